@@ -0,0 +1,49 @@
+"""Add packed depth columns to orderbook_snapshots
+
+Revision ID: 020_packed_depth
+Revises: 019_map_context
+Create Date: 2026-10-16
+
+Adds an alternative compact storage for orderbook levels (used when
+ORDERBOOK_STORAGE_MODE=packed):
+- bid_depth / ask_depth: uint16 price ticks + float32 sizes (bytea)
+- keyframe_id: set when the packed levels are a delta against that row
+bids/asks JSONB become nullable since packed rows leave them empty.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers
+revision = '020_packed_depth'
+down_revision = '019_map_context'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('orderbook_snapshots', sa.Column('bid_depth', sa.LargeBinary(), nullable=True))
+    op.add_column('orderbook_snapshots', sa.Column('ask_depth', sa.LargeBinary(), nullable=True))
+    op.add_column('orderbook_snapshots', sa.Column('keyframe_id', sa.BigInteger(), nullable=True))
+    op.alter_column('orderbook_snapshots', 'bids', existing_type=postgresql.JSONB(), nullable=True)
+    op.alter_column('orderbook_snapshots', 'asks', existing_type=postgresql.JSONB(), nullable=True)
+
+    # Latest keyframe lookup per market (writer) and keyframe fetch (readers)
+    op.create_index(
+        'ix_orderbook_snapshots_keyframes',
+        'orderbook_snapshots',
+        ['market_id', sa.text('timestamp DESC')],
+        postgresql_where=sa.text('keyframe_id IS NULL AND bid_depth IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orderbook_snapshots_keyframes', table_name='orderbook_snapshots')
+    # Packed-only rows cannot satisfy NOT NULL JSONB columns
+    op.execute("DELETE FROM orderbook_snapshots WHERE bids IS NULL OR asks IS NULL")
+    op.alter_column('orderbook_snapshots', 'asks', existing_type=postgresql.JSONB(), nullable=False)
+    op.alter_column('orderbook_snapshots', 'bids', existing_type=postgresql.JSONB(), nullable=False)
+    op.drop_column('orderbook_snapshots', 'keyframe_id')
+    op.drop_column('orderbook_snapshots', 'ask_depth')
+    op.drop_column('orderbook_snapshots', 'bid_depth')
@@ -0,0 +1,32 @@
+"""Add snapshot_suppressions coverage markers
+
+Revision ID: 021_snapshot_suppressions
+Revises: 020_packed_depth
+Create Date: 2026-10-16
+
+Per tier and minute count of snapshot writes skipped because features did
+not change (SNAPSHOT_DEDUP_ENABLED), so coverage monitoring can count them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '021_snapshot_suppressions'
+down_revision = '020_packed_depth'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'snapshot_suppressions',
+        sa.Column('tier', sa.SmallInteger(), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('suppressed', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('tier', 'bucket'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('snapshot_suppressions')
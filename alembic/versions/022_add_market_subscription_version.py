@@ -0,0 +1,63 @@
+"""Add markets.subscription_version for incremental WebSocket subscriptions
+
+Revision ID: 022_subscription_version
+Revises: 021_snapshot_suppressions
+Create Date: 2026-10-16
+
+A sequence-backed version bumped by a trigger whenever a column that decides
+WebSocket eligibility changes (tier, active, resolved, token IDs). The
+collector keeps the highest version it has seen and reads only newer rows.
+updated_at cannot serve: snapshot runs bump it on every market every cycle.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '022_subscription_version'
+down_revision = '021_snapshot_suppressions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE market_subscription_version_seq")
+    op.add_column(
+        'markets',
+        sa.Column(
+            'subscription_version',
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("nextval('market_subscription_version_seq')"),
+        ),
+    )
+    op.create_index('ix_markets_subscription_version', 'markets', ['subscription_version'])
+    op.execute("""
+        CREATE FUNCTION bump_market_subscription_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.subscription_version := nextval('market_subscription_version_seq');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER markets_subscription_version
+        BEFORE UPDATE ON markets
+        FOR EACH ROW
+        WHEN (
+            OLD.tier IS DISTINCT FROM NEW.tier
+            OR OLD.active IS DISTINCT FROM NEW.active
+            OR OLD.resolved IS DISTINCT FROM NEW.resolved
+            OR OLD.yes_token_id IS DISTINCT FROM NEW.yes_token_id
+            OR OLD.no_token_id IS DISTINCT FROM NEW.no_token_id
+        )
+        EXECUTE FUNCTION bump_market_subscription_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS markets_subscription_version ON markets")
+    op.execute("DROP FUNCTION IF EXISTS bump_market_subscription_version()")
+    op.drop_index('ix_markets_subscription_version', table_name='markets')
+    op.drop_column('markets', 'subscription_version')
+    op.execute("DROP SEQUENCE IF EXISTS market_subscription_version_seq")
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the WebSocket collector against a local replay.
+
+Replays a recording (scripts/record_ws_frames.py) from a ReplayServer in a
+separate process and runs the real collector pipeline against it: managed
+WebSocketCollector connections with the shared TradeWriter,
+CoalescingRedisWriter, metrics aggregator and orderbook replica, writing
+to the Postgres and Redis configured in settings. Point DATABASE_URL /
+REDIS_URL at scratch instances; the recorded market IDs must exist in
+that database for trades to be written.
+
+Reports events/sec, p50/p99 latency per frame and per event handler,
+DB rows/sec and Redis commands/sec.
+
+Usage:
+    python scripts/bench_ws_collector.py frames.rec.gz               # max speed
+    python scripts/bench_ws_collector.py frames.rec.gz --speed 10 --loops 3
+    python scripts/bench_ws_collector.py frames.rec.gz --json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.collectors.replay import ReplayServer, read_recording
+from src.collectors.subscriptions import diff_subscriptions
+from src.collectors.websocket import MAX_SUBSCRIPTIONS, MultiConnectionCollector
+from src.config.settings import settings
+
+IDLE_SECONDS = 0.5  # No new frames for this long after the replay ends = drained
+
+
+def serve_replay(path: str, speed: float, loops: int, connections: int, port_queue, done) -> None:
+    """Replay server process: reports its port, sets `done` once every connection got its replay."""
+
+    async def serve():
+        server = ReplayServer(read_recording(path), speed=speed, loops=loops)
+        await server.start()
+        port_queue.put(server.port)
+        await server.wait_done(connections)
+        done.set()
+        await asyncio.Future()  # Keep connections open until terminated
+
+    asyncio.run(serve())
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile (0 for no samples)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class Probe:
+    """Times frames and event handlers of instrumented collectors."""
+
+    def __init__(self):
+        self.frame_latency: list[float] = []
+        self.handler_latency: dict[str, list[float]] = defaultdict(list)
+        self.first_frame_at: float = 0.0
+        self.last_frame_at: float = 0.0
+
+    def instrument(self, collector) -> None:
+        handle_message = collector._handle_message
+
+        async def timed_message(message):
+            start = time.perf_counter()
+            if not self.first_frame_at:
+                self.first_frame_at = start
+            await handle_message(message)
+            self.last_frame_at = time.perf_counter()
+            self.frame_latency.append(self.last_frame_at - start)
+
+        collector._handle_message = timed_message
+        for event_type, handler in collector._event_handlers.items():
+            if handler is not None:
+                collector._event_handlers[event_type] = self._timed(event_type, handler)
+
+    def _timed(self, event_type: str, handler):
+        samples = self.handler_latency[event_type]
+
+        async def timed(data):
+            start = time.perf_counter()
+            await handler(data)
+            samples.append(time.perf_counter() - start)
+
+        return timed
+
+
+async def redis_commands_processed(collector: MultiConnectionCollector) -> int:
+    """Server-wide command counter (0 if Redis is unreachable)."""
+    try:
+        info = await collector.redis_writer.redis.client.info("stats")
+        return int(info.get("total_commands_processed", 0))
+    except Exception:
+        return 0
+
+
+async def bench(args) -> dict:
+    recording = read_recording(args.recording)
+    if not recording.markets:
+        raise SystemExit("Recording has no market header; record it with scripts/record_ws_frames.py")
+    per_connection = MAX_SUBSCRIPTIONS // 2
+    connections = args.connections or math.ceil(len(recording.markets) / per_connection)
+
+    # Replay server in its own process so it does not compete for the collector's loop
+    ctx = multiprocessing.get_context("spawn")
+    port_queue, done = ctx.Queue(), ctx.Event()
+    server = ctx.Process(
+        target=serve_replay,
+        args=(args.recording, args.speed, args.loops, connections, port_queue, done),
+        daemon=True,
+    )
+    server.start()
+    settings.websocket_url = f"ws://127.0.0.1:{port_queue.get(timeout=60)}"
+
+    # Same wiring as MultiConnectionCollector, with the recorded markets instead of Postgres
+    multi = MultiConnectionCollector(num_connections=connections)
+    priors = settings.websocket_tier_load_weights
+    weights = {cid: priors.get(info.get("tier"), 0.0) for cid, info in recording.markets.items()}
+    plan = multi.scheduler.plan(list(recording.markets), weights, {}, connections)
+    probe = Probe()
+    for i in range(connections):
+        collector = multi._add_connection()
+        assigned = {cid: recording.markets[cid] for cid, conn in plan.items() if conn == i}
+        collector.apply_subscription_diff(diff_subscriptions({}, assigned))
+        probe.instrument(collector)
+
+    await multi.trade_writer.start()
+    await multi.redis_writer.start()
+    await multi.metrics_aggregator.start()
+    await multi.orderbook_replica.start()
+    redis_before = await redis_commands_processed(multi)
+
+    tasks = [asyncio.create_task(c._connect_and_run()) for c in multi.collectors]
+    try:
+        while not done.is_set():
+            await asyncio.sleep(0.05)
+        # Frames still in socket buffers
+        while time.perf_counter() - max(probe.last_frame_at, probe.first_frame_at) < IDLE_SECONDS:
+            await asyncio.sleep(0.05)
+    finally:
+        for collector in multi.collectors:
+            collector.running = False
+            if collector.ws is not None:
+                await collector.ws.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        server.terminate()
+        server.join()
+
+    # Drain the writers; their throughput includes the time to flush the backlog
+    await multi.metrics_aggregator.stop()
+    await multi.orderbook_replica.stop()
+    await multi.trade_writer.stop()
+    db_done = time.perf_counter()
+    await multi.redis_writer.stop()
+    redis_done = time.perf_counter()
+    redis_after = await redis_commands_processed(multi)
+    await multi.redis_writer.redis.close()
+
+    start = probe.first_frame_at
+    elapsed = max(probe.last_frame_at - start, 1e-9)
+    events = sum(c.events_processed for c in multi.collectors)
+    trade_stats = multi.trade_writer.stats()
+    redis_stats = multi.redis_writer.stats()
+    db_rows = trade_stats["written"] + trade_stats["whales_written"]
+
+    def latency(samples: list[float]) -> dict:
+        return {
+            "count": len(samples),
+            "p50_us": round(percentile(samples, 50) * 1e6, 1),
+            "p99_us": round(percentile(samples, 99) * 1e6, 1),
+            "max_us": round(max(samples, default=0.0) * 1e6, 1),
+        }
+
+    return {
+        "recording": args.recording,
+        "speed": args.speed,
+        "loops": args.loops,
+        "markets": len(recording.markets),
+        "connections": connections,
+        "frames": len(probe.frame_latency),
+        "events": events,
+        "trades": sum(c.trades_processed for c in multi.collectors),
+        "seconds": round(elapsed, 3),
+        "frames_per_sec": round(len(probe.frame_latency) / elapsed, 1),
+        "events_per_sec": round(events / elapsed, 1),
+        "frame_latency": latency(probe.frame_latency),
+        "handler_latency": {event_type: latency(s) for event_type, s in probe.handler_latency.items()},
+        "db_rows": db_rows,
+        "db_rows_per_sec": round(db_rows / max(db_done - start, 1e-9), 1),
+        "db_failed_batches": trade_stats["failed"],
+        "trades_spilled": trade_stats["spilled"],
+        "redis_commands": redis_stats["commands_sent"],
+        "redis_commands_per_sec": round(redis_stats["commands_sent"] / max(redis_done - start, 1e-9), 1),
+        "redis_pipelines": redis_stats["pipelines_sent"],
+        "redis_failed_flushes": redis_stats["failed_flushes"],
+        # Everything the server saw, including non-coalesced calls (and other clients)
+        "redis_server_commands_per_sec": round(
+            max(redis_after - redis_before, 0) / max(redis_done - start, 1e-9), 1
+        ),
+    }
+
+
+def print_report(report: dict) -> None:
+    pace = "max speed" if report["speed"] <= 0 else f"{report['speed']:g}x"
+    print(
+        f"{report['frames']} frames / {report['events']} events from {report['markets']} markets "
+        f"on {report['connections']} connections at {pace} in {report['seconds']:.2f}s"
+    )
+    print(f"  events/s        {report['events_per_sec']:>12,.0f}   (frames/s {report['frames_per_sec']:,.0f})")
+    print(
+        f"  DB rows/s       {report['db_rows_per_sec']:>12,.0f}   ({report['db_rows']} rows, "
+        f"{report['db_failed_batches']} failed batches, {report['trades_spilled']} spilled)"
+    )
+    print(
+        f"  Redis cmds/s    {report['redis_commands_per_sec']:>12,.0f}   ({report['redis_pipelines']} pipelines, "
+        f"{report['redis_failed_flushes']} failed; server-wide {report['redis_server_commands_per_sec']:,.0f}/s)"
+    )
+    print(f"  {'latency (us)':<18} {'count':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+    rows = [("frame", report["frame_latency"])] + sorted(report["handler_latency"].items())
+    for name, stats in rows:
+        print(f"  {name:<18} {stats['count']:>9} {stats['p50_us']:>9.1f} {stats['p99_us']:>9.1f} {stats['max_us']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", help="Recording from scripts/record_ws_frames.py")
+    parser.add_argument("--speed", type=float, default=0, help="Pace multiplier (0 = max speed)")
+    parser.add_argument("--loops", type=int, default=1, help="Replays per connection")
+    parser.add_argument("--connections", type=int, help="Collector connections (default: as many as needed)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(bench(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for WebSocket frame decoding and event dispatch.
+
+Replays frames through every available FrameDecoder backend and routes the
+events through an event_type dispatch table that reads the same fields as
+the collector's handlers, so the numbers reflect the collector's per-frame
+CPU cost without network, Redis or Postgres.
+
+Frames come from a recording made by scripts/record_ws_frames.py or a
+file with one raw frame per line (gzip if the name ends in .gz); without
+--frames a synthetic mix of trades, books and batched price changes is
+generated.
+
+Usage:
+    python scripts/bench_ws_decode.py
+    python scripts/bench_ws_decode.py --frames frames.txt.gz --repeat 5
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.collectors.decoding import FrameDecoder, available_backends
+from src.collectors.replay import read_recording
+
+
+def load_frames(path: str) -> list[str | bytes]:
+    """Frames of a recording or of a file with one raw frame per line."""
+    return [frame for _, frame in read_recording(path).frames]
+
+
+def synthetic_frames(count: int, seed: int = 7) -> list[str]:
+    """Trades, 20-level books and batched price changes in roughly live proportions."""
+    rng = random.Random(seed)
+    assets = [str(rng.getrandbits(250)) for _ in range(200)]
+
+    def levels(start: float, step: float) -> list[dict]:
+        return [
+            {"price": f"{start + i * step:.3f}", "size": f"{rng.uniform(5, 5000):.2f}"}
+            for i in range(20)
+        ]
+
+    frames = []
+    for _ in range(count):
+        kind = rng.random()
+        ts = str(1760000000000 + rng.randrange(10**6))
+        if kind < 0.3:
+            event = {
+                "event_type": "last_trade_price",
+                "asset_id": rng.choice(assets),
+                "market": "0x" + "ab" * 32,
+                "price": f"{rng.uniform(0.01, 0.99):.3f}",
+                "size": f"{rng.uniform(1, 20000):.2f}",
+                "side": rng.choice(["BUY", "SELL"]),
+                "fee_rate_bps": "0",
+                "timestamp": ts,
+            }
+        elif kind < 0.4:
+            mid = rng.uniform(0.2, 0.8)
+            event = {
+                "event_type": "book",
+                "asset_id": rng.choice(assets),
+                "market": "0x" + "cd" * 32,
+                "bids": levels(mid - 0.001, -0.001),
+                "asks": levels(mid + 0.001, 0.001),
+                "timestamp": ts,
+                "hash": "%040x" % rng.getrandbits(160),
+            }
+        else:
+            event = {
+                "event_type": "price_change",
+                "market": "0x" + "ef" * 32,
+                "price_changes": [
+                    {
+                        "asset_id": rng.choice(assets),
+                        "price": f"{rng.uniform(0.01, 0.99):.3f}",
+                        "size": f"{rng.uniform(0, 5000):.2f}",
+                        "side": rng.choice(["BUY", "SELL"]),
+                        "hash": "%040x" % rng.getrandbits(160),
+                        "best_bid": f"{rng.uniform(0.01, 0.5):.3f}",
+                        "best_ask": f"{rng.uniform(0.5, 0.99):.3f}",
+                    }
+                    for _ in range(rng.randint(1, 4))
+                ],
+                "timestamp": ts,
+            }
+        # The server sometimes batches events into one array frame
+        frames.append(json.dumps([event] if rng.random() < 0.2 else event))
+    return frames
+
+
+def _trade(event: dict) -> float:
+    return float(event.get("price", 0)) * float(event.get("size", 0)) + len(event.get("side", ""))
+
+
+def _book(event: dict) -> float:
+    return sum(float(level["size"]) for level in event.get("bids", []) + event.get("asks", []))
+
+
+def _price_change(event: dict) -> float:
+    return sum(float(change.get("price", 0)) for change in event.get("price_changes") or [])
+
+
+HANDLERS = {
+    "last_trade_price": _trade,
+    "book": _book,
+    "price_change": _price_change,
+    "tick_size_change": None,
+}
+
+
+def run(decoder: FrameDecoder, frames: list[str | bytes], dispatch: bool) -> tuple[float, int]:
+    """Decode (and optionally dispatch) every frame; returns (seconds, events)."""
+    events = 0
+    start = time.perf_counter()
+    for frame in frames:
+        for event in decoder.decode(frame):
+            events += 1
+            if dispatch:
+                handler = HANDLERS.get(event.get("event_type"))
+                if handler is not None:
+                    handler(event)
+    return time.perf_counter() - start, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", help="Recording or file with one raw frame per line (.gz allowed)")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Synthetic frames without --frames")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else synthetic_frames(args.synthetic)
+    megabytes = sum(len(f) for f in frames) / 1e6
+    print(f"{len(frames)} frames, {megabytes:.1f} MB")
+    print(f"{'backend':<8} {'stage':<16} {'frames/s':>12} {'events/s':>12} {'us/frame':>10} {'speedup':>8}")
+
+    baseline: dict[str, float] = {}
+    for backend in reversed(available_backends()):  # json first, as the baseline
+        decoder = FrameDecoder(backend)
+        for stage, dispatch in (("decode", False), ("decode+dispatch", True)):
+            elapsed, events = min(
+                (run(decoder, frames, dispatch) for _ in range(args.repeat)),
+                key=lambda result: result[0],
+            )
+            baseline.setdefault(stage, elapsed)
+            print(
+                f"{backend:<8} {stage:<16} {len(frames) / elapsed:>12,.0f} {events / elapsed:>12,.0f} "
+                f"{elapsed / len(frames) * 1e6:>10.2f} {baseline[stage] / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
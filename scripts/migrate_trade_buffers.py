@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+One-time conversion of legacy JSON trade buffers to packed sorted sets.
+
+Readers merge the legacy trades:{condition_id} lists automatically until they
+expire (redis_trade_buffer_ttl), so this is optional - run it after deploying
+the packed buffer to free the old lists immediately.
+
+Usage:
+    docker-compose exec api python scripts/migrate_trade_buffers.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.db.redis import SyncRedisClient
+
+
+def migrate_trade_buffers():
+    """Convert every legacy trade list and report how many were migrated."""
+    redis = SyncRedisClient()
+    try:
+        migrated = redis.migrate_legacy_trade_buffers()
+        print(f"Migrated {migrated} legacy trade buffers")
+    finally:
+        redis.close()
+
+
+if __name__ == "__main__":
+    migrate_trade_buffers()
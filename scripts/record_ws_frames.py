@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Record raw market-channel WebSocket frames for offline replay.
+
+Subscribes to the highest-tier eligible markets (read from Postgres, like
+the collector) and writes every frame with its arrival time to a gzip
+recording that scripts/replay_ws_server.py, scripts/bench_ws_collector.py
+and scripts/bench_ws_decode.py read.
+
+Usage:
+    python scripts/record_ws_frames.py --out frames.rec.gz --duration 600
+    python scripts/record_ws_frames.py --out t4.rec.gz --tiers 4 --markets 250
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import signal
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import websockets
+
+from src.collectors.replay import FrameRecorder
+from src.collectors.subscriptions import MarketSubscriptions, token_ids
+from src.collectors.websocket import MAX_SUBSCRIPTIONS
+from src.config.settings import settings
+
+
+def select_markets(tiers: list[int], limit: int) -> dict[str, dict]:
+    """Eligible markets in the given tiers, highest tier first."""
+    subscriptions = MarketSubscriptions()
+    subscriptions.refresh()
+    markets = {cid: info for cid, info in subscriptions.ranked().items() if info["tier"] in tiers}
+    return dict(list(markets.items())[:limit])
+
+
+async def record_connection(url: str, tokens: list[str], recorder: FrameRecorder, deadline: float) -> None:
+    """Subscribe one connection and record its frames until the deadline."""
+    async with websockets.connect(url, ping_interval=30, ping_timeout=10, max_size=None) as ws:
+        await ws.send(json.dumps({"type": "market", "assets_ids": tokens}))
+        while time.monotonic() < deadline:
+            try:
+                frame = await asyncio.wait_for(ws.recv(), timeout=deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            recorder.write(frame)
+
+
+async def record(args) -> None:
+    markets = select_markets(args.tiers, args.markets)
+    if not markets:
+        print("No eligible markets in the requested tiers")
+        return
+
+    per_connection = MAX_SUBSCRIPTIONS // 2
+    chunks = [
+        list(markets.values())[i * per_connection:(i + 1) * per_connection]
+        for i in range(math.ceil(len(markets) / per_connection))
+    ]
+    print(f"Recording {len(markets)} markets on {len(chunks)} connections for {args.duration:.0f}s -> {args.out}")
+
+    deadline = time.monotonic() + args.duration
+    with FrameRecorder(args.out, markets, source=args.url) as recorder:
+        tasks = [
+            asyncio.create_task(record_connection(args.url, token_ids(chunk), recorder, deadline))
+            for chunk in chunks
+        ]
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: [task.cancel() for task in tasks])
+        # A dropped connection ends its share of the recording; the others continue
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                print(f"Connection {i} stopped early: {result}")
+
+    print(f"Recorded {recorder.frames} frames ({recorder.bytes / 1e6:.1f} MB raw)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", required=True, help="Recording file (.gz compresses)")
+    parser.add_argument("--duration", type=float, default=300, help="Seconds to record")
+    parser.add_argument("--tiers", type=int, nargs="+", default=settings.websocket_enabled_tiers)
+    parser.add_argument("--markets", type=int, default=1000, help="Max markets to subscribe")
+    parser.add_argument("--url", default=settings.websocket_url, help="Market channel URL")
+    args = parser.parse_args()
+    asyncio.run(record(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Serve a WebSocket recording as a local market channel.
+
+Point a collector at it with WEBSOCKET_URL=ws://127.0.0.1:<port>. Each
+connection receives the recorded frames for the tokens it subscribes to.
+
+Usage:
+    python scripts/replay_ws_server.py frames.rec.gz --port 8765
+    python scripts/replay_ws_server.py frames.rec.gz --speed 10 --loops 3
+    python scripts/replay_ws_server.py frames.rec.gz --speed 0   # max speed
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.collectors.replay import ReplayServer, read_recording
+
+
+async def serve(args) -> None:
+    recording = read_recording(args.recording)
+    server = ReplayServer(recording, speed=args.speed, loops=args.loops, host=args.host, port=args.port)
+    url = await server.start()
+    pace = "max speed" if args.speed <= 0 else f"{args.speed:g}x"
+    print(
+        f"Replaying {len(recording.frames)} frames ({recording.duration:.0f}s, "
+        f"{len(recording.markets)} markets) at {pace} on {url}",
+        flush=True,
+    )
+    try:
+        await asyncio.Future()  # Until interrupted
+    finally:
+        await server.stop()
+        print(f"Sent {server.frames_sent} frames to {server.connections} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", help="Recording from scripts/record_ws_frames.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pace multiplier (0 = max speed)")
+    parser.add_argument("--loops", type=int, default=1, help="Replays per connection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
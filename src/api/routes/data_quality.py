@@ -9,7 +9,8 @@ from sqlalchemy.orm import Session
 
 from src.config.settings import settings
 from src.db.database import get_db
-from src.db.models import Market, Snapshot
+from src.db.models import Market, Snapshot, SnapshotSuppression
+from src.snapshots.scheduling import adaptive_tier
 
 router = APIRouter()
 
@@ -23,12 +24,34 @@ EXPECTED_SNAPSHOTS_PER_HOUR = {
 }
 
 
+def expected_interval(tier: int) -> float:
+    """
+    Longest expected gap between snapshots of a market in the tier (seconds).
+
+    Adaptive tiers snapshot quiet markets only every
+    adaptive_snapshot_max_interval, so that is what every market is
+    guaranteed; other tiers follow their fixed interval.
+    """
+    if adaptive_tier(tier):
+        return settings.adaptive_snapshot_max_interval[tier]
+    return float(getattr(settings, f"tier_{tier}_interval"))
+
+
+def expected_snapshots_per_hour(tier: int) -> float:
+    """Snapshots per market per hour the tier guarantees."""
+    if adaptive_tier(tier):
+        return 3600 / settings.adaptive_snapshot_max_interval[tier]
+    return EXPECTED_SNAPSHOTS_PER_HOUR[tier]
+
+
 @router.get("/data-quality/coverage")
 async def get_coverage(db: Session = Depends(get_db)):
     """
     Get data collection coverage by tier.
 
-    Compares expected vs actual snapshots per hour.
+    Compares expected vs actual snapshots per hour. Adaptive tiers are
+    expected to deliver at least one snapshot per max interval; active
+    markets get more, which is capped so they do not hide shortfalls.
     """
     now = datetime.now(timezone.utc)
     one_hour_ago = now - timedelta(hours=1)
@@ -45,30 +68,44 @@ async def get_coverage(db: Session = Depends(get_db)):
         ).scalar()
 
         # Expected snapshots per hour
-        expected_per_market = EXPECTED_SNAPSHOTS_PER_HOUR[tier]
-        expected_total = market_count * expected_per_market
+        expected_per_market = expected_snapshots_per_hour(tier)
+        expected_total = round(market_count * expected_per_market)
+        adaptive = adaptive_tier(tier)
 
         # Actual snapshots in last hour
-        actual = db.execute(
+        written = db.execute(
             select(func.count(Snapshot.id)).where(
                 Snapshot.tier == tier,
                 Snapshot.timestamp >= one_hour_ago,
             )
         ).scalar()
 
+        # Unchanged snapshots skipped by change suppression still count as covered
+        suppressed = db.execute(
+            select(func.coalesce(func.sum(SnapshotSuppression.suppressed), 0)).where(
+                SnapshotSuppression.tier == tier,
+                SnapshotSuppression.bucket >= one_hour_ago,
+            )
+        ).scalar()
+        actual = written + suppressed
+
         # Coverage percentage
-        coverage_pct = (actual / expected_total * 100) if expected_total > 0 else 100
+        covered = min(actual, expected_total) if adaptive else actual
+        coverage_pct = (covered / expected_total * 100) if expected_total > 0 else 100
 
         coverage[f"tier_{tier}"] = {
             "markets": market_count,
+            "schedule": "adaptive" if adaptive else "fixed",
             "expected_per_hour": expected_total,
             "actual_per_hour": actual,
+            "covered_per_hour": covered,
+            "suppressed_per_hour": suppressed,
             "coverage_pct": round(coverage_pct, 1),
         }
 
     # Overall coverage
     total_expected = sum(c["expected_per_hour"] for c in coverage.values())
-    total_actual = sum(c["actual_per_hour"] for c in coverage.values())
+    total_actual = sum(c["covered_per_hour"] for c in coverage.values())
     overall_coverage = (total_actual / total_expected * 100) if total_expected > 0 else 100
 
     return {
@@ -84,19 +121,14 @@ async def get_gaps(db: Session = Depends(get_db)):
     """
     Find markets with missing or stale data.
 
-    A market is considered stale if it hasn't had a snapshot
-    in longer than its tier interval.
+    A market is considered stale if it hasn't had a snapshot in longer
+    than twice its tier's expected interval (the max interval for
+    adaptive tiers, where quiet markets are snapshotted only that often).
     """
     now = datetime.now(timezone.utc)
 
     # Tier staleness thresholds (in seconds, 2x the expected interval)
-    staleness_thresholds = {
-        0: 2 * settings.tier_0_interval,
-        1: 2 * settings.tier_1_interval,
-        2: 2 * settings.tier_2_interval,
-        3: 2 * settings.tier_3_interval,
-        4: 2 * settings.tier_4_interval,
-    }
+    staleness_thresholds = {tier: 2 * expected_interval(tier) for tier in range(5)}
 
     gaps = []
     for tier in range(5):
@@ -127,7 +159,7 @@ async def get_gaps(db: Session = Depends(get_db)):
                 "tier": tier,
                 "last_snapshot_at": last_snapshot.isoformat() if last_snapshot else None,
                 "seconds_since_last": int(seconds_since) if seconds_since else None,
-                "expected_interval": staleness_thresholds[tier] // 2,
+                "expected_interval": int(staleness_thresholds[tier] // 2),
             })
 
     return {
@@ -37,6 +37,9 @@ def serialize_value(value: Any) -> Any:
         return value
     if isinstance(value, (list, dict)):
         return value
+    if isinstance(value, (bytes, memoryview)):
+        # Packed orderbook depth - show the size, not the raw bytes
+        return f"<{len(value)} bytes>"
     # For Decimal and other types
     return str(value)
 
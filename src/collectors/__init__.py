@@ -2,5 +2,12 @@
 Data collectors for real-time market data.
 
 - WebSocketCollector: Real-time trade data via WebSocket
+- TradeWriter: Batched write-behind of WebSocket trades to PostgreSQL
 - MetricsComputer: Compute trade flow and whale metrics from Redis buffers
+- TradeMetricsAggregator: Incremental 1h trade/whale metrics published by the collector
+- OrderBookReplica: Live L2 books from book/price_change deltas, published with features
+- ConnectionScheduler: Load-aware, sticky assignment of markets to WebSocket connections
+- FrameDecoder: Pluggable WebSocket frame decoding (orjson with stdlib json fallback)
+- ShardSupervisor: Runs the collector as supervised shard processes with Redis-published assignments
+- FrameRecorder / ReplayServer: Record market-channel frames and replay them locally for benchmarks
 """
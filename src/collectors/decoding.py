@@ -0,0 +1,89 @@
+"""
+Decoding of WebSocket frames into event dicts.
+
+JSON parsing is the largest per-frame CPU cost in the collector (book
+frames carry full ladders, price_change frames batch many assets), so the
+decoder is pluggable:
+
+- orjson when installed, otherwise stdlib json (settings.websocket_decoder
+  selects "auto", "orjson" or "json")
+- Binary frames are msgpack
+- decode() always returns a list of events, so callers do not branch on
+  single events vs arrays; PING/PONG keepalives decode to no events
+
+Malformed frames raise ValueError (json and orjson decode errors both
+subclass it).
+"""
+import json
+from typing import Any, Callable, Optional
+
+from src.config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used instead
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+KEEPALIVE_FRAMES = frozenset(("PING", "PONG"))
+
+
+def available_backends() -> list[str]:
+    """Decoder backends usable in this environment (fastest first)."""
+    return (["orjson"] if orjson is not None else []) + ["json"]
+
+
+def get_loads(backend: str) -> tuple[str, Callable[[str | bytes], Any]]:
+    """
+    Resolve a decoder backend name to its loads function.
+
+    Args:
+        backend: "auto", "orjson" or "json"
+
+    Returns:
+        (resolved backend name, loads function)
+    """
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend == "orjson":
+        if orjson is None:
+            raise ValueError("orjson decoder requested but orjson is not installed")
+        return backend, orjson.loads
+    if backend == "json":
+        return backend, json.loads
+    raise ValueError(f"Unknown WebSocket decoder: {backend}")
+
+
+class FrameDecoder:
+    """Turns raw WebSocket frames into lists of event dicts."""
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Args:
+            backend: Decoder backend (defaults to settings.websocket_decoder)
+        """
+        self.backend, self._loads = get_loads(backend or settings.websocket_decoder)
+
+    def decode(self, message: str | bytes) -> list:
+        """
+        Decode one frame.
+
+        Returns:
+            Events in the frame (empty for keepalives)
+
+        Raises:
+            ValueError: Malformed frame, or a binary frame without msgpack installed
+        """
+        if isinstance(message, bytes):
+            if msgpack is None:
+                raise ValueError("Received binary message but msgpack not installed")
+            data = msgpack.unpackb(message, raw=False)
+        elif message in KEEPALIVE_FRAMES:
+            return []
+        else:
+            data = self._loads(message)
+        return data if isinstance(data, list) else [data]
@@ -4,7 +4,8 @@ Health check script for WebSocket collector.
 
 Checks:
 1. Redis connectivity and last activity timestamp
-2. Trade rate from database (must be > MIN_RATE trades/minute)
+2. In sharded mode, that at least one collector shard is reporting
+3. Trade rate from database (must be > MIN_RATE trades/minute)
 
 Exit codes:
 - 0: Healthy
@@ -45,7 +46,13 @@ def check_health():
             except Exception as e:
                 print(f"WARNING: Could not parse last_activity: {e}")
 
-        # Check 3: Trade rate from database
+        # Check 3: Collector shards (only present when the supervisor runs)
+        shards_reporting = r.hget("ws:shards", "shards_reporting")
+        if shards_reporting is not None and int(shards_reporting) == 0:
+            print("UNHEALTHY: No collector shard is reporting")
+            return 1
+
+        # Check 4: Trade rate from database
         database_url = os.environ.get("DATABASE_URL")
         if database_url:
             try:
@@ -0,0 +1,260 @@
+"""
+Write-behind trade ingestion for the WebSocket collector.
+
+Trades arriving on the WebSocket are queued in memory and written to
+PostgreSQL by a single background writer instead of one session/commit
+per event inside the asyncio loop.
+
+- Bounded queue: producers never grow memory without limit
+- Batched writes: multi-row INSERT ... RETURNING for trades, flushed by
+  size or by time, whichever comes first
+- Whale linkage: returned trade IDs are used to insert whale_events in
+  the same transaction
+- Backpressure: a full queue makes producers wait briefly, then spill
+  (drop) the trade and count it so the loss is visible in logs/metrics
+- DB work runs in a worker thread so it never blocks WebSocket reads
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+import structlog
+
+from src.config.settings import settings
+from src.db.database import get_session
+from src.db.models import Trade, WhaleEvent
+
+logger = structlog.get_logger()
+
+# Minimum seconds between "queue full" warnings (avoid log floods during bursts)
+SPILL_LOG_INTERVAL_SECONDS = 10.0
+STATS_LOG_INTERVAL_SECONDS = 60.0  # Periodic writer stats for monitoring
+
+
+@dataclass
+class PendingTrade:
+    """A validated trade waiting to be written to the database."""
+    market_id: int
+    timestamp: datetime
+    price: float
+    size: float
+    side: str
+    token_type: str
+    whale_tier: int
+
+    def to_row(self) -> dict:
+        """Row dictionary for the trades table."""
+        return {
+            "market_id": self.market_id,
+            "timestamp": self.timestamp,
+            "price": self.price,
+            "size": self.size,
+            "side": self.side,
+            "token_type": self.token_type,
+            "whale_tier": self.whale_tier,
+        }
+
+
+class TradeWriter:
+    """
+    Bounded async queue with a background batch writer for trades.
+
+    One writer is shared by every connection in the collector process.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        put_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the trade writer.
+
+        Args:
+            batch_size: Max trades per INSERT (defaults to settings)
+            flush_interval: Max seconds a trade waits before being flushed
+            max_queue: Queue capacity before backpressure kicks in
+            put_timeout: Seconds a producer waits on a full queue before spilling
+        """
+        self.batch_size = batch_size or settings.trade_ingest_batch_size
+        self.flush_interval = flush_interval or settings.trade_ingest_flush_interval
+        self.put_timeout = put_timeout if put_timeout is not None else settings.trade_ingest_put_timeout
+        self.queue: asyncio.Queue[PendingTrade] = asyncio.Queue(
+            maxsize=max_queue or settings.trade_ingest_queue_max
+        )
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_spill_log = 0.0
+        self._last_stats_log = time.monotonic()
+
+        # Counters (monotonic, for monitoring)
+        self.enqueued = 0
+        self.written = 0
+        self.whales_written = 0
+        self.batches = 0
+        self.failed = 0
+        self.backpressure_waits = 0
+        self.spilled = 0
+
+    async def start(self) -> None:
+        """Start the background writer task."""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Trade writer started",
+            batch_size=self.batch_size,
+            flush_interval=self.flush_interval,
+            max_queue=self.queue.maxsize,
+        )
+
+    async def stop(self) -> None:
+        """Stop the writer, flushing everything still queued."""
+        self.running = False
+        if self._task:
+            await self._task
+            self._task = None
+        logger.info("Trade writer stopped", **self.stats())
+
+    async def submit(self, trade: PendingTrade) -> bool:
+        """
+        Queue a trade for writing.
+
+        Waits up to put_timeout when the queue is full (backpressure), then
+        spills the trade rather than stalling the WebSocket reader.
+
+        Returns:
+            True if queued, False if spilled
+        """
+        try:
+            self.queue.put_nowait(trade)
+            self.enqueued += 1
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self.backpressure_waits += 1
+        try:
+            await asyncio.wait_for(self.queue.put(trade), timeout=self.put_timeout)
+            self.enqueued += 1
+            return True
+        except asyncio.TimeoutError:
+            self.spilled += 1
+            now = time.monotonic()
+            if now - self._last_spill_log >= SPILL_LOG_INTERVAL_SECONDS:
+                self._last_spill_log = now
+                logger.warning(
+                    "Trade queue full, spilling trades",
+                    spilled=self.spilled,
+                    queue_size=self.queue.qsize(),
+                    max_queue=self.queue.maxsize,
+                )
+            return False
+
+    def stats(self) -> dict:
+        """Current writer counters."""
+        return {
+            "queue_size": self.queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "whales_written": self.whales_written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "backpressure_waits": self.backpressure_waits,
+            "spilled": self.spilled,
+        }
+
+    async def _run(self) -> None:
+        """Collect batches and flush them until stopped and drained."""
+        while self.running or not self.queue.empty():
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+
+            now = time.monotonic()
+            if now - self._last_stats_log >= STATS_LOG_INTERVAL_SECONDS:
+                self._last_stats_log = now
+                logger.info("Trade writer stats", **self.stats())
+
+    async def _collect_batch(self) -> list[PendingTrade]:
+        """
+        Wait for the first trade, then keep draining until the batch is full
+        or flush_interval has elapsed since the first trade arrived.
+        """
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            if not self.running:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _flush(self, batch: list[PendingTrade]) -> None:
+        """Write a batch in a worker thread (keeps the event loop free)."""
+        try:
+            whales = await asyncio.to_thread(self._write_batch, batch)
+            self.written += len(batch)
+            self.whales_written += whales
+            self.batches += 1
+            logger.debug("Trade batch written", trades=len(batch), whales=whales)
+        except Exception as e:
+            # Log but continue - DB errors must not stop the collector
+            self.failed += len(batch)
+            logger.error("Failed to write trade batch", error=str(e), trades=len(batch))
+
+    @staticmethod
+    def _write_batch(batch: list[PendingTrade]) -> int:
+        """
+        Insert a batch of trades and their whale events in one transaction.
+
+        Returns:
+            Number of whale events written
+        """
+        with get_session() as session:
+            trade_ids = session.scalars(
+                insert(Trade).returning(Trade.id, sort_by_parameter_order=True),
+                [t.to_row() for t in batch],
+            ).all()
+
+            whale_rows = [
+                {
+                    "market_id": t.market_id,
+                    "trade_id": trade_id,
+                    "timestamp": t.timestamp,
+                    "price": t.price,
+                    "size": t.size,
+                    "side": t.side,
+                    "whale_tier": t.whale_tier,
+                }
+                for t, trade_id in zip(batch, trade_ids)
+                if t.whale_tier >= 2
+            ]
+            if whale_rows:
+                session.execute(insert(WhaleEvent), whale_rows)
+
+            session.commit()
+            return len(whale_rows)
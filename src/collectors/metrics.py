@@ -3,11 +3,34 @@ Compute trade metrics from Redis buffer.
 
 These metrics are computed from the rolling 1h trade buffer
 and added to snapshots for ML features.
+
+Two paths produce the same metric dictionaries:
+- TradeMetricsAggregator (collector side): keeps incremental sliding-window
+  aggregates as trades arrive and publishes ready-made metrics to
+  metrics:{condition_id}, so snapshot tasks read O(1) per market
+- compute_*_metrics (reader side): recompute from the packed
+  tradebuf:{condition_id} sorted set (plus any legacy trades:{condition_id}
+  list entries), used as fallback when no published metrics exist
 """
-from datetime import datetime, timezone
+import asyncio
+import time
+from collections import deque
 from typing import Optional
 
-from src.db.redis import RedisClient, SyncRedisClient
+import structlog
+
+from src.config.settings import settings
+from src.db.redis import CoalescingRedisWriter, RedisClient, SyncRedisClient
+
+logger = structlog.get_logger()
+
+WINDOW_SECONDS = 3600  # Metrics cover the last hour of trades
+WHALE_TIER_MIN = 2  # whale_tier >= 2 means >= $2,000
+
+# Internal keys published alongside the metrics (stripped by readers)
+PUBLISHED_AT_KEY = "published_at"
+LAST_WHALE_AT_KEY = "last_whale_at"
+LAST_TRADE_AT_KEY = "last_trade_at"  # Newest trade ever seen (kept after it expires)
 
 # Singleton redis client
 _redis: Optional[RedisClient] = None
@@ -21,9 +44,375 @@ def get_redis() -> RedisClient:
     return _redis
 
 
-async def compute_trade_metrics(condition_id: str) -> dict:
+# ===== INCREMENTAL SLIDING-WINDOW AGGREGATION (COLLECTOR SIDE) =====
+
+
+class RollingTradeWindow:
     """
-    Compute all trade flow metrics from 1h buffer.
+    Sliding window of trades for one market with O(1) running aggregates.
+
+    Counts and sums are updated on add/expire; max trade size uses a
+    monotonic deque so it stays correct as large trades age out.
+    """
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        # (seq, ts, price, size, is_buy, is_whale)
+        self._trades: deque[tuple[int, float, float, float, bool, bool]] = deque()
+        # (seq, size) with strictly decreasing sizes - front is the window max
+        self._max_sizes: deque[tuple[int, float]] = deque()
+        self._seq = 0
+        # Not reset on expiry: moves only when a new trade arrives
+        self.last_trade_ts: Optional[float] = None
+        self._reset_sums()
+
+    def _reset_sums(self) -> None:
+        self.buy_count = 0
+        self.sell_count = 0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.notional = 0.0  # sum(price * size) for VWAP
+        self.whale_count = 0
+        self.whale_buy_volume = 0.0
+        self.whale_sell_volume = 0.0
+        self.last_whale_ts: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    @property
+    def oldest_ts(self) -> Optional[float]:
+        """Timestamp of the oldest trade still in the window."""
+        return self._trades[0][1] if self._trades else None
+
+    def trades(self) -> list[tuple[float, float, float, str, int]]:
+        """Trades in arrival order as add() arguments (whale tier collapsed to 0/2)."""
+        return [
+            (ts, price, size, "BUY" if is_buy else "SELL", WHALE_TIER_MIN if is_whale else 0)
+            for _, ts, price, size, is_buy, is_whale in self._trades
+        ]
+
+    def add(self, ts: float, price: float, size: float, side: str, whale_tier: int) -> None:
+        """Add a trade (timestamps must be non-decreasing)."""
+        is_buy = side == "BUY"
+        is_whale = whale_tier >= WHALE_TIER_MIN
+        seq = self._seq
+        self._seq += 1
+        self._trades.append((seq, ts, price, size, is_buy, is_whale))
+        self.last_trade_ts = ts
+
+        while self._max_sizes and self._max_sizes[-1][1] <= size:
+            self._max_sizes.pop()
+        self._max_sizes.append((seq, size))
+
+        if is_buy:
+            self.buy_count += 1
+            self.buy_volume += size
+        else:
+            self.sell_count += 1
+            self.sell_volume += size
+        self.notional += price * size
+
+        if is_whale:
+            self.whale_count += 1
+            if is_buy:
+                self.whale_buy_volume += size
+            else:
+                self.whale_sell_volume += size
+            self.last_whale_ts = ts
+
+    def expire(self, now: float) -> bool:
+        """
+        Drop trades older than the window.
+
+        Returns:
+            True if any trade was removed
+        """
+        cutoff = now - self.window_seconds
+        removed = False
+        while self._trades and self._trades[0][1] < cutoff:
+            seq, _, price, size, is_buy, is_whale = self._trades.popleft()
+            removed = True
+            if self._max_sizes and self._max_sizes[0][0] == seq:
+                self._max_sizes.popleft()
+            if is_buy:
+                self.buy_count -= 1
+                self.buy_volume -= size
+            else:
+                self.sell_count -= 1
+                self.sell_volume -= size
+            self.notional -= price * size
+            if is_whale:
+                self.whale_count -= 1
+                if is_buy:
+                    self.whale_buy_volume -= size
+                else:
+                    self.whale_sell_volume -= size
+
+        if removed and not self._trades:
+            # Reset exactly to avoid floating-point drift accumulating
+            self._reset_sums()
+        elif self.whale_count == 0:
+            self.last_whale_ts = None
+        return removed
+
+    def metrics(self, now: float) -> dict:
+        """
+        Current metrics in the same shape as compute_all_metrics().
+
+        Also includes last_whale_at (epoch seconds) so readers can compute
+        time_since_whale at read time, and last_trade_at, which unlike the
+        rolling counts only moves on new activity.
+        """
+        count = len(self._trades)
+        if count == 0:
+            return {
+                **_EMPTY_TRADE_METRICS, **_EMPTY_WHALE_METRICS,
+                LAST_WHALE_AT_KEY: None, LAST_TRADE_AT_KEY: self.last_trade_ts,
+            }
+
+        # Clamp tiny negatives from floating-point subtraction
+        buy_volume = max(self.buy_volume, 0.0)
+        sell_volume = max(self.sell_volume, 0.0)
+        total_volume = buy_volume + sell_volume
+
+        metrics = {
+            "trade_count_1h": count,
+            "buy_count_1h": self.buy_count,
+            "sell_count_1h": self.sell_count,
+            "volume_1h": total_volume,
+            "buy_volume_1h": buy_volume,
+            "sell_volume_1h": sell_volume,
+            "avg_trade_size_1h": total_volume / count,
+            "max_trade_size_1h": self._max_sizes[0][1] if self._max_sizes else None,
+            "vwap_1h": max(self.notional, 0.0) / total_volume if total_volume > 0 else None,
+            LAST_TRADE_AT_KEY: self.last_trade_ts,
+        }
+
+        if self.whale_count == 0:
+            return {**metrics, **_EMPTY_WHALE_METRICS, LAST_WHALE_AT_KEY: None}
+
+        whale_buy_volume = max(self.whale_buy_volume, 0.0)
+        whale_sell_volume = max(self.whale_sell_volume, 0.0)
+        whale_volume = whale_buy_volume + whale_sell_volume
+        return {
+            **metrics,
+            "whale_count_1h": self.whale_count,
+            "whale_volume_1h": whale_volume,
+            "whale_buy_volume_1h": whale_buy_volume,
+            "whale_sell_volume_1h": whale_sell_volume,
+            "whale_net_flow_1h": whale_buy_volume - whale_sell_volume,
+            "whale_buy_ratio_1h": whale_buy_volume / whale_volume if whale_volume > 0 else None,
+            "time_since_whale": int(now - self.last_whale_ts),
+            "pct_volume_from_whales": whale_volume / total_volume if total_volume > 0 else 0,
+            LAST_WHALE_AT_KEY: self.last_whale_ts,
+        }
+
+
+class TradeMetricsAggregator:
+    """
+    Incremental 1h trade/whale metrics for every market the collector sees.
+
+    Trades are recorded as they arrive; a background loop expires old
+    entries and publishes changed markets to metrics:{condition_id} through
+    the coalescing Redis writer. Markets are only published once seeded from
+    the existing tradebuf:{condition_id} buffer (merged with any legacy
+    trades:{condition_id} list), so a collector restart never publishes a
+    partial window.
+    """
+
+    def __init__(
+        self,
+        redis_writer: CoalescingRedisWriter,
+        window_seconds: float = WINDOW_SECONDS,
+        publish_interval: Optional[float] = None,
+        refresh_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the aggregator.
+
+        Args:
+            redis_writer: Writer used to publish metrics
+            window_seconds: Sliding window length
+            publish_interval: Seconds between publish passes
+            refresh_seconds: Republish unchanged markets this often (keeps TTL alive)
+        """
+        self.redis_writer = redis_writer
+        self.window_seconds = window_seconds
+        self.publish_interval = publish_interval or settings.trade_metrics_publish_interval
+        self.refresh_seconds = refresh_seconds or settings.trade_metrics_refresh_seconds
+        self.windows: dict[str, RollingTradeWindow] = {}
+        self._seeded: set[str] = set()
+        self._dirty: set[str] = set()
+        self._last_published: dict[str, float] = {}
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record_trade(
+        self,
+        condition_id: str,
+        ts: float,
+        price: float,
+        size: float,
+        side: str,
+        whale_tier: int,
+    ) -> None:
+        """Add a trade to the market's window (O(1))."""
+        window = self.windows.get(condition_id)
+        if window is None:
+            window = RollingTradeWindow(self.window_seconds)
+            self.windows[condition_id] = window
+        window.add(ts, price, size, side, whale_tier)
+        self._dirty.add(condition_id)
+
+    def discard(self, condition_id: str) -> None:
+        """Forget a market (e.g. after unsubscribe)."""
+        self.windows.pop(condition_id, None)
+        self._seeded.discard(condition_id)
+        self._dirty.discard(condition_id)
+        self._last_published.pop(condition_id, None)
+
+    async def seed(self, redis: RedisClient, condition_ids: list[str]) -> int:
+        """
+        Load existing buffered trades for markets not yet seeded.
+
+        Trades recorded live while the buffer is being read are kept; only
+        buffered trades older than the oldest live trade are merged in.
+
+        Returns:
+            Number of markets seeded
+        """
+        seeded = 0
+        for condition_id in condition_ids:
+            if condition_id in self._seeded:
+                continue
+            try:
+                buffered = await redis.get_trades_1h(condition_id)
+            except Exception as e:
+                logger.debug("Metrics seed failed", market=condition_id[:16], error=str(e))
+                continue
+
+            live = self.windows.get(condition_id)
+            oldest_live = live.oldest_ts if live else None
+            # The buffer keeps epoch-ms timestamps, so compare at that resolution:
+            # a live trade already flushed comes back slightly older than its
+            # in-memory copy and must not be counted twice
+            oldest_live_ms = int(oldest_live * 1000) if oldest_live is not None else None
+            # Buffer is newest first; keep only trades older than the live window
+            rows = [
+                (t["ts"], t["price"], t["size"], t["side"], t["whale_tier"])
+                for t in reversed(buffered)
+                if oldest_live_ms is None or int(t["ts"] * 1000) < oldest_live_ms
+            ]
+            if live:
+                rows.extend(live.trades())
+
+            window = RollingTradeWindow(self.window_seconds)
+            for row in rows:
+                window.add(*row)
+            self.windows[condition_id] = window
+            self._seeded.add(condition_id)
+            self._dirty.add(condition_id)
+            seeded += 1
+        return seeded
+
+    def publish(self, now: Optional[float] = None) -> int:
+        """
+        Expire old trades and buffer metrics for changed/refresh-due markets.
+
+        Returns:
+            Number of markets published
+        """
+        now = now or time.time()
+        published = 0
+        for condition_id, window in self.windows.items():
+            if window.expire(now):
+                self._dirty.add(condition_id)
+            if condition_id not in self._seeded:
+                continue
+            due = now - self._last_published.get(condition_id, 0.0) >= self.refresh_seconds
+            if condition_id in self._dirty or due:
+                metrics = window.metrics(now)
+                metrics[PUBLISHED_AT_KEY] = now
+                self.redis_writer.set_metrics(condition_id, metrics)
+                self._last_published[condition_id] = now
+                self._dirty.discard(condition_id)
+                published += 1
+        return published
+
+    async def start(self) -> None:
+        """Start the background publish loop."""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the publish loop."""
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.publish_interval)
+            try:
+                published = self.publish()
+                logger.debug("Trade metrics published", markets=published, tracked=len(self.windows))
+            except Exception as e:
+                logger.error("Trade metrics publish failed", error=str(e))
+
+
+_EMPTY_TRADE_METRICS = {
+    "trade_count_1h": 0,
+    "buy_count_1h": 0,
+    "sell_count_1h": 0,
+    "volume_1h": 0,
+    "buy_volume_1h": 0,
+    "sell_volume_1h": 0,
+    "avg_trade_size_1h": None,
+    "max_trade_size_1h": None,
+    "vwap_1h": None,
+}
+
+_EMPTY_WHALE_METRICS = {
+    "whale_count_1h": 0,
+    "whale_volume_1h": 0,
+    "whale_buy_volume_1h": 0,
+    "whale_sell_volume_1h": 0,
+    "whale_net_flow_1h": 0,
+    "whale_buy_ratio_1h": None,
+    "time_since_whale": None,
+    "pct_volume_from_whales": 0,
+}
+
+
+def finalize_published_metrics(raw: dict, now: Optional[float] = None) -> dict:
+    """
+    Turn a published metrics hash into snapshot-ready metrics.
+
+    Recomputes time_since_whale from last_whale_at and drops internal keys.
+    """
+    metrics = dict(raw)
+    metrics.pop(PUBLISHED_AT_KEY, None)
+    metrics.pop(LAST_TRADE_AT_KEY, None)
+    last_whale_at = metrics.pop(LAST_WHALE_AT_KEY, None)
+    if last_whale_at is not None:
+        metrics["time_since_whale"] = int((now or time.time()) - last_whale_at)
+    return metrics
+
+
+# ===== RECOMPUTE FROM BUFFER (READER SIDE / FALLBACK) =====
+
+
+def trade_metrics_from_trades(trades: list[dict]) -> dict:
+    """
+    Trade flow metrics from a market's 1h trades.
 
     Returns:
         Dictionary with trade flow features:
@@ -37,9 +426,6 @@ async def compute_trade_metrics(condition_id: str) -> dict:
         - max_trade_size_1h
         - vwap_1h
     """
-    redis = get_redis()
-    trades = await redis.get_trades_1h(condition_id)
-
     if not trades:
         return {
             "trade_count_1h": 0,
@@ -78,9 +464,9 @@ async def compute_trade_metrics(condition_id: str) -> dict:
     }
 
 
-async def compute_whale_metrics(condition_id: str) -> dict:
+def whale_metrics_from_trades(trades: list[dict], now: Optional[float] = None) -> dict:
     """
-    Compute whale metrics from 1h buffer.
+    Whale metrics from a market's 1h trades.
 
     Returns:
         Dictionary with whale features:
@@ -93,9 +479,6 @@ async def compute_whale_metrics(condition_id: str) -> dict:
         - time_since_whale (seconds)
         - pct_volume_from_whales
     """
-    redis = get_redis()
-    trades = await redis.get_trades_1h(condition_id)
-
     # Filter to whales (tier >= 2 means >= $2,000)
     whales = [t for t in trades if t.get("whale_tier", 0) >= 2]
 
@@ -120,11 +503,8 @@ async def compute_whale_metrics(condition_id: str) -> dict:
     total_volume = sum(t["size"] for t in trades) if trades else 0
 
     # Time since last whale trade
-    now = datetime.now(timezone.utc)
-    last_whale_time = max(
-        datetime.fromisoformat(t["timestamp"]) for t in whales
-    )
-    time_since = int((now - last_whale_time).total_seconds())
+    last_whale_ts = max(t["ts"] for t in whales)
+    time_since = int((now or time.time()) - last_whale_ts)
 
     return {
         "whale_count_1h": len(whales),
@@ -138,6 +518,38 @@ async def compute_whale_metrics(condition_id: str) -> dict:
     }
 
 
+def metrics_from_trades(trades: list[dict], now: Optional[float] = None) -> dict:
+    """
+    All trade and whale metrics from a market's 1h trades.
+
+    Returns:
+        Combined dictionary with all metrics
+    """
+    return {**trade_metrics_from_trades(trades), **whale_metrics_from_trades(trades, now)}
+
+
+async def compute_trade_metrics(condition_id: str) -> dict:
+    """
+    Compute all trade flow metrics from 1h buffer.
+
+    Returns:
+        Dictionary with trade flow features (see trade_metrics_from_trades)
+    """
+    redis = get_redis()
+    return trade_metrics_from_trades(await redis.get_trades_1h(condition_id))
+
+
+async def compute_whale_metrics(condition_id: str) -> dict:
+    """
+    Compute whale metrics from 1h buffer.
+
+    Returns:
+        Dictionary with whale features (see whale_metrics_from_trades)
+    """
+    redis = get_redis()
+    return whale_metrics_from_trades(await redis.get_trades_1h(condition_id))
+
+
 async def compute_all_metrics(condition_id: str) -> dict:
     """
     Compute all trade and whale metrics for a market.
@@ -145,9 +557,8 @@ async def compute_all_metrics(condition_id: str) -> dict:
     Returns:
         Combined dictionary with all metrics
     """
-    trade_metrics = await compute_trade_metrics(condition_id)
-    whale_metrics = await compute_whale_metrics(condition_id)
-    return {**trade_metrics, **whale_metrics}
+    redis = get_redis()
+    return metrics_from_trades(await redis.get_trades_1h(condition_id))
 
 
 async def compute_and_cache_metrics(condition_id: str) -> dict:
@@ -197,44 +608,7 @@ def compute_trade_metrics_sync(condition_id: str) -> dict:
         Dictionary with trade flow features
     """
     redis = get_sync_redis()
-    trades = redis.get_trades_1h(condition_id)
-
-    if not trades:
-        return {
-            "trade_count_1h": 0,
-            "buy_count_1h": 0,
-            "sell_count_1h": 0,
-            "volume_1h": 0,
-            "buy_volume_1h": 0,
-            "sell_volume_1h": 0,
-            "avg_trade_size_1h": None,
-            "max_trade_size_1h": None,
-            "vwap_1h": None,
-        }
-
-    buys = [t for t in trades if t["side"] == "BUY"]
-    sells = [t for t in trades if t["side"] == "SELL"]
-
-    total_volume = sum(t["size"] for t in trades)
-    buy_volume = sum(t["size"] for t in buys)
-    sell_volume = sum(t["size"] for t in sells)
-
-    # VWAP calculation
-    vwap = None
-    if total_volume > 0:
-        vwap = sum(t["price"] * t["size"] for t in trades) / total_volume
-
-    return {
-        "trade_count_1h": len(trades),
-        "buy_count_1h": len(buys),
-        "sell_count_1h": len(sells),
-        "volume_1h": total_volume,
-        "buy_volume_1h": buy_volume,
-        "sell_volume_1h": sell_volume,
-        "avg_trade_size_1h": total_volume / len(trades) if trades else None,
-        "max_trade_size_1h": max(t["size"] for t in trades) if trades else None,
-        "vwap_1h": vwap,
-    }
+    return trade_metrics_from_trades(redis.get_trades_1h(condition_id))
 
 
 def compute_whale_metrics_sync(condition_id: str) -> dict:
@@ -245,48 +619,7 @@ def compute_whale_metrics_sync(condition_id: str) -> dict:
         Dictionary with whale features
     """
     redis = get_sync_redis()
-    trades = redis.get_trades_1h(condition_id)
-
-    # Filter to whales (tier >= 2 means >= $2,000)
-    whales = [t for t in trades if t.get("whale_tier", 0) >= 2]
-
-    if not whales:
-        return {
-            "whale_count_1h": 0,
-            "whale_volume_1h": 0,
-            "whale_buy_volume_1h": 0,
-            "whale_sell_volume_1h": 0,
-            "whale_net_flow_1h": 0,
-            "whale_buy_ratio_1h": None,
-            "time_since_whale": None,
-            "pct_volume_from_whales": 0,
-        }
-
-    whale_buys = [t for t in whales if t["side"] == "BUY"]
-    whale_sells = [t for t in whales if t["side"] == "SELL"]
-
-    whale_volume = sum(t["size"] for t in whales)
-    whale_buy_volume = sum(t["size"] for t in whale_buys)
-    whale_sell_volume = sum(t["size"] for t in whale_sells)
-    total_volume = sum(t["size"] for t in trades) if trades else 0
-
-    # Time since last whale trade
-    now = datetime.now(timezone.utc)
-    last_whale_time = max(
-        datetime.fromisoformat(t["timestamp"]) for t in whales
-    )
-    time_since = int((now - last_whale_time).total_seconds())
-
-    return {
-        "whale_count_1h": len(whales),
-        "whale_volume_1h": whale_volume,
-        "whale_buy_volume_1h": whale_buy_volume,
-        "whale_sell_volume_1h": whale_sell_volume,
-        "whale_net_flow_1h": whale_buy_volume - whale_sell_volume,
-        "whale_buy_ratio_1h": whale_buy_volume / whale_volume if whale_volume > 0 else None,
-        "time_since_whale": time_since,
-        "pct_volume_from_whales": whale_volume / total_volume if total_volume > 0 else 0,
-    }
+    return whale_metrics_from_trades(redis.get_trades_1h(condition_id))
 
 
 def compute_all_metrics_sync(condition_id: str) -> dict:
@@ -296,6 +629,28 @@ def compute_all_metrics_sync(condition_id: str) -> dict:
     Returns:
         Combined dictionary with all metrics
     """
-    trade_metrics = compute_trade_metrics_sync(condition_id)
-    whale_metrics = compute_whale_metrics_sync(condition_id)
-    return {**trade_metrics, **whale_metrics}
+    redis = get_sync_redis()
+    return metrics_from_trades(redis.get_trades_1h(condition_id))
+
+
+def get_published_metrics_many_sync(condition_ids: list[str]) -> dict[str, dict]:
+    """
+    Read collector-published metrics for many markets in one pipeline.
+
+    Markets without published metrics (collector not subscribed, not yet
+    seeded, or expired) are omitted - callers fall back to
+    compute_all_metrics_sync() for those.
+
+    Returns:
+        Dictionary of condition_id -> snapshot-ready metrics
+    """
+    if not condition_ids:
+        return {}
+    redis = get_sync_redis()
+    raw = redis.get_metrics_many(condition_ids)
+    now = time.time()
+    return {
+        cid: finalize_published_metrics(metrics, now)
+        for cid, metrics in raw.items()
+        if metrics and PUBLISHED_AT_KEY in metrics
+    }
@@ -0,0 +1,402 @@
+"""
+Live L2 orderbook replica maintained from WebSocket book/price_change events.
+
+The collector keeps one OrderBook per subscribed YES token instead of
+caching each raw `book` message:
+- `book` events replace the book (full snapshot)
+- `price_change` events set or remove single price levels (deltas)
+- Deltas older than the current book or arriving before any snapshot are
+  dropped; a book whose best bid/ask disagrees with the exchange-reported
+  values (or crosses) is marked out of sync until the next snapshot
+
+OrderBookReplica publishes changed books to orderbook:{condition_id} as
+price levels (best price first; the full book unless
+orderbook_publish_levels caps it) plus ready-made snapshot features and
+orderbook_snapshots summaries, both computed on the full book, so snapshot
+tasks neither re-parse raw books nor fall back to the CLOB API for markets
+the collector covers.
+"""
+import asyncio
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.db.redis import CoalescingRedisWriter
+
+logger = structlog.get_logger()
+
+DEPTH_LEVELS = (5, 10, 20, 50)  # Snapshot bid/ask depth features
+PRICE_TOLERANCE = 1e-9  # Float tolerance when comparing exchange-reported prices
+
+
+def parse_event_ts(raw) -> Optional[int]:
+    """Parse an exchange timestamp (epoch ms, str or int)."""
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+class OrderBook:
+    """
+    L2 book for one token as sorted price-level arrays.
+
+    Prices are kept ascending per side with sizes in a dict keyed by price,
+    so a delta is one bisect plus a list insert/pop; best bid is the last
+    bid price and best ask the first ask price.
+    """
+
+    def __init__(self):
+        self._bid_prices: list[float] = []
+        self._ask_prices: list[float] = []
+        self._bid_sizes: dict[float, float] = {}
+        self._ask_sizes: dict[float, float] = {}
+        self.timestamp: Optional[int] = None  # Exchange time (ms) of last applied event
+        self.hash: Optional[str] = None  # Exchange book hash of last applied event
+        self.in_sync = False  # False until a snapshot is applied, or after a failed check
+
+    def apply_snapshot(
+        self,
+        bids: list[dict],
+        asks: list[dict],
+        timestamp: Optional[int] = None,
+        book_hash: Optional[str] = None,
+    ) -> None:
+        """Replace the book with a full snapshot of price levels."""
+        self._bid_sizes = self._parse_levels(bids)
+        self._ask_sizes = self._parse_levels(asks)
+        self._bid_prices = sorted(self._bid_sizes)
+        self._ask_prices = sorted(self._ask_sizes)
+        self.timestamp = timestamp
+        self.hash = book_hash
+        self.in_sync = True
+
+    def apply_change(self, side: str, price: float, size: float) -> None:
+        """
+        Set one price level; size 0 removes it.
+
+        Args:
+            side: "BUY" (bid) or "SELL" (ask)
+            price: Level price
+            size: New total size at that price
+        """
+        if side == "BUY":
+            prices, sizes = self._bid_prices, self._bid_sizes
+        else:
+            prices, sizes = self._ask_prices, self._ask_sizes
+
+        if size > 0:
+            if price not in sizes:
+                insort(prices, price)
+            sizes[price] = size
+        elif price in sizes:
+            del sizes[price]
+            prices.pop(bisect_left(prices, price))
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self._bid_prices[-1] if self._bid_prices else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self._ask_prices[0] if self._ask_prices else None
+
+    def is_crossed(self) -> bool:
+        """True if the best bid is at or above the best ask."""
+        return (
+            self.best_bid is not None
+            and self.best_ask is not None
+            and self.best_bid >= self.best_ask
+        )
+
+    def levels(self, side: str, n: Optional[int] = None) -> list[tuple[float, float]]:
+        """
+        Top price levels, best first.
+
+        Args:
+            side: 'bid' or 'ask'
+            n: Max levels (None for the whole side)
+
+        Returns:
+            List of (price, size)
+        """
+        if side == "bid":
+            prices = self._bid_prices[::-1] if n is None else self._bid_prices[:-n - 1:-1]
+            sizes = self._bid_sizes
+        else:
+            prices = self._ask_prices if n is None else self._ask_prices[:n]
+            sizes = self._ask_sizes
+        return [(p, sizes[p]) for p in prices]
+
+    def features(self) -> dict:
+        """
+        Snapshot features, same keys and semantics as
+        CLOBClient.extract_orderbook_features on a best-first book.
+        """
+        bids = self.levels("bid")
+        asks = self.levels("ask")
+        features: dict = {}
+
+        for side, levels in (("bid", bids), ("ask", asks)):
+            for n in DEPTH_LEVELS:
+                features[f"{side}_depth_{n}"] = sum(size for _, size in levels[:n])
+        features["bid_levels"] = len(bids)
+        features["ask_levels"] = len(asks)
+
+        bid_total = sum(size for _, size in bids)
+        ask_total = sum(size for _, size in asks)
+        total = bid_total + ask_total
+        features["book_imbalance"] = (bid_total - ask_total) / total if total else 0.0
+
+        for side, levels in (("bid", bids), ("ask", asks)):
+            wall_price, wall_size = max(levels, key=lambda level: level[1]) if levels else (0.0, 0.0)
+            features[f"{side}_wall_price"] = wall_price
+            features[f"{side}_wall_size"] = wall_size
+
+        best_bid = self.best_bid
+        best_ask = self.best_ask
+        features["best_bid"] = best_bid
+        features["best_ask"] = best_ask
+        features["spread"] = (best_ask - best_bid) if (best_bid and best_ask) else None
+        return features
+
+    def summary(self) -> dict:
+        """
+        Totals and largest levels, same keys and semantics as
+        OrderbookBatch.summaries on a best-first book.
+        """
+        summary: dict = {}
+        for side in ("bid", "ask"):
+            levels = self.levels(side)
+            summary[f"total_{side}_depth"] = sum(size for _, size in levels)
+            summary[f"num_{side}_levels"] = len(levels)
+        for side in ("bid", "ask"):
+            levels = self.levels(side)
+            price, size = max(levels, key=lambda level: level[1]) if levels else (None, None)
+            summary[f"largest_{side}_price"] = price
+            summary[f"largest_{side}_size"] = size
+        return summary
+
+    def to_orderbook(self, n: Optional[int] = None) -> dict:
+        """Book in the CLOB REST level format (best first; top N levels per side if given)."""
+        return {
+            "bids": [{"price": str(p), "size": str(s)} for p, s in self.levels("bid", n)],
+            "asks": [{"price": str(p), "size": str(s)} for p, s in self.levels("ask", n)],
+        }
+
+    @staticmethod
+    def _parse_levels(levels: list[dict]) -> dict[float, float]:
+        parsed: dict[float, float] = {}
+        for level in levels:
+            try:
+                price = float(level["price"])
+                size = float(level["size"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if size > 0:
+                parsed[price] = size
+        return parsed
+
+
+class OrderBookReplica:
+    """
+    In-memory books for the markets the collector subscribes to.
+
+    Events are applied as they arrive; a background loop publishes changed
+    (and periodically unchanged, to keep the 60s cache TTL alive) in-sync
+    books through the coalescing Redis writer.
+    """
+
+    def __init__(
+        self,
+        redis_writer: CoalescingRedisWriter,
+        publish_interval: Optional[float] = None,
+        refresh_seconds: Optional[float] = None,
+        publish_levels: Optional[int] = None,
+    ):
+        """
+        Initialize the replica.
+
+        Args:
+            redis_writer: Writer used to publish books
+            publish_interval: Seconds between publish passes
+            refresh_seconds: Republish unchanged books this often
+            publish_levels: Price levels per side in the published book
+                            (0 = full book)
+        """
+        self.redis_writer = redis_writer
+        self.publish_interval = publish_interval or settings.orderbook_publish_interval
+        self.refresh_seconds = refresh_seconds or settings.orderbook_refresh_seconds
+        self.publish_levels = settings.orderbook_publish_levels if publish_levels is None else publish_levels
+        self.books: dict[str, OrderBook] = {}  # condition_id -> YES token book
+        self._dirty: set[str] = set()
+        self._last_published: dict[str, float] = {}
+        # Counters for monitoring
+        self.snapshots_applied = 0
+        self.changes_applied = 0
+        self.changes_dropped = 0
+        self.desyncs = 0
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def apply_book(self, condition_id: str, data: dict) -> None:
+        """Apply a `book` event (full snapshot)."""
+        timestamp = parse_event_ts(data.get("timestamp"))
+        book = self.books.get(condition_id)
+        if book is None:
+            book = OrderBook()
+            self.books[condition_id] = book
+        elif book.in_sync and timestamp is not None and book.timestamp is not None and timestamp < book.timestamp:
+            # Late snapshot - the book already reflects newer events
+            return
+
+        bids = data.get("bids")
+        asks = data.get("asks")
+        book.apply_snapshot(
+            data.get("buys", []) if bids is None else bids,
+            data.get("sells", []) if asks is None else asks,
+            timestamp,
+            data.get("hash"),
+        )
+        self.snapshots_applied += 1
+        self._dirty.add(condition_id)
+
+    def apply_change(
+        self,
+        condition_id: str,
+        change: dict,
+        timestamp: Optional[int] = None,
+    ) -> bool:
+        """
+        Apply one `price_change` level update.
+
+        Args:
+            condition_id: Market the token belongs to
+            change: {"price", "size", "side"} plus optional "hash",
+                    "best_bid" and "best_ask" reported by the exchange
+            timestamp: Event time (ms)
+
+        Returns:
+            True if the change was applied
+        """
+        book = self.books.get(condition_id)
+        if book is None or not book.in_sync:
+            # No base snapshot to apply the delta to - wait for the next book
+            self.changes_dropped += 1
+            return False
+        if timestamp is not None and book.timestamp is not None and timestamp < book.timestamp:
+            self.changes_dropped += 1
+            return False
+
+        try:
+            price = float(change["price"])
+            size = float(change["size"])
+        except (KeyError, TypeError, ValueError):
+            self.changes_dropped += 1
+            return False
+
+        book.apply_change(str(change.get("side", "")).upper(), price, size)
+        if timestamp is not None:
+            book.timestamp = timestamp
+        if change.get("hash"):
+            book.hash = change["hash"]
+        self.changes_applied += 1
+
+        if book.is_crossed() or not self._matches_reported(book, change):
+            book.in_sync = False
+            self.desyncs += 1
+            self._dirty.discard(condition_id)
+            logger.debug("Orderbook out of sync", market=condition_id[:16])
+            return True
+
+        self._dirty.add(condition_id)
+        return True
+
+    def discard(self, condition_id: str) -> None:
+        """Forget a market (e.g. after unsubscribe)."""
+        self.books.pop(condition_id, None)
+        self._dirty.discard(condition_id)
+        self._last_published.pop(condition_id, None)
+
+    def publish(self, now: Optional[float] = None) -> int:
+        """
+        Buffer changed/refresh-due in-sync books for the next Redis flush.
+
+        Returns:
+            Number of books published
+        """
+        now = now or time.time()
+        published = 0
+        for condition_id, book in self.books.items():
+            if not book.in_sync:
+                continue
+            due = now - self._last_published.get(condition_id, 0.0) >= self.refresh_seconds
+            if condition_id not in self._dirty and not due:
+                continue
+            orderbook = book.to_orderbook(self.publish_levels or None)
+            # Computed on the full book even if the published levels are capped
+            orderbook["features"] = book.features()
+            orderbook["summary"] = book.summary()
+            orderbook["hash"] = book.hash
+            orderbook["timestamp"] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+            self.redis_writer.set_orderbook(condition_id, orderbook)
+            self._last_published[condition_id] = now
+            self._dirty.discard(condition_id)
+            published += 1
+        return published
+
+    async def start(self) -> None:
+        """Start the background publish loop."""
+        if self.running:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the publish loop."""
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while self.running:
+            await asyncio.sleep(self.publish_interval)
+            try:
+                published = self.publish()
+                logger.debug(
+                    "Orderbooks published",
+                    books=published,
+                    tracked=len(self.books),
+                    dropped=self.changes_dropped,
+                    desyncs=self.desyncs,
+                )
+            except Exception as e:
+                logger.error("Orderbook publish failed", error=str(e))
+
+    @staticmethod
+    def _matches_reported(book: OrderBook, change: dict) -> bool:
+        """Check the replica's top of book against exchange-reported values."""
+        for key, ours in (("best_bid", book.best_bid), ("best_ask", book.best_ask)):
+            reported = change.get(key)
+            if reported is None:
+                continue
+            try:
+                reported = float(reported)
+            except (TypeError, ValueError):
+                continue
+            # The exchange reports 0 (bid) / 1 (ask) for an empty side
+            if ours is None:
+                if reported not in (0.0, 1.0):
+                    return False
+            elif abs(ours - reported) > PRICE_TOLERANCE:
+                return False
+        return True
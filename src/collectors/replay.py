@@ -0,0 +1,287 @@
+"""
+Recording and local replay of WebSocket market frames.
+
+Lets collector throughput be measured offline against real traffic
+(see scripts/record_ws_frames.py and scripts/bench_ws_collector.py):
+
+- FrameRecorder writes raw frames with their arrival time to a gzip file.
+  A header line holds the recorded markets, so a replay can subscribe the
+  collector without Postgres
+- read_recording() loads a recording; files with one bare frame per line
+  are read too (all frames at offset 0)
+- ReplayServer is a local WebSocket server speaking the market channel
+  protocol: each connection gets the recorded frames for the tokens it
+  subscribed to, at the recorded pace times `speed` (speed <= 0: as fast
+  as the client reads)
+
+File format (UTF-8, gzip if the name ends in .gz):
+    #{"version": 1, "started_at": ..., "source": ..., "markets": {...}}
+    <seconds since start>\t<text frame>
+    <seconds since start>\tb:<base64 binary frame>
+"""
+import asyncio
+import base64
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+import structlog
+import websockets
+
+logger = structlog.get_logger()
+
+RECORDING_VERSION = 1
+BINARY_PREFIX = "b:"
+
+
+def _open(path: str, mode: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, mode + "t", encoding="utf-8")
+
+
+@dataclass
+class Recording:
+    """Frames captured from the market channel."""
+    markets: dict[str, dict]  # condition_id -> {yes_token_id, no_token_id, market_id, tier}
+    frames: list[tuple[float, str | bytes]]  # (seconds since start, raw frame)
+    started_at: Optional[str] = None
+    source: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and last frame."""
+        if not self.frames:
+            return 0.0
+        return self.frames[-1][0] - self.frames[0][0]
+
+
+class FrameRecorder:
+    """Appends timestamped raw frames to a (gzip) recording file."""
+
+    def __init__(self, path: str, markets: dict[str, dict], source: Optional[str] = None):
+        """
+        Args:
+            path: Output file (gzip-compressed if the name ends in .gz)
+            markets: condition_id -> market info of the subscribed markets
+            source: WebSocket URL the frames come from (informational)
+        """
+        self.path = path
+        self._file = _open(path, "w")
+        self._start = time.monotonic()
+        header = {
+            "version": RECORDING_VERSION,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "source": source,
+            "markets": markets,
+        }
+        self._file.write("#" + json.dumps(header) + "\n")
+
+        # Counters (monotonic, for monitoring)
+        self.frames = 0
+        self.bytes = 0
+
+    def write(self, frame: str | bytes, at: Optional[float] = None) -> None:
+        """
+        Record one frame.
+
+        Args:
+            frame: Raw frame as received
+            at: Monotonic arrival time (defaults to now)
+        """
+        offset = (time.monotonic() if at is None else at) - self._start
+        if isinstance(frame, bytes):
+            line = BINARY_PREFIX + base64.b64encode(frame).decode("ascii")
+        else:
+            # Raw newlines can only be JSON whitespace (strings escape them)
+            line = frame.replace("\n", " ")
+        self._file.write(f"{offset:.6f}\t{line}\n")
+        self.frames += 1
+        self.bytes += len(frame)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _parse_line(line: str) -> tuple[float, str | bytes]:
+    offset, sep, frame = line.partition("\t")
+    try:
+        at = float(offset) if sep else None
+    except ValueError:
+        at = None
+    if at is None:
+        # Bare frame (no timestamp column)
+        return 0.0, line
+    if frame.startswith(BINARY_PREFIX):
+        return at, base64.b64decode(frame[len(BINARY_PREFIX):])
+    return at, frame
+
+
+def read_recording(path: str) -> Recording:
+    """Load a recording (or a file with one bare frame per line)."""
+    recording = Recording(markets={}, frames=[])
+    with _open(path, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if line.startswith("#"):
+                header = json.loads(line[1:])
+                recording.markets = header.get("markets") or {}
+                recording.started_at = header.get("started_at")
+                recording.source = header.get("source")
+                continue
+            recording.frames.append(_parse_line(line))
+    return recording
+
+
+def frame_assets(frame: str | bytes) -> Optional[frozenset[str]]:
+    """
+    Token IDs a frame carries events for.
+
+    Returns:
+        Asset IDs, or None if the frame has none (sent to every connection)
+    """
+    if isinstance(frame, bytes):
+        return None
+    try:
+        data = json.loads(frame)
+    except ValueError:
+        return None
+    assets = set()
+    for event in data if isinstance(data, list) else [data]:
+        if not isinstance(event, dict):
+            continue
+        if event.get("asset_id"):
+            assets.add(event["asset_id"])
+        for change in event.get("price_changes") or []:
+            if isinstance(change, dict) and change.get("asset_id"):
+                assets.add(change["asset_id"])
+    return frozenset(assets) or None
+
+
+@dataclass
+class _ReplayFrame:
+    offset: float  # Seconds after the first frame
+    frame: str | bytes
+    assets: Optional[frozenset[str]] = field(default=None)
+
+
+class ReplayServer:
+    """Local market-channel WebSocket server replaying a recording."""
+
+    def __init__(
+        self,
+        recording: Recording,
+        speed: float = 1.0,
+        loops: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Args:
+            recording: Frames to replay
+            speed: Pace multiplier (1 = as recorded, 10 = ten times faster,
+                   <= 0 = as fast as the client reads)
+            loops: Times the recording is replayed back to back per connection
+            host: Interface to listen on
+            port: Port to listen on (0 = any free port)
+        """
+        self.speed = speed
+        self.loops = loops
+        self.host = host
+        self.port = port
+        first = recording.frames[0][0] if recording.frames else 0.0
+        self._frames = [
+            _ReplayFrame(at - first, frame, frame_assets(frame))
+            for at, frame in recording.frames
+        ]
+        self._duration = recording.duration
+        self._server = None
+        self._streams: list[asyncio.Task] = []
+
+        # Counters (monotonic, for monitoring)
+        self.connections = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        """Start listening; returns the server URL."""
+        self._server = await websockets.serve(self._handle, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Replay server listening", url=self.url, frames=len(self._frames), speed=self.speed)
+        return self.url
+
+    async def stop(self) -> None:
+        for task in self._streams:
+            task.cancel()
+        await asyncio.gather(*self._streams, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def wait_done(self, connections: int = 1) -> None:
+        """Wait until `connections` clients subscribed and got their whole replay."""
+        while len(self._streams) < connections:
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*self._streams, return_exceptions=True)
+
+    async def _handle(self, ws, path: Optional[str] = None) -> None:
+        """Track a connection's subscriptions; the first one starts its replay."""
+        self.connections += 1
+        subscribed: set[str] = set()
+        stream: Optional[asyncio.Task] = None
+        try:
+            async for message in ws:
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    continue  # Keepalives
+                if not isinstance(data, dict):
+                    continue
+                tokens = data.get("assets_ids") or []
+                if data.get("operation") == "unsubscribe":
+                    subscribed.difference_update(tokens)
+                else:
+                    subscribed.update(tokens)
+                if stream is None:
+                    stream = asyncio.create_task(self._stream(ws, subscribed))
+                    self._streams.append(stream)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if stream is not None and not stream.done():
+                stream.cancel()
+
+    async def _stream(self, ws, subscribed: set[str]) -> None:
+        """Send the subscribed tokens' frames at the replay pace."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            for i in range(self.loops):
+                base = i * self._duration
+                for item in self._frames:
+                    if item.assets is not None and item.assets.isdisjoint(subscribed):
+                        continue
+                    if self.speed > 0:
+                        delay = start + (base + item.offset) / self.speed - loop.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    await ws.send(item.frame)
+                    self.frames_sent += 1
+                    self.bytes_sent += len(item.frame)
+        except websockets.ConnectionClosed:
+            pass
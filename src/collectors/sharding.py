@@ -0,0 +1,207 @@
+"""
+Load-aware assignment of markets to WebSocket connections.
+
+Round-robin by index ignores how much traffic each market produces and
+reshuffles most markets whenever the eligible set changes. Instead:
+
+- MarketLoadTracker counts messages per market and keeps an exponentially
+  decayed messages/sec rate; markets without history are weighted by a
+  per-tier prior (settings.websocket_tier_load_weights)
+- ConnectionScheduler keeps markets on their current connection, places new
+  markets heaviest-first on the least-loaded connection, then moves a few
+  markets per cycle from the hottest to the coldest connection
+- The number of connections grows as the market count passes the fill
+  target of the existing connections (up to websocket_max_connections)
+"""
+import math
+import time
+from typing import Iterable, Optional
+
+from src.config.settings import settings
+
+
+class MarketLoadTracker:
+    """Per-market message rates (messages/sec), smoothed across reassignment cycles."""
+
+    def __init__(self, half_life: Optional[float] = None):
+        """
+        Args:
+            half_life: Seconds for an old rate observation to lose half its weight
+        """
+        self.half_life = settings.websocket_load_half_life if half_life is None else half_life
+        self.counts: dict[str, int] = {}  # Messages since the last roll
+        self.rates: dict[str, float] = {}  # condition_id -> smoothed messages/sec
+        self._rolled_at = time.monotonic()
+
+    def record(self, condition_id: str, count: int = 1) -> None:
+        """Count messages for a market (hot path: one dict update)."""
+        self.counts[condition_id] = self.counts.get(condition_id, 0) + count
+
+    def roll(self, tracked: Iterable[str], now: Optional[float] = None) -> None:
+        """
+        Fold the counts since the last roll into the smoothed rates.
+
+        Args:
+            tracked: Markets subscribed during the period (no messages = rate 0)
+            now: Monotonic time (defaults to time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._rolled_at
+        if elapsed <= 0:
+            return
+        alpha = 1 - 0.5 ** (elapsed / self.half_life) if self.half_life > 0 else 1.0
+        counts, self.counts = self.counts, {}
+        for condition_id in set(tracked) | set(counts):
+            observed = counts.get(condition_id, 0) / elapsed
+            previous = self.rates.get(condition_id)
+            self.rates[condition_id] = (
+                observed if previous is None else previous + alpha * (observed - previous)
+            )
+        self._rolled_at = now
+
+    def weights(self, tiers: dict[str, int]) -> dict[str, float]:
+        """
+        Expected messages/sec per market: observed rate, else the tier prior.
+
+        Args:
+            tiers: condition_id -> tier
+        """
+        priors = settings.websocket_tier_load_weights
+        return {
+            cid: self.rates[cid] if cid in self.rates else priors.get(tier, 0.0)
+            for cid, tier in tiers.items()
+        }
+
+    def discard(self, condition_id: str) -> None:
+        """Forget a market that is no longer subscribed anywhere."""
+        self.counts.pop(condition_id, None)
+        self.rates.pop(condition_id, None)
+
+
+class ConnectionScheduler:
+    """Sticky, load-balanced placement of markets on connections."""
+
+    def __init__(
+        self,
+        max_markets_per_connection: int,
+        min_connections: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        fill_target: Optional[float] = None,
+        tolerance: Optional[float] = None,
+        max_moves: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_markets_per_connection: Hard cap per connection (subscription limit)
+            min_connections: Connections kept even when few markets are eligible
+            max_connections: Upper bound when spilling onto new connections
+            fill_target: Fraction of the cap filled before adding a connection
+            tolerance: Rebalance while the hottest connection exceeds the mean
+                       load by more than this fraction
+            max_moves: Max markets moved between connections per cycle
+        """
+        self.max_markets_per_connection = max_markets_per_connection
+        self.min_connections = settings.websocket_num_connections if min_connections is None else min_connections
+        self.max_connections = max(
+            self.min_connections,
+            settings.websocket_max_connections if max_connections is None else max_connections,
+        )
+        self.fill_target = settings.websocket_connection_fill if fill_target is None else fill_target
+        self.tolerance = settings.websocket_rebalance_tolerance if tolerance is None else tolerance
+        self.max_moves = settings.websocket_rebalance_max_moves if max_moves is None else max_moves
+
+    def connections_needed(self, market_count: int, current: int = 0) -> int:
+        """
+        Connections for a market count (never fewer than are already open).
+
+        Args:
+            market_count: Eligible markets
+            current: Connections already open
+        """
+        per_connection = max(1, int(self.max_markets_per_connection * self.fill_target))
+        needed = math.ceil(market_count / per_connection)
+        return min(self.max_connections, max(self.min_connections, current, needed))
+
+    def plan(
+        self,
+        markets: list[str],
+        weights: dict[str, float],
+        current: dict[str, int],
+        num_connections: int,
+    ) -> dict[str, int]:
+        """
+        Assign markets to connections.
+
+        Args:
+            markets: Markets to place, highest priority first; markets beyond
+                     total capacity are left unassigned
+            weights: condition_id -> expected messages/sec
+            current: condition_id -> connection it is subscribed on now
+            num_connections: Connections available
+
+        Returns:
+            condition_id -> connection index
+        """
+        cap = self.max_markets_per_connection
+        markets = markets[:num_connections * cap]
+        loads = [0.0] * num_connections
+        members: list[set[str]] = [set() for _ in range(num_connections)]
+        assignment: dict[str, int] = {}
+
+        def place(condition_id: str, conn: int) -> None:
+            assignment[condition_id] = conn
+            members[conn].add(condition_id)
+            loads[conn] += weights.get(condition_id, 0.0)
+
+        # Keep existing placements so reassignment only touches what changed
+        unplaced = []
+        for condition_id in markets:
+            conn = current.get(condition_id)
+            if conn is not None and conn < num_connections and len(members[conn]) < cap:
+                place(condition_id, conn)
+            else:
+                unplaced.append(condition_id)
+
+        # Heaviest first onto the least-loaded connection with room
+        unplaced.sort(key=lambda cid: weights.get(cid, 0.0), reverse=True)
+        for condition_id in unplaced:
+            conn = min(
+                (i for i in range(num_connections) if len(members[i]) < cap),
+                key=lambda i: (loads[i], len(members[i])),
+            )
+            place(condition_id, conn)
+
+        self._rebalance(assignment, members, loads, weights)
+        return assignment
+
+    def _rebalance(
+        self,
+        assignment: dict[str, int],
+        members: list[set[str]],
+        loads: list[float],
+        weights: dict[str, float],
+    ) -> None:
+        """Move markets from the hottest to the coldest connection, a few per cycle."""
+        if len(loads) < 2:
+            return
+        mean = sum(loads) / len(loads)
+        cap = self.max_markets_per_connection
+        for _ in range(self.max_moves):
+            hot = max(range(len(loads)), key=loads.__getitem__)
+            if loads[hot] - mean <= self.tolerance * mean:
+                return
+            room = [i for i in range(len(loads)) if i != hot and len(members[i]) < cap]
+            if not room:
+                return
+            cold = min(room, key=loads.__getitem__)
+            gap = loads[hot] - loads[cold]
+            # The market closest to half the gap narrows it the most
+            candidates = [cid for cid in members[hot] if 0 < weights.get(cid, 0.0) < gap]
+            if not candidates:
+                return
+            condition_id = min(candidates, key=lambda cid: abs(weights[cid] - gap / 2))
+            members[hot].discard(condition_id)
+            members[cold].add(condition_id)
+            loads[hot] -= weights[condition_id]
+            loads[cold] += weights[condition_id]
+            assignment[condition_id] = cold
@@ -0,0 +1,276 @@
+"""
+Process-sharded WebSocket collector.
+
+A single collector process runs every connection on one event loop, so
+JSON decoding, DB writes and Redis calls for all markets share one core.
+With settings.websocket_shards > 1, `python -m src.collectors.websocket`
+runs a ShardSupervisor instead:
+
+- Each shard is a separate process running its own MultiConnectionCollector
+  (own connections, trade writer, Redis writer, metrics, orderbook replica
+  and Postgres pool - nothing is shared between shards)
+- The supervisor splits eligible markets across live shards with
+  ConnectionScheduler (sticky, tier-weighted) and publishes each shard's set
+  to ws:shard:{i}:markets under a version counter; shards apply a new
+  version within websocket_shard_poll_interval
+- Shards report health and rates to ws:shard:{i}:stats (with a TTL); the
+  supervisor aggregates the live shards into the ws:shards hash
+- A shard that exits or stops reporting is restarted after
+  websocket_shard_restart_delay. Its markets move to the live shards right
+  away and are rebalanced back once it is running again
+"""
+import asyncio
+import math
+import multiprocessing
+import signal
+import time
+from typing import Callable, Optional
+
+import structlog
+
+from src.collectors.sharding import ConnectionScheduler
+from src.collectors.subscriptions import MarketSubscriptions
+from src.collectors.websocket import MAX_SUBSCRIPTIONS, MultiConnectionCollector, run_collector
+from src.config.settings import settings
+from src.db.redis import SyncRedisClient
+
+logger = structlog.get_logger()
+
+SHARD_STARTUP_GRACE = 60.0  # Seconds a new shard may take before its first stats report
+SHARD_STOP_TIMEOUT = 10.0  # Seconds to wait for a shard to exit before killing it
+
+
+def shard_connections(num_shards: int) -> tuple[int, int]:
+    """(min, max) WebSocket connections per shard, splitting the configured totals."""
+    return (
+        max(1, math.ceil(settings.websocket_num_connections / num_shards)),
+        max(1, math.ceil(settings.websocket_max_connections / num_shards)),
+    )
+
+
+def run_shard(shard_id: int, num_shards: int) -> None:
+    """Shard process entry point."""
+    asyncio.run(_run_shard(shard_id, num_shards))
+
+
+async def _run_shard(shard_id: int, num_shards: int) -> None:
+    min_connections, max_connections = shard_connections(num_shards)
+    logger.info("Collector shard starting", shard=shard_id, shards=num_shards)
+    await run_collector(MultiConnectionCollector(
+        num_connections=min_connections,
+        shard_id=shard_id,
+        max_connections=max_connections,
+    ))
+
+
+class ShardSupervisor:
+    """Starts, watches and restarts collector shards and assigns their markets."""
+
+    def __init__(
+        self,
+        num_shards: int,
+        redis: Optional[SyncRedisClient] = None,
+        process_factory: Optional[Callable[[int, int], multiprocessing.Process]] = None,
+    ):
+        """
+        Args:
+            num_shards: Shard processes to run
+            redis: Redis client (defaults to settings.redis_url)
+            process_factory: (shard_id, num_shards) -> unstarted process
+                             (defaults to a spawned run_shard process)
+        """
+        self.num_shards = num_shards
+        self.redis = redis or SyncRedisClient()
+        self.process_factory = process_factory or self._spawn_process
+        self.subscriptions = MarketSubscriptions()
+        _, max_connections = shard_connections(num_shards)
+        self.scheduler = ConnectionScheduler(
+            max_markets_per_connection=max_connections * (MAX_SUBSCRIPTIONS // 2),
+            min_connections=0,
+            max_connections=num_shards,
+            max_moves=settings.websocket_shard_rebalance_max_moves,
+        )
+        self.processes: dict[int, multiprocessing.Process] = {}
+        self.started_at: dict[int, float] = {}
+        self.restart_at: dict[int, float] = {}
+        self.assignment: dict[str, int] = {}  # condition_id -> shard_id
+        self.version: Optional[int] = None
+        self.running = False
+
+        # Counters (monotonic, for monitoring)
+        self.restarts = 0
+
+    @staticmethod
+    def _spawn_process(shard_id: int, num_shards: int) -> multiprocessing.Process:
+        # Spawn, not fork: shards must not inherit the supervisor's sockets or pools
+        return multiprocessing.get_context("spawn").Process(
+            target=run_shard,
+            args=(shard_id, num_shards),
+            name=f"ws-shard-{shard_id}",
+            daemon=True,
+        )
+
+    def run(self) -> None:
+        """Run until stop(): start shards, then watch and rebalance them."""
+        self.running = True
+        logger.info("Collector shard supervisor starting", shards=self.num_shards)
+        # Shards share ws:connected, so stale entries are cleared here once
+        self.redis.clear_ws_connected()
+        for shard_id in range(self.num_shards):
+            self._start_shard(shard_id)
+        self.rebalance()
+        rebalanced_at = time.monotonic()
+
+        try:
+            while self.running:
+                time.sleep(settings.websocket_shard_poll_interval)
+                now = time.monotonic()
+                try:
+                    stats = self.redis.get_shard_stats(range(self.num_shards))
+                    changed = self.check_shards(stats, now)
+                    if changed or now - rebalanced_at >= settings.websocket_shard_rebalance_interval:
+                        self.rebalance()
+                        rebalanced_at = now
+                    self.redis.set_shard_summary(
+                        self.summary(stats), ttl=int(settings.websocket_shard_heartbeat_ttl)
+                    )
+                except Exception as e:
+                    logger.error("Shard supervision failed", error=str(e))
+        finally:
+            self.stop_shards()
+
+    def stop(self) -> None:
+        """Ask run() to stop the shards and return."""
+        self.running = False
+
+    def _start_shard(self, shard_id: int) -> None:
+        process = self.process_factory(shard_id, self.num_shards)
+        process.start()
+        self.processes[shard_id] = process
+        self.started_at[shard_id] = time.monotonic()
+        self.restart_at.pop(shard_id, None)
+        logger.info("Collector shard started", shard=shard_id, pid=process.pid)
+
+    def _stop_shard(self, shard_id: int) -> None:
+        process = self.processes.pop(shard_id)
+        process.terminate()
+        process.join(SHARD_STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def stop_shards(self) -> None:
+        """Terminate every shard process."""
+        for shard_id in list(self.processes):
+            self._stop_shard(shard_id)
+        logger.info("Collector shards stopped")
+
+    def check_shards(self, stats: dict[int, dict], now: float) -> bool:
+        """
+        Restart dead or silent shards.
+
+        Args:
+            stats: shard_id -> latest stats (shards that stopped reporting are absent)
+            now: Monotonic time
+
+        Returns:
+            True if the set of running shards changed
+        """
+        changed = False
+        for shard_id in range(self.num_shards):
+            process = self.processes.get(shard_id)
+            if process is not None:
+                if not process.is_alive():
+                    logger.warning("Collector shard exited", shard=shard_id, exitcode=process.exitcode)
+                    del self.processes[shard_id]
+                    process = None
+                elif shard_id not in stats and now - self.started_at[shard_id] > SHARD_STARTUP_GRACE:
+                    logger.warning(
+                        "Collector shard stopped reporting, restarting",
+                        shard=shard_id,
+                        ttl=settings.websocket_shard_heartbeat_ttl,
+                    )
+                    self._stop_shard(shard_id)
+                    process = None
+                if process is None:
+                    self.restart_at[shard_id] = now + settings.websocket_shard_restart_delay
+                    changed = True
+            elif now >= self.restart_at.get(shard_id, 0.0):
+                self._start_shard(shard_id)
+                self.restarts += 1
+                changed = True
+        return changed
+
+    def rebalance(self) -> None:
+        """Assign eligible markets to running shards and publish the assignment."""
+        self.subscriptions.refresh()
+        live = sorted(self.processes)
+        if not live:
+            return
+        ranked = self.subscriptions.ranked()
+        priors = settings.websocket_tier_load_weights
+        weights = {cid: priors.get(info["tier"], 0.0) for cid, info in ranked.items()}
+        position = {shard_id: i for i, shard_id in enumerate(live)}
+        current = {
+            cid: position[shard_id]
+            for cid, shard_id in self.assignment.items()
+            if shard_id in position
+        }
+        plan = self.scheduler.plan(list(ranked), weights, current, len(live))
+        assignment = {cid: live[i] for cid, i in plan.items()}
+        if assignment == self.assignment and self.version is not None:
+            return
+
+        shard_markets: dict[int, list[str]] = {shard_id: [] for shard_id in range(self.num_shards)}
+        for cid, shard_id in assignment.items():
+            shard_markets[shard_id].append(cid)
+        self.version = self.redis.set_shard_assignments(shard_markets)
+        # Shards only add to ws:connected; markets no shard has anymore are removed here
+        self.redis.remove_ws_connected(set(self.assignment) - set(assignment))
+        moved = sum(
+            1 for cid, shard_id in assignment.items()
+            if cid in self.assignment and self.assignment[cid] != shard_id
+        )
+        self.assignment = assignment
+
+        logger.info(
+            "Collector shards assigned",
+            version=self.version,
+            live_shards=len(live),
+            markets=len(assignment),
+            moved=moved,
+            per_shard={shard_id: len(markets) for shard_id, markets in shard_markets.items()},
+        )
+
+    def summary(self, stats: dict[int, dict]) -> dict:
+        """Aggregate of the shards' reported stats (written to ws:shards)."""
+        def total(field: str) -> float:
+            return round(sum(float(s.get(field) or 0) for s in stats.values()), 2)
+
+        return {
+            "shards": self.num_shards,
+            "shards_running": len(self.processes),
+            "shards_reporting": len(stats),
+            "restarts": self.restarts,
+            "assignment_version": self.version or 0,
+            "markets_assigned": len(self.assignment),
+            "markets": int(total("markets")),
+            "connections_open": int(total("connections_open")),
+            "events_per_sec": total("events_per_sec"),
+            "trades_per_sec": total("trades_per_sec"),
+            "updated_at": round(time.time(), 3),
+        }
+
+
+def run_supervisor(num_shards: Optional[int] = None) -> None:
+    """Entry point for the process-sharded collector."""
+    supervisor = ShardSupervisor(num_shards or settings.websocket_shards)
+
+    def shutdown_handler(signum, frame):
+        logger.info("Shutdown signal received")
+        supervisor.stop()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, shutdown_handler)
+
+    supervisor.run()
@@ -0,0 +1,205 @@
+"""
+Incremental view of the markets eligible for WebSocket subscriptions.
+
+Subscription updates used to re-read every eligible market from Postgres,
+replace the subscription map and rebuild the token lookup each cycle.
+MarketSubscriptions instead:
+
+- Keeps every eligible market in memory, keyed by condition_id
+- Remembers the highest markets.subscription_version it has seen and reads
+  only newer rows (the version is bumped by a trigger when tier, active,
+  resolved or token IDs change), applying them as upserts/removals
+- Falls back to a full read on first use and every
+  websocket_subscription_resync_seconds, which also picks up changes from
+  transactions that committed behind the high-water mark
+
+diff_subscriptions() turns current vs desired subscriptions into the delta
+that is sent as subscribe/unsubscribe frames and patched into the lookup.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+import structlog
+
+from src.config.settings import settings
+from src.db.database import get_session
+from src.db.models import Market
+
+logger = structlog.get_logger()
+
+SUBSCRIPTION_COLUMNS = (
+    Market.condition_id,
+    Market.id,
+    Market.yes_token_id,
+    Market.no_token_id,
+    Market.tier,
+    Market.active,
+    Market.resolved,
+    Market.subscription_version,
+)
+
+
+@dataclass
+class SubscriptionDiff:
+    """Markets to subscribe to and unsubscribe from (condition_id -> market info)."""
+    added: dict[str, dict] = field(default_factory=dict)
+    removed: dict[str, dict] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def subscribe_tokens(self) -> list[str]:
+        """Token IDs to send in the subscribe frame."""
+        return token_ids(self.added.values())
+
+    def unsubscribe_tokens(self) -> list[str]:
+        """
+        Token IDs to send in the unsubscribe frame.
+
+        Tokens still wanted by an added market are kept: a market whose NO
+        token is filled in is both removed (Y, None) and added (Y, N), and
+        unsubscribing Y would silently drop its YES events.
+        """
+        keep = set(self.subscribe_tokens())
+        return [token for token in token_ids(self.removed.values()) if token not in keep]
+
+
+def token_ids(markets: Iterable[dict]) -> list[str]:
+    """YES and NO token IDs of the given market infos."""
+    tokens = []
+    for info in markets:
+        if info.get("yes_token_id"):
+            tokens.append(info["yes_token_id"])
+        if info.get("no_token_id"):
+            tokens.append(info["no_token_id"])
+    return tokens
+
+
+def _tokens(info: dict) -> tuple:
+    return info.get("yes_token_id"), info.get("no_token_id")
+
+
+def diff_subscriptions(current: dict[str, dict], desired: dict[str, dict]) -> SubscriptionDiff:
+    """
+    Delta between the subscribed and the desired markets.
+
+    A market whose token IDs changed is both removed (old tokens) and added
+    (new tokens); other changes (e.g. tier) need no frames. Use
+    subscribe_tokens()/unsubscribe_tokens() for the frames so tokens shared
+    by the old and new info stay subscribed.
+    """
+    diff = SubscriptionDiff()
+    for condition_id, info in current.items():
+        wanted = desired.get(condition_id)
+        if wanted is None or _tokens(wanted) != _tokens(info):
+            diff.removed[condition_id] = info
+    for condition_id, info in desired.items():
+        have = current.get(condition_id)
+        if have is None or _tokens(have) != _tokens(info):
+            diff.added[condition_id] = info
+    return diff
+
+
+class MarketSubscriptions:
+    """Eligible WebSocket markets, refreshed by subscription_version high-water mark."""
+
+    def __init__(self, resync_seconds: Optional[float] = None):
+        """
+        Args:
+            resync_seconds: Max seconds between full reads
+        """
+        self.resync_seconds = (
+            settings.websocket_subscription_resync_seconds if resync_seconds is None else resync_seconds
+        )
+        self.markets: dict[str, dict] = {}  # condition_id -> {yes_token_id, no_token_id, market_id, tier}
+        self.high_water: Optional[int] = None
+        self._synced_at = 0.0
+
+        # Counters (monotonic, for monitoring)
+        self.full_reads = 0
+        self.delta_rows = 0
+
+    @staticmethod
+    def eligible(row) -> bool:
+        """Whether a market row should have WebSocket data."""
+        return (
+            row.tier in settings.websocket_enabled_tiers
+            and row.active
+            and not row.resolved
+            and row.yes_token_id is not None
+        )
+
+    @staticmethod
+    def _info(row) -> dict:
+        return {
+            "yes_token_id": row.yes_token_id,
+            "no_token_id": row.no_token_id,
+            "market_id": row.id,
+            "tier": row.tier,
+        }
+
+    def refresh(self, session: Optional[Session] = None) -> int:
+        """
+        Bring the eligible markets up to date.
+
+        Returns:
+            Number of market rows read
+        """
+        if session is None:
+            with get_session() as session:
+                return self.refresh(session)
+
+        now = time.monotonic()
+        if self.high_water is None or now - self._synced_at >= self.resync_seconds:
+            # Read the high-water mark first: anything changed meanwhile is re-read next time
+            high_water = session.scalar(select(func.max(Market.subscription_version)))
+            rows = session.execute(
+                select(*SUBSCRIPTION_COLUMNS).where(
+                    Market.tier.in_(settings.websocket_enabled_tiers),
+                    Market.active == True,
+                    Market.resolved == False,
+                    Market.yes_token_id.isnot(None),
+                )
+            ).all()
+            self.apply_full(rows, high_water)
+            self._synced_at = now
+        else:
+            rows = session.execute(
+                select(*SUBSCRIPTION_COLUMNS).where(
+                    Market.subscription_version > self.high_water
+                )
+            ).all()
+            self.apply_changes(rows)
+        return len(rows)
+
+    def apply_full(self, rows: Iterable, high_water: Optional[int]) -> None:
+        """Replace the view with a full read of eligible markets."""
+        self.markets = {row.condition_id: self._info(row) for row in rows if self.eligible(row)}
+        self.high_water = high_water or 0
+        self.full_reads += 1
+        logger.debug("Subscription view reloaded", markets=len(self.markets), version=self.high_water)
+
+    def apply_changes(self, rows: Iterable) -> None:
+        """Apply rows changed since the high-water mark."""
+        for row in rows:
+            if self.eligible(row):
+                self.markets[row.condition_id] = self._info(row)
+            else:
+                self.markets.pop(row.condition_id, None)
+            self.high_water = max(self.high_water or 0, row.subscription_version)
+            self.delta_rows += 1
+
+    def ranked(self, limit: Optional[int] = None) -> dict[str, dict]:
+        """
+        Eligible markets, highest tier first (T4 > T3 > T2).
+
+        Args:
+            limit: Keep only this many markets
+        """
+        ordered = sorted(self.markets.items(), key=lambda item: (-item[1]["tier"], item[1]["market_id"]))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return dict(ordered)
@@ -7,24 +7,41 @@ This service connects to Polymarket's WebSocket API to:
 - Monitor price changes (price_change)
 
 Trade data is:
-1. Stored in PostgreSQL (trades table)
-2. Pushed to Redis buffer for metrics computation
-3. Whale trades trigger whale_events records
+1. Queued for batched write-behind to PostgreSQL (trades table)
+2. Pushed to Redis buffer for metrics computation (coalesced, one pipeline per tick)
+3. Whale trades trigger whale_events records (written with their trade batch)
+4. Folded into incremental 1h trade/whale metrics published to metrics:{condition_id}
+
+Book and price_change events maintain a live L2 replica of each YES token
+book, published as top-N levels plus features to orderbook:{condition_id}.
+
+Frames are decoded by FrameDecoder (orjson when installed) and routed to
+handlers through a table keyed on event_type.
 """
 import asyncio
 import json
+import os
 import signal
+import time
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Optional
 
 import websockets
-from sqlalchemy import select
 import structlog
 
+from src.collectors.decoding import FrameDecoder
+from src.collectors.ingest import PendingTrade, TradeWriter
+from src.collectors.metrics import TradeMetricsAggregator
+from src.collectors.orderbook import OrderBookReplica, parse_event_ts
+from src.collectors.sharding import ConnectionScheduler, MarketLoadTracker
+from src.collectors.subscriptions import (
+    MarketSubscriptions,
+    SubscriptionDiff,
+    diff_subscriptions,
+    token_ids,
+)
 from src.config.settings import settings
-from src.db.database import get_session
-from src.db.models import Market, Trade, WhaleEvent
-from src.db.redis import RedisClient
+from src.db.redis import CoalescingRedisWriter, RedisClient
 
 logger = structlog.get_logger()
 
@@ -40,15 +57,52 @@ RATE_CHECK_WINDOW_SECONDS = 300  # Window for rate calculation (5 minutes)
 class WebSocketCollector:
     """Manages WebSocket connections for trade data collection."""
 
-    def __init__(self, managed: bool = False):
+    def __init__(
+        self,
+        managed: bool = False,
+        trade_writer: Optional[TradeWriter] = None,
+        redis_writer: Optional[CoalescingRedisWriter] = None,
+        metrics_aggregator: Optional[TradeMetricsAggregator] = None,
+        orderbook_replica: Optional[OrderBookReplica] = None,
+        load_tracker: Optional[MarketLoadTracker] = None,
+    ):
         """Initialize the WebSocket collector.
 
         Args:
             managed: If True, subscription updates are managed externally
                      (by MultiConnectionCollector). Internal updates are disabled.
+            trade_writer: Shared write-behind trade writer. If None, the
+                          collector creates and owns its own writer.
+            redis_writer: Shared coalescing Redis writer for hot-path writes.
+                          If None, the collector creates and owns its own.
+            metrics_aggregator: Shared incremental trade metrics aggregator.
+                                If None, the collector creates and owns its own.
+            orderbook_replica: Shared live orderbook replica.
+                               If None, the collector creates and owns its own.
+            load_tracker: Shared per-market message rate tracker.
+                          If None, the collector keeps its own.
         """
         self.ws: Optional[websockets.WebSocketClientProtocol] = None
+        self.trade_writer = trade_writer or TradeWriter()
+        self._owns_trade_writer = trade_writer is None
         self.redis = RedisClient()
+        self.redis_writer = redis_writer or CoalescingRedisWriter(self.redis)
+        self._owns_redis_writer = redis_writer is None
+        self.metrics_aggregator = metrics_aggregator or TradeMetricsAggregator(self.redis_writer)
+        self._owns_metrics_aggregator = metrics_aggregator is None
+        self.orderbook_replica = orderbook_replica or OrderBookReplica(self.redis_writer)
+        self._owns_orderbook_replica = orderbook_replica is None
+        self.load_tracker = load_tracker or MarketLoadTracker()
+        self._owns_load_tracker = load_tracker is None
+        self.subscriptions = MarketSubscriptions()  # Eligible markets (unmanaged mode)
+        self.decoder = FrameDecoder()
+        # event_type -> handler (None = known but ignored)
+        self._event_handlers = {
+            "last_trade_price": self._handle_trade,
+            "book": self._handle_book,
+            "price_change": self._handle_price_change,
+            "tick_size_change": None,
+        }
         self.subscribed_markets: dict[str, dict] = {}  # condition_id -> {yes_token_id, no_token_id, market_id}
         self.token_to_market: dict[str, dict] = {}  # token_id -> {condition_id, market_id, token_type}
         self.running = False
@@ -58,6 +112,9 @@ class WebSocketCollector:
         self.last_activity: datetime = datetime.now(timezone.utc)
         self.managed = managed  # If True, skip internal subscription updates
         self.connection_id: int = 0  # Set by MultiConnectionCollector
+        # Counters (monotonic, for shard stats)
+        self.events_processed = 0
+        self.trades_processed = 0
         # Trade rate tracking for health monitoring
         self.trade_timestamps: list[datetime] = []  # Rolling window of trade times
         self.last_rate_check: datetime = datetime.now(timezone.utc)
@@ -67,22 +124,40 @@ class WebSocketCollector:
         self.running = True
         print("WebSocket collector starting...", flush=True)
         logger.info("WebSocket collector starting")
+        if self._owns_trade_writer:
+            await self.trade_writer.start()
+        if self._owns_redis_writer:
+            await self.redis_writer.start()
+        if self._owns_metrics_aggregator:
+            await self.metrics_aggregator.start()
+        if self._owns_orderbook_replica:
+            await self.orderbook_replica.start()
 
-        while self.running:
-            try:
-                await self._connect_and_run()
-            except websockets.ConnectionClosed as e:
-                logger.warning("WebSocket connection closed", code=e.code, reason=e.reason)
-            except Exception as e:
-                logger.error("WebSocket error", error=str(e))
-
-            if self.running:
-                logger.info("Reconnecting in seconds", delay=self.reconnect_delay)
-                await asyncio.sleep(self.reconnect_delay)
-                self.reconnect_delay = min(
-                    self.reconnect_delay * 1.5,
-                    settings.websocket_max_reconnect_delay
-                )
+        try:
+            while self.running:
+                try:
+                    await self._connect_and_run()
+                except websockets.ConnectionClosed as e:
+                    logger.warning("WebSocket connection closed", code=e.code, reason=e.reason)
+                except Exception as e:
+                    logger.error("WebSocket error", error=str(e))
+
+                if self.running:
+                    logger.info("Reconnecting in seconds", delay=self.reconnect_delay)
+                    await asyncio.sleep(self.reconnect_delay)
+                    self.reconnect_delay = min(
+                        self.reconnect_delay * 1.5,
+                        settings.websocket_max_reconnect_delay
+                    )
+        finally:
+            if self._owns_metrics_aggregator:
+                await self.metrics_aggregator.stop()
+            if self._owns_orderbook_replica:
+                await self.orderbook_replica.stop()
+            if self._owns_trade_writer:
+                await self.trade_writer.stop()
+            if self._owns_redis_writer:
+                await self.redis_writer.stop()
 
     async def _connect_and_run(self) -> None:
         """Connect to WebSocket and process messages."""
@@ -99,16 +174,15 @@ class WebSocketCollector:
             print("WebSocket connected!", flush=True)
             logger.info("WebSocket connected", connection=self.connection_id)
 
-            # Initial subscription update (skip if managed externally)
+            # Initial subscription update (skip if managed externally); frames
+            # are not sent here since the new socket subscribes to everything
             if not self.managed:
                 print("Updating subscriptions...", flush=True)
-                await self._update_subscriptions()
-            else:
-                # For managed mode, build token lookup and subscribe to pre-assigned markets
-                self._build_token_lookup()
-                token_ids = list(self.token_to_market.keys())
-                if token_ids:
-                    await self._subscribe_tokens(token_ids)
+                await self._update_subscriptions(send_frames=False)
+            # Subscribe to all assigned markets on the new socket
+            tokens = list(self.token_to_market.keys())
+            if tokens:
+                await self._subscribe_tokens(tokens)
             print(f"Subscribed to {len(self.subscribed_markets)} markets ({len(self.token_to_market)} tokens)", flush=True)
 
             # Start periodic subscription updates (only if not managed)
@@ -218,22 +292,35 @@ class WebSocketCollector:
         """Build reverse lookup from token_id to market info."""
         self.token_to_market = {}
         for cid, info in self.subscribed_markets.items():
-            yes_token = info.get("yes_token_id")
-            no_token = info.get("no_token_id")
-            market_id = info["market_id"]
-
-            if yes_token:
-                self.token_to_market[yes_token] = {
-                    "condition_id": cid,
-                    "market_id": market_id,
-                    "token_type": "YES",
-                }
-            if no_token:
-                self.token_to_market[no_token] = {
-                    "condition_id": cid,
-                    "market_id": market_id,
-                    "token_type": "NO",
-                }
+            self._add_to_lookup(cid, info)
+
+    def _add_to_lookup(self, condition_id: str, info: dict) -> None:
+        """Add a market's YES/NO tokens to the reverse lookup."""
+        market_id = info["market_id"]
+        if info.get("yes_token_id"):
+            self.token_to_market[info["yes_token_id"]] = {
+                "condition_id": condition_id,
+                "market_id": market_id,
+                "token_type": "YES",
+            }
+        if info.get("no_token_id"):
+            self.token_to_market[info["no_token_id"]] = {
+                "condition_id": condition_id,
+                "market_id": market_id,
+                "token_type": "NO",
+            }
+
+    def apply_subscription_diff(self, diff: SubscriptionDiff) -> None:
+        """Patch subscribed_markets and the token lookup in place (no frames sent)."""
+        for cid, info in diff.removed.items():
+            self.subscribed_markets.pop(cid, None)
+            for token_id in token_ids([info]):
+                entry = self.token_to_market.get(token_id)
+                if entry is not None and entry["condition_id"] == cid:
+                    del self.token_to_market[token_id]
+        for cid, info in diff.added.items():
+            self.subscribed_markets[cid] = info
+            self._add_to_lookup(cid, info)
 
     async def _subscribe_tokens(self, token_ids: list[str]) -> None:
         """Subscribe to a list of token IDs."""
@@ -245,117 +332,100 @@ class WebSocketCollector:
             await self.ws.send(json.dumps(message))
             logger.info("Subscribed to tokens", count=len(token_ids), connection=self.connection_id)
 
-    async def _update_subscriptions(self) -> None:
+    async def _unsubscribe_tokens(self, token_ids: list[str]) -> None:
+        """Stop receiving events for a list of token IDs on this connection."""
+        if self.ws and token_ids:
+            message = {
+                "assets_ids": token_ids,
+                "operation": "unsubscribe",
+            }
+            await self.ws.send(json.dumps(message))
+            logger.info("Unsubscribed from tokens", count=len(token_ids), connection=self.connection_id)
+
+    async def _update_subscriptions(self, send_frames: bool = True) -> None:
         """Subscribe to markets in T2+ tiers, prioritizing by tier (T4 first).
 
         Polymarket limits WebSocket connections to 500 instruments max.
         Each market uses 2 slots (YES + NO token), so max ~250 markets per connection.
         We prioritize higher tiers (T4 > T3 > T2) since they need real-time data most.
+
+        Only markets changed since the last update are read from Postgres,
+        and only the delta is sent as subscribe/unsubscribe frames.
+
+        Args:
+            send_frames: Send delta frames on the open socket (False right
+                         after connecting, when everything is subscribed anyway)
         """
-        with get_session() as session:
-            markets = session.execute(
-                select(Market).where(
-                    Market.tier.in_(settings.websocket_enabled_tiers),
-                    Market.active == True,
-                    Market.resolved == False,
-                    Market.yes_token_id.isnot(None),
-                ).order_by(Market.tier.desc())  # T4 first, then T3, then T2
-            ).scalars().all()
-
-            # Each market uses 2 subscription slots (YES + NO token)
-            max_markets = MAX_SUBSCRIPTIONS // 2
-            if len(markets) > max_markets:
-                logger.warning(
-                    "Limiting WebSocket subscriptions",
-                    total_markets=len(markets),
-                    max_markets=max_markets,
-                    max_tokens=MAX_SUBSCRIPTIONS,
-                    dropped=len(markets) - max_markets,
-                )
-                markets = markets[:max_markets]
-
-            new_subscriptions = {
-                m.condition_id: {
-                    "yes_token_id": m.yes_token_id,
-                    "no_token_id": m.no_token_id,
-                    "market_id": m.id,
-                }
-                for m in markets
-            }
+        self.subscriptions.refresh()
 
-        # Find removed and added markets
-        removed = set(self.subscribed_markets.keys()) - set(new_subscriptions.keys())
-        added = set(new_subscriptions.keys()) - set(self.subscribed_markets.keys())
-
-        # Unsubscribe from removed markets (update Redis tracking)
-        for cid in removed:
-            await self._unsubscribe(cid)
-
-        # Update subscribed_markets and rebuild token lookup
-        self.subscribed_markets = new_subscriptions
-        self._build_token_lookup()
-
-        # Subscribe to new tokens
-        if added:
-            new_tokens = []
-            for cid in added:
-                info = new_subscriptions[cid]
-                if info.get("yes_token_id"):
-                    new_tokens.append(info["yes_token_id"])
-                if info.get("no_token_id"):
-                    new_tokens.append(info["no_token_id"])
-            if new_tokens:
-                await self._subscribe_tokens(new_tokens)
-                # Update Redis tracking for connected markets
-                for cid in added:
-                    await self.redis.set_ws_connected(cid, True)
+        # Each market uses 2 subscription slots (YES + NO token)
+        max_markets = MAX_SUBSCRIPTIONS // 2
+        if len(self.subscriptions.markets) > max_markets:
+            logger.warning(
+                "Limiting WebSocket subscriptions",
+                total_markets=len(self.subscriptions.markets),
+                max_markets=max_markets,
+                max_tokens=MAX_SUBSCRIPTIONS,
+                dropped=len(self.subscriptions.markets) - max_markets,
+            )
+        diff = diff_subscriptions(self.subscribed_markets, self.subscriptions.ranked(max_markets))
+        if not diff:
+            return
+
+        self.apply_subscription_diff(diff)
+        if send_frames:
+            await self._subscribe_tokens(diff.subscribe_tokens())
+            await self._unsubscribe_tokens(diff.unsubscribe_tokens())
+
+        # Redis tracking for all changed markets in one pipeline (a market whose
+        # tokens changed is in both sets and stays connected)
+        removed = [cid for cid in diff.removed if cid not in diff.added]
+        await self.redis.set_ws_connected_many(connected=diff.added, disconnected=removed)
+        self._release(removed)
+        if diff.added:
+            # Load the existing 1h buffer so published metrics cover the full window
+            await self.metrics_aggregator.seed(self.redis, list(diff.added))
 
         logger.info(
             "Subscriptions updated",
             total_markets=len(self.subscribed_markets),
             total_tokens=len(self.token_to_market),
-            added=len(added),
-            removed=len(removed),
+            added=len(diff.added),
+            removed=len(diff.removed),
         )
 
-    async def _unsubscribe(self, condition_id: str) -> None:
-        """Unsubscribe from a market."""
-        await self.redis.set_ws_connected(condition_id, False)
-        logger.debug("Unsubscribed from market", condition_id=condition_id[:20])
+    def _release(self, condition_ids: Iterable[str]) -> None:
+        """Drop owned per-market state for markets no longer subscribed."""
+        for condition_id in condition_ids:
+            if self._owns_metrics_aggregator:
+                # A shared aggregator is pruned by MultiConnectionCollector, since a
+                # market dropped here may have moved to another connection
+                self.metrics_aggregator.discard(condition_id)
+            if self._owns_orderbook_replica:
+                self.orderbook_replica.discard(condition_id)
+            if self._owns_load_tracker:
+                self.load_tracker.discard(condition_id)
 
     async def _handle_message(self, message: str | bytes) -> None:
         """Process incoming WebSocket message."""
         # Track activity on ANY message (for health detection)
         self.last_activity = datetime.now(timezone.utc)
-        await self.redis.set_ws_last_activity()
+        self.redis_writer.set_ws_last_activity()
 
         try:
-            # Handle binary messages (msgpack encoded)
-            if isinstance(message, bytes):
-                try:
-                    import msgpack
-                    data = msgpack.unpackb(message, raw=False)
-                except ImportError:
-                    logger.warning("Received binary message but msgpack not installed")
-                    return
-                except Exception as e:
-                    logger.warning("Failed to decode msgpack message", error=str(e), raw=message[:50])
-                    return
-            else:
-                # Skip ping/pong text messages
-                if message in ("PING", "PONG"):
-                    return
-                data = json.loads(message)
-
-            # Handle arrays of events
-            if isinstance(data, list):
-                for event in data:
-                    await self._process_event(event)
-            else:
-                await self._process_event(data)
+            # JSON text or msgpack binary; arrays and single events both become a list
+            events = self.decoder.decode(message)
+        except ValueError as e:
+            logger.warning(
+                "Invalid message",
+                error=str(e),
+                preview=str(message[:100]) if message else "empty",
+            )
+            return
 
-        except json.JSONDecodeError:
-            logger.warning("Invalid JSON message", preview=str(message)[:100] if message else "empty")
+        try:
+            for event in events:
+                await self._process_event(event)
         except Exception as e:
             logger.warning("Failed to handle message", error=str(e))
 
@@ -366,20 +436,18 @@ class WebSocketCollector:
             return
 
         event_type = data.get("event_type")
-
-        if event_type == "last_trade_price":
-            await self._handle_trade(data)
-        elif event_type == "book":
-            await self._handle_book(data)
-        elif event_type == "price_change":
-            await self._handle_price_change(data)
-        elif event_type == "tick_size_change":
-            pass  # Ignore tick size changes
-        elif event_type is None:
-            # Log first few keys to debug unknown message format
-            logger.info("Received event without event_type", keys=list(data.keys())[:5])
-        else:
-            logger.debug("Unknown event type", event_type=event_type)
+        try:
+            handler = self._event_handlers[event_type]
+        except KeyError:
+            if event_type is None:
+                # Log first few keys to debug unknown message format
+                logger.info("Received event without event_type", keys=list(data.keys())[:5])
+            else:
+                logger.debug("Unknown event type", event_type=event_type)
+            return
+        self.events_processed += 1
+        if handler is not None:
+            await handler(data)
 
     async def _handle_trade(self, data: dict) -> None:
         """
@@ -404,6 +472,7 @@ class WebSocketCollector:
             return
 
         condition_id = token_info["condition_id"]
+        self.load_tracker.record(condition_id)
         market_id = token_info["market_id"]
         token_type = token_info["token_type"]  # "YES" or "NO"
 
@@ -448,71 +517,44 @@ class WebSocketCollector:
         # Classify whale tier
         whale_tier = self._classify_whale(size)
 
-        # Insert trade to database
-        try:
-            with get_session() as session:
-                trade = Trade(
-                    market_id=market_id,
-                    timestamp=timestamp,
-                    price=price,
-                    size=size,
-                    side=side,
-                    token_type=token_type,
-                    whale_tier=whale_tier,
-                )
-                session.add(trade)
-                session.flush()  # Get trade ID
-
-                # Create whale event if whale trade
-                if whale_tier >= 2:
-                    whale_event = WhaleEvent(
-                        market_id=market_id,
-                        trade_id=trade.id,
-                        timestamp=timestamp,
-                        price=price,
-                        size=size,
-                        side=side,
-                        whale_tier=whale_tier,
-                    )
-                    session.add(whale_event)
-                    logger.info(
-                        "Whale trade detected",
-                        market_id=market_id,
-                        size=size,
-                        whale_tier=whale_tier,
-                        connection=self.connection_id,
-                    )
-
-                session.commit()
-
-        except Exception as e:
-            # Log but continue - don't let DB errors stop trade processing
-            logger.error(
-                "Failed to insert trade",
-                error=str(e),
+        # Queue trade for batched DB write (never blocks on the database)
+        await self.trade_writer.submit(PendingTrade(
+            market_id=market_id,
+            timestamp=timestamp,
+            price=price,
+            size=size,
+            side=side,
+            token_type=token_type,
+            whale_tier=whale_tier,
+        ))
+        if whale_tier >= 2:
+            logger.info(
+                "Whale trade detected",
                 market_id=market_id,
+                size=size,
+                whale_tier=whale_tier,
                 connection=self.connection_id,
             )
-            # Still push to Redis even if DB fails
-            # This maintains the real-time buffer for metrics
 
-        # Push to Redis buffer (graceful degradation - continue even if Redis fails)
-        try:
-            trade_data = {
-                "timestamp": timestamp.isoformat(),
-                "price": price,
-                "size": size,
-                "side": side,
-                "whale_tier": whale_tier,
-            }
-            await self.redis.push_trade(condition_id, trade_data)
-            await self.redis.set_ws_last_event(condition_id)
-            await self.redis.set_price(condition_id, price)
-        except Exception as e:
-            logger.warning("Redis trade push failed", error=str(e), market_id=market_id)
+        # Buffer Redis writes (flushed as one pipeline per tick; flush failures
+        # are logged by the writer and never stop trade processing)
+        trade_data = {
+            "ts": timestamp.timestamp(),
+            "price": price,
+            "size": size,
+            "side": side,
+            "whale_tier": whale_tier,
+        }
+        self.redis_writer.push_trade(condition_id, trade_data)
+        self.redis_writer.set_ws_last_event(condition_id)
+        self.redis_writer.set_price(condition_id, price)
+        self.metrics_aggregator.record_trade(
+            condition_id, timestamp.timestamp(), price, size, side, whale_tier
+        )
 
         # Track trade for rate monitoring
         self._record_trade()
+        self.trades_processed += 1
 
         logger.debug(
             "Trade recorded",
@@ -524,35 +566,48 @@ class WebSocketCollector:
         )
 
     async def _handle_book(self, data: dict) -> None:
-        """Process orderbook update."""
+        """Process orderbook snapshot (replaces the replica's book)."""
         asset_id = data.get("asset_id")
         if not asset_id:
             return
 
-        # Fast O(1) lookup using token_to_market dict
+        # Fast O(1) lookup using token_to_market dict; snapshot tasks only
+        # use the YES token book
         token_info = self.token_to_market.get(asset_id)
-        if token_info:
-            condition_id = token_info["condition_id"]
-            # Cache orderbook in Redis
-            orderbook = {
-                "bids": data.get("buys", []),
-                "asks": data.get("sells", []),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-            await self.redis.set_orderbook(condition_id, orderbook)
+        if not token_info:
+            return
+        self.load_tracker.record(token_info["condition_id"])
+        if token_info["token_type"] == "YES":
+            self.orderbook_replica.apply_book(token_info["condition_id"], data)
 
     async def _handle_price_change(self, data: dict) -> None:
-        """Process price change event."""
-        asset_id = data.get("asset_id")
-        price = data.get("price")
+        """
+        Process price change event.
 
-        if not asset_id or price is None:
-            return
+        Handles both payload shapes: per-asset `price_changes` entries (each
+        with its own asset_id, hash and best bid/ask) and the older top-level
+        asset_id with a `changes` list.
+        """
+        timestamp = parse_event_ts(data.get("timestamp"))
 
-        # Fast O(1) lookup using token_to_market dict
-        token_info = self.token_to_market.get(asset_id)
-        if token_info:
-            await self.redis.set_price(token_info["condition_id"], float(price))
+        if "price_changes" in data:
+            changes = [(c.get("asset_id"), c) for c in data.get("price_changes") or []]
+        else:
+            asset_id = data.get("asset_id")
+            changes = [(asset_id, c) for c in data.get("changes") or []]
+            # Older payloads may carry a top-level last price
+            price = data.get("price")
+            token_info = self.token_to_market.get(asset_id) if asset_id else None
+            if token_info and price is not None:
+                self.redis_writer.set_price(token_info["condition_id"], float(price))
+
+        for asset_id, change in changes:
+            token_info = self.token_to_market.get(asset_id) if asset_id else None
+            if not token_info:
+                continue
+            self.load_tracker.record(token_info["condition_id"])
+            if token_info["token_type"] == "YES":
+                self.orderbook_replica.apply_change(token_info["condition_id"], change, timestamp)
 
     def _classify_whale(self, size: float) -> int:
         """
@@ -585,56 +640,135 @@ class MultiConnectionCollector:
     Polymarket limits each connection to 500 instruments, so we split markets
     across multiple connections, prioritizing by tier (T4 > T3 > T2).
     Each market uses 2 subscription slots (YES + NO token).
+
+    Placement is load-aware (see src/collectors/sharding.py): markets stay on
+    their connection between reassignments, new markets go to the least
+    loaded connection by observed message rate, and connections are added
+    as the market count grows.
     """
 
-    def __init__(self, num_connections: int = 2):
+    def __init__(
+        self,
+        num_connections: int = 2,
+        shard_id: Optional[int] = None,
+        max_connections: Optional[int] = None,
+    ):
+        """
+        Args:
+            num_connections: Connections opened at start (minimum)
+            shard_id: Collector shard this process runs (see src/collectors/shards.py);
+                      only markets the supervisor assigned to it are subscribed
+            max_connections: Upper bound when adding connections
+                             (defaults to settings.websocket_max_connections)
+        """
         self.num_connections = num_connections
+        self.shard_id = shard_id
+        self.shard_version: Optional[str] = None  # Assignment version last applied
         self.collectors: list[WebSocketCollector] = []
+        self.trade_writer = TradeWriter()  # Shared by all connections
+        self.redis_writer = CoalescingRedisWriter()  # Shared by all connections
+        self.metrics_aggregator = TradeMetricsAggregator(self.redis_writer)  # Shared by all connections
+        self.orderbook_replica = OrderBookReplica(self.redis_writer)  # Shared by all connections
+        self.load_tracker = MarketLoadTracker()  # Shared by all connections
+        self.scheduler = ConnectionScheduler(
+            MAX_SUBSCRIPTIONS // 2, min_connections=num_connections, max_connections=max_connections
+        )
+        self.subscriptions = MarketSubscriptions()  # Eligible markets, read incrementally
+        self._connection_tasks: list[asyncio.Task] = []
+        self._reassign_lock = asyncio.Lock()
+        self._last_stats: tuple[float, int, int] = (time.monotonic(), 0, 0)  # (at, events, trades)
         self.running = False
 
     async def start(self) -> None:
         """Start all WebSocket collectors in parallel."""
         self.running = True
         # Each market uses 2 slots (YES + NO token)
-        max_markets = (self.num_connections * MAX_SUBSCRIPTIONS) // 2
+        max_markets = (self.scheduler.max_connections * MAX_SUBSCRIPTIONS) // 2
         logger.info(
             "Starting multi-connection collector",
+            shard=self.shard_id,
             num_connections=self.num_connections,
-            max_tokens=self.num_connections * MAX_SUBSCRIPTIONS,
+            max_connections=self.scheduler.max_connections,
+            max_tokens=self.scheduler.max_connections * MAX_SUBSCRIPTIONS,
             max_markets=max_markets,
         )
 
         # Clear stale entries from Redis ws:connected set
         # This ensures we don't have leftover entries from previous sessions
-        redis = RedisClient()
-        try:
-            await redis.clear_ws_connected()
-        finally:
-            await redis.close()
+        # (in sharded mode the supervisor does this, since shards share the set)
+        if self.shard_id is None:
+            redis = RedisClient()
+            try:
+                await redis.clear_ws_connected()
+            finally:
+                await redis.close()
+
+        await self.trade_writer.start()
+        await self.redis_writer.start()
+        await self.metrics_aggregator.start()
+        await self.orderbook_replica.start()
 
         # Create collectors (managed mode - subscriptions handled by MultiConnectionCollector)
-        for i in range(self.num_connections):
-            collector = WebSocketCollector(managed=True)
-            collector.connection_id = i  # Tag for logging
-            collector.running = True  # Enable the collector's run loop
-            self.collectors.append(collector)
+        for _ in range(self.num_connections):
+            self._add_connection()
 
         # Override subscription logic to split markets across connections
         await self._assign_markets_to_connections()
 
-        # Start all collectors in parallel
-        tasks = [
-            asyncio.create_task(self._run_collector(collector, i))
-            for i, collector in enumerate(self.collectors)
-        ]
+        # Start all collectors in parallel (connections added later start on reassignment)
+        self._start_connections()
 
         # Also run periodic market reassignment
-        tasks.append(asyncio.create_task(self._reassignment_loop()))
+        tasks = [asyncio.create_task(self._reassignment_loop())]
+        if self.shard_id is not None:
+            # Follow the supervisor's assignment and report shard health
+            tasks.append(asyncio.create_task(self._shard_loop()))
+
+        # Seed incremental metrics from the existing 1h buffers in the background
+        assigned = [cid for c in self.collectors for cid in c.subscribed_markets]
+        await self.redis_writer.redis.set_ws_connected_many(connected=assigned)
+        tasks.append(asyncio.create_task(
+            self.metrics_aggregator.seed(self.redis_writer.redis, assigned)
+        ))
 
         try:
-            await asyncio.gather(*tasks)
+            await asyncio.gather(*self._connection_tasks, *tasks)
         except asyncio.CancelledError:
             pass
+        finally:
+            # Connections spawned after start are not part of the gather above
+            for task in self._connection_tasks:
+                task.cancel()
+            await asyncio.gather(*self._connection_tasks, return_exceptions=True)
+            # Flush trades and Redis writes still buffered in memory
+            await self.metrics_aggregator.stop()
+            self.metrics_aggregator.publish()
+            await self.orderbook_replica.stop()
+            await self.trade_writer.stop()
+            await self.redis_writer.stop()
+            await self.redis_writer.redis.close()
+
+    def _add_connection(self) -> WebSocketCollector:
+        """Create a managed collector sharing this instance's writers."""
+        collector = WebSocketCollector(
+            managed=True,
+            trade_writer=self.trade_writer,
+            redis_writer=self.redis_writer,
+            metrics_aggregator=self.metrics_aggregator,
+            orderbook_replica=self.orderbook_replica,
+            load_tracker=self.load_tracker,
+        )
+        collector.connection_id = len(self.collectors)  # Tag for logging
+        collector.running = True  # Enable the collector's run loop
+        self.collectors.append(collector)
+        return collector
+
+    def _start_connections(self) -> None:
+        """Start run loops for collectors that do not have one yet."""
+        for i in range(len(self._connection_tasks), len(self.collectors)):
+            self._connection_tasks.append(
+                asyncio.create_task(self._run_collector(self.collectors[i], i))
+            )
 
     async def _run_collector(self, collector: WebSocketCollector, conn_id: int) -> None:
         """Run a single collector with its assigned markets.
@@ -681,36 +815,43 @@ class MultiConnectionCollector:
                     settings.websocket_max_reconnect_delay
                 )
 
-    async def _assign_markets_to_connections(self) -> None:
-        """Split markets across connections, prioritizing by tier.
+    def _load_markets(self) -> list[dict]:
+        """Markets eligible for WebSocket data, highest tier first (changed rows only are read)."""
+        self.subscriptions.refresh()
+        return [
+            {"condition_id": cid, **info}
+            for cid, info in self.subscriptions.ranked().items()
+        ]
+
+    async def _assign_markets_to_connections(self) -> list[SubscriptionDiff]:
+        """Split markets across connections by expected load.
 
         Each market uses 2 subscription slots (YES + NO token), so max markets
-        per connection is MAX_SUBSCRIPTIONS // 2.
+        per connection is MAX_SUBSCRIPTIONS // 2. Connections are added when
+        the market count outgrows the fill target of the open ones. Each
+        collector's subscriptions and token lookup are patched in place.
+
+        Returns:
+            Subscription delta per connection
         """
-        # Extract data within session to avoid detached instance errors
-        with get_session() as session:
-            markets = session.execute(
-                select(Market).where(
-                    Market.tier.in_(settings.websocket_enabled_tiers),
-                    Market.active == True,
-                    Market.resolved == False,
-                    Market.yes_token_id.isnot(None),
-                ).order_by(Market.tier.desc())  # T4 first
-            ).scalars().all()
-
-            # Extract data while session is active (include both token IDs)
-            market_data = [
-                {
-                    "condition_id": m.condition_id,
-                    "yes_token_id": m.yes_token_id,
-                    "no_token_id": m.no_token_id,
-                    "market_id": m.id,
-                }
-                for m in markets
-            ]
+        market_data = self._load_markets()
+        if self.shard_id is not None:
+            self.shard_version, shard_markets = await self.redis_writer.redis.get_shard_assignment(self.shard_id)
+            market_data = [m for m in market_data if m["condition_id"] in shard_markets]
+
+        needed = self.scheduler.connections_needed(len(market_data), len(self.collectors))
+        if needed > len(self.collectors):
+            logger.info(
+                "Adding WebSocket connections",
+                markets=len(market_data),
+                connections=len(self.collectors),
+                new_connections=needed - len(self.collectors),
+            )
+            while len(self.collectors) < needed:
+                self._add_connection()
 
         # Each market uses 2 slots (YES + NO token)
-        total_token_capacity = self.num_connections * MAX_SUBSCRIPTIONS
+        total_token_capacity = len(self.collectors) * MAX_SUBSCRIPTIONS
         max_markets = total_token_capacity // 2
 
         if len(market_data) > max_markets:
@@ -721,93 +862,137 @@ class MultiConnectionCollector:
                 total_tokens=total_token_capacity,
                 dropped=len(market_data) - max_markets,
             )
-            market_data = market_data[:max_markets]
 
-        # Calculate max markets per connection (2 tokens per market)
-        max_markets_per_conn = MAX_SUBSCRIPTIONS // 2
+        weights = self.load_tracker.weights({m["condition_id"]: m["tier"] for m in market_data})
+        current = {
+            cid: i
+            for i, collector in enumerate(self.collectors)
+            for cid in collector.subscribed_markets
+        }
+        assignment = self.scheduler.plan(
+            [m["condition_id"] for m in market_data], weights, current, len(self.collectors)
+        )
 
-        # Distribute markets evenly across connections (round-robin for better balance)
-        # This ensures each connection gets a mix of tiers rather than one getting all T4
-        markets_per_connection: list[list[dict]] = [[] for _ in range(self.num_connections)]
-        for idx, market in enumerate(market_data):
-            conn_idx = idx % self.num_connections
-            if len(markets_per_connection[conn_idx]) < max_markets_per_conn:
-                markets_per_connection[conn_idx].append(market)
+        markets_per_connection: list[dict[str, dict]] = [{} for _ in self.collectors]
+        for cid, conn_idx in assignment.items():
+            markets_per_connection[conn_idx][cid] = self.subscriptions.markets[cid]
 
+        diffs = []
         for i, collector in enumerate(self.collectors):
             assigned = markets_per_connection[i]
+            diff = diff_subscriptions(collector.subscribed_markets, assigned)
+            collector.apply_subscription_diff(diff)
+            diffs.append(diff)
 
-            # Include both YES and NO token IDs
-            collector.subscribed_markets = {
-                m["condition_id"]: {
-                    "yes_token_id": m["yes_token_id"],
-                    "no_token_id": m["no_token_id"],
-                    "market_id": m["market_id"],
-                }
-                for m in assigned
-            }
-
-            # Build token lookup for this collector
-            collector._build_token_lookup()
-
-            logger.info(
-                "Assigned markets to connection",
-                connection=i,
-                markets=len(assigned),
-                tokens=len(collector.token_to_market),
-            )
+            if diff:
+                logger.info(
+                    "Assigned markets to connection",
+                    connection=i,
+                    markets=len(assigned),
+                    tokens=len(collector.token_to_market),
+                    load=round(sum(weights.get(cid, 0.0) for cid in assigned), 2),
+                )
+        return diffs
 
     async def _reassignment_loop(self) -> None:
-        """Periodically reassign markets to handle tier changes."""
+        """Periodically reassign markets to handle tier changes and load shifts."""
         while self.running:
             await asyncio.sleep(300)  # Every 5 minutes
+            await self._reassign()
+
+    async def _reassign(self) -> None:
+        """Reassign markets and send each connection its subscription delta.
+
+        Only the delta is sent: each connection subscribes to the markets it
+        gained and unsubscribes from the ones it lost. A market moved between
+        connections keeps its Redis status and metrics window; status changes
+        for all connections go out in one Redis pipeline.
+        """
+        async with self._reassign_lock:
             try:
-                # Track old subscriptions before reassignment
-                old_subscriptions: dict[int, set[str]] = {
-                    i: set(collector.subscribed_markets.keys())
-                    for i, collector in enumerate(self.collectors)
-                }
-
-                await self._assign_markets_to_connections()
-
-                # Update subscriptions on all collectors
-                for i, collector in enumerate(self.collectors):
-                    if collector.ws:
-                        new_subs = set(collector.subscribed_markets.keys())
-                        old_subs = old_subscriptions.get(i, set())
-
-                        # Unsubscribe from removed markets (update Redis tracking)
-                        removed = old_subs - new_subs
-                        for cid in removed:
-                            await collector._unsubscribe(cid)
-
-                        # Subscribe to new markets (both YES and NO tokens)
-                        added = new_subs - old_subs
-                        if added:
-                            new_tokens = []
-                            for cid in added:
-                                info = collector.subscribed_markets[cid]
-                                if info.get("yes_token_id"):
-                                    new_tokens.append(info["yes_token_id"])
-                                if info.get("no_token_id"):
-                                    new_tokens.append(info["no_token_id"])
-                            if new_tokens:
-                                await collector._subscribe_tokens(new_tokens)
-                                # Update Redis tracking
-                                for cid in added:
-                                    await collector.redis.set_ws_connected(cid, True)
-
-                        logger.info(
-                            "Reassignment complete",
-                            connection=i,
-                            added_markets=len(added),
-                            removed_markets=len(removed),
-                            total_markets=len(new_subs),
-                            total_tokens=len(collector.token_to_market),
-                        )
+                tracked_before = {cid for c in self.collectors for cid in c.subscribed_markets}
+                self.load_tracker.roll(tracked_before)
+
+                diffs = await self._assign_markets_to_connections()
+                self._start_connections()
+                tracked = {cid for c in self.collectors for cid in c.subscribed_markets}
+
+                for i, diff in enumerate(diffs):
+                    collector = self.collectors[i]
+                    if diff and collector.ws:
+                        try:
+                            # Subscribe before unsubscribing so moved markets are not dropped
+                            await collector._subscribe_tokens(diff.subscribe_tokens())
+                            await collector._unsubscribe_tokens(diff.unsubscribe_tokens())
+                        except websockets.ConnectionClosed:
+                            # The reconnect subscribes to the new assignment
+                            logger.debug("Connection closed during reassignment", connection=i)
+
+                # Redis tracking only for markets that appeared or disappeared overall.
+                # A shard cannot tell a dropped market from one moved to another
+                # shard, so the supervisor removes markets in sharded mode
+                new_markets = tracked - tracked_before
+                dropped = tracked_before - tracked
+                await self.redis_writer.redis.set_ws_connected_many(
+                    connected=new_markets, disconnected=dropped if self.shard_id is None else ()
+                )
+                if new_markets:
+                    await self.metrics_aggregator.seed(self.redis_writer.redis, list(new_markets))
+
+                logger.info(
+                    "Reassignment complete",
+                    connections=len(self.collectors),
+                    total_markets=len(tracked),
+                    added_markets=len(new_markets),
+                    removed_markets=len(dropped),
+                    moved_markets=sum(len(d.added) for d in diffs) - len(new_markets),
+                )
+
+                # Drop load history, metrics windows and books for markets no connection tracks anymore
+                for cid in dropped:
+                    self.load_tracker.discard(cid)
+                for cid in [cid for cid in self.metrics_aggregator.windows if cid not in tracked]:
+                    self.metrics_aggregator.discard(cid)
+                for cid in [cid for cid in self.orderbook_replica.books if cid not in tracked]:
+                    self.orderbook_replica.discard(cid)
             except Exception as e:
                 logger.error("Market reassignment failed", error=str(e))
 
+    async def _shard_loop(self) -> None:
+        """Publish shard stats and apply new supervisor assignments promptly."""
+        while self.running:
+            await asyncio.sleep(settings.websocket_shard_poll_interval)
+            try:
+                await self.redis_writer.redis.publish_shard_stats(
+                    self.shard_id, self.shard_stats(), ttl=int(settings.websocket_shard_heartbeat_ttl)
+                )
+                if await self.redis_writer.redis.get_shard_version() != self.shard_version:
+                    logger.info("Shard assignment changed", shard=self.shard_id)
+                    await self._reassign()
+            except Exception as e:
+                logger.error("Shard update failed", shard=self.shard_id, error=str(e))
+
+    def shard_stats(self) -> dict:
+        """Health and rate stats of this collector (published per shard)."""
+        now = time.monotonic()
+        events = sum(c.events_processed for c in self.collectors)
+        trades = sum(c.trades_processed for c in self.collectors)
+        last_at, last_events, last_trades = self._last_stats
+        elapsed = max(now - last_at, 1e-9)
+        self._last_stats = (now, events, trades)
+        return {
+            "pid": os.getpid(),
+            "heartbeat": round(time.time(), 3),
+            "markets": sum(len(c.subscribed_markets) for c in self.collectors),
+            "connections": len(self.collectors),
+            "connections_open": sum(1 for c in self.collectors if c.ws is not None and c.ws.open),
+            "events": events,
+            "trades": trades,
+            "events_per_sec": round((events - last_events) / elapsed, 2),
+            "trades_per_sec": round((trades - last_trades) / elapsed, 2),
+            "version": self.shard_version or "",
+        }
+
     def stop(self) -> None:
         """Stop all collectors."""
         self.running = False
@@ -815,11 +1000,11 @@ class MultiConnectionCollector:
             collector.stop()
 
 
-async def run_collector() -> None:
-    """Entry point for WebSocket collector service."""
+async def run_collector(collector: Optional[MultiConnectionCollector] = None) -> None:
+    """Entry point for WebSocket collector service (also runs each shard process)."""
     # Use multi-connection collector to handle many markets
     # 10 connections * 500 subscriptions = 5000 tokens = 2500 markets (2 tokens per market)
-    collector = MultiConnectionCollector(num_connections=settings.websocket_num_connections)
+    collector = collector or MultiConnectionCollector(num_connections=settings.websocket_num_connections)
 
     # Handle shutdown signals
     loop = asyncio.get_event_loop()
@@ -840,4 +1025,9 @@ async def run_collector() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(run_collector())
+    if settings.websocket_shards > 1:
+        # One process per shard under a supervisor (src/collectors/shards.py)
+        from src.collectors.shards import run_supervisor
+        run_supervisor()
+    else:
+        asyncio.run(run_collector())
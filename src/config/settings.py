@@ -31,12 +31,15 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6380/0"
     redis_trade_buffer_ttl: int = 7200  # 2 hours
     redis_trade_buffer_max: int = 10000
+    redis_write_tick_seconds: float = 0.1  # Collector write coalescing window
+    redis_write_max_pending: int = 2000  # Buffered trades that force an early flush
 
     # ===========================================
     # Celery
     # ===========================================
     celery_broker_url: str = "redis://localhost:6380/0"
     celery_result_backend: str = "redis://localhost:6380/1"
+    worker_client_health_interval: float = 30.0  # Min seconds between health checks of shared task clients
 
     # ===========================================
     # Polymarket APIs
@@ -48,6 +51,19 @@ class Settings(BaseSettings):
     # Rate limits (requests per second, conservative)
     gamma_rate_limit: float = 10.0  # 125/10s = 12.5/s, use 10
     clob_rate_limit: float = 15.0  # 200/10s = 20/s, use 15
+    gamma_page_concurrency: int = 8  # Market listing pages fetched in parallel per wave
+
+    # Distributed rate limiting: one Redis token bucket per API shared by all workers
+    rate_limit_distributed: bool = False
+    rate_limit_prefetch_seconds: float = 0.1  # Tokens taken per Redis round trip (seconds of rate)
+    clob_endpoint_rate_limits: dict[str, float] = {}  # Extra per-path buckets, e.g. {"/book": 40.0}
+    gamma_endpoint_rate_limits: dict[str, float] = {}
+
+    # GET response cache: listed paths share identical in-flight requests and
+    # serve responses for the TTL in seconds (0 = coalesce only, no caching)
+    clob_response_cache_ttls: dict[str, float] = {}  # e.g. {"/book": 1.0, "/midpoint": 1.0}
+    gamma_response_cache_ttls: dict[str, float] = {}
+    http_response_cache_size: int = 1024  # Cached responses per client (LRU)
 
     # ===========================================
     # Data Collection
@@ -70,8 +86,33 @@ class Settings(BaseSettings):
     tier_3_interval: int = 30  # 30 sec
     tier_4_interval: int = 15  # 15 sec
 
+    # Adaptive snapshot scheduling (T2+): beat runs each tier at its min
+    # interval; hot markets are snapshotted down to the min, changed markets
+    # at the tier interval, unchanged markets only at the max
+    adaptive_snapshots_enabled: bool = False
+    adaptive_snapshot_min_interval: dict[int, float] = {2: 30.0, 3: 10.0, 4: 5.0}
+    adaptive_snapshot_max_interval: dict[int, float] = {2: 300.0, 3: 150.0, 4: 60.0}
+    adaptive_snapshot_hot_trades_per_min: float = 5.0  # 1h trade rate that earns the min interval
+    adaptive_snapshot_price_epsilon: float = 0.0005  # Smaller price/spread moves count as unchanged
+
+    # Change-suppressed snapshot writes: skip rows whose features barely moved
+    # since the market's last written snapshot (coverage is still recorded)
+    snapshot_dedup_enabled: bool = False
+    snapshot_dedup_abs_tolerance: float = 0.0005  # Prices, spreads, ratios, imbalance
+    snapshot_dedup_rel_tolerance: float = 0.01  # Volumes, depths, counts (fraction of old value)
+    snapshot_dedup_max_age: int = 600  # Always write if the last written row is older (seconds)
+
+    # Batched snapshot tiers (T3/T4): each batch selects its markets in SQL (id % n)
+    snapshot_dynamic_batches: bool = False  # Beat dispatches a batch count sized to the tier
+    snapshot_batch_target_size: int = 250  # Markets per batch when sizing dynamically
+    snapshot_batch_workers: int = 4  # Max batches per tier run (snapshot workers available)
+    snapshot_async_engine: bool = False  # Fetch orderbooks/metrics in one coroutine (pipelined Redis, async CLOB)
+
     # Orderbook collection (only for T2+)
     orderbook_enabled_tiers: list[int] = [2, 3, 4]
+    orderbook_storage_mode: str = "jsonb"  # "jsonb" (bids/asks JSON) or "packed" (bid_depth/ask_depth bytea)
+    orderbook_delta_encoding: bool = False  # Packed mode: store levels changed since the market's keyframe
+    orderbook_keyframe_seconds: int = 900  # Packed mode: max age of the keyframe a delta refers to
 
     # ===========================================
     # Whale Detection
@@ -87,6 +128,39 @@ class Settings(BaseSettings):
     websocket_reconnect_delay: float = 5.0
     websocket_max_reconnect_delay: float = 60.0
     websocket_num_connections: int = 10  # Number of parallel WS connections (500 subscriptions each, 2 per market = 2500 markets max)
+    websocket_max_connections: int = 20  # Upper bound when spilling onto extra connections as markets grow
+    websocket_connection_fill: float = 0.8  # Fraction of a connection's market cap filled before adding a connection
+    websocket_tier_load_weights: dict[int, float] = {2: 0.02, 3: 0.1, 4: 0.5}  # Prior messages/sec for markets without history
+    websocket_load_half_life: float = 900.0  # Seconds for an observed per-market message rate to lose half its weight
+    websocket_rebalance_tolerance: float = 0.2  # Rebalance while the hottest connection exceeds mean load by this fraction
+    websocket_rebalance_max_moves: int = 20  # Max markets moved between connections per reassignment cycle
+    websocket_subscription_resync_seconds: float = 1800.0  # Max seconds between full reads of eligible markets (deltas in between)
+    websocket_decoder: str = "auto"  # Frame JSON decoder: "auto" (orjson if installed), "orjson" or "json"
+
+    # Process-sharded collector: >1 runs a supervisor with this many shard processes,
+    # splitting websocket_num_connections/websocket_max_connections between them
+    websocket_shards: int = 1
+    websocket_shard_poll_interval: float = 5.0  # Seconds between shard stats reports / assignment checks
+    websocket_shard_heartbeat_ttl: float = 30.0  # A shard without a stats report this long is restarted
+    websocket_shard_restart_delay: float = 5.0  # Seconds before a dead shard is started again
+    websocket_shard_rebalance_interval: float = 300.0  # Seconds between supervisor market reassignments
+    websocket_shard_rebalance_max_moves: int = 500  # Max markets moved between shards per reassignment
+
+    # Trade ingestion (write-behind queue for WebSocket trades)
+    trade_ingest_batch_size: int = 500  # Max trades per INSERT
+    trade_ingest_flush_interval: float = 1.0  # Max seconds before a partial batch is flushed
+    trade_ingest_queue_max: int = 20000  # Queue capacity before backpressure
+    trade_ingest_put_timeout: float = 0.05  # Seconds to wait on a full queue before spilling
+
+    # Incremental trade metrics (published by the collector to metrics:{condition_id})
+    trade_metrics_publish_interval: float = 5.0  # Seconds between publish passes
+    trade_metrics_refresh_seconds: float = 60.0  # Republish unchanged markets to keep TTL alive
+    trade_metrics_ttl: int = 180  # Published metrics expire if the collector stops
+
+    # Live orderbook replica (published by the collector to orderbook:{condition_id})
+    orderbook_publish_interval: float = 1.0  # Seconds between publish passes
+    orderbook_refresh_seconds: float = 30.0  # Republish unchanged books (cache TTL is 60s)
+    orderbook_publish_levels: int = 0  # Price levels per side in the published book (0 = full book, as stored in orderbook_snapshots)
 
     # ===========================================
     # Application
@@ -170,10 +170,9 @@ def enrich_csgo_market(gamma_id: int, db: Session) -> Optional[CSGOMatch]:
     Returns:
         Updated CSGOMatch or None if fetch failed
     """
-    client = SyncGammaClient()
-
     # Fetch from Gamma API
-    data = client.get_market_by_id(gamma_id)
+    with SyncGammaClient() as client:
+        data = client.get_market_by_id(gamma_id)
     if not data:
         logger.warning(f"Failed to fetch Gamma data for gamma_id={gamma_id}")
         return None
@@ -235,36 +234,35 @@ def enrich_all_csgo_matches(db: Session, only_unenriched: bool = True) -> dict:
     failed = 0
     skipped = 0
 
-    client = SyncGammaClient()
-
-    for match in matches:
-        if not match.gamma_id:
-            skipped += 1
-            continue
-
-        data = client.get_market_by_id(match.gamma_id)
-        if not data:
-            failed += 1
-            continue
-
-        parsed = parse_gamma_response(data)
-
-        # Update fields
-        match.team_yes = parsed["team_yes"]
-        match.team_no = parsed["team_no"]
-        if not match.game_start_override:
-            match.game_start_time = parsed["game_start_time"]
-        match.end_date = parsed["end_date"]
-        match.tournament = parsed["tournament"]
-        match.format = parsed["format"]
-        match.market_type = parsed["market_type"]
-        match.group_item_title = parsed["group_item_title"]
-        match.game_id = parsed["game_id"]
-        match.volume_24h = parsed["volume_24h"]
-        match.liquidity = parsed["liquidity"]
-        match.gamma_data = parsed["gamma_data"]
-
-        enriched += 1
+    with SyncGammaClient() as client:
+        for match in matches:
+            if not match.gamma_id:
+                skipped += 1
+                continue
+
+            data = client.get_market_by_id(match.gamma_id)
+            if not data:
+                failed += 1
+                continue
+
+            parsed = parse_gamma_response(data)
+
+            # Update fields
+            match.team_yes = parsed["team_yes"]
+            match.team_no = parsed["team_no"]
+            if not match.game_start_override:
+                match.game_start_time = parsed["game_start_time"]
+            match.end_date = parsed["end_date"]
+            match.tournament = parsed["tournament"]
+            match.format = parsed["format"]
+            match.market_type = parsed["market_type"]
+            match.group_item_title = parsed["group_item_title"]
+            match.game_id = parsed["game_id"]
+            match.volume_24h = parsed["volume_24h"]
+            match.liquidity = parsed["liquidity"]
+            match.gamma_data = parsed["gamma_data"]
+
+            enriched += 1
 
     db.commit()
 
@@ -19,8 +19,9 @@ from sqlalchemy import and_, or_
 from src.db.database import get_session
 from src.db.models import TaskRun, CSGOMatch, Market
 from src.csgo.engine.models import CSGOPosition, CSGOPositionLeg, CSGOStrategyState
-from src.fetchers.gamma import GammaClient, SyncGammaClient
+from src.fetchers.gamma import GammaClient
 from src.fetchers.clob import SyncCLOBClient
+from src.snapshots.clients import worker_clients
 
 logger = logging.getLogger(__name__)
 
@@ -421,7 +422,7 @@ def refresh_csgo_volume_task(self):
     task_name = "refresh_csgo_volume"
 
     try:
-        gamma = SyncGammaClient()
+        gamma = worker_clients.gamma()
         now = datetime.now(timezone.utc)
         cutoff = now + timedelta(hours=12)
 
@@ -513,8 +514,8 @@ def poll_csgo_market_status_task(self):
     task_name = "poll_csgo_market_status"
 
     try:
-        clob = SyncCLOBClient()
-        gamma = SyncGammaClient()
+        clob = worker_clients.clob()
+        gamma = worker_clients.gamma()
         now = datetime.now(timezone.utc)
 
         with get_session() as db:
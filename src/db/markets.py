@@ -0,0 +1,267 @@
+"""
+Market row planning for discovery and tier management.
+
+Pure helpers that turn Gamma API data into markets rows, kept apart from
+the Celery tasks so they can be used and tested without the task app:
+
+- calculate_tier / tier_case: Tier from hours to resolution, in Python and SQL
+- filter_discovery_candidates: Discovery filters over a Gamma listing
+- new_market_row / plan_market_update: Column values for the bulk INSERT and
+  bulk UPDATE written by discover_markets
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import case
+
+from src.config.settings import settings
+from src.db.models import Market
+from src.fetchers.gamma import GammaClient
+
+
+def calculate_tier(end_date: Optional[datetime]) -> int:
+    """
+    Calculate collection tier based on hours to resolution.
+
+    Tier boundaries:
+    - T0: > 48h
+    - T1: 12-48h
+    - T2: 4-12h
+    - T3: 1-4h
+    - T4: < 1h
+
+    Args:
+        end_date: Market resolution date
+
+    Returns:
+        Tier number (0-4)
+    """
+    if not end_date:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    hours_to_close = (end_date - now).total_seconds() / 3600
+
+    if hours_to_close < 0:
+        return 4  # Expired but not yet resolved
+    elif hours_to_close < settings.tier_3_min_hours:  # < 1h
+        return 4
+    elif hours_to_close < settings.tier_2_min_hours:  # < 4h
+        return 3
+    elif hours_to_close < settings.tier_1_min_hours:  # < 12h
+        return 2
+    elif hours_to_close < settings.tier_0_min_hours:  # < 48h
+        return 1
+    else:
+        return 0
+
+
+def tier_case(now: datetime):
+    """
+    SQL CASE on Market.end_date equivalent to calculate_tier().
+
+    Boundaries are compared as timestamps (now + N hours), so the
+    expression stays index-friendly and needs no per-row arithmetic.
+
+    Args:
+        now: Reference time (bound once per statement)
+
+    Returns:
+        SQLAlchemy expression yielding the tier (0-4)
+    """
+    def boundary(hours: float) -> datetime:
+        return now + timedelta(hours=hours)
+
+    return case(
+        (Market.end_date.is_(None), 0),
+        (Market.end_date < boundary(settings.tier_3_min_hours), 4),  # < 1h (or expired)
+        (Market.end_date < boundary(settings.tier_2_min_hours), 3),  # < 4h
+        (Market.end_date < boundary(settings.tier_1_min_hours), 2),  # < 12h
+        (Market.end_date < boundary(settings.tier_0_min_hours), 1),  # < 48h
+        else_=0,
+    )
+
+
+# Columns needed to diff an existing market against Gamma data
+DISCOVERY_EXISTING_COLUMNS = (
+    Market.id,
+    Market.condition_id,
+    Market.slug,
+    Market.active,
+    Market.resolved,
+    Market.closed,
+    Market.closed_at,
+    Market.accepting_orders,
+    Market.accepting_orders_updated_at,
+    Market.uma_resolution_status,
+    Market.uma_status_updated_at,
+    Market.yes_token_id,
+    Market.no_token_id,
+    Market.event_id,
+    Market.event_slug,
+    Market.event_title,
+    Market.gamma_id,
+)
+
+
+def filter_discovery_candidates(
+    markets: list[dict],
+    now: datetime,
+) -> dict[str, tuple[dict, Optional[datetime], int]]:
+    """
+    Apply discovery filters to Gamma markets.
+
+    Drops markets without a condition_id or orderbook, markets outside the
+    lookahead window, and duplicates within the API response.
+
+    Returns:
+        condition_id -> (market_data, end_date, tier), in API order
+    """
+    candidates = {}
+    for market_data in markets:
+        condition_id = market_data.get("conditionId")
+        if not condition_id:
+            continue
+
+        # Skip duplicates within this batch (API sometimes returns duplicates)
+        if condition_id in candidates:
+            continue
+
+        # Volume filter at T1→T2 transition (in update_market_tiers)
+        # Markets have until 12h before close to build volume
+
+        # Filter: must have orderbook enabled
+        if not market_data.get("enableOrderBook", False):
+            continue
+
+        # Parse end date
+        end_date = GammaClient.parse_datetime(market_data.get("endDate"))
+
+        # Check lookahead window
+        if end_date:
+            hours_to_close = (end_date - now).total_seconds() / 3600
+            if hours_to_close > settings.ml_lookahead_hours:
+                continue  # Too far out
+            if hours_to_close < -24:
+                continue  # Already resolved long ago
+
+        candidates[condition_id] = (market_data, end_date, calculate_tier(end_date))
+    return candidates
+
+
+def event_fields(market_data: dict) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    """Extract event id/slug/title from the nested events array."""
+    events = market_data.get("events", [])
+    event_data = events[0] if events else {}
+    event_id = event_data.get("id")
+    return (str(event_id) if event_id else None, event_data.get("slug"), event_data.get("title"))
+
+
+def new_market_row(market_data: dict, end_date: Optional[datetime], tier: int, now: datetime) -> dict:
+    """Column values for a newly discovered market (same keys for every row)."""
+    yes_price, _ = GammaClient.parse_outcome_prices(market_data)
+    yes_token, no_token = GammaClient.parse_token_ids(market_data)
+    event_id, event_slug, event_title = event_fields(market_data)
+    return {
+        "condition_id": market_data["conditionId"],
+        "gamma_id": int(market_data.get("id")) if market_data.get("id") else None,
+        "slug": market_data.get("slug", ""),
+        "question": market_data.get("question", ""),
+        "description": market_data.get("description"),
+        # Event grouping (from nested events array)
+        "event_id": event_id,
+        "event_slug": event_slug,
+        "event_title": event_title,
+        # Token IDs
+        "yes_token_id": yes_token,
+        "no_token_id": no_token,
+        # Timing
+        "start_date": GammaClient.parse_datetime(market_data.get("startDate")),
+        "end_date": end_date,
+        "created_at": GammaClient.parse_datetime(market_data.get("createdAt")),
+        # Initial state
+        "initial_price": yes_price,
+        "initial_spread": market_data.get("spread"),
+        "initial_volume": float(market_data.get("volume24hr") or 0),
+        "initial_liquidity": market_data.get("liquidityNum"),
+        # Lifecycle status (from Gamma API)
+        "closed": market_data.get("closed", False),
+        "closed_at": GammaClient.parse_datetime(market_data.get("closedTime")),
+        "accepting_orders": market_data.get("acceptingOrders", True),
+        "accepting_orders_updated_at": GammaClient.parse_datetime(market_data.get("acceptingOrdersTimestamp")),
+        "uma_resolution_status": market_data.get("umaResolutionStatus"),
+        "uma_status_updated_at": now if market_data.get("umaResolutionStatus") else None,
+        # Collection tracking
+        "tier": tier,
+        "active": market_data.get("active", True),
+        "tracking_started_at": now,  # Set when first discovered
+        # Metadata
+        "category": market_data.get("category"),
+        "neg_risk": market_data.get("negRisk", False),
+        "competitive": market_data.get("competitive"),
+        "enable_order_book": market_data.get("enableOrderBook", True),
+    }
+
+
+def plan_market_update(existing, market_data: dict, tier: int, now: datetime) -> dict:
+    """
+    Compute the update for an existing market from fresh Gamma data.
+
+    Args:
+        existing: Row with the DISCOVERY_EXISTING_COLUMNS of the market
+        market_data: Market dictionary from Gamma API
+        tier: Newly calculated tier
+        now: Timestamp for change tracking
+
+    Returns:
+        Values for a bulk UPDATE by primary key (same keys for every row)
+    """
+    active = market_data.get("active", True)
+    new_closed = market_data.get("closed", False)
+    new_accepting_orders = market_data.get("acceptingOrders", True)
+    new_uma_status = market_data.get("umaResolutionStatus")
+
+    # Track when closed status changes
+    closed_at = existing.closed_at
+    if new_closed and not existing.closed:
+        closed_at = GammaClient.parse_datetime(market_data.get("closedTime")) or now
+
+    # Track when accepting_orders changes
+    accepting_orders_updated_at = existing.accepting_orders_updated_at
+    if new_accepting_orders != existing.accepting_orders:
+        accepting_orders_updated_at = GammaClient.parse_datetime(
+            market_data.get("acceptingOrdersTimestamp")
+        ) or now
+
+    # Track UMA resolution status changes
+    uma_status_updated_at = existing.uma_status_updated_at
+    if new_uma_status != existing.uma_resolution_status:
+        uma_status_updated_at = now
+
+    # Fill identifiers that are missing on older rows
+    yes_token, no_token = GammaClient.parse_token_ids(market_data)
+    event_id, event_slug, event_title = event_fields(market_data)
+    gamma_id = existing.gamma_id
+    if gamma_id is None and market_data.get("id"):
+        gamma_id = int(market_data.get("id"))
+
+    values = {
+        "id": existing.id,
+        "tier": tier,
+        "active": active,
+        "updated_at": now,
+        "closed": new_closed,
+        "closed_at": closed_at,
+        "accepting_orders": new_accepting_orders,
+        "accepting_orders_updated_at": accepting_orders_updated_at,
+        "uma_resolution_status": new_uma_status,
+        "uma_status_updated_at": uma_status_updated_at,
+        "yes_token_id": existing.yes_token_id or yes_token,
+        "no_token_id": existing.no_token_id or no_token,
+        "event_id": existing.event_id or event_id,
+        "event_slug": existing.event_slug or event_slug,
+        "event_title": existing.event_title or event_title,
+        "gamma_id": gamma_id,
+    }
+
+    return values
@@ -9,6 +9,7 @@ Tables:
 - whale_events: Whale trade tracking with impact
 - task_runs: Celery task execution logging
 - tier_transitions: Market tier change tracking for monitoring
+- snapshot_suppressions: Coverage markers for change-suppressed snapshot writes
 """
 
 from datetime import datetime
@@ -21,11 +22,13 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    LargeBinary,
     Numeric,
     SmallInteger,
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -96,6 +99,11 @@ class Market(Base):
     )
     last_snapshot_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     snapshot_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Bumped from a sequence by a trigger when tier/active/resolved/token IDs
+    # change, so the WebSocket collector reads only changed markets
+    subscription_version: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("nextval('market_subscription_version_seq')"), index=True
+    )
 
     # Metadata
     category: Mapped[Optional[str]] = mapped_column(String(100))
@@ -252,8 +260,15 @@ class OrderbookSnapshot(Base):
     market_id: Mapped[int] = mapped_column(ForeignKey("markets.id"), index=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
 
-    bids: Mapped[dict] = mapped_column(JSONB)  # [[price, size], ...]
-    asks: Mapped[dict] = mapped_column(JSONB)
+    bids: Mapped[Optional[dict]] = mapped_column(JSONB)  # [{price, size}, ...] (NULL in packed mode)
+    asks: Mapped[Optional[dict]] = mapped_column(JSONB)
+
+    # Packed depth (see src/db/orderbook_storage.py): uint16 price ticks +
+    # float32 sizes, best price first. With keyframe_id set, the levels are
+    # a delta against that row's book.
+    bid_depth: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    ask_depth: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    keyframe_id: Mapped[Optional[int]] = mapped_column(BigInteger)
 
     # Summary stats
     total_bid_depth: Mapped[float] = mapped_column(Numeric(20, 2))
@@ -346,6 +361,19 @@ class TierTransition(Base):
     market: Mapped["Market"] = relationship(back_populates="tier_transitions")
 
 
+class SnapshotSuppression(Base):
+    """
+    Coverage markers for snapshot writes skipped by change suppression.
+
+    One row per tier and minute; coverage = snapshots written + suppressed.
+    """
+    __tablename__ = "snapshot_suppressions"
+
+    tier: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)  # Minute
+    suppressed: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class CategorizationRule(Base):
     """
     Database-stored categorization rules for pattern matching.
@@ -0,0 +1,280 @@
+"""
+Compact columnar storage for orderbook_snapshots depth.
+
+In packed mode (settings.orderbook_storage_mode = "packed") the bids/asks
+JSONB columns are left NULL and each side is stored in bid_depth/ask_depth
+as one bytea:
+
+    [n x uint16 price ticks][n x float32 sizes]   (little-endian)
+
+Prices are fixed-point ticks of 1/PRICE_SCALE and levels are stored best
+price first. With delta encoding enabled, a row whose keyframe_id is set
+stores only the levels that changed since that keyframe (size 0 = level
+removed); keyframes are rows with packed depth and no keyframe_id.
+
+Readers return NumPy arrays for both storage modes, so analysis code never
+re-parses JSON.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.db.models import OrderbookSnapshot
+
+PRICE_SCALE = 10_000  # 1 tick = 0.0001 (Polymarket's smallest tick is 0.001)
+TICK_DTYPE = np.dtype("<u2")
+SIZE_DTYPE = np.dtype("<f4")
+LEVEL_BYTES = TICK_DTYPE.itemsize + SIZE_DTYPE.itemsize
+
+
+class DepthBook(NamedTuple):
+    """One decoded orderbook snapshot, best price first on each side."""
+    market_id: int
+    timestamp: datetime
+    bid_prices: np.ndarray  # float64
+    bid_sizes: np.ndarray  # float32
+    ask_prices: np.ndarray
+    ask_sizes: np.ndarray
+
+
+# ===== ENCODING =====
+
+
+def levels_to_ticks(levels: list[dict], side: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert CLOB {price, size} levels to tick/size arrays.
+
+    Args:
+        levels: Orderbook levels (any order)
+        side: 'bid' or 'ask'
+
+    Returns:
+        (ticks, sizes) best price first, empty levels dropped
+    """
+    if not levels:
+        return np.empty(0, TICK_DTYPE), np.empty(0, SIZE_DTYPE)
+    parsed = np.array(
+        [(level.get("price", 0), level.get("size", 0)) for level in levels],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    keep = parsed[:, 1] > 0
+    # Levels that round to the same tick are merged
+    ticks, index = np.unique(np.rint(parsed[keep, 0] * PRICE_SCALE).astype(TICK_DTYPE), return_inverse=True)
+    sizes = np.bincount(index, weights=parsed[keep, 1], minlength=len(ticks)).astype(SIZE_DTYPE)
+    return _best_first(ticks, sizes, side)
+
+
+def pack_levels(ticks: np.ndarray, sizes: np.ndarray) -> bytes:
+    """Pack tick/size arrays into the bytea layout."""
+    return ticks.astype(TICK_DTYPE).tobytes() + sizes.astype(SIZE_DTYPE).tobytes()
+
+
+def unpack_levels(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Unpack a bytea side into (ticks, sizes)."""
+    n = len(data) // LEVEL_BYTES
+    ticks = np.frombuffer(data, dtype=TICK_DTYPE, count=n)
+    sizes = np.frombuffer(data, dtype=SIZE_DTYPE, count=n, offset=n * TICK_DTYPE.itemsize)
+    return ticks, sizes
+
+
+def delta_levels(
+    base_ticks: np.ndarray,
+    base_sizes: np.ndarray,
+    ticks: np.ndarray,
+    sizes: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Levels that differ from the base book (size 0 for removed levels)."""
+    all_ticks = np.union1d(base_ticks, ticks)
+    before = _dense(all_ticks, base_ticks, base_sizes)
+    after = _dense(all_ticks, ticks, sizes)
+    changed = before != after
+    return all_ticks[changed].astype(TICK_DTYPE), after[changed]
+
+
+def apply_delta(
+    base_ticks: np.ndarray,
+    base_sizes: np.ndarray,
+    delta_ticks: np.ndarray,
+    delta_sizes: np.ndarray,
+    side: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rebuild a book from its keyframe and delta (best price first)."""
+    all_ticks = np.union1d(base_ticks, delta_ticks)
+    sizes = _dense(all_ticks, base_ticks, base_sizes)
+    sizes[np.searchsorted(all_ticks, delta_ticks)] = delta_sizes
+    keep = sizes > 0
+    return _best_first(all_ticks[keep].astype(TICK_DTYPE), sizes[keep], side)
+
+
+def encode_orderbook_rows(
+    rows: list[dict],
+    keyframes: Optional[dict[int, tuple[int, bytes, bytes]]] = None,
+) -> None:
+    """
+    Convert orderbook_snapshots rows from JSONB levels to packed depth in place.
+
+    Args:
+        rows: Row dicts with raw "bids"/"asks" level lists
+        keyframes: market_id -> (row id, bid_depth, ask_depth) of the
+                   latest keyframe; rows for these markets are stored as
+                   deltas when that is smaller than the full book
+    """
+    keyframes = keyframes or {}
+    for row in rows:
+        bid_ticks, bid_sizes = levels_to_ticks(row.get("bids") or [], "bid")
+        ask_ticks, ask_sizes = levels_to_ticks(row.get("asks") or [], "ask")
+        bid_depth = pack_levels(bid_ticks, bid_sizes)
+        ask_depth = pack_levels(ask_ticks, ask_sizes)
+        keyframe_id = None
+
+        keyframe = keyframes.get(row["market_id"])
+        if keyframe is not None:
+            key_id, key_bids, key_asks = keyframe
+            bid_delta = pack_levels(*delta_levels(*unpack_levels(key_bids), bid_ticks, bid_sizes))
+            ask_delta = pack_levels(*delta_levels(*unpack_levels(key_asks), ask_ticks, ask_sizes))
+            if len(bid_delta) + len(ask_delta) < len(bid_depth) + len(ask_depth):
+                bid_depth, ask_depth, keyframe_id = bid_delta, ask_delta, key_id
+
+        row["bids"] = None
+        row["asks"] = None
+        row["bid_depth"] = bid_depth
+        row["ask_depth"] = ask_depth
+        row["keyframe_id"] = keyframe_id
+
+
+def load_keyframes(
+    session: Session,
+    market_ids: list[int],
+    since: datetime,
+) -> dict[int, tuple[int, bytes, bytes]]:
+    """
+    Latest keyframe per market newer than `since` (one query).
+
+    Returns:
+        market_id -> (row id, bid_depth, ask_depth)
+    """
+    if not market_ids:
+        return {}
+    rows = session.execute(
+        select(
+            OrderbookSnapshot.market_id,
+            OrderbookSnapshot.id,
+            OrderbookSnapshot.bid_depth,
+            OrderbookSnapshot.ask_depth,
+        )
+        .where(
+            OrderbookSnapshot.market_id.in_(market_ids),
+            OrderbookSnapshot.timestamp >= since,
+            OrderbookSnapshot.keyframe_id.is_(None),
+            OrderbookSnapshot.bid_depth.isnot(None),
+        )
+        .distinct(OrderbookSnapshot.market_id)
+        .order_by(OrderbookSnapshot.market_id, OrderbookSnapshot.timestamp.desc())
+    ).all()
+    return {
+        market_id: (row_id, bytes(bid_depth), bytes(ask_depth))
+        for market_id, row_id, bid_depth, ask_depth in rows
+    }
+
+
+# ===== READERS =====
+
+
+def decode_orderbook(
+    row: OrderbookSnapshot,
+    keyframe: Optional[OrderbookSnapshot] = None,
+) -> DepthBook:
+    """
+    Decode one orderbook_snapshots row (JSONB or packed) to NumPy arrays.
+
+    Args:
+        row: Row to decode
+        keyframe: The row referenced by row.keyframe_id (delta rows only)
+    """
+    if row.bid_depth is None:
+        bid_ticks, bid_sizes = levels_to_ticks(row.bids or [], "bid")
+        ask_ticks, ask_sizes = levels_to_ticks(row.asks or [], "ask")
+    elif row.keyframe_id is None:
+        bid_ticks, bid_sizes = unpack_levels(row.bid_depth)
+        ask_ticks, ask_sizes = unpack_levels(row.ask_depth)
+    else:
+        if keyframe is None or keyframe.id != row.keyframe_id:
+            raise ValueError(f"Orderbook snapshot {row.id} needs keyframe {row.keyframe_id}")
+        bid_ticks, bid_sizes = apply_delta(
+            *unpack_levels(keyframe.bid_depth), *unpack_levels(row.bid_depth), "bid"
+        )
+        ask_ticks, ask_sizes = apply_delta(
+            *unpack_levels(keyframe.ask_depth), *unpack_levels(row.ask_depth), "ask"
+        )
+
+    return DepthBook(
+        market_id=row.market_id,
+        timestamp=row.timestamp,
+        bid_prices=bid_ticks.astype(np.float64) / PRICE_SCALE,
+        bid_sizes=np.asarray(bid_sizes, dtype=SIZE_DTYPE),
+        ask_prices=ask_ticks.astype(np.float64) / PRICE_SCALE,
+        ask_sizes=np.asarray(ask_sizes, dtype=SIZE_DTYPE),
+    )
+
+
+def load_orderbook_depth(
+    session: Session,
+    market_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list[DepthBook]:
+    """
+    Load and decode a market's orderbook snapshots in time order.
+
+    Keyframes referenced by delta rows outside the range are fetched in
+    one extra query.
+    """
+    query = select(OrderbookSnapshot).where(OrderbookSnapshot.market_id == market_id)
+    if start is not None:
+        query = query.where(OrderbookSnapshot.timestamp >= start)
+    if end is not None:
+        query = query.where(OrderbookSnapshot.timestamp < end)
+    rows = session.execute(query.order_by(OrderbookSnapshot.timestamp)).scalars().all()
+
+    by_id = {row.id: row for row in rows}
+    missing = {row.keyframe_id for row in rows if row.keyframe_id and row.keyframe_id not in by_id}
+    if missing:
+        keyframes = session.execute(
+            select(OrderbookSnapshot).where(OrderbookSnapshot.id.in_(missing))
+        ).scalars().all()
+        by_id.update((row.id, row) for row in keyframes)
+
+    return [
+        decode_orderbook(row, by_id.get(row.keyframe_id) if row.keyframe_id else None)
+        for row in rows
+    ]
+
+
+def depth_matrix(books: list[DepthBook], side: str, levels: int) -> np.ndarray:
+    """
+    Sizes of the top `levels` levels per book as a (books x levels) matrix.
+
+    Missing levels are 0, so column sums/cumsums give depth-at-N directly.
+    """
+    out = np.zeros((len(books), levels), dtype=SIZE_DTYPE)
+    for i, book in enumerate(books):
+        sizes = book.bid_sizes if side == "bid" else book.ask_sizes
+        n = min(levels, len(sizes))
+        out[i, :n] = sizes[:n]
+    return out
+
+
+def _dense(all_ticks: np.ndarray, ticks: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    dense = np.zeros(len(all_ticks), dtype=SIZE_DTYPE)
+    dense[np.searchsorted(all_ticks, ticks)] = sizes
+    return dense
+
+
+def _best_first(ticks: np.ndarray, sizes: np.ndarray, side: str) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(ticks, kind="stable")
+    if side == "bid":
+        order = order[::-1]
+    return ticks[order], sizes[order]
@@ -2,25 +2,35 @@
 Redis client for trade buffers and metrics caching.
 
 Redis is used for:
-- Trade buffers: Rolling 1h window of trades per market
+- Trade buffers: Rolling 1h window of trades per market (packed binary entries
+  in a sorted set scored by epoch-ms, so the window is one ZRANGEBYSCORE)
 - Metrics cache: Pre-computed trade metrics
 - Tier sets: Markets in each tier for quick lookup
 - WebSocket health: Connection status tracking
+- Coalesced writes: Collector hot-path writes batched into one pipeline per tick
+- Gamma cache: One hash field per market plus a monotonically increasing
+  version, so readers HMGET only the condition_ids they need. Warming writes
+  only markets whose consumed fields changed and appends the version to a
+  change stream (the changed IDs sit in a short-lived per-version key)
 
 Production features:
 - Connection retry with exponential backoff
 - Graceful degradation on JSON parse errors
 - Health check methods for monitoring
 """
+import asyncio
+import hashlib
+import itertools
 import json
+import struct
 import time
 from datetime import datetime, timezone
 from functools import wraps
-from typing import Any, Optional, TypeVar, Callable
+from typing import Any, Iterable, Optional, TypeVar, Callable
 
 import redis.asyncio as redis_async
 import redis as redis_sync
-from redis.exceptions import ConnectionError, TimeoutError, RedisError
+from redis.exceptions import ConnectionError, TimeoutError, RedisError, WatchError
 import structlog
 
 from src.config.settings import settings
@@ -33,6 +43,149 @@ RETRY_DELAY_BASE = 0.5  # seconds
 
 T = TypeVar('T')
 
+# Packed trade buffer entry: epoch_ms, price, size, is_buy, whale_tier, seq.
+# 28 bytes vs ~110 for the legacy JSON entries; seq keeps otherwise identical
+# trades in the same millisecond distinct as sorted-set members.
+TRADE_STRUCT = struct.Struct("<qddBBH")
+_trade_seq = itertools.count()
+
+WINDOW_1H_MS = 3600 * 1000
+
+# Gamma market cache: hash of condition_id -> market JSON, replaced atomically
+# on each warm; the version counter is bumped with every write and never expires
+GAMMA_MARKETS_KEY = "gamma:markets:by_id"
+GAMMA_VERSION_KEY = "gamma:markets:version"
+GAMMA_DIGEST_KEY = "gamma:markets:digest"  # condition_id -> content hash
+GAMMA_CHANGES_STREAM = "gamma:markets:changes"  # One entry per cache version (version + counts)
+GAMMA_CHANGES_MAXLEN = 1000  # ~2h of history at one warm every 8s
+GAMMA_CHANGES_IDS_TTL = 300  # Changed/removed IDs of a version; consumers read every few seconds
+
+# Fields the Gamma cache consumers read (snapshot rows, adaptive scheduling,
+# discovery's volume filter). Only these feed the content hash, so volatile
+# fields nobody reads do not mark every market changed on every warm.
+GAMMA_DIGEST_FIELDS = (
+    "outcomePrices", "bestBid", "bestAsk", "spread", "lastTradePrice",
+    "oneDayPriceChange", "oneWeekPriceChange", "oneMonthPriceChange",
+    "volumeNum", "volume24hr", "volume1wk", "liquidityNum",
+)
+
+# Adaptive snapshot scheduling / change suppression: one key per market, so a
+# market that stops being snapshotted (resolved, re-tiered) expires on its own
+SNAPSHOT_STATE_TTL = 86400  # A market's entry is dropped a day after its last snapshot write
+
+# Process-sharded WebSocket collector: the supervisor publishes each shard's
+# market set and bumps the version; shards publish stats hashes with a TTL
+WS_SHARD_VERSION_KEY = "ws:shards:version"
+WS_SHARD_SUMMARY_KEY = "ws:shards"  # Aggregate over live shards (written by the supervisor)
+
+
+def gamma_changes_ids_key(version: int) -> str:
+    """Changed/removed condition_ids of one Gamma cache version."""
+    return f"gamma:markets:changes:{version}"
+
+
+def ws_shard_markets_key(shard_id: int) -> str:
+    """Set of condition_ids assigned to a collector shard."""
+    return f"ws:shard:{shard_id}:markets"
+
+
+def ws_shard_stats_key(shard_id: int) -> str:
+    """Hash of a collector shard's health and rate stats."""
+    return f"ws:shard:{shard_id}:stats"
+
+
+def snapshot_state_key(condition_id: str) -> str:
+    """JSON state of a market's last snapshot (adaptive scheduling)."""
+    return f"snapshot:state:{condition_id}"
+
+
+def snapshot_written_key(condition_id: str) -> str:
+    """JSON feature vector of a market's last written snapshot (change suppression)."""
+    return f"snapshot:written:{condition_id}"
+
+
+def trade_buffer_key(condition_id: str) -> str:
+    """Sorted-set key holding a market's packed trade buffer."""
+    return f"tradebuf:{condition_id}"
+
+
+def legacy_trade_buffer_key(condition_id: str) -> str:
+    """Pre-sorted-set JSON list key (read for compatibility until it expires)."""
+    return f"trades:{condition_id}"
+
+
+def encode_trade(trade: dict) -> tuple[bytes, int]:
+    """
+    Pack a trade for the buffer.
+
+    Args:
+        trade: Trade dictionary with ts (epoch seconds), price, size, side, whale_tier
+
+    Returns:
+        (member, score) where score is the epoch-ms timestamp
+    """
+    ts_ms = int(trade["ts"] * 1000)
+    member = TRADE_STRUCT.pack(
+        ts_ms,
+        float(trade["price"]),
+        float(trade["size"]),
+        trade["side"] == "BUY",
+        int(trade.get("whale_tier", 0)),
+        next(_trade_seq) & 0xFFFF,
+    )
+    return member, ts_ms
+
+
+def decode_trade(raw: bytes) -> dict:
+    """Unpack a buffer entry into a trade dictionary (ts in epoch seconds)."""
+    ts_ms, price, size, is_buy, whale_tier, _ = TRADE_STRUCT.unpack(raw)
+    return {
+        "ts": ts_ms / 1000,
+        "price": price,
+        "size": size,
+        "side": "BUY" if is_buy else "SELL",
+        "whale_tier": whale_tier,
+    }
+
+
+def decode_legacy_trade(raw: str | bytes) -> dict:
+    """Parse a legacy JSON list entry (ISO timestamp) into the packed trade shape."""
+    trade = json.loads(raw)
+    return {
+        "ts": datetime.fromisoformat(trade["timestamp"]).timestamp(),
+        "price": trade["price"],
+        "size": trade["size"],
+        "side": trade["side"],
+        "whale_tier": trade.get("whale_tier", 0),
+    }
+
+
+def _merge_trade_buffers(packed: list[bytes], legacy: list, cutoff: float) -> list[dict]:
+    """
+    Decode packed (newest first) and legacy entries into one newest-first list.
+
+    Corrupt entries are skipped (graceful degradation).
+    """
+    trades = []
+    for raw in packed:
+        try:
+            trades.append(decode_trade(raw))
+        except struct.error as e:
+            logger.debug("Skipping corrupt trade entry", error=str(e))
+    if not legacy:
+        return trades
+
+    for raw in legacy:
+        try:
+            trade = decode_legacy_trade(raw)
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            logger.debug("Skipping corrupt trade entry", error=str(e))
+            continue
+        if trade["ts"] >= cutoff:
+            trades.append(trade)
+    trades.sort(key=lambda t: t["ts"], reverse=True)
+    return trades
+
 
 def redis_retry_sync(func: Callable[..., T]) -> Callable[..., T]:
     """Decorator for synchronous Redis operations with retry."""
@@ -73,6 +226,88 @@ def redis_retry_sync(func: Callable[..., T]) -> Callable[..., T]:
     return wrapper
 
 
+def _queue_trade_buffer_writes(pipe: Any, condition_id: str, entries: dict[bytes, int]) -> int:
+    """
+    Queue ZADD + trim + EXPIRE for a market's trade buffer on a pipeline.
+
+    Entries older than the buffer TTL are dropped by score, then the set is
+    capped to the newest redis_trade_buffer_max entries.
+
+    Returns:
+        Number of commands queued
+    """
+    key = trade_buffer_key(condition_id)
+    cutoff_ms = int(time.time() * 1000) - settings.redis_trade_buffer_ttl * 1000
+    pipe.zadd(key, entries)
+    pipe.zremrangebyscore(key, "-inf", f"({cutoff_ms}")
+    pipe.zremrangebyrank(key, 0, -(settings.redis_trade_buffer_max + 1))
+    pipe.expire(key, settings.redis_trade_buffer_ttl)
+    return 4
+
+
+def _queue_gamma_cache_replace(pipe: Any, markets: list[dict], ttl: int) -> None:
+    """Queue DEL + HSET + EXPIRE + INCR version for a full Gamma cache rewrite."""
+    mapping = {
+        m["conditionId"]: json.dumps(m)
+        for m in markets
+        if m.get("conditionId")
+    }
+    pipe.delete(GAMMA_MARKETS_KEY, GAMMA_DIGEST_KEY)  # Next delta warm starts from scratch
+    if mapping:
+        pipe.hset(GAMMA_MARKETS_KEY, mapping=mapping)
+        pipe.expire(GAMMA_MARKETS_KEY, ttl)
+    pipe.xadd(GAMMA_CHANGES_STREAM, {"full": "1"}, maxlen=GAMMA_CHANGES_MAXLEN, approximate=True)
+    pipe.incr(GAMMA_VERSION_KEY)
+
+
+def diff_gamma_markets(
+    markets: list[dict],
+    old_digests: dict[str, str],
+) -> tuple[dict[str, str], dict[str, str], list[str]]:
+    """
+    Compare fetched markets against the cached content hashes.
+
+    The hash covers GAMMA_DIGEST_FIELDS only; a market whose other fields
+    changed keeps its cached JSON until one of those fields moves.
+
+    Args:
+        markets: Markets from the Gamma API
+        old_digests: condition_id -> content hash currently cached
+
+    Returns:
+        (changed values, changed digests, removed condition_ids) where the
+        values are the JSON to store for new or modified markets
+    """
+    values: dict[str, str] = {}
+    digests: dict[str, str] = {}
+    seen: set[str] = set()
+    for m in markets:
+        condition_id = m.get("conditionId")
+        if not condition_id:
+            continue
+        seen.add(condition_id)
+        consumed = [m.get(field) for field in GAMMA_DIGEST_FIELDS]
+        digest = hashlib.blake2b(json.dumps(consumed).encode(), digest_size=16).hexdigest()
+        if old_digests.get(condition_id) != digest:
+            values[condition_id] = json.dumps(m)
+            digests[condition_id] = digest
+    removed = [cid for cid in old_digests if cid not in seen]
+    return values, digests, removed
+
+
+def _decode_gamma_markets(condition_ids: list[str], values: list) -> dict[str, dict]:
+    """Decode HMGET results, skipping missing and corrupt entries."""
+    markets = {}
+    for condition_id, raw in zip(condition_ids, values):
+        if raw is None:
+            continue
+        try:
+            markets[condition_id] = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning("Corrupt Gamma cache entry", condition_id=condition_id[:16], error=str(e))
+    return markets
+
+
 class RedisClient:
     """Async Redis client for trade buffers and caching."""
 
@@ -85,6 +320,7 @@ class RedisClient:
         """
         self.url = url or settings.redis_url
         self._client: Optional[redis_async.Redis] = None
+        self._raw_client: Optional[redis_async.Redis] = None
 
     @property
     def client(self) -> redis_async.Redis:
@@ -93,26 +329,36 @@ class RedisClient:
             self._client = redis_async.from_url(self.url, decode_responses=True)
         return self._client
 
+    @property
+    def raw_client(self) -> redis_async.Redis:
+        """Lazy-initialize a bytes client (packed trade buffer reads)."""
+        if self._raw_client is None:
+            self._raw_client = redis_async.from_url(self.url, decode_responses=False)
+        return self._raw_client
+
     async def close(self) -> None:
-        """Close Redis connection."""
+        """Close Redis connections."""
         if self._client is not None:
             await self._client.close()
             self._client = None
+        if self._raw_client is not None:
+            await self._raw_client.close()
+            self._raw_client = None
 
     # === Trade Buffer Operations ===
 
     async def push_trade(self, condition_id: str, trade_data: dict) -> None:
         """
-        Push trade to buffer (FIFO, max size limited).
+        Push trade to buffer (time-ordered, max size and age limited).
 
         Args:
             condition_id: Market condition ID
-            trade_data: Trade dictionary with timestamp, price, size, side, whale_tier
+            trade_data: Trade dictionary with ts (epoch seconds), price, size, side, whale_tier
         """
-        key = f"trades:{condition_id}"
-        await self.client.lpush(key, json.dumps(trade_data))
-        await self.client.ltrim(key, 0, settings.redis_trade_buffer_max - 1)
-        await self.client.expire(key, settings.redis_trade_buffer_ttl)
+        member, score = encode_trade(trade_data)
+        pipe = self.client.pipeline(transaction=False)
+        _queue_trade_buffer_writes(pipe, condition_id, {member: score})
+        await pipe.execute()
 
     async def get_trades_1h(self, condition_id: str) -> list[dict]:
         """
@@ -122,26 +368,45 @@ class RedisClient:
             condition_id: Market condition ID
 
         Returns:
-            List of trade dictionaries within the last hour
+            List of trade dictionaries (newest first) within the last hour
         """
-        key = f"trades:{condition_id}"
-        trades_raw = await self.client.lrange(key, 0, -1)
-
-        one_hour_ago = datetime.now(timezone.utc).timestamp() - 3600
-        trades = []
+        now_ms = int(time.time() * 1000)
+        pipe = self.raw_client.pipeline(transaction=False)
+        pipe.zrevrangebyscore(trade_buffer_key(condition_id), "+inf", now_ms - WINDOW_1H_MS)
+        pipe.lrange(legacy_trade_buffer_key(condition_id), 0, -1)
+        packed, legacy = await pipe.execute()
+        return _merge_trade_buffers(packed, legacy, (now_ms - WINDOW_1H_MS) / 1000)
+
+    async def get_trades_1h_many(self, condition_ids: list[str]) -> dict[str, list[dict]]:
+        """
+        Get the last hour of trades for many markets in one pipeline.
 
-        for raw in trades_raw:
-            trade = json.loads(raw)
-            ts = datetime.fromisoformat(trade["timestamp"]).timestamp()
-            if ts >= one_hour_ago:
-                trades.append(trade)
+        Args:
+            condition_ids: Market condition IDs
 
-        return trades
+        Returns:
+            Dictionary of condition_id -> trades (newest first)
+        """
+        if not condition_ids:
+            return {}
+        now_ms = int(time.time() * 1000)
+        pipe = self.raw_client.pipeline(transaction=False)
+        for condition_id in condition_ids:
+            pipe.zrevrangebyscore(trade_buffer_key(condition_id), "+inf", now_ms - WINDOW_1H_MS)
+            pipe.lrange(legacy_trade_buffer_key(condition_id), 0, -1)
+        results = await pipe.execute()
+        cutoff = (now_ms - WINDOW_1H_MS) / 1000
+        return {
+            condition_id: _merge_trade_buffers(results[2 * i], results[2 * i + 1], cutoff)
+            for i, condition_id in enumerate(condition_ids)
+        }
 
     async def get_trade_count(self, condition_id: str) -> int:
         """Get total trades in buffer."""
-        key = f"trades:{condition_id}"
-        return await self.client.llen(key)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zcard(trade_buffer_key(condition_id))
+        pipe.llen(legacy_trade_buffer_key(condition_id))
+        return sum(await pipe.execute())
 
     # === Metrics Cache Operations ===
 
@@ -173,6 +438,31 @@ class RedisClient:
             return None
         return {k: json.loads(v) for k, v in raw.items()}
 
+    async def get_metrics_many(self, condition_ids: list[str]) -> dict[str, dict]:
+        """
+        Get cached metrics for many markets in one pipeline.
+
+        Args:
+            condition_ids: Market condition IDs
+
+        Returns:
+            Dictionary of condition_id -> metrics (missing/corrupt entries omitted)
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for condition_id in condition_ids:
+            pipe.hgetall(f"metrics:{condition_id}")
+        results = await pipe.execute()
+
+        metrics = {}
+        for condition_id, raw in zip(condition_ids, results):
+            if not raw:
+                continue
+            try:
+                metrics[condition_id] = {k: json.loads(v) for k, v in raw.items()}
+            except json.JSONDecodeError as e:
+                logger.warning("Corrupt metrics cache", condition_id=condition_id[:16], error=str(e))
+        return metrics
+
     # === Tier Management ===
 
     async def set_market_tier(self, condition_id: str, tier: int) -> None:
@@ -223,6 +513,61 @@ class RedisClient:
         else:
             await self.client.srem("ws:connected", condition_id)
 
+    async def set_ws_connected_many(
+        self,
+        connected: Iterable[str] = (),
+        disconnected: Iterable[str] = (),
+    ) -> None:
+        """
+        Track WebSocket connection status for many markets in one pipeline.
+
+        Args:
+            connected: Condition IDs now subscribed
+            disconnected: Condition IDs no longer subscribed
+        """
+        connected = list(connected)
+        disconnected = list(disconnected)
+        if not connected and not disconnected:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        if connected:
+            pipe.sadd("ws:connected", *connected)
+        if disconnected:
+            pipe.srem("ws:connected", *disconnected)
+        await pipe.execute()
+
+    async def get_shard_version(self) -> Optional[str]:
+        """Version of the published shard assignment (None if none published)."""
+        return await self.client.get(WS_SHARD_VERSION_KEY)
+
+    async def get_shard_assignment(self, shard_id: int) -> tuple[Optional[str], set[str]]:
+        """
+        Markets assigned to a collector shard.
+
+        Returns:
+            (assignment version, condition IDs)
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(WS_SHARD_VERSION_KEY)
+        pipe.smembers(ws_shard_markets_key(shard_id))
+        version, markets = await pipe.execute()
+        return version, set(markets)
+
+    async def publish_shard_stats(self, shard_id: int, stats: dict, ttl: int) -> None:
+        """
+        Publish a collector shard's stats (expire if the shard stops reporting).
+
+        Args:
+            shard_id: Shard index
+            stats: Flat field -> value mapping
+            ttl: Seconds until the stats expire
+        """
+        key = ws_shard_stats_key(shard_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(key, mapping={k: str(v) for k, v in stats.items()})
+        pipe.expire(key, ttl)
+        await pipe.execute()
+
     async def set_ws_last_event(self, condition_id: str) -> None:
         """Update last event timestamp for a market."""
         await self.client.hset(
@@ -307,6 +652,29 @@ class RedisClient:
         raw = await self.client.get(key)
         return json.loads(raw) if raw else None
 
+    async def get_orderbooks_many(self, condition_ids: list[str]) -> dict[str, dict]:
+        """
+        Get cached orderbooks for many markets with one MGET.
+
+        Args:
+            condition_ids: Market condition IDs
+
+        Returns:
+            Dictionary of condition_id -> orderbook (missing/corrupt entries omitted)
+        """
+        if not condition_ids:
+            return {}
+        raws = await self.client.mget([f"orderbook:{cid}" for cid in condition_ids])
+        orderbooks = {}
+        for condition_id, raw in zip(condition_ids, raws):
+            if not raw:
+                continue
+            try:
+                orderbooks[condition_id] = json.loads(raw)
+            except json.JSONDecodeError as e:
+                logger.warning("Corrupt orderbook cache", condition_id=condition_id[:16], error=str(e))
+        return orderbooks
+
     # === Price Cache ===
 
     async def set_price(self, condition_id: str, price: float) -> None:
@@ -325,25 +693,41 @@ class RedisClient:
 
     # === Gamma API Cache ===
 
-    async def set_gamma_markets_cache(self, markets: list[dict], ttl: int = 10) -> None:
+    async def set_gamma_markets_cache(self, markets: list[dict], ttl: int = 10) -> int:
         """
-        Cache Gamma API markets response.
+        Replace the Gamma market cache (one hash field per market).
 
         Args:
             markets: List of market dictionaries from Gamma API
             ttl: Time to live in seconds (default 10s)
+
+        Returns:
+            New cache version
         """
-        await self.client.set("gamma:markets", json.dumps(markets), ex=ttl)
+        pipe = self.client.pipeline(transaction=True)
+        _queue_gamma_cache_replace(pipe, markets, ttl)
+        results = await pipe.execute()
+        return results[-1]
 
-    async def get_gamma_markets_cache(self) -> Optional[list[dict]]:
+    async def get_gamma_markets(self, condition_ids: list[str]) -> Optional[dict[str, dict]]:
         """
-        Get cached Gamma API markets response.
+        Get cached Gamma markets for specific condition IDs.
+
+        Args:
+            condition_ids: Markets to fetch
 
         Returns:
-            List of market dictionaries or None if not cached/expired
+            Dictionary of condition_id -> market (IDs not in the cache are
+            omitted), or None if the cache is empty/expired
         """
-        raw = await self.client.get("gamma:markets")
-        return json.loads(raw) if raw else None
+        pipe = self.client.pipeline(transaction=False)
+        pipe.exists(GAMMA_MARKETS_KEY)
+        if condition_ids:
+            pipe.hmget(GAMMA_MARKETS_KEY, condition_ids)
+        exists, *values = await pipe.execute()
+        if not exists:
+            return None
+        return _decode_gamma_markets(condition_ids, values[0] if values else [])
 
     # === Stats ===
 
@@ -359,6 +743,186 @@ class RedisClient:
         }
 
 
+class CoalescingRedisWriter:
+    """
+    Buffers hot-path collector writes and sends them as one pipeline per tick.
+
+    The WebSocket collector touches Redis several times per trade (trade
+    buffer, last event, price) and once per frame (last activity). This
+    writer collects those writes in memory and flushes them every
+    `tick_seconds` in a single non-transactional pipeline:
+
+    - Trade buffer entries are added per market (one ZADD per market per tick)
+    - ws:last_activity, ws:last_event, prices, orderbooks and metrics are last-write-wins
+      within a tick, so repeated updates collapse into one command
+
+    Methods are synchronous (buffer only) so handlers never await Redis.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[RedisClient] = None,
+        tick_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            redis_client: Async client to flush through (defaults to a new RedisClient)
+            tick_seconds: Flush interval (defaults to settings.redis_write_tick_seconds)
+            max_pending: Buffered trade count that triggers an early flush
+        """
+        self.redis = redis_client or RedisClient()
+        self.tick_seconds = tick_seconds or settings.redis_write_tick_seconds
+        self.max_pending = max_pending or settings.redis_write_max_pending
+
+        self._trades: dict[str, dict[bytes, int]] = {}
+        self._last_events: dict[str, str] = {}
+        self._prices: dict[str, str] = {}
+        self._orderbooks: dict[str, str] = {}
+        self._metrics: dict[str, dict[str, str]] = {}
+        self._activity: Optional[str] = None
+        self._pending_trades = 0
+
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._flush_now: Optional[asyncio.Event] = None
+
+        # Counters (monotonic, for monitoring)
+        self.writes_buffered = 0
+        self.commands_sent = 0
+        self.pipelines_sent = 0
+        self.failed_flushes = 0
+
+    # === Buffered write API (mirrors RedisClient) ===
+
+    def push_trade(self, condition_id: str, trade_data: dict) -> None:
+        """Buffer a trade for the market's trade buffer."""
+        member, score = encode_trade(trade_data)
+        self._trades.setdefault(condition_id, {})[member] = score
+        self._pending_trades += 1
+        self.writes_buffered += 1
+        if self._pending_trades >= self.max_pending and self._flush_now is not None:
+            self._flush_now.set()
+
+    def set_ws_last_event(self, condition_id: str) -> None:
+        """Buffer last event timestamp for a market (last write wins)."""
+        self._last_events[condition_id] = datetime.now(timezone.utc).isoformat()
+        self.writes_buffered += 1
+
+    def set_price(self, condition_id: str, price: float) -> None:
+        """Buffer latest price (last write wins)."""
+        self._prices[condition_id] = str(price)
+        self.writes_buffered += 1
+
+    def set_orderbook(self, condition_id: str, orderbook: dict) -> None:
+        """Buffer latest orderbook (last write wins)."""
+        self._orderbooks[condition_id] = json.dumps(orderbook)
+        self.writes_buffered += 1
+
+    def set_ws_last_activity(self) -> None:
+        """Buffer global WebSocket activity timestamp (last write wins)."""
+        self._activity = datetime.now(timezone.utc).isoformat()
+        self.writes_buffered += 1
+
+    def set_metrics(self, condition_id: str, metrics: dict) -> None:
+        """Buffer published metrics for a market (last write wins)."""
+        self._metrics[condition_id] = {k: json.dumps(v) for k, v in metrics.items()}
+        self.writes_buffered += 1
+
+    # === Lifecycle ===
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self.running:
+            return
+        self.running = True
+        self._flush_now = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and send anything still buffered."""
+        self.running = False
+        if self._flush_now is not None:
+            self._flush_now.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush every tick (or early when the trade buffer fills)."""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Send all buffered writes in one pipeline.
+
+        Returns:
+            Number of Redis commands sent (0 if nothing was buffered)
+        """
+        trades, self._trades = self._trades, {}
+        last_events, self._last_events = self._last_events, {}
+        prices, self._prices = self._prices, {}
+        orderbooks, self._orderbooks = self._orderbooks, {}
+        metrics, self._metrics = self._metrics, {}
+        activity, self._activity = self._activity, None
+        self._pending_trades = 0
+
+        if not (trades or last_events or prices or orderbooks or metrics or activity):
+            return 0
+
+        pipe = self.redis.client.pipeline(transaction=False)
+        commands = 0
+
+        for condition_id, entries in trades.items():
+            commands += _queue_trade_buffer_writes(pipe, condition_id, entries)
+        if last_events:
+            pipe.hset("ws:last_event", mapping=last_events)
+            commands += 1
+        if prices:
+            pipe.hset("prices", mapping=prices)
+            commands += 1
+        for condition_id, raw in orderbooks.items():
+            pipe.set(f"orderbook:{condition_id}", raw, ex=60)
+            commands += 1
+        for condition_id, mapping in metrics.items():
+            key = f"metrics:{condition_id}"
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, settings.trade_metrics_ttl)
+            commands += 2
+        if activity:
+            pipe.set("ws:last_activity", activity, ex=300)
+            commands += 1
+
+        try:
+            await pipe.execute()
+            self.commands_sent += commands
+            self.pipelines_sent += 1
+        except RedisError as e:
+            # Graceful degradation - buffered data is dropped, collector keeps running
+            self.failed_flushes += 1
+            logger.warning("Redis pipeline flush failed", error=str(e), commands=commands)
+            return 0
+        return commands
+
+    def stats(self) -> dict:
+        """Current writer counters."""
+        return {
+            "writes_buffered": self.writes_buffered,
+            "commands_sent": self.commands_sent,
+            "pipelines_sent": self.pipelines_sent,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
 # Singleton instance for shared use
 _redis_client: Optional[RedisClient] = None
 
@@ -390,6 +954,7 @@ class SyncRedisClient:
         """
         self.url = url or settings.redis_url
         self._client: Optional[redis_sync.Redis] = None
+        self._raw_client: Optional[redis_sync.Redis] = None
 
     @property
     def client(self) -> redis_sync.Redis:
@@ -404,14 +969,29 @@ class SyncRedisClient:
             )
         return self._client
 
+    @property
+    def raw_client(self) -> redis_sync.Redis:
+        """Lazy-initialize a bytes client (packed trade buffer reads)."""
+        if self._raw_client is None:
+            self._raw_client = redis_sync.from_url(
+                self.url,
+                decode_responses=False,
+                socket_timeout=10.0,
+                socket_connect_timeout=5.0,
+                retry_on_timeout=True,
+            )
+        return self._raw_client
+
     def close(self) -> None:
-        """Close Redis connection."""
-        if self._client is not None:
-            try:
-                self._client.close()
-            except Exception:
-                pass
-            self._client = None
+        """Close Redis connections."""
+        for client in (self._client, self._raw_client):
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+        self._client = None
+        self._raw_client = None
 
     def ping(self) -> bool:
         """Health check - verify Redis connection."""
@@ -431,27 +1011,44 @@ class SyncRedisClient:
             condition_id: Market condition ID
 
         Returns:
-            List of trade dictionaries within the last hour.
-            Returns empty list on parse errors (graceful degradation).
+            List of trade dictionaries (newest first) within the last hour.
+            Corrupt entries are skipped (graceful degradation).
         """
-        key = f"trades:{condition_id}"
-        trades_raw = self.client.lrange(key, 0, -1)
+        now_ms = int(time.time() * 1000)
+        pipe = self.raw_client.pipeline(transaction=False)
+        pipe.zrevrangebyscore(trade_buffer_key(condition_id), "+inf", now_ms - WINDOW_1H_MS)
+        pipe.lrange(legacy_trade_buffer_key(condition_id), 0, -1)
+        packed, legacy = pipe.execute()
+        return _merge_trade_buffers(packed, legacy, (now_ms - WINDOW_1H_MS) / 1000)
+
+    def migrate_legacy_trade_buffers(self, scan_count: int = 500) -> int:
+        """
+        Convert legacy JSON list buffers (trades:*) into packed sorted sets.
 
-        one_hour_ago = datetime.now(timezone.utc).timestamp() - 3600
-        trades = []
+        Safe to run while the collector is writing: entries are merged into
+        the new key with ZADD and the legacy list is deleted afterwards.
 
-        for raw in trades_raw:
-            try:
-                trade = json.loads(raw)
-                ts = datetime.fromisoformat(trade["timestamp"]).timestamp()
-                if ts >= one_hour_ago:
-                    trades.append(trade)
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                # Log but don't fail - skip corrupt entries
-                logger.debug("Skipping corrupt trade entry", error=str(e))
-                continue
-
-        return trades
+        Returns:
+            Number of legacy buffers migrated
+        """
+        migrated = 0
+        for key in self.raw_client.scan_iter(match="trades:*", count=scan_count, _type="list"):
+            condition_id = key.decode().split(":", 1)[1]
+            entries: dict[bytes, int] = {}
+            for raw in self.raw_client.lrange(key, 0, -1):
+                try:
+                    member, score = encode_trade(decode_legacy_trade(raw))
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    continue
+                entries[member] = score
+
+            pipe = self.raw_client.pipeline(transaction=False)
+            if entries:
+                _queue_trade_buffer_writes(pipe, condition_id, entries)
+            pipe.delete(key)
+            pipe.execute()
+            migrated += 1
+        return migrated
 
     # === Metrics Cache Operations ===
 
@@ -476,6 +1073,132 @@ class SyncRedisClient:
             logger.warning("Corrupt metrics cache", condition_id=condition_id[:16], error=str(e))
             return None
 
+    @redis_retry_sync
+    def get_metrics_many(self, condition_ids: list[str]) -> dict[str, dict]:
+        """
+        Get cached metrics for many markets in one pipeline.
+
+        Args:
+            condition_ids: Market condition IDs
+
+        Returns:
+            Dictionary of condition_id -> metrics (missing/corrupt entries omitted)
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for condition_id in condition_ids:
+            pipe.hgetall(f"metrics:{condition_id}")
+        results = pipe.execute()
+
+        metrics = {}
+        for condition_id, raw in zip(condition_ids, results):
+            if not raw:
+                continue
+            try:
+                metrics[condition_id] = {k: json.loads(v) for k, v in raw.items()}
+            except json.JSONDecodeError as e:
+                logger.warning("Corrupt metrics cache", condition_id=condition_id[:16], error=str(e))
+        return metrics
+
+    # === Adaptive Snapshot State ===
+
+    @redis_retry_sync
+    def get_snapshot_activity(
+        self,
+        condition_ids: list[str],
+    ) -> tuple[dict[str, list], dict[str, tuple[Optional[int], Optional[float]]]]:
+        """
+        Get last-snapshot state and published trade activity in one pipeline.
+
+        Args:
+            condition_ids: Market condition IDs
+
+        Returns:
+            (condition_id -> state list,
+             condition_id -> (trade_count_1h, last_trade_at));
+            markets without state or published metrics are omitted
+        """
+        if not condition_ids:
+            return {}, {}
+        pipe = self.client.pipeline(transaction=False)
+        pipe.mget([snapshot_state_key(cid) for cid in condition_ids])
+        for condition_id in condition_ids:
+            pipe.hmget(f"metrics:{condition_id}", "trade_count_1h", "last_trade_at")
+        raw_states, *raw_activity = pipe.execute()
+
+        states = {}
+        for condition_id, raw in zip(condition_ids, raw_states):
+            if raw:
+                try:
+                    states[condition_id] = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+        activity = {}
+        for condition_id, (raw_count, raw_last) in zip(condition_ids, raw_activity):
+            if raw_count is None:
+                continue
+            try:
+                last_trade_at = json.loads(raw_last) if raw_last else None
+                activity[condition_id] = (
+                    int(json.loads(raw_count)),
+                    float(last_trade_at) if last_trade_at is not None else None,
+                )
+            except (TypeError, ValueError):
+                continue
+        return states, activity
+
+    @redis_retry_sync
+    def set_snapshot_state(self, states: dict[str, list]) -> None:
+        """
+        Store the state of markets just snapshotted.
+
+        Args:
+            states: condition_id -> state list (see src/snapshots/scheduling.py)
+        """
+        if not states:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for condition_id, state in states.items():
+            pipe.set(snapshot_state_key(condition_id), json.dumps(state), ex=SNAPSHOT_STATE_TTL)
+        pipe.execute()
+
+    @redis_retry_sync
+    def get_snapshot_written(self, condition_ids: list[str]) -> dict[str, dict]:
+        """
+        Get the last written snapshot feature vectors.
+
+        Args:
+            condition_ids: Market condition IDs
+
+        Returns:
+            condition_id -> {"ts", "features"}; markets without an entry are omitted
+        """
+        if not condition_ids:
+            return {}
+        written = {}
+        raw_entries = self.client.mget([snapshot_written_key(cid) for cid in condition_ids])
+        for condition_id, raw in zip(condition_ids, raw_entries):
+            if raw:
+                try:
+                    written[condition_id] = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+        return written
+
+    @redis_retry_sync
+    def set_snapshot_written(self, entries: dict[str, dict]) -> None:
+        """
+        Store the feature vectors of snapshot rows just written.
+
+        Args:
+            entries: condition_id -> {"ts", "features"} (see src/snapshots/dedup.py)
+        """
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for condition_id, entry in entries.items():
+            pipe.set(snapshot_written_key(condition_id), json.dumps(entry), ex=SNAPSHOT_STATE_TTL)
+        pipe.execute()
+
     # === Orderbook Cache ===
 
     @redis_retry_sync
@@ -502,32 +1225,164 @@ class SyncRedisClient:
     # === Gamma API Cache ===
 
     @redis_retry_sync
-    def set_gamma_markets_cache(self, markets: list[dict], ttl: int = 10) -> None:
+    def set_gamma_markets_cache(self, markets: list[dict], ttl: int = 10) -> int:
         """
-        Cache Gamma API markets response.
+        Replace the Gamma market cache (one hash field per market).
+
+        The hash is rewritten in a MULTI/EXEC block so readers never see a
+        half-written cache.
 
         Args:
             markets: List of market dictionaries from Gamma API
             ttl: Time to live in seconds (default 10s)
+
+        Returns:
+            New cache version
         """
-        self.client.set("gamma:markets", json.dumps(markets), ex=ttl)
+        pipe = self.client.pipeline(transaction=True)
+        _queue_gamma_cache_replace(pipe, markets, ttl)
+        return pipe.execute()[-1]
 
     @redis_retry_sync
-    def get_gamma_markets_cache(self) -> Optional[list[dict]]:
+    def get_gamma_markets(self, condition_ids: list[str]) -> Optional[dict[str, dict]]:
         """
-        Get cached Gamma API markets response.
+        Get cached Gamma markets for specific condition IDs (one HMGET).
+
+        Args:
+            condition_ids: Markets to fetch
 
         Returns:
-            List of market dictionaries or None if not cached/expired/corrupt
+            Dictionary of condition_id -> market (IDs not in the cache or
+            corrupt are omitted), or None if the cache is empty/expired
         """
-        raw = self.client.get("gamma:markets")
-        if not raw:
-            return None
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError as e:
-            logger.warning("Corrupt Gamma cache", error=str(e))
+        pipe = self.client.pipeline(transaction=False)
+        pipe.exists(GAMMA_MARKETS_KEY)
+        if condition_ids:
+            pipe.hmget(GAMMA_MARKETS_KEY, condition_ids)
+        exists, *values = pipe.execute()
+        if not exists:
             return None
+        return _decode_gamma_markets(condition_ids, values[0] if values else [])
+
+    @redis_retry_sync
+    def get_gamma_condition_ids(self) -> Optional[set[str]]:
+        """
+        Get every condition ID in the Gamma cache (HKEYS, no market bodies).
+
+        Returns:
+            Set of condition IDs, or None if the cache is empty/expired
+        """
+        keys = self.client.hkeys(GAMMA_MARKETS_KEY)
+        return set(keys) if keys else None
+
+    @redis_retry_sync
+    def get_gamma_cache_version(self) -> Optional[int]:
+        """Current Gamma cache version (None if never written)."""
+        raw = self.client.get(GAMMA_VERSION_KEY)
+        return int(raw) if raw else None
+
+    @redis_retry_sync
+    def update_gamma_markets_cache(self, markets: list[dict], ttl: int = 10) -> dict:
+        """
+        Write only the Gamma markets whose content changed since the last warm.
+
+        Content hashes live next to the cache (gamma:markets:digest). Changed
+        and removed markets are written in one MULTI/EXEC block together with
+        a version bump and a change-stream entry; unchanged warms only refresh
+        the TTLs. WATCH on the version key makes concurrent warmers back off.
+
+        Stream entries carry only the version and counts; the changed/removed
+        IDs go to a per-version key that expires after GAMMA_CHANGES_IDS_TTL,
+        so the retained history stays small however many markets change.
+
+        Args:
+            markets: List of market dictionaries from Gamma API
+            ttl: Time to live in seconds for the cache and digests
+
+        Returns:
+            Dictionary with version, changed, removed and full (bool)
+        """
+        with self.client.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(GAMMA_VERSION_KEY)
+                full = not pipe.exists(GAMMA_MARKETS_KEY)
+                old_digests = {} if full else pipe.hgetall(GAMMA_DIGEST_KEY)
+                version = int(pipe.get(GAMMA_VERSION_KEY) or 0)
+
+                values, digests, removed = diff_gamma_markets(markets, old_digests)
+                changed = bool(values or removed or full)
+
+                pipe.multi()
+                if full:
+                    pipe.delete(GAMMA_MARKETS_KEY, GAMMA_DIGEST_KEY)
+                if values:
+                    pipe.hset(GAMMA_MARKETS_KEY, mapping=values)
+                    pipe.hset(GAMMA_DIGEST_KEY, mapping=digests)
+                if removed:
+                    pipe.hdel(GAMMA_MARKETS_KEY, *removed)
+                    pipe.hdel(GAMMA_DIGEST_KEY, *removed)
+                pipe.expire(GAMMA_MARKETS_KEY, ttl)
+                pipe.expire(GAMMA_DIGEST_KEY, ttl)
+                if changed:
+                    version += 1
+                    entry = {"version": version}
+                    if full:
+                        entry["full"] = "1"
+                    else:
+                        entry["changed"] = len(values)
+                        entry["removed"] = len(removed)
+                        pipe.set(
+                            gamma_changes_ids_key(version),
+                            json.dumps({"changed": list(values), "removed": removed}),
+                            ex=GAMMA_CHANGES_IDS_TTL,
+                        )
+                    pipe.xadd(GAMMA_CHANGES_STREAM, entry, maxlen=GAMMA_CHANGES_MAXLEN, approximate=True)
+                    pipe.incr(GAMMA_VERSION_KEY)
+                pipe.execute()
+            except WatchError:
+                # Another warmer wrote first with the same API data - nothing to do
+                logger.info("Gamma cache updated concurrently, skipping write")
+                return {"version": None, "changed": 0, "removed": 0, "full": False, "skipped": True}
+
+        return {"version": version, "changed": len(values), "removed": len(removed), "full": full}
+
+    @redis_retry_sync
+    def read_gamma_changes(self, last_id: Optional[str]) -> tuple[Optional[int], list[tuple[str, dict]]]:
+        """
+        Read the Gamma change stream after last_id (atomic with the version).
+
+        Delta entries get their "changed"/"removed" ID lists from the
+        per-version key; an entry whose IDs already expired is returned as a
+        full rewrite so the consumer resets.
+
+        Args:
+            last_id: Last stream ID already consumed (None for a fresh consumer,
+                     which gets no history - just the current position)
+
+        Returns:
+            (current version or None if the cache is empty, stream entries)
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.exists(GAMMA_MARKETS_KEY)
+        pipe.get(GAMMA_VERSION_KEY)
+        if last_id is None:
+            pipe.xrevrange(GAMMA_CHANGES_STREAM, count=1)
+        else:
+            pipe.xrange(GAMMA_CHANGES_STREAM, min=f"({last_id}")
+        exists, version, entries = pipe.execute()
+        if not exists:
+            return None, []
+        if last_id is None:
+            entries = [(entry_id, {"full": "1"}) for entry_id, _ in entries]
+        deltas = [fields for _, fields in entries if not fields.get("full") and "version" in fields]
+        if deltas:
+            ids = self.client.mget([gamma_changes_ids_key(int(fields["version"])) for fields in deltas])
+            for fields, raw in zip(deltas, ids):
+                try:
+                    fields.update(json.loads(raw))
+                except (TypeError, json.JSONDecodeError):
+                    fields["full"] = "1"
+        return int(version or 0), entries
 
     # === WebSocket Health Tracking ===
 
@@ -561,6 +1416,148 @@ class SyncRedisClient:
         """Get count of connected markets."""
         return self.client.scard("ws:connected") or 0
 
+    @redis_retry_sync
+    def remove_ws_connected(self, condition_ids: Iterable[str]) -> None:
+        """Drop markets from the ws:connected set."""
+        condition_ids = list(condition_ids)
+        if condition_ids:
+            self.client.srem("ws:connected", *condition_ids)
+
+    @redis_retry_sync
+    def clear_ws_connected(self) -> None:
+        """Remove the ws:connected set (collector startup)."""
+        self.client.delete("ws:connected")
+
+    @redis_retry_sync
+    def set_shard_assignments(self, assignments: dict[int, Iterable[str]]) -> int:
+        """
+        Publish the market set of every collector shard atomically.
+
+        Args:
+            assignments: shard_id -> condition IDs (shards missing here keep nothing)
+
+        Returns:
+            New assignment version
+        """
+        pipe = self.client.pipeline(transaction=True)
+        for shard_id, condition_ids in assignments.items():
+            key = ws_shard_markets_key(shard_id)
+            pipe.delete(key)
+            condition_ids = list(condition_ids)
+            if condition_ids:
+                pipe.sadd(key, *condition_ids)
+        pipe.incr(WS_SHARD_VERSION_KEY)
+        return int(pipe.execute()[-1])
+
+    @redis_retry_sync
+    def get_shard_stats(self, shard_ids: Iterable[int]) -> dict[int, dict]:
+        """
+        Stats of collector shards that are still reporting.
+
+        Returns:
+            shard_id -> stats hash (shards with expired stats are omitted)
+        """
+        shard_ids = list(shard_ids)
+        pipe = self.client.pipeline(transaction=False)
+        for shard_id in shard_ids:
+            pipe.hgetall(ws_shard_stats_key(shard_id))
+        return {shard_id: stats for shard_id, stats in zip(shard_ids, pipe.execute()) if stats}
+
+    @redis_retry_sync
+    def set_shard_summary(self, summary: dict, ttl: int) -> None:
+        """Replace the aggregate collector shard stats (expire if the supervisor stops)."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(WS_SHARD_SUMMARY_KEY)
+        pipe.hset(WS_SHARD_SUMMARY_KEY, mapping={k: str(v) for k, v in summary.items()})
+        pipe.expire(WS_SHARD_SUMMARY_KEY, ttl)
+        pipe.execute()
+
+
+class GammaMarketView:
+    """
+    Process-local view of the Gamma cache kept current from the change stream.
+
+    Snapshot tasks run every few seconds against mostly unchanged markets.
+    The view keeps decoded markets between runs and, on each call, applies
+    the change stream: changed/removed markets are evicted and only those
+    (plus markets never seen) are fetched with HMGET. Any gap in versions,
+    a full rewrite, or an empty cache resets the view.
+    """
+
+    def __init__(self):
+        self.markets: dict[str, dict] = {}
+        self.last_id: Optional[str] = None
+        self.version: Optional[int] = None
+
+        # Counters (monotonic, for monitoring)
+        self.hits = 0
+        self.fetched = 0
+        self.resets = 0
+
+    def reset(self) -> None:
+        """Forget all cached markets."""
+        self.markets.clear()
+        self.version = None
+        self.resets += 1
+
+    def apply_changes(self, version: int, entries: list[tuple[str, dict]]) -> None:
+        """
+        Evict markets named in change-stream entries (reset on gaps/full rewrites).
+
+        Entries are as returned by read_gamma_changes(), with "changed" and
+        "removed" already resolved to ID lists.
+        """
+        for entry_id, fields in entries:
+            self.last_id = entry_id
+            entry_version = fields.get("version")
+            if (
+                fields.get("full")
+                or self.version is None
+                or entry_version is None
+                or int(entry_version) != self.version + 1
+            ):
+                self.reset()
+            else:
+                for condition_id in fields.get("changed", ()):
+                    self.markets.pop(condition_id, None)
+                for condition_id in fields.get("removed", ()):
+                    self.markets.pop(condition_id, None)
+            if entry_version is not None:
+                self.version = int(entry_version)
+
+        if self.version != version:
+            # Stream trimmed past our position (or written without an entry)
+            self.reset()
+        self.version = version
+        if self.last_id is None:
+            self.last_id = "0-0"  # Stream not created yet - start from the beginning
+
+    def get_markets(self, redis: SyncRedisClient, condition_ids: list[str]) -> Optional[dict[str, dict]]:
+        """
+        Get cached Gamma markets, fetching only changed or unseen ones.
+
+        Returns:
+            Dictionary of condition_id -> market (IDs not in the cache are
+            omitted), or None if the cache is empty/expired
+        """
+        version, entries = redis.read_gamma_changes(self.last_id)
+        if version is None:
+            self.reset()
+            return None
+        self.apply_changes(version, entries)
+
+        missing = [cid for cid in condition_ids if cid not in self.markets]
+        self.hits += len(condition_ids) - len(missing)
+        if missing:
+            fetched = redis.get_gamma_markets(missing)
+            if fetched is None:
+                self.reset()
+                return None
+            self.markets.update(fetched)
+            self.fetched += len(fetched)
+
+        return {cid: self.markets[cid] for cid in condition_ids if cid in self.markets}
+
 
 # Singleton instance for sync client
 _sync_redis_client: Optional[SyncRedisClient] = None
@@ -9,12 +9,17 @@ Features:
 - Smart retry logic (only retries transient errors)
 - Response validation
 - Memory-safe response limits
+- Token-bucket rate limiting, per process or shared through Redis
+  (settings.rate_limit_distributed, see rate_limit.py)
+- Opt-in per-path GET response cache with request coalescing (single-flight)
 """
 import asyncio
+import copy
 import random
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -23,6 +28,9 @@ from typing import Any, Optional
 import httpx
 import structlog
 
+from src.config.settings import settings
+from src.fetchers.rate_limit import DistributedRateLimiter, SyncDistributedRateLimiter
+
 logger = structlog.get_logger()
 
 # Maximum response size to prevent OOM (10MB)
@@ -154,6 +162,94 @@ def calculate_backoff(attempt: int, base: float = 1.0, max_delay: float = 60.0)
     return random.uniform(0, exp_backoff)
 
 
+class ResponseCache:
+    """
+    Short-TTL LRU cache of GET responses, with per-path TTLs.
+
+    Only paths listed in `ttls` take part in caching and request coalescing
+    (a TTL of 0 coalesces in-flight requests without caching). Callers get
+    deep copies, so cached and shared responses are never mutated.
+    """
+
+    def __init__(self, ttls: Optional[dict[str, float]] = None, max_entries: int = 1024):
+        """
+        Args:
+            ttls: Path -> seconds a response stays fresh
+            max_entries: Responses kept before the least recently used is evicted
+        """
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def enabled(self, path: str) -> bool:
+        """True if GETs to this path are cached/coalesced."""
+        return path in self.ttls
+
+    @staticmethod
+    def key(path: str, params: Optional[dict[str, Any]]) -> tuple:
+        """Cache key for a GET (params order-insensitive)."""
+        return path, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """
+        Look up a fresh response.
+
+        Returns:
+            (found, deep copy of the response)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                data = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+        return True, copy.deepcopy(data)
+
+    def put(self, key: tuple, data: Any) -> None:
+        """Store a response for its path's TTL."""
+        ttl = self.ttls.get(key[0], 0.0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_coalesced(self) -> None:
+        with self._lock:
+            self.coalesced += 1
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/coalesced counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "entries": len(self._entries),
+            }
+
+
+class _InflightCall:
+    """A GET being fetched by one thread while others wait for its result."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
 class RateLimiter:
     """Token bucket rate limiter for async operations."""
 
@@ -169,21 +265,26 @@ class RateLimiter:
         self.last_update = time.monotonic()
         self.lock = asyncio.Lock()
 
-    async def acquire(self) -> None:
-        """Acquire a token, waiting if necessary."""
+    async def acquire(self, endpoint: Optional[str] = None) -> None:
+        """
+        Acquire a token, waiting if necessary.
+
+        The token is reserved under the lock (the bucket may go negative) and
+        the wait happens outside it, so waiting callers don't serialize.
+        `endpoint` is accepted for interface parity with the distributed
+        limiter; a process-local bucket covers the whole API.
+        """
         async with self.lock:
             now = time.monotonic()
             elapsed = now - self.last_update
             self.tokens = min(self.rate, self.tokens + elapsed * self.rate)
             self.last_update = now
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
 
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) / self.rate
-                logger.debug("Rate limited, waiting", wait_seconds=round(wait_time, 2))
-                await asyncio.sleep(wait_time)
-                self.tokens = 0
-            else:
-                self.tokens -= 1
+        if wait_time > 0:
+            logger.debug("Rate limited, waiting", wait_seconds=round(wait_time, 2))
+            await asyncio.sleep(wait_time)
 
 
 class BaseClient:
@@ -197,6 +298,8 @@ class BaseClient:
         read_timeout: float = 30.0,
         headers: Optional[dict[str, str]] = None,
         max_retries: int = 3,
+        endpoint_rate_limits: Optional[dict[str, float]] = None,
+        response_cache_ttls: Optional[dict[str, float]] = None,
     ):
         """
         Initialize the HTTP client.
@@ -208,11 +311,25 @@ class BaseClient:
             read_timeout: Read timeout in seconds
             headers: Additional headers to include in requests
             max_retries: Maximum retry attempts for transient errors
+            endpoint_rate_limits: Path -> requests per second for extra
+                                  per-endpoint buckets (distributed limiter only)
+            response_cache_ttls: Path -> seconds GET responses are cached;
+                                 listed paths also coalesce identical in-flight GETs
         """
         self.base_url = base_url
         self.rate_limiter = RateLimiter(rate_limit)
+        if settings.rate_limit_distributed:
+            # One Redis bucket per API host shared by every process
+            self.rate_limiter = DistributedRateLimiter(
+                httpx.URL(base_url).host,
+                rate_limit,
+                fallback=self.rate_limiter,
+                endpoint_rates=endpoint_rate_limits,
+            )
         self.max_retries = max_retries
         self.circuit_breaker = CircuitBreaker()
+        self.response_cache = ResponseCache(response_cache_ttls, settings.http_response_cache_size)
+        self._inflight: dict[tuple, asyncio.Future] = {}
 
         default_headers = {
             "Accept": "application/json",
@@ -246,6 +363,9 @@ class BaseClient:
         """
         Make a rate-limited GET request with automatic retries.
 
+        Paths with a response cache TTL are served from the cache while
+        fresh, and identical in-flight requests share one HTTP call.
+
         Args:
             path: URL path (appended to base_url)
             params: Query parameters
@@ -258,6 +378,37 @@ class BaseClient:
             httpx.HTTPStatusError: On non-2xx response after retries
             CircuitOpenError: If circuit breaker is open
         """
+        if not self.response_cache.enabled(path):
+            return await self._get(path, params, request_id)
+
+        key = ResponseCache.key(path, params)
+        found, data = self.response_cache.get(key)
+        if found:
+            return data
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._get(path, params, request_id))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish_inflight(key, done))
+        else:
+            self.response_cache.record_coalesced()
+        # Shielded: one caller being cancelled must not cancel the shared request
+        data = await asyncio.shield(future)
+        return copy.deepcopy(data)
+
+    def _finish_inflight(self, key: tuple, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.response_cache.put(key, future.result())
+
+    async def _get(
+        self,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        request_id: Optional[str] = None,
+    ) -> Any:
+        """GET with rate limiting, retries and circuit breaking (no cache)."""
         request_id = request_id or str(uuid.uuid4())[:8]
 
         # Check circuit breaker
@@ -269,7 +420,7 @@ class BaseClient:
 
         for attempt in range(self.max_retries):
             try:
-                await self.rate_limiter.acquire()
+                await self.rate_limiter.acquire(path)
 
                 logger.debug(
                     "HTTP GET",
@@ -352,7 +503,7 @@ class BaseClient:
 
         for attempt in range(self.max_retries):
             try:
-                await self.rate_limiter.acquire()
+                await self.rate_limiter.acquire(path)
 
                 logger.debug("HTTP POST", path=path, attempt=attempt + 1, request_id=request_id)
                 response = await self.client.post(path, json=json)
@@ -382,10 +533,17 @@ class BaseClient:
         self.circuit_breaker.record_failure()
         raise last_error or Exception("Request failed")
 
+    @property
+    def is_closed(self) -> bool:
+        """True once the client (or its connection pool) has been closed."""
+        return self._closed or self.client.is_closed
+
     async def close(self) -> None:
-        """Close the HTTP client."""
+        """Close the HTTP client (and the distributed limiter's Redis pool)."""
         if not self._closed:
             await self.client.aclose()
+            if isinstance(self.rate_limiter, DistributedRateLimiter):
+                await self.rate_limiter.close()
             self._closed = True
 
     async def __aenter__(self) -> "BaseClient":
@@ -404,21 +562,19 @@ class SyncRateLimiter:
         self.last_update = time.monotonic()
         self.lock = threading.Lock()
 
-    def acquire(self) -> None:
-        """Acquire a token, waiting if necessary."""
+    def acquire(self, endpoint: Optional[str] = None) -> None:
+        """Acquire a token, waiting (outside the lock) if necessary."""
         with self.lock:
             now = time.monotonic()
             elapsed = now - self.last_update
             self.tokens = min(self.rate, self.tokens + elapsed * self.rate)
             self.last_update = now
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
 
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) / self.rate
-                logger.debug("Rate limited, waiting", wait_seconds=round(wait_time, 2))
-                time.sleep(wait_time)
-                self.tokens = 0
-            else:
-                self.tokens -= 1
+        if wait_time > 0:
+            logger.debug("Rate limited, waiting", wait_seconds=round(wait_time, 2))
+            time.sleep(wait_time)
 
 
 class SyncBaseClient:
@@ -436,11 +592,24 @@ class SyncBaseClient:
         read_timeout: float = 30.0,
         headers: Optional[dict[str, str]] = None,
         max_retries: int = 3,
+        endpoint_rate_limits: Optional[dict[str, float]] = None,
+        response_cache_ttls: Optional[dict[str, float]] = None,
     ):
         self.base_url = base_url
         self.rate_limiter = SyncRateLimiter(rate_limit)
+        if settings.rate_limit_distributed:
+            # One Redis bucket per API host shared by every process
+            self.rate_limiter = SyncDistributedRateLimiter(
+                httpx.URL(base_url).host,
+                rate_limit,
+                fallback=self.rate_limiter,
+                endpoint_rates=endpoint_rate_limits,
+            )
         self.max_retries = max_retries
         self.circuit_breaker = CircuitBreaker()
+        self.response_cache = ResponseCache(response_cache_ttls, settings.http_response_cache_size)
+        self._inflight: dict[tuple, _InflightCall] = {}
+        self._inflight_lock = threading.Lock()
 
         default_headers = {
             "Accept": "application/json",
@@ -473,6 +642,9 @@ class SyncBaseClient:
         """
         Make a rate-limited GET request with automatic retries.
 
+        Paths with a response cache TTL are served from the cache while
+        fresh, and identical in-flight requests share one HTTP call.
+
         Args:
             path: URL path (appended to base_url)
             params: Query parameters
@@ -485,6 +657,46 @@ class SyncBaseClient:
             httpx.HTTPStatusError: On non-2xx response after retries
             CircuitOpenError: If circuit breaker is open
         """
+        if not self.response_cache.enabled(path):
+            return self._get(path, params, request_id)
+
+        key = ResponseCache.key(path, params)
+        found, data = self.response_cache.get(key)
+        if found:
+            return data
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+
+        if not leader:
+            self.response_cache.record_coalesced()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._get(path, params, request_id)
+            self.response_cache.put(key, call.result)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return copy.deepcopy(call.result)
+
+    def _get(
+        self,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        request_id: Optional[str] = None,
+    ) -> Any:
+        """GET with rate limiting, retries and circuit breaking (no cache)."""
         request_id = request_id or str(uuid.uuid4())[:8]
 
         if not self.circuit_breaker.can_execute():
@@ -495,7 +707,7 @@ class SyncBaseClient:
 
         for attempt in range(self.max_retries):
             try:
-                self.rate_limiter.acquire()
+                self.rate_limiter.acquire(path)
 
                 logger.debug(
                     "HTTP GET (sync)",
@@ -563,7 +775,7 @@ class SyncBaseClient:
 
         for attempt in range(self.max_retries):
             try:
-                self.rate_limiter.acquire()
+                self.rate_limiter.acquire(path)
                 logger.debug("HTTP POST (sync)", path=path, attempt=attempt + 1, request_id=request_id)
                 response = self.client.post(path, json=json)
                 response.raise_for_status()
@@ -591,10 +803,17 @@ class SyncBaseClient:
         self.circuit_breaker.record_failure()
         raise last_error or Exception("Request failed")
 
+    @property
+    def is_closed(self) -> bool:
+        """True once the client (or its connection pool) has been closed."""
+        return self._closed or self.client.is_closed
+
     def close(self) -> None:
-        """Close the HTTP client."""
+        """Close the HTTP client (and the distributed limiter's Redis pool)."""
         if not self._closed:
             self.client.close()
+            if isinstance(self.rate_limiter, SyncDistributedRateLimiter):
+                self.rate_limiter.close()
             self._closed = True
 
     def __enter__(self) -> "SyncBaseClient":
@@ -13,6 +13,7 @@ import structlog
 
 from src.config.settings import settings
 from src.fetchers.base import BaseClient, SyncBaseClient
+from src.fetchers.orderbook_features import extract_orderbook_features, sort_orderbook
 
 logger = structlog.get_logger()
 
@@ -25,6 +26,8 @@ class CLOBClient(BaseClient):
         super().__init__(
             base_url=settings.clob_api_base,
             rate_limit=settings.clob_rate_limit,
+            endpoint_rate_limits=settings.clob_endpoint_rate_limits,
+            response_cache_ttls=settings.clob_response_cache_ttls,
         )
 
     async def get_orderbook(self, token_id: str) -> dict[str, Any]:
@@ -35,9 +38,9 @@ class CLOBClient(BaseClient):
             token_id: The token ID (from market's clobTokenIds)
 
         Returns:
-            Orderbook dictionary with 'bids' and 'asks' arrays
+            Orderbook dictionary with 'bids' and 'asks' arrays, best price first
         """
-        return await self.get("/book", params={"token_id": token_id})
+        return sort_orderbook(await self.get("/book", params={"token_id": token_id}))
 
     async def get_midpoint(self, token_id: str) -> float:
         """
@@ -240,60 +243,8 @@ class CLOBClient(BaseClient):
         Returns:
             Dictionary with all computed features
         """
-        bids = orderbook.get("bids", [])
-        asks = orderbook.get("asks", [])
-
-        # Depth at various levels
-        bid_depth_5 = CLOBClient.calculate_depth(orderbook, "bid", 5)
-        bid_depth_10 = CLOBClient.calculate_depth(orderbook, "bid", 10)
-        bid_depth_20 = CLOBClient.calculate_depth(orderbook, "bid", 20)
-        bid_depth_50 = CLOBClient.calculate_depth(orderbook, "bid", 50)
-
-        ask_depth_5 = CLOBClient.calculate_depth(orderbook, "ask", 5)
-        ask_depth_10 = CLOBClient.calculate_depth(orderbook, "ask", 10)
-        ask_depth_20 = CLOBClient.calculate_depth(orderbook, "ask", 20)
-        ask_depth_50 = CLOBClient.calculate_depth(orderbook, "ask", 50)
-
-        # Level counts
-        bid_levels = len(bids)
-        ask_levels = len(asks)
-
-        # Imbalance
-        book_imbalance = CLOBClient.calculate_imbalance(orderbook)
-
-        # Walls
-        bid_wall_price, bid_wall_size = CLOBClient.find_wall(orderbook, "bid")
-        ask_wall_price, ask_wall_size = CLOBClient.find_wall(orderbook, "ask")
-
-        # Best prices
-        best_bid = float(bids[0].get("price", 0)) if bids else None
-        best_ask = float(asks[0].get("price", 0)) if asks else None
-        spread = (best_ask - best_bid) if (best_bid and best_ask) else None
-
-        return {
-            # Depth features
-            "bid_depth_5": bid_depth_5,
-            "bid_depth_10": bid_depth_10,
-            "bid_depth_20": bid_depth_20,
-            "bid_depth_50": bid_depth_50,
-            "ask_depth_5": ask_depth_5,
-            "ask_depth_10": ask_depth_10,
-            "ask_depth_20": ask_depth_20,
-            "ask_depth_50": ask_depth_50,
-            # Level counts
-            "bid_levels": bid_levels,
-            "ask_levels": ask_levels,
-            # Derived
-            "book_imbalance": book_imbalance,
-            "bid_wall_price": bid_wall_price,
-            "bid_wall_size": bid_wall_size,
-            "ask_wall_price": ask_wall_price,
-            "ask_wall_size": ask_wall_size,
-            # Prices
-            "best_bid": best_bid,
-            "best_ask": best_ask,
-            "spread": spread,
-        }
+        # Single pass over each side (see OrderbookBatch for many books at once)
+        return extract_orderbook_features(orderbook)
 
 
 class SyncCLOBClient(SyncBaseClient):
@@ -307,6 +258,8 @@ class SyncCLOBClient(SyncBaseClient):
         super().__init__(
             base_url=settings.clob_api_base,
             rate_limit=settings.clob_rate_limit,
+            endpoint_rate_limits=settings.clob_endpoint_rate_limits,
+            response_cache_ttls=settings.clob_response_cache_ttls,
         )
 
     def get_orderbook(self, token_id: str) -> dict[str, Any]:
@@ -317,9 +270,9 @@ class SyncCLOBClient(SyncBaseClient):
             token_id: The token ID (from market's clobTokenIds)
 
         Returns:
-            Orderbook dictionary with 'bids' and 'asks' arrays
+            Orderbook dictionary with 'bids' and 'asks' arrays, best price first
         """
-        return self.get("/book", params={"token_id": token_id})
+        return sort_orderbook(self.get("/book", params={"token_id": token_id}))
 
     def get_midpoint(self, token_id: str) -> float:
         """
@@ -9,10 +9,14 @@ The Gamma API provides market information including:
 
 Production notes:
 - Pagination protected with MAX_PAGES limit to prevent infinite loops
+- Market listing fans out offset pages concurrently (in waves, under the
+  client's rate limiter and circuit breaker), dedupes and keeps page order
 - 404/422 errors handled gracefully for delisted markets
 - Price parsing falls back safely on malformed data
 """
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Optional
 
@@ -26,6 +30,58 @@ logger = structlog.get_logger()
 
 # Safety limit to prevent infinite pagination loops
 MAX_PAGES = 500  # 500 pages * 100 items = 50,000 markets max
+PAGE_SIZE = 100  # Gamma API max limit per page
+
+
+def merge_market_pages(pages: list[list[dict[str, Any]]], limit: int) -> tuple[list[dict[str, Any]], int, bool]:
+    """
+    Combine offset pages fetched out of order into one stable listing.
+
+    Pages after the first short (or empty) page are past the end of the
+    listing and are ignored. Markets shifting between pages while the
+    listing is fetched can appear twice; the first occurrence wins.
+
+    Args:
+        pages: Pages in offset order
+        limit: Page size requested
+
+    Returns:
+        (markets, pages used, end of listing reached)
+    """
+    markets = []
+    seen: set[str] = set()
+    used = 0
+    for page in pages:
+        used += 1
+        for market in page:
+            key = market.get("conditionId") or market.get("id")
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            markets.append(market)
+        if len(page) < limit:
+            return markets, used, True
+    return markets, used, False
+
+
+def _finish_listing(pages: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Merge fetched pages and log the outcome (shared by async and sync clients)."""
+    markets, used, complete = merge_market_pages(pages, PAGE_SIZE)
+    if not complete:
+        logger.warning(
+            "Pagination limit reached",
+            max_pages=MAX_PAGES,
+            total_fetched=len(markets),
+        )
+    logger.info(
+        "Fetched all active markets",
+        total=len(markets),
+        pages=used,
+        requested_pages=len(pages),
+        duplicates=sum(len(p) for p in pages[:used]) - len(markets),
+    )
+    return markets
 
 
 class GammaClient(BaseClient):
@@ -36,6 +92,8 @@ class GammaClient(BaseClient):
         super().__init__(
             base_url=settings.gamma_api_base,
             rate_limit=settings.gamma_rate_limit,
+            endpoint_rate_limits=settings.gamma_endpoint_rate_limits,
+            response_cache_ttls=settings.gamma_response_cache_ttls,
         )
 
     async def get_markets(
@@ -69,55 +127,32 @@ class GammaClient(BaseClient):
         """
         Fetch all active markets, handling pagination automatically.
 
+        Offset pages are fetched concurrently in waves of
+        settings.gamma_page_concurrency; the rate limiter paces requests.
+
         Safety features:
         - MAX_PAGES limit prevents infinite loops
-        - Empty response breaks pagination
+        - Short/empty page ends pagination (later pages are discarded)
+        - Duplicates across pages are dropped, page order is kept
         - Logs progress for monitoring
-        - Per-page delay to avoid 429 rate limits
 
         Returns:
             List of all active market dictionaries
         """
-        import asyncio
-
-        all_markets = []
-        offset = 0
-        limit = 100
-        page = 0
-
-        while page < MAX_PAGES:
-            markets = await self.get_markets(
-                active=True,
-                closed=False,
-                limit=limit,
-                offset=offset,
-            )
-
-            if not markets:
-                break
-
-            all_markets.extend(markets)
-            offset += limit
-            page += 1
+        pages: list[list[dict[str, Any]]] = []
+        done = False
 
-            # Check if we've reached the end
-            if len(markets) < limit:
-                break
+        while not done and len(pages) < MAX_PAGES:
+            wave = range(len(pages), min(len(pages) + settings.gamma_page_concurrency, MAX_PAGES))
+            results = await asyncio.gather(*(
+                self.get_markets(active=True, closed=False, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
+                for page in wave
+            ))
+            pages.extend(results)
+            done = any(len(r) < PAGE_SIZE for r in results)
+            logger.debug("Fetched markets pages", pages=len(pages), wave=len(wave))
 
-            logger.debug("Fetched markets page", page=page, offset=offset, count=len(markets))
-
-            # Small delay between pages to avoid 429 rate limits
-            await asyncio.sleep(0.15)
-
-        if page >= MAX_PAGES:
-            logger.warning(
-                "Pagination limit reached",
-                max_pages=MAX_PAGES,
-                total_fetched=len(all_markets),
-            )
-
-        logger.info("Fetched all active markets", total=len(all_markets), pages=page)
-        return all_markets
+        return _finish_listing(pages)
 
     async def get_market(self, condition_id: str) -> Optional[dict[str, Any]]:
         """
@@ -331,6 +366,8 @@ class SyncGammaClient(SyncBaseClient):
         super().__init__(
             base_url=settings.gamma_api_base,
             rate_limit=settings.gamma_rate_limit,
+            endpoint_rate_limits=settings.gamma_endpoint_rate_limits,
+            response_cache_ttls=settings.gamma_response_cache_ttls,
         )
 
     def get_markets(
@@ -364,48 +401,32 @@ class SyncGammaClient(SyncBaseClient):
         """
         Fetch all active markets, handling pagination automatically.
 
+        Offset pages are fetched concurrently (thread pool) in waves of
+        settings.gamma_page_concurrency; the rate limiter paces requests.
+
         Safety features:
         - MAX_PAGES limit prevents infinite loops
-        - Empty response breaks pagination
+        - Short/empty page ends pagination (later pages are discarded)
+        - Duplicates across pages are dropped, page order is kept
 
         Returns:
             List of all active market dictionaries
         """
-        all_markets = []
-        offset = 0
-        limit = 100
-        page = 0
-
-        while page < MAX_PAGES:
-            markets = self.get_markets(
-                active=True,
-                closed=False,
-                limit=limit,
-                offset=offset,
-            )
-
-            if not markets:
-                break
-
-            all_markets.extend(markets)
-            offset += limit
-            page += 1
+        pages: list[list[dict[str, Any]]] = []
+        done = False
 
-            # Check if we've reached the end
-            if len(markets) < limit:
-                break
+        def fetch_page(page: int) -> list[dict[str, Any]]:
+            return self.get_markets(active=True, closed=False, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
 
-            logger.debug("Fetched markets page", page=page, offset=offset, count=len(markets))
-
-        if page >= MAX_PAGES:
-            logger.warning(
-                "Pagination limit reached",
-                max_pages=MAX_PAGES,
-                total_fetched=len(all_markets),
-            )
+        with ThreadPoolExecutor(max_workers=settings.gamma_page_concurrency) as executor:
+            while not done and len(pages) < MAX_PAGES:
+                wave = range(len(pages), min(len(pages) + settings.gamma_page_concurrency, MAX_PAGES))
+                results = list(executor.map(fetch_page, wave))
+                pages.extend(results)
+                done = any(len(r) < PAGE_SIZE for r in results)
+                logger.debug("Fetched markets pages", pages=len(pages), wave=len(wave))
 
-        logger.info("Fetched all active markets", total=len(all_markets), pages=page)
-        return all_markets
+        return _finish_listing(pages)
 
     def get_market(self, condition_id: str) -> Optional[dict[str, Any]]:
         """
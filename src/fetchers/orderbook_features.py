@@ -0,0 +1,218 @@
+"""
+Vectorized orderbook feature extraction.
+
+Each side of every book is parsed once into flat NumPy price/size arrays;
+depths, totals, imbalance, walls, weighted midpoint and depth-within-price
+are then computed from prefix sums and segment reductions. OrderbookBatch
+processes all books of a snapshot cycle in one call.
+
+Semantics match the CLOBClient helpers: levels are taken in the order the
+book lists them (first entry is the best price) and missing price/size
+fields count as 0. The CLOB REST /book endpoint does not list levels best
+first, so the CLOB clients pass every book through sort_orderbook(); REST
+books then agree with the collector's replica, which is best first too.
+"""
+from typing import Any, Optional
+
+import numpy as np
+
+DEPTH_LEVELS = (5, 10, 20, 50)  # Snapshot bid/ask depth features
+
+
+def _level_price(level: dict) -> float:
+    try:
+        return float(level.get("price", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def sort_orderbook(orderbook: dict[str, Any]) -> dict[str, Any]:
+    """
+    Order both sides best price first (bids descending, asks ascending), in place.
+
+    Args:
+        orderbook: Orderbook dictionary with 'bids' and 'asks' arrays
+
+    Returns:
+        The same orderbook
+    """
+    if orderbook.get("bids"):
+        orderbook["bids"] = sorted(orderbook["bids"], key=_level_price, reverse=True)
+    if orderbook.get("asks"):
+        orderbook["asks"] = sorted(orderbook["asks"], key=_level_price)
+    return orderbook
+
+
+class _Side:
+    """One side (bids or asks) of every book in a batch as flat arrays."""
+
+    def __init__(self, books: list[list[dict]]):
+        self.counts = np.fromiter((len(orders) for orders in books), dtype=np.int64, count=len(books))
+        levels = [
+            (order.get("price", 0), order.get("size", 0))
+            for orders in books
+            for order in orders
+        ]
+        parsed = np.array(levels, dtype=np.float64).reshape(-1, 2)
+        self.prices = parsed[:, 0]
+        self.sizes = parsed[:, 1]
+
+        # Segment bounds and prefix sums: book i spans [starts[i], ends[i])
+        self.ends = np.cumsum(self.counts)
+        self.starts = self.ends - self.counts
+        self.cumsum = np.concatenate(([0.0], np.cumsum(self.sizes)))
+        self.segment = np.repeat(np.arange(len(books)), self.counts)
+        self.nonempty = self.counts > 0
+
+    def depth(self, levels: int) -> np.ndarray:
+        """Total size over the first N levels of each book."""
+        return self.cumsum[self.starts + np.minimum(self.counts, levels)] - self.cumsum[self.starts]
+
+    def total(self) -> np.ndarray:
+        """Total size of each book side."""
+        return self.cumsum[self.ends] - self.cumsum[self.starts]
+
+    def first(self, values: np.ndarray, default: float) -> np.ndarray:
+        """First-level value per book (default for empty sides)."""
+        return self.take(values, np.where(self.nonempty, self.starts, -1), default)
+
+    @staticmethod
+    def take(values: np.ndarray, index: np.ndarray, default: float) -> np.ndarray:
+        """values[index] per book, default where index is -1."""
+        out = np.full(len(index), default, dtype=np.float64)
+        valid = index >= 0
+        out[valid] = values[index[valid]]
+        return out
+
+    def largest(self) -> np.ndarray:
+        """Index of each book's largest level (first one on ties), -1 if empty."""
+        n = len(self.counts)
+        seg_max = np.full(n, -np.inf)
+        np.maximum.at(seg_max, self.segment, self.sizes)
+        at_max = self.sizes == seg_max[self.segment]
+        first = np.full(n, len(self.sizes), dtype=np.int64)
+        np.minimum.at(first, self.segment[at_max], np.flatnonzero(at_max))
+        return np.where(self.nonempty, first, -1)
+
+    def depth_at_price(self, price_distance: float, is_bid: bool) -> np.ndarray:
+        """Size of the leading levels within price_distance of each book's first price."""
+        if not len(self.sizes):
+            return np.zeros(len(self.counts))
+        best = self.prices[self.starts[self.segment]]
+        distance = best - self.prices if is_bid else self.prices - best
+        outside = (distance > price_distance).astype(np.int64)
+        # Stop at the first level outside the distance (later levels never
+        # count): keep levels with no outside level up to them in their book
+        running = np.cumsum(outside)
+        segment_start = self.starts[self.segment]
+        within = running - running[segment_start] + outside[segment_start] == 0
+        return np.bincount(self.segment, weights=self.sizes * within, minlength=len(self.counts))
+
+
+class OrderbookBatch:
+    """
+    Features for many orderbooks computed together.
+
+    Args:
+        orderbooks: Orderbook dictionaries with 'bids' and 'asks' arrays
+    """
+
+    def __init__(self, orderbooks: list[dict[str, Any]]):
+        self.size = len(orderbooks)
+        self.bids = _Side([book.get("bids", []) for book in orderbooks])
+        self.asks = _Side([book.get("asks", []) for book in orderbooks])
+
+    def depth_at_price(self, side: str, price_distance: float) -> list[float]:
+        """Depth within price_distance of the best price for each book."""
+        book_side = self.bids if side == "bid" else self.asks
+        return book_side.depth_at_price(price_distance, is_bid=side == "bid").tolist()
+
+    def weighted_midpoint(self) -> list[Optional[float]]:
+        """Volume-weighted midpoint per book (None unless both sides exist)."""
+        bid_price = self.bids.first(self.bids.prices, 0.0)
+        bid_size = self.bids.first(self.bids.sizes, 0.0)
+        ask_price = self.asks.first(self.asks.prices, 0.0)
+        ask_size = self.asks.first(self.asks.sizes, 0.0)
+        total = bid_size + ask_size
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted = np.where(
+                total == 0,
+                (bid_price + ask_price) / 2,
+                (bid_price * ask_size + ask_price * bid_size) / total,
+            )
+        both = self.bids.nonempty & self.asks.nonempty
+        return [float(w) if ok else None for w, ok in zip(weighted, both)]
+
+    def features(self) -> list[dict[str, Any]]:
+        """
+        Snapshot features per book, same keys and values as
+        CLOBClient.extract_orderbook_features.
+        """
+        columns: dict[str, list] = {}
+        for name, book_side in (("bid", self.bids), ("ask", self.asks)):
+            for n in DEPTH_LEVELS:
+                columns[f"{name}_depth_{n}"] = book_side.depth(n).tolist()
+        columns["bid_levels"] = self.bids.counts.tolist()
+        columns["ask_levels"] = self.asks.counts.tolist()
+
+        bid_total = self.bids.total()
+        ask_total = self.asks.total()
+        total = bid_total + ask_total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            imbalance = np.where(total == 0, 0.0, (bid_total - ask_total) / total)
+        columns["book_imbalance"] = imbalance.tolist()
+
+        for name, book_side in (("bid", self.bids), ("ask", self.asks)):
+            wall = book_side.largest()
+            columns[f"{name}_wall_price"] = book_side.take(book_side.prices, wall, 0.0).tolist()
+            columns[f"{name}_wall_size"] = book_side.take(book_side.sizes, wall, 0.0).tolist()
+
+        best_bids = [float(p) if ok else None for p, ok in zip(self.bids.first(self.bids.prices, 0.0), self.bids.nonempty)]
+        best_asks = [float(p) if ok else None for p, ok in zip(self.asks.first(self.asks.prices, 0.0), self.asks.nonempty)]
+
+        results = []
+        for i in range(self.size):
+            features = {key: values[i] for key, values in columns.items()}
+            best_bid = best_bids[i]
+            best_ask = best_asks[i]
+            features["best_bid"] = best_bid
+            features["best_ask"] = best_ask
+            features["spread"] = (best_ask - best_bid) if (best_bid and best_ask) else None
+            results.append(features)
+        return results
+
+    def summaries(self) -> list[dict[str, Any]]:
+        """
+        Per-book totals and largest levels (orderbook_snapshots columns).
+        """
+        columns: dict[str, list] = {
+            "total_bid_depth": self.bids.total().tolist(),
+            "total_ask_depth": self.asks.total().tolist(),
+            "num_bid_levels": self.bids.counts.tolist(),
+            "num_ask_levels": self.asks.counts.tolist(),
+        }
+        for name, book_side in (("bid", self.bids), ("ask", self.asks)):
+            wall = book_side.largest()
+            columns[f"largest_{name}_price"] = [
+                float(book_side.prices[i]) if i >= 0 else None for i in wall
+            ]
+            columns[f"largest_{name}_size"] = [
+                float(book_side.sizes[i]) if i >= 0 else None for i in wall
+            ]
+        return [
+            {key: values[i] for key, values in columns.items()}
+            for i in range(self.size)
+        ]
+
+
+def extract_orderbook_features(orderbook: dict[str, Any]) -> dict[str, Any]:
+    """
+    Extract all orderbook-derived features for one book.
+
+    Args:
+        orderbook: Raw orderbook dictionary from API
+
+    Returns:
+        Dictionary with all computed features
+    """
+    return OrderbookBatch([orderbook]).features()[0]
@@ -0,0 +1,265 @@
+"""
+Distributed token-bucket rate limiting shared by every worker.
+
+The in-process limiters in base.py give each Celery worker (and the
+collector) its own bucket, so N processes send N times the configured rate.
+With settings.rate_limit_distributed the API clients use one Redis bucket
+per API instead:
+
+- A Lua script refills and takes tokens atomically using the Redis clock,
+  so buckets are exact across hosts and never overshoot the rate
+- Optional per-endpoint buckets (e.g. CLOB /book) are checked in the same
+  script; a request needs a token from the API bucket and its endpoint bucket
+- Each process takes a small batch of tokens per round trip (prefetch) and
+  hands them out locally; unused tokens lapse after a short lease
+- Waiting never holds a lock, so threads/coroutines do not serialize
+- If Redis is unreachable the limiter degrades to the process-local bucket
+- A limiter that opened its own Redis connection closes it with the client
+  (BaseClient.close / SyncBaseClient.close), so per-run clients do not leak
+  pools
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import redis as redis_sync
+import redis.asyncio as redis_async
+from redis.exceptions import RedisError
+import structlog
+
+from src.config.settings import settings
+
+logger = structlog.get_logger()
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit"
+LOCAL_TOKEN_LEASE = 1.0  # Seconds a prefetched token may be held before it lapses
+DEGRADED_RETRY_SECONDS = 5.0  # Use the local bucket this long after a Redis failure
+
+# KEYS: bucket hashes. ARGV[1]: tokens wanted; then rate, capacity per key.
+# Takes min(wanted, tokens available in every bucket) from all buckets and
+# returns {granted, ms until one token is available when nothing was granted}.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local granted = tonumber(ARGV[1])
+local levels = {}
+local wait = 0
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if tokens == nil or ts == nil then
+        tokens = capacity
+        ts = now
+    end
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if math.floor(tokens) < granted then
+        granted = math.floor(tokens)
+    end
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+if granted < 0 then
+    granted = 0
+end
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(levels[i] - granted), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate * 1000) + 1000)
+end
+return {granted, math.ceil(wait * 1000)}
+"""
+
+
+@dataclass
+class _LocalTokens:
+    """Tokens taken from Redis and not yet handed out."""
+    count: int = 0
+    expires_at: float = 0.0
+
+
+class _DistributedBucket:
+    """Bucket layout, prefetch sizing and local token pools (shared by both limiters)."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        endpoint_rates: Optional[dict[str, float]] = None,
+        prefetch_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            name: API name; buckets are ratelimit:{name}[:{endpoint}]
+            rate: API-wide requests per second (also the burst capacity)
+            endpoint_rates: Path -> requests per second for extra endpoint buckets
+            prefetch_seconds: Tokens taken per Redis round trip, in seconds of rate
+        """
+        self.name = name
+        self.rate = rate
+        self.endpoint_rates = endpoint_rates or {}
+        self.prefetch_seconds = (
+            settings.rate_limit_prefetch_seconds if prefetch_seconds is None else prefetch_seconds
+        )
+        self._pools: dict[Optional[str], _LocalTokens] = {}
+        self._degraded_until = 0.0
+
+    def _plan(self, endpoint: Optional[str]) -> tuple[Optional[str], list[str], list]:
+        """Local pool key, bucket keys and script args for a request."""
+        keys = [f"{RATE_LIMIT_KEY_PREFIX}:{self.name}"]
+        rates = [self.rate]
+        pool = None
+        endpoint_rate = self.endpoint_rates.get(endpoint) if endpoint else None
+        if endpoint_rate:
+            keys.append(f"{RATE_LIMIT_KEY_PREFIX}:{self.name}:{endpoint}")
+            rates.append(endpoint_rate)
+            pool = endpoint
+        batch = max(1, int(min(rates) * self.prefetch_seconds))
+        args: list = [batch]
+        for rate in rates:
+            args.extend([rate, rate])  # Capacity = 1 second of tokens
+        return pool, keys, args
+
+    def _take_local(self, pool: Optional[str], now: float) -> bool:
+        tokens = self._pools.get(pool)
+        if tokens is None or tokens.count <= 0 or now >= tokens.expires_at:
+            return False
+        tokens.count -= 1
+        return True
+
+    def _store_local(self, pool: Optional[str], granted: int, now: float) -> None:
+        """Keep the tokens beyond the one being used right now."""
+        if granted > 1:
+            self._pools[pool] = _LocalTokens(granted - 1, now + LOCAL_TOKEN_LEASE)
+
+    def _degraded(self, now: float) -> bool:
+        return now < self._degraded_until
+
+    def _mark_degraded(self, now: float, error: Exception) -> None:
+        self._degraded_until = now + DEGRADED_RETRY_SECONDS
+        logger.warning(
+            "Distributed rate limiter unavailable, using local bucket",
+            bucket=self.name,
+            error=str(error),
+        )
+
+
+class SyncDistributedRateLimiter(_DistributedBucket):
+    """Redis token bucket for synchronous clients (thread-safe)."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        fallback,
+        endpoint_rates: Optional[dict[str, float]] = None,
+        prefetch_seconds: Optional[float] = None,
+        redis_client: Optional[redis_sync.Redis] = None,
+    ):
+        """
+        Args:
+            fallback: Process-local limiter used while Redis is unreachable
+            redis_client: Redis connection (defaults to settings.redis_url)
+        """
+        super().__init__(name, rate, endpoint_rates, prefetch_seconds)
+        self.fallback = fallback
+        self._owns_redis = redis_client is None
+        self.redis = redis_client or redis_sync.from_url(
+            settings.redis_url, socket_timeout=2.0, socket_connect_timeout=2.0
+        )
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the Redis connection pool if this limiter opened it."""
+        if self._owns_redis:
+            self.redis.close()
+            self._owns_redis = False
+
+    def acquire(self, endpoint: Optional[str] = None) -> None:
+        """Wait for a token for this API (and endpoint, if it has a bucket)."""
+        pool, keys, args = self._plan(endpoint)
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                if self._take_local(pool, now):
+                    return
+                degraded = self._degraded(now)
+            if degraded:
+                self.fallback.acquire(endpoint)
+                return
+
+            try:
+                granted, wait_ms = self._script(keys=keys, args=args)
+            except RedisError as e:
+                with self._lock:
+                    self._mark_degraded(now, e)
+                continue
+
+            if granted:
+                with self._lock:
+                    self._store_local(pool, int(granted), time.monotonic())
+                return
+            time.sleep(max(int(wait_ms), 1) / 1000)
+
+
+class DistributedRateLimiter(_DistributedBucket):
+    """Redis token bucket for async clients."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        fallback,
+        endpoint_rates: Optional[dict[str, float]] = None,
+        prefetch_seconds: Optional[float] = None,
+        redis_client: Optional[redis_async.Redis] = None,
+    ):
+        """
+        Args:
+            fallback: Process-local limiter used while Redis is unreachable
+            redis_client: Redis connection (defaults to settings.redis_url)
+        """
+        super().__init__(name, rate, endpoint_rates, prefetch_seconds)
+        self.fallback = fallback
+        self._owns_redis = redis_client is None
+        self.redis = redis_client or redis_async.from_url(
+            settings.redis_url, socket_timeout=2.0, socket_connect_timeout=2.0
+        )
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool if this limiter opened it (on its own loop)."""
+        if self._owns_redis:
+            await self.redis.aclose()
+            self._owns_redis = False
+
+    async def acquire(self, endpoint: Optional[str] = None) -> None:
+        """Wait for a token for this API (and endpoint, if it has a bucket)."""
+        pool, keys, args = self._plan(endpoint)
+        while True:
+            now = time.monotonic()
+            # Single-threaded: pool bookkeeping needs no lock between awaits
+            if self._take_local(pool, now):
+                return
+            if self._degraded(now):
+                await self.fallback.acquire(endpoint)
+                return
+
+            try:
+                granted, wait_ms = await self._script(keys=keys, args=args)
+            except RedisError as e:
+                self._mark_degraded(now, e)
+                continue
+
+            if granted:
+                self._store_local(pool, int(granted), time.monotonic())
+                return
+            await asyncio.sleep(max(int(wait_ms), 1) / 1000)
@@ -0,0 +1,11 @@
+"""
+Snapshot collection logic used by the Celery snapshot tasks.
+
+Kept outside src.tasks so it imports without the Celery app:
+
+- scheduling: Activity-driven snapshot scheduling and batch sizing
+- dedup: Change-suppressed snapshot writes
+- engine: Asyncio fetch stage for orderbooks and trade metrics
+- storage: Tier batch loading, snapshot row building and bulk writes
+- clients: Worker-lifetime API and Redis clients shared by tasks
+"""
@@ -0,0 +1,168 @@
+"""
+Worker-lifetime API and Redis clients for Celery tasks.
+
+Snapshot tasks run every few seconds; building fresh clients per run meant
+new TCP/TLS handshakes to CLOB/Gamma and new Redis pools every time. Each
+worker process instead keeps one client of each kind:
+
+- Created on worker_process_init (after fork) and warmed with a ping
+- Shared by every task the process runs (rate limiter and circuit breaker
+  state carry over between runs)
+- Health-checked at most every worker_client_health_interval seconds when
+  handed out; a closed HTTP client or failed Redis ping is replaced
+- Closed on worker_process_shutdown
+
+The SQLAlchemy engine pool inherited from the parent is discarded on
+process init so every worker opens (and keeps) its own Postgres connections.
+
+The async snapshot engine's CLOB/Redis clients live on a persistent
+per-process event loop (run()) for the same reason.
+
+Outside a worker (scripts, tests) the clients are created lazily on first use.
+"""
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, Coroutine, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+import structlog
+
+from src.config.settings import settings
+from src.db.database import engine
+from src.db.redis import RedisClient, SyncRedisClient
+from src.fetchers.base import BaseClient, SyncBaseClient
+from src.fetchers.clob import CLOBClient, SyncCLOBClient
+from src.fetchers.gamma import SyncGammaClient
+
+logger = structlog.get_logger()
+
+
+class WorkerClients:
+    """Lazily created, health-checked clients shared by tasks in one process."""
+
+    def __init__(self, health_interval: Optional[float] = None):
+        """
+        Initialize the pool (no connections are opened yet).
+
+        Args:
+            health_interval: Min seconds between health checks per client
+        """
+        self.health_interval = (
+            settings.worker_client_health_interval if health_interval is None else health_interval
+        )
+        self._clients: dict[str, object] = {}
+        self._checked_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def gamma(self) -> SyncGammaClient:
+        """Shared Gamma API client."""
+        return self._get("gamma", SyncGammaClient, self._http_healthy)
+
+    def clob(self) -> SyncCLOBClient:
+        """Shared CLOB API client."""
+        return self._get("clob", SyncCLOBClient, self._http_healthy)
+
+    def redis(self) -> SyncRedisClient:
+        """Shared Redis client."""
+        return self._get("redis", SyncRedisClient, self._redis_healthy)
+
+    def async_clob(self) -> CLOBClient:
+        """Shared async CLOB client (use only inside run())."""
+        return self._get("async_clob", CLOBClient, self._http_healthy)
+
+    def async_redis(self) -> RedisClient:
+        """Shared async Redis client (use only inside run())."""
+        # redis-py replaces dropped pool connections on the next command
+        return self._get("async_redis", RedisClient, lambda client: True)
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on this process's persistent event loop.
+
+        The async clients stay bound to this loop, so their keep-alive
+        connections survive between task runs.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def warm(self) -> None:
+        """Create all clients and open the Redis connection up front."""
+        self.gamma()
+        self.clob()
+        if not self.redis().ping():
+            logger.warning("Redis unreachable while warming worker clients")
+
+    def close(self) -> None:
+        """Close every client (they are recreated on next use)."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._checked_at.clear()
+        for client in clients:
+            self._close_client(client)
+        loop, self._loop = self._loop, None
+        if loop is not None and not loop.is_closed():
+            loop.close()
+
+    def _close_client(self, client) -> None:
+        try:
+            result = client.close()
+            if inspect.isawaitable(result):
+                # Async clients close on the loop their connections belong to
+                if self._loop is not None and not self._loop.is_closed() and not self._loop.is_running():
+                    self._loop.run_until_complete(result)
+                else:
+                    result.close()
+        except Exception as e:
+            logger.debug("Worker client close failed", error=str(e))
+
+    def _get(self, name: str, factory: Callable, healthy: Callable[[object], bool]):
+        with self._lock:
+            client = self._clients.get(name)
+            now = time.monotonic()
+            if client is not None and now - self._checked_at.get(name, 0.0) >= self.health_interval:
+                if not healthy(client):
+                    logger.warning("Worker client unhealthy, reconnecting", client=name)
+                    self._close_client(client)
+                    client = None
+                self._checked_at[name] = now
+            if client is None:
+                client = factory()
+                self._clients[name] = client
+                self._checked_at[name] = now
+            return client
+
+    @staticmethod
+    def _http_healthy(client: SyncBaseClient | BaseClient) -> bool:
+        # httpx drops dead keep-alive connections itself; only a closed client is fatal
+        return not client.is_closed
+
+    @staticmethod
+    def _redis_healthy(client: SyncRedisClient) -> bool:
+        return client.ping()
+
+
+# Per-process pool used by the snapshot tasks
+worker_clients = WorkerClients()
+
+
+@worker_process_init.connect
+def _init_worker_clients(**kwargs) -> None:
+    # Connections inherited from the parent must not be shared across processes
+    engine.dispose(close=False)
+    worker_clients.close()
+    try:
+        worker_clients.warm()
+    except Exception as e:
+        # Clients are created lazily on first use instead
+        logger.warning("Worker client warm-up failed", error=str(e))
+
+
+@worker_process_shutdown.connect
+def _close_worker_clients(**kwargs) -> None:
+    worker_clients.close()
+    engine.dispose()
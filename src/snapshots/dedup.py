@@ -0,0 +1,163 @@
+"""
+Change-suppressed snapshot writes.
+
+With snapshot_dedup_enabled, a snapshot row is only written when its
+features moved since the market's last *written* row:
+
+- Price-like columns (prices, spreads, ratios, imbalance) compare with an
+  absolute tolerance (snapshot_dedup_abs_tolerance)
+- Volumes, depths and counts compare relative to the old value
+  (snapshot_dedup_rel_tolerance)
+- Clock-derived columns (hours_to_close, time_since_whale, ...) are ignored
+- A value appearing or disappearing always counts as a change
+- A row is always written once the last written one is older than
+  snapshot_dedup_max_age, so every market keeps a heartbeat
+
+The last written vector per market lives in Redis
+(snapshot:written:{condition_id}, expiring a day after the market's last
+write), so all workers share it. Suppressed rows still bump
+Market.last_snapshot_at and are counted in snapshot_suppressions, keeping
+coverage/gap monitoring intact.
+"""
+import time
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.db.redis import SyncRedisClient
+
+logger = structlog.get_logger()
+
+# Columns that are not compared (identity or derived from the clock)
+IGNORED_COLUMNS = frozenset({
+    "market_id", "timestamp", "tier",
+    "hours_to_close", "day_of_week", "hour_of_day", "time_since_whale",
+})
+
+# Columns compared with the absolute tolerance; all others are relative
+ABSOLUTE_COLUMNS = frozenset({
+    "price", "best_bid", "best_ask", "spread", "last_trade_price",
+    "price_change_1d", "price_change_1w", "price_change_1m",
+    "book_imbalance", "bid_wall_price", "ask_wall_price",
+    "vwap_1h", "whale_buy_ratio_1h", "pct_volume_from_whales",
+})
+
+
+def feature_vector(row: dict) -> dict:
+    """Compared columns of a snapshot row."""
+    return {key: value for key, value in row.items() if key not in IGNORED_COLUMNS}
+
+
+def features_changed(
+    previous: dict,
+    current: dict,
+    abs_tolerance: float,
+    rel_tolerance: float,
+) -> bool:
+    """
+    True if any compared column moved beyond its tolerance.
+
+    Args:
+        previous: Feature vector of the last written row
+        current: Feature vector of the new row
+        abs_tolerance: Max unchanged move for ABSOLUTE_COLUMNS
+        rel_tolerance: Max unchanged move for other columns, as a fraction
+                       of the old value (at least 1 unit of it)
+    """
+    for key, new in current.items():
+        old = previous.get(key)
+        if (old is None) != (new is None):
+            return True
+        if old is None or old == new:
+            continue
+        try:
+            delta = abs(float(new) - float(old))
+        except (TypeError, ValueError):
+            return True
+        if key in ABSOLUTE_COLUMNS:
+            if delta > abs_tolerance:
+                return True
+        elif delta > rel_tolerance * max(abs(float(old)), 1.0):
+            return True
+    return False
+
+
+def select_changed_rows(
+    rows: list[dict],
+    condition_ids: list[str],
+    previous: dict[str, dict],
+    now: float,
+    max_age: Optional[float] = None,
+) -> tuple[list[int], dict[str, dict]]:
+    """
+    Decide which snapshot rows to write.
+
+    Args:
+        rows: Snapshot rows built this run
+        condition_ids: Condition ID of each row (same order)
+        previous: condition_id -> {"ts": epoch seconds, "features": vector}
+                  of the last written row
+        now: Epoch seconds
+        max_age: Force a write after this many seconds (default from settings)
+
+    Returns:
+        (indexes of rows to write, condition_id -> entry to store once written)
+    """
+    max_age = settings.snapshot_dedup_max_age if max_age is None else max_age
+    abs_tolerance = settings.snapshot_dedup_abs_tolerance
+    rel_tolerance = settings.snapshot_dedup_rel_tolerance
+
+    keep: list[int] = []
+    written: dict[str, dict] = {}
+    for i, (row, condition_id) in enumerate(zip(rows, condition_ids)):
+        current = feature_vector(row)
+        last = previous.get(condition_id)
+        if (
+            last
+            and now - last.get("ts", 0) < max_age
+            and not features_changed(last.get("features", {}), current, abs_tolerance, rel_tolerance)
+        ):
+            continue
+        keep.append(i)
+        written[condition_id] = {"ts": now, "features": current}
+    return keep, written
+
+
+def suppress_unchanged(
+    redis_client: SyncRedisClient,
+    tier: int,
+    snapshot_rows: list[dict],
+    condition_ids: list[str],
+) -> tuple[list[dict], set[int], dict[str, dict]]:
+    """
+    Drop snapshot rows whose features did not move since the last written row.
+
+    Args:
+        snapshot_rows: Rows built this run
+        condition_ids: Condition ID of each row (same order)
+
+    Returns:
+        (rows to write, suppressed market IDs, condition_id -> entry to store once written)
+    """
+    try:
+        previous = redis_client.get_snapshot_written(condition_ids)
+    except Exception as e:
+        # Without the last written vectors every row is written
+        logger.warning("Snapshot dedup read failed", tier=tier, error=str(e))
+        previous = {}
+
+    keep, written = select_changed_rows(snapshot_rows, condition_ids, previous, time.time())
+    kept = set(keep)
+    suppressed = {row["market_id"] for i, row in enumerate(snapshot_rows) if i not in kept}
+    return [snapshot_rows[i] for i in keep], suppressed, written
+
+
+def store_written_entries(redis_client: SyncRedisClient, entries: dict[str, dict]) -> None:
+    """Record the feature vectors of written snapshots (non-fatal on failure)."""
+    if not entries:
+        return
+    try:
+        redis_client.set_snapshot_written(entries)
+    except Exception as e:
+        logger.warning("Snapshot dedup write failed", markets=len(entries), error=str(e))
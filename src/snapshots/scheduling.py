@@ -0,0 +1,216 @@
+"""
+Activity-driven snapshot scheduling.
+
+Beat runs adaptive tiers at their minimum interval; on each run the
+snapshot task keeps only the markets that are due:
+
+- Never snapshotted (no stored state): due
+- Older than the tier's max interval: due (heartbeat, bounds data gaps)
+- Younger than the tier's min interval: skipped
+- Unchanged since the last snapshot: skipped until the max interval
+- Changed: due once the activity interval has passed, which goes from the
+  tier's regular interval down to the min as the trade rate approaches
+  adaptive_snapshot_hot_trades_per_min
+
+"Changed" compares price, best bid/ask, spread and last trade price from
+Gamma plus the collector's last_trade_at against the values stored in
+snapshot:state:{condition_id} when the market was last snapshotted. Only a
+newer trade counts: the rolling 1h trade count also falls as old trades
+expire, so it sets the activity interval but is not a change signal. Each
+market has its own key with SNAPSHOT_STATE_TTL, so markets that stop being
+snapshotted (resolved, re-tiered) age out on their own.
+
+batch_count sizes dynamically batched tiers (snapshot_dynamic_batches).
+"""
+import math
+import time
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.db.redis import SyncRedisClient
+from src.fetchers.gamma import GammaClient
+
+logger = structlog.get_logger()
+
+# State list layout stored per market in snapshot:state:{condition_id}
+STATE_FIELDS = ("ts", "price", "best_bid", "best_ask", "spread", "last_trade_price", "last_trade_at")
+_GAMMA_FIELDS = (
+    ("price", None),
+    ("best_bid", "bestBid"),
+    ("best_ask", "bestAsk"),
+    ("spread", "spread"),
+    ("last_trade_price", "lastTradePrice"),
+)
+
+
+def adaptive_tier(tier: int) -> bool:
+    """True if the tier's snapshots are activity-scheduled."""
+    return (
+        settings.adaptive_snapshots_enabled
+        and tier in settings.adaptive_snapshot_min_interval
+        and tier in settings.adaptive_snapshot_max_interval
+    )
+
+
+def tier_schedule(tier: int, default: float) -> float:
+    """Beat interval for a tier: its min interval when adaptive, else default."""
+    if adaptive_tier(tier):
+        return settings.adaptive_snapshot_min_interval[tier]
+    return default
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def market_state(
+    market_data: dict,
+    price: Optional[float],
+    last_trade_at: Optional[float],
+    now: float,
+) -> list:
+    """Current state of a market in STATE_FIELDS order."""
+    values = [now]
+    for name, key in _GAMMA_FIELDS:
+        values.append(price if key is None else _float(market_data.get(key)))
+    values.append(last_trade_at)
+    return values
+
+
+def state_changed(previous: list, current: list, epsilon: float) -> bool:
+    """True if any tracked value moved by more than epsilon or a newer trade arrived."""
+    for i in range(1, len(STATE_FIELDS)):
+        old = previous[i] if i < len(previous) else None
+        new = current[i]
+        if STATE_FIELDS[i] == "last_trade_at":
+            # Only new activity counts (an unpublished market is not a change)
+            if new is not None and (old is None or new > old):
+                return True
+            continue
+        if (old is None) != (new is None):
+            return True
+        if old is None:
+            continue
+        if abs(new - old) > epsilon:
+            return True
+    return False
+
+
+def activity_interval(tier: int, trade_count: Optional[int]) -> float:
+    """Snapshot interval for a changed market given its 1h trade count."""
+    min_interval = settings.adaptive_snapshot_min_interval[tier]
+    base = max(float(getattr(settings, f"tier_{tier}_interval")), min_interval)
+    trades_per_min = (trade_count or 0) / 60.0
+    heat = min(1.0, trades_per_min / settings.adaptive_snapshot_hot_trades_per_min)
+    return base - (base - min_interval) * heat
+
+
+def select_due_markets(
+    tier: int,
+    current: dict[str, list],
+    previous: dict[str, list],
+    now: Optional[float] = None,
+    trade_counts: Optional[dict[str, int]] = None,
+) -> list[str]:
+    """
+    Pick the markets to snapshot this run.
+
+    Args:
+        tier: Adaptive tier
+        current: condition_id -> current state (market_state)
+        previous: condition_id -> state stored at the last snapshot
+        now: Epoch seconds
+        trade_counts: condition_id -> rolling 1h trade count (activity interval)
+
+    Returns:
+        Condition IDs that are due
+    """
+    now = now or time.time()
+    trade_counts = trade_counts or {}
+    min_interval = settings.adaptive_snapshot_min_interval[tier]
+    max_interval = settings.adaptive_snapshot_max_interval[tier]
+    epsilon = settings.adaptive_snapshot_price_epsilon
+    # Beat jitter: a run slightly early still counts for that interval
+    slack = min_interval * 0.1
+
+    due = []
+    for condition_id, state in current.items():
+        last = previous.get(condition_id)
+        if not last:
+            due.append(condition_id)
+            continue
+        elapsed = now - last[0] + slack
+        if elapsed >= max_interval:
+            due.append(condition_id)
+        elif elapsed < min_interval:
+            continue
+        elif (
+            state_changed(last, state, epsilon)
+            and elapsed >= activity_interval(tier, trade_counts.get(condition_id))
+        ):
+            due.append(condition_id)
+    return due
+
+
+def select_adaptive(
+    redis_client: SyncRedisClient,
+    tier: int,
+    tier_markets: list[dict],
+) -> tuple[list[dict], dict[str, list]]:
+    """
+    Keep only the markets due for a snapshot under adaptive scheduling.
+
+    Returns:
+        (due Gamma markets, condition_id -> state to store once written)
+    """
+    now_ts = time.time()
+    condition_ids = [m.get("conditionId") for m in tier_markets]
+    try:
+        previous, activity = redis_client.get_snapshot_activity(condition_ids)
+    except Exception as e:
+        # Without state every market is due - same as fixed scheduling
+        logger.warning("Snapshot state read failed", tier=tier, error=str(e))
+        previous, activity = {}, {}
+
+    current = {
+        m.get("conditionId"): market_state(
+            m,
+            GammaClient.parse_outcome_prices(m)[0],
+            activity.get(m.get("conditionId"), (None, None))[1],
+            now_ts,
+        )
+        for m in tier_markets
+    }
+    trade_counts = {cid: trade_count for cid, (trade_count, _) in activity.items()}
+    due = set(select_due_markets(tier, current, previous, now_ts, trade_counts))
+    return (
+        [m for m in tier_markets if m.get("conditionId") in due],
+        {cid: current[cid] for cid in due},
+    )
+
+
+def store_adaptive_states(redis_client: SyncRedisClient, states: dict[str, list]) -> None:
+    """Record the state of snapshotted markets (non-fatal on failure)."""
+    if not states:
+        return
+    try:
+        redis_client.set_snapshot_state(states)
+    except Exception as e:
+        logger.warning("Snapshot state write failed", markets=len(states), error=str(e))
+
+
+def batch_count(market_count: int, workers: Optional[int] = None) -> int:
+    """
+    Number of snapshot batches for a tier run.
+
+    One batch per snapshot_batch_target_size markets, capped by the workers
+    available to run them in parallel (at least one batch).
+    """
+    workers = workers or settings.snapshot_batch_workers
+    wanted = math.ceil(market_count / max(settings.snapshot_batch_target_size, 1))
+    return max(1, min(wanted, workers))
@@ -0,0 +1,227 @@
+"""
+Snapshot rows and their database writes.
+
+Tier runs build plain column dictionaries (no ORM unit of work) and write
+them with executemany INSERTs plus one bookkeeping UPDATE per run:
+
+- tier_filter / load_tier_markets: Markets of a tier run, optionally one
+  batch of it (Market.id % total_batches == batch, so batches never overlap)
+- snapshot_row / orderbook_row: Rows from Gamma data, orderbook features
+  and trade metrics; every row carries every key so executemany batches
+- write_snapshots: Inserts rows (packed orderbook depth in "packed"
+  storage mode), bumps last_snapshot_at/snapshot_count and counts
+  suppressed markets in snapshot_suppressions
+"""
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+import structlog
+
+from src.config.settings import settings
+from src.db.database import get_session
+from src.db.models import Market, OrderbookSnapshot, Snapshot, SnapshotSuppression
+from src.db.orderbook_storage import encode_orderbook_rows, load_keyframes
+from src.fetchers.gamma import GammaClient
+
+logger = structlog.get_logger()
+
+# Snapshot columns filled from orderbook features / trade metrics (same key
+# names on both sides); every row carries every key so executemany batches
+ORDERBOOK_FEATURE_COLUMNS = (
+    "bid_depth_5", "bid_depth_10", "bid_depth_20", "bid_depth_50",
+    "ask_depth_5", "ask_depth_10", "ask_depth_20", "ask_depth_50",
+    "bid_levels", "ask_levels", "book_imbalance",
+    "bid_wall_price", "bid_wall_size", "ask_wall_price", "ask_wall_size",
+)
+TRADE_METRIC_COLUMNS = (
+    "trade_count_1h", "buy_count_1h", "sell_count_1h",
+    "volume_1h", "buy_volume_1h", "sell_volume_1h",
+    "avg_trade_size_1h", "max_trade_size_1h", "vwap_1h",
+    "whale_count_1h", "whale_volume_1h", "whale_buy_volume_1h", "whale_sell_volume_1h",
+    "whale_net_flow_1h", "whale_buy_ratio_1h", "time_since_whale", "pct_volume_from_whales",
+)
+
+
+def tier_filter(tier: int) -> tuple:
+    """WHERE clauses for the active, unresolved markets of a tier."""
+    return (
+        Market.tier == tier,
+        Market.active == True,
+        Market.resolved == False,
+    )
+
+
+def load_tier_markets(
+    session: Session,
+    tier: int,
+    batch: int = 0,
+    total_batches: int = 1,
+) -> list:
+    """
+    Load the columns snapshot tasks need for a tier (or one batch of it).
+
+    Returns:
+        Rows with id, condition_id, yes_token_id and end_date
+    """
+    query = select(
+        Market.id, Market.condition_id, Market.yes_token_id, Market.end_date
+    ).where(*tier_filter(tier))
+    if total_batches > 1:
+        query = query.where(Market.id % total_batches == batch)
+    return session.execute(query).all()
+
+
+def safe_float(value, field_name: str = "field") -> Optional[float]:
+    """
+    Safely convert value to float, returning None on failure.
+
+    Logs warning for suspicious but valid values.
+    """
+    if value is None:
+        return None
+    try:
+        result = float(value)
+        # Log suspicious values but don't reject them
+        if result < 0:
+            logger.debug(f"Negative value for {field_name}", value=result)
+        return result
+    except (ValueError, TypeError) as e:
+        logger.debug(f"Invalid value for {field_name}", value=value, error=str(e))
+        return None
+
+
+def snapshot_row(
+    market_data: dict,
+    market_id: int,
+    tier: int,
+    now: datetime,
+    end_date: Optional[datetime],
+    features: Optional[dict],
+    metrics: Optional[dict],
+) -> dict:
+    """
+    Build a snapshots row from Gamma data, orderbook features and trade metrics.
+
+    Returns:
+        Column dictionary for a bulk INSERT
+    """
+    yes_price, _ = GammaClient.parse_outcome_prices(market_data)
+    features = features or {}
+    metrics = metrics or {}
+
+    row = {
+        "market_id": market_id,
+        "timestamp": now,
+        "tier": tier,
+        # === PRICE FIELDS ===
+        "price": yes_price,
+        "best_bid": safe_float(market_data.get("bestBid")),
+        "best_ask": safe_float(market_data.get("bestAsk")),
+        "spread": safe_float(market_data.get("spread")),
+        "last_trade_price": safe_float(market_data.get("lastTradePrice")),
+        # === MOMENTUM (FREE from Gamma!) ===
+        "price_change_1d": safe_float(market_data.get("oneDayPriceChange")),
+        "price_change_1w": safe_float(market_data.get("oneWeekPriceChange")),
+        "price_change_1m": safe_float(market_data.get("oneMonthPriceChange")),
+        # === VOLUME ===
+        "volume_total": safe_float(market_data.get("volumeNum")),
+        "volume_24h": safe_float(market_data.get("volume24hr")),
+        "volume_1w": safe_float(market_data.get("volume1wk")),
+        "liquidity": safe_float(market_data.get("liquidityNum")),
+        # === CONTEXT ===
+        "hours_to_close": (end_date - now).total_seconds() / 3600 if end_date else None,
+        "day_of_week": now.weekday(),
+        "hour_of_day": now.hour,
+    }
+    for column in ORDERBOOK_FEATURE_COLUMNS:
+        row[column] = features.get(column)
+    for column in TRADE_METRIC_COLUMNS:
+        row[column] = metrics.get(column)
+
+    # Use CLOB prices only if BOTH sides exist and spread is reasonable
+    clob_bid = features.get("best_bid")
+    clob_ask = features.get("best_ask")
+    clob_spread = features.get("spread")
+    if clob_bid and clob_ask and clob_spread and clob_spread < 0.5:
+        row["best_bid"] = clob_bid
+        row["best_ask"] = clob_ask
+        row["spread"] = clob_spread
+
+    return row
+
+
+def orderbook_row(market_id: int, now: datetime, raw: dict, summary: dict) -> dict:
+    """Build an orderbook_snapshots row from a raw CLOB orderbook and its summary."""
+    return {
+        "market_id": market_id,
+        "timestamp": now,
+        "bids": raw.get("bids", []),
+        "asks": raw.get("asks", []),
+        **summary,
+    }
+
+
+def write_snapshots(
+    now: datetime,
+    tier: int,
+    snapshot_rows: list[dict],
+    orderbook_rows: list[dict],
+    suppressed_ids: Collection[int] = (),
+) -> None:
+    """
+    Insert snapshot and orderbook rows and update market bookkeeping.
+
+    Core INSERTs (executemany, batched into multi-row VALUES by SQLAlchemy)
+    plus one UPDATE for every snapshotted market, in a single transaction.
+    Suppressed (unchanged) markets still get last_snapshot_at and are
+    counted in snapshot_suppressions so coverage monitoring sees them.
+    """
+    if not snapshot_rows and not orderbook_rows and not suppressed_ids:
+        return
+
+    with get_session() as session:
+        if snapshot_rows:
+            session.execute(insert(Snapshot.__table__), snapshot_rows)
+        if orderbook_rows:
+            if settings.orderbook_storage_mode == "packed":
+                keyframes = {}
+                if settings.orderbook_delta_encoding:
+                    keyframes = load_keyframes(
+                        session,
+                        [row["market_id"] for row in orderbook_rows],
+                        since=now - timedelta(seconds=settings.orderbook_keyframe_seconds),
+                    )
+                encode_orderbook_rows(orderbook_rows, keyframes)
+            session.execute(insert(OrderbookSnapshot.__table__), orderbook_rows)
+
+        # Update market last_snapshot_at and snapshot_count (written rows only)
+        written_ids = [row["market_id"] for row in snapshot_rows]
+        snapshot_count = Market.snapshot_count + 1
+        if suppressed_ids:
+            snapshot_count = Market.snapshot_count + case((Market.id.in_(written_ids), 1), else_=0)
+        market_ids = written_ids + list(suppressed_ids)
+        if market_ids:
+            session.execute(
+                update(Market)
+                .where(Market.id.in_(market_ids))
+                .values(
+                    last_snapshot_at=now,
+                    snapshot_count=snapshot_count,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        if suppressed_ids:
+            bucket = now.replace(second=0, microsecond=0)
+            stmt = pg_insert(SnapshotSuppression).values(
+                tier=tier, bucket=bucket, suppressed=len(suppressed_ids)
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=["tier", "bucket"],
+                set_={"suppressed": SnapshotSuppression.suppressed + stmt.excluded.suppressed},
+            ))
+
+        session.commit()
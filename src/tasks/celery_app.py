@@ -17,6 +17,7 @@ from celery import Celery
 from celery.schedules import crontab
 
 from src.config.settings import settings
+from src.snapshots.scheduling import tier_schedule
 
 # Create Celery app
 app = Celery(
@@ -61,6 +62,7 @@ app.conf.update(
     task_routes={
         "src.tasks.snapshots.snapshot_tier": {"queue": "snapshots"},
         "src.tasks.snapshots.snapshot_tier_batch": {"queue": "snapshots"},
+        "src.tasks.snapshots.dispatch_tier_batches": {"queue": "snapshots"},
         "src.tasks.snapshots.warm_gamma_cache": {"queue": "snapshots"},
         "src.tasks.discovery.*": {"queue": "discovery"},
         "src.tasks.categorization.*": {"queue": "categorization"},
@@ -197,33 +199,45 @@ app.conf.beat_schedule = {
     # Tier 2: 4-12h to resolution, 1 minute snapshots
     "snapshot-tier-2": {
         "task": "src.tasks.snapshots.snapshot_tier",
-        "schedule": 60.0,  # Every 60 seconds
+        "schedule": tier_schedule(2, 60.0),  # Every 60 seconds (adaptive: min interval)
         "args": [2],
     },
     # Tier 3: 1-4h to resolution, 30 second snapshots (batched for throughput)
     "snapshot-tier-3-batch-0": {
         "task": "src.tasks.snapshots.snapshot_tier_batch",
-        "schedule": 30.0,  # Every 30 seconds
+        "schedule": tier_schedule(3, 30.0),  # Every 30 seconds (adaptive: min interval)
         "args": [3, 0, 2],  # tier=3, batch=0, total_batches=2
     },
     "snapshot-tier-3-batch-1": {
         "task": "src.tasks.snapshots.snapshot_tier_batch",
-        "schedule": 30.0,  # Every 30 seconds
+        "schedule": tier_schedule(3, 30.0),  # Every 30 seconds (adaptive: min interval)
         "args": [3, 1, 2],  # tier=3, batch=1, total_batches=2
     },
     # Tier 4: < 1h to resolution, 15 second snapshots (batched for throughput)
     "snapshot-tier-4-batch-0": {
         "task": "src.tasks.snapshots.snapshot_tier_batch",
-        "schedule": 15.0,  # Every 15 seconds
+        "schedule": tier_schedule(4, 15.0),  # Every 15 seconds (adaptive: min interval)
         "args": [4, 0, 2],  # tier=4, batch=0, total_batches=2
     },
     "snapshot-tier-4-batch-1": {
         "task": "src.tasks.snapshots.snapshot_tier_batch",
-        "schedule": 15.0,  # Every 15 seconds
+        "schedule": tier_schedule(4, 15.0),  # Every 15 seconds (adaptive: min interval)
         "args": [4, 1, 2],  # tier=4, batch=1, total_batches=2
     },
 }
 
+# Dynamic batching: one dispatcher per batched tier replaces the fixed
+# two-batch entries and sizes the batch count to the tier each run
+if settings.snapshot_dynamic_batches:
+    for _tier, _interval in ((3, 30.0), (4, 15.0)):
+        for _batch in range(2):
+            app.conf.beat_schedule.pop(f"snapshot-tier-{_tier}-batch-{_batch}")
+        app.conf.beat_schedule[f"snapshot-tier-{_tier}"] = {
+            "task": "src.tasks.snapshots.dispatch_tier_batches",
+            "schedule": tier_schedule(_tier, _interval),
+            "args": [_tier],
+        }
+
 # Import tasks to register them with Celery
 app.autodiscover_tasks(["src.tasks", "src.csgo"])
 
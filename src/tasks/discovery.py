@@ -12,11 +12,19 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from celery import shared_task
-from sqlalchemy import select, update, func, or_
+from sqlalchemy import insert, literal, select, update, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import structlog
 
 from src.config.settings import settings
 from src.db.database import get_session
+from src.db.markets import (
+    DISCOVERY_EXISTING_COLUMNS,
+    filter_discovery_candidates,
+    new_market_row,
+    plan_market_update,
+    tier_case,
+)
 from src.db.models import Market, TaskRun, TierTransition
 from src.fetchers.gamma import GammaClient
 from src.services.market_lifecycle import (
@@ -28,43 +36,6 @@ from src.services.market_lifecycle import (
 logger = structlog.get_logger()
 
 
-def calculate_tier(end_date: Optional[datetime]) -> int:
-    """
-    Calculate collection tier based on hours to resolution.
-
-    Tier boundaries:
-    - T0: > 48h
-    - T1: 12-48h
-    - T2: 4-12h
-    - T3: 1-4h
-    - T4: < 1h
-
-    Args:
-        end_date: Market resolution date
-
-    Returns:
-        Tier number (0-4)
-    """
-    if not end_date:
-        return 0
-
-    now = datetime.now(timezone.utc)
-    hours_to_close = (end_date - now).total_seconds() / 3600
-
-    if hours_to_close < 0:
-        return 4  # Expired but not yet resolved
-    elif hours_to_close < settings.tier_3_min_hours:  # < 1h
-        return 4
-    elif hours_to_close < settings.tier_2_min_hours:  # < 4h
-        return 3
-    elif hours_to_close < settings.tier_1_min_hours:  # < 12h
-        return 2
-    elif hours_to_close < settings.tier_0_min_hours:  # < 48h
-        return 1
-    else:
-        return 0
-
-
 def derive_outcome(outcome_prices_str: Optional[str]) -> Optional[str]:
     """
     Derive YES/NO/INVALID from outcomePrices string.
@@ -121,7 +92,13 @@ def discover_markets() -> dict:
 
 
 async def _discover_markets_async() -> dict:
-    """Async implementation of market discovery."""
+    """
+    Async implementation of market discovery.
+
+    Bulk path: markets are filtered in memory, existing rows for each chunk
+    are loaded with one IN query, and inserts/updates are written with one
+    executemany per chunk instead of a SELECT and ORM flush per market.
+    """
     task_run_id = _start_task_run("discover_markets")
 
     try:
@@ -130,188 +107,68 @@ async def _discover_markets_async() -> dict:
         markets = await client.get_all_active_markets()
         await client.close()
 
+        candidates = filter_discovery_candidates(markets, datetime.now(timezone.utc))
+
         markets_processed = 0
         rows_inserted = 0
         rows_updated = 0
-        seen_condition_ids = set()  # Track condition_ids to avoid duplicates in API response
 
         with get_session() as session:
-            for market_data in markets:
-                # Parse market data
-                yes_price, _ = GammaClient.parse_outcome_prices(market_data)
-                yes_token, no_token = GammaClient.parse_token_ids(market_data)
-                condition_id = market_data.get("conditionId")
-
-                if not condition_id:
-                    continue
-
-                # Skip duplicates within this batch (API sometimes returns duplicates)
-                if condition_id in seen_condition_ids:
-                    continue
-                seen_condition_ids.add(condition_id)
-
-                # Volume filter at T1→T2 transition (in update_market_tiers)
-                # Markets have until 12h before close to build volume
-                volume_24h = float(market_data.get("volume24hr") or 0)
-
-                # Filter: must have orderbook enabled
-                if not market_data.get("enableOrderBook", False):
-                    continue
-
-                # Parse end date
-                end_date = GammaClient.parse_datetime(market_data.get("endDate"))
-
-                # Check lookahead window
-                if end_date:
-                    hours_to_close = (end_date - datetime.now(timezone.utc)).total_seconds() / 3600
-                    if hours_to_close > settings.ml_lookahead_hours:
-                        continue  # Too far out
-                    if hours_to_close < -24:
-                        continue  # Already resolved long ago
-
-                # Calculate tier
-                tier = calculate_tier(end_date)
-
-                # Check if market exists
-                existing = session.execute(
-                    select(Market).where(Market.condition_id == condition_id)
-                ).scalar_one_or_none()
-
-                # Extract event info from nested events array
-                events = market_data.get("events", [])
-                event_data = events[0] if events else {}
-                event_id = event_data.get("id")
-                event_slug = event_data.get("slug")
-                event_title = event_data.get("title")
-
-                if existing:
-                    # Update existing market
-                    existing.tier = tier
-                    existing.active = market_data.get("active", True)
-                    existing.updated_at = datetime.now(timezone.utc)
-
-                    # Update lifecycle fields (always update, these change over time)
-                    now = datetime.now(timezone.utc)
-                    new_closed = market_data.get("closed", False)
-                    new_accepting_orders = market_data.get("acceptingOrders", True)
-                    new_uma_status = market_data.get("umaResolutionStatus")
-
-                    # Capture old state for transition logging
-                    old_trading = get_trading_status(
-                        existing.active, existing.closed,
-                        existing.accepting_orders, existing.resolved
-                    )
-                    old_uma = get_uma_status(existing.uma_resolution_status)
-
-                    # Track when closed status changes
-                    if new_closed and not existing.closed:
-                        existing.closed_at = GammaClient.parse_datetime(market_data.get("closedTime")) or now
-                    existing.closed = new_closed
-
-                    # Track when accepting_orders changes
-                    if new_accepting_orders != existing.accepting_orders:
-                        existing.accepting_orders_updated_at = GammaClient.parse_datetime(
-                            market_data.get("acceptingOrdersTimestamp")
-                        ) or now
-                    existing.accepting_orders = new_accepting_orders
-
-                    # Track UMA resolution status changes
-                    if new_uma_status != existing.uma_resolution_status:
-                        existing.uma_status_updated_at = now
-                    existing.uma_resolution_status = new_uma_status
-
-                    # Log state transition if any lifecycle field changed
-                    new_trading = get_trading_status(
-                        existing.active, existing.closed,
-                        existing.accepting_orders, existing.resolved
+            condition_ids = list(candidates.keys())
+            for start in range(0, len(condition_ids), DISCOVERY_CHUNK_SIZE):
+                chunk = condition_ids[start:start + DISCOVERY_CHUNK_SIZE]
+                now = datetime.now(timezone.utc)
+
+                existing_rows = {
+                    row.condition_id: row
+                    for row in session.execute(
+                        select(*DISCOVERY_EXISTING_COLUMNS).where(Market.condition_id.in_(chunk))
                     )
-                    new_uma = get_uma_status(existing.uma_resolution_status)
+                }
+
+                inserts = []
+                updates = []
+                for condition_id in chunk:
+                    market_data, end_date, tier = candidates[condition_id]
+                    existing = existing_rows.get(condition_id)
+                    if existing is None:
+                        inserts.append(new_market_row(market_data, end_date, tier, now))
+                        continue
 
-                    if old_trading != new_trading or old_uma != new_uma:
+                    values = plan_market_update(existing, market_data, tier, now)
+                    updates.append(values)
+                    transition = _lifecycle_transition(existing, values)
+                    if transition:
                         log_state_transition(
                             market_id=existing.id,
                             condition_id=existing.condition_id,
                             slug=existing.slug,
-                            old_trading=old_trading,
-                            new_trading=new_trading,
-                            old_uma=old_uma,
-                            new_uma=new_uma,
+                            **transition,
                         )
 
-                    # Update volatile fields
-                    if yes_token and not existing.yes_token_id:
-                        existing.yes_token_id = yes_token
-                    if no_token and not existing.no_token_id:
-                        existing.no_token_id = no_token
-                    # Update event info if missing
-                    if event_id and not existing.event_id:
-                        existing.event_id = str(event_id)
-                    if event_slug and not existing.event_slug:
-                        existing.event_slug = event_slug
-                    if event_title and not existing.event_title:
-                        existing.event_title = event_title
-                    # Update gamma_id if missing (for existing markets before this field was added)
-                    if existing.gamma_id is None and market_data.get("id"):
-                        existing.gamma_id = int(market_data.get("id"))
-                    rows_updated += 1
-                else:
-                    # Insert new market
-                    now = datetime.now(timezone.utc)
-                    new_market = Market(
-                        condition_id=condition_id,
-                        gamma_id=int(market_data.get("id")) if market_data.get("id") else None,
-                        slug=market_data.get("slug", ""),
-                        question=market_data.get("question", ""),
-                        description=market_data.get("description"),
-                        # Event grouping (from nested events array)
-                        event_id=str(event_id) if event_id else None,
-                        event_slug=event_slug,
-                        event_title=event_title,
-                        # Token IDs
-                        yes_token_id=yes_token,
-                        no_token_id=no_token,
-                        # Timing
-                        start_date=GammaClient.parse_datetime(market_data.get("startDate")),
-                        end_date=end_date,
-                        created_at=GammaClient.parse_datetime(market_data.get("createdAt")),
-                        # Initial state
-                        initial_price=yes_price,
-                        initial_spread=market_data.get("spread"),
-                        initial_volume=volume_24h,
-                        initial_liquidity=market_data.get("liquidityNum"),
-                        # Lifecycle status (from Gamma API)
-                        closed=market_data.get("closed", False),
-                        closed_at=GammaClient.parse_datetime(market_data.get("closedTime")),
-                        accepting_orders=market_data.get("acceptingOrders", True),
-                        accepting_orders_updated_at=GammaClient.parse_datetime(market_data.get("acceptingOrdersTimestamp")),
-                        uma_resolution_status=market_data.get("umaResolutionStatus"),
-                        uma_status_updated_at=now if market_data.get("umaResolutionStatus") else None,
-                        # Collection tracking
-                        tier=tier,
-                        active=market_data.get("active", True),
-                        tracking_started_at=now,  # Set when first discovered
-                        # Metadata
-                        category=market_data.get("category"),
-                        neg_risk=market_data.get("negRisk", False),
-                        competitive=market_data.get("competitive"),
-                        enable_order_book=market_data.get("enableOrderBook", True),
-                    )
-                    session.add(new_market)
-                    rows_inserted += 1
-
-                markets_processed += 1
-
-                # Commit in batches to avoid very large transactions
-                if markets_processed % 1000 == 0:
-                    session.commit()
-                    logger.debug(
-                        "Discovery progress",
-                        processed=markets_processed,
-                        new=rows_inserted,
-                        updated=rows_updated,
-                    )
-
-            session.commit()
+                if inserts:
+                    # ON CONFLICT keeps concurrent discovery runs from failing the batch
+                    inserted_ids = session.scalars(
+                        pg_insert(Market)
+                        .on_conflict_do_nothing(index_elements=[Market.condition_id])
+                        .returning(Market.id),
+                        inserts,
+                    ).all()
+                    rows_inserted += len(inserted_ids)
+                if updates:
+                    session.execute(update(Market), updates)
+                    rows_updated += len(updates)
+
+                markets_processed += len(chunk)
+
+                # Commit per chunk to avoid very large transactions
+                session.commit()
+                logger.debug(
+                    "Discovery progress",
+                    processed=markets_processed,
+                    new=rows_inserted,
+                    updated=rows_updated,
+                )
 
         _complete_task_run(task_run_id, "success", markets_processed, rows_inserted)
         logger.info(
@@ -332,6 +189,36 @@ async def _discover_markets_async() -> dict:
         raise
 
 
+# Markets per existing-row lookup / write batch / commit
+DISCOVERY_CHUNK_SIZE = 1000
+
+
+def _lifecycle_transition(existing, values: dict) -> Optional[dict]:
+    """
+    Lifecycle transition between an existing market and its planned update.
+
+    Returns:
+        kwargs for log_state_transition, or None if the status is unchanged
+    """
+    old_trading = get_trading_status(
+        existing.active, existing.closed, existing.accepting_orders, existing.resolved
+    )
+    new_trading = get_trading_status(
+        values["active"], values["closed"], values["accepting_orders"], existing.resolved
+    )
+    old_uma = get_uma_status(existing.uma_resolution_status)
+    new_uma = get_uma_status(values["uma_resolution_status"])
+
+    if old_trading == new_trading and old_uma == new_uma:
+        return None
+    return {
+        "old_trading": old_trading,
+        "new_trading": new_trading,
+        "old_uma": old_uma,
+        "new_uma": new_uma,
+    }
+
+
 @shared_task(name="src.tasks.discovery.update_market_tiers")
 def update_market_tiers() -> dict:
     """
@@ -345,6 +232,11 @@ def update_market_tiers() -> dict:
     - This gives markets until 12h before close to build volume
     - Saves WebSocket bandwidth (only T2+ gets WebSocket connections)
 
+    Set-based: new tiers come from tier_case() in SQL, and transitions,
+    deactivations and tier changes are each one INSERT ... SELECT / UPDATE,
+    so run time does not grow with the number of tracked markets. Only the
+    (few) markets crossing T1→T2 are read into Python for the volume check.
+
     Returns:
         Dictionary with updated count and deactivated count
     """
@@ -353,81 +245,76 @@ def update_market_tiers() -> dict:
     redis_client = SyncRedisClient()
 
     try:
-        # Get cached Gamma data for volume lookup
-        gamma_cache = redis_client.get_gamma_markets_cache() or []
-        volume_by_condition = {
-            m.get("conditionId"): float(m.get("volume24hr") or 0)
-            for m in gamma_cache
-        }
-
         with get_session() as session:
-            markets = session.execute(
-                select(Market).where(Market.active == True, Market.resolved == False)
-            ).scalars().all()
-
-            updated = 0
-            deactivated = 0
-            tier_counts = {i: 0 for i in range(5)}
             now = datetime.now(timezone.utc)
-
-            for market in markets:
-                new_tier = calculate_tier(market.end_date)
-                hours_to_close = None
-                if market.end_date:
-                    hours_to_close = (market.end_date - now).total_seconds() / 3600
-
-                # Volume filter at T1→T2 transition (before WebSocket)
-                # Markets have until 12h before close to build volume
-                if market.tier <= 1 and new_tier >= 2:
-                    volume_24h = volume_by_condition.get(market.condition_id, 0)
-                    if volume_24h < settings.ml_volume_threshold:
-                        # Record deactivation as tier transition
-                        transition = TierTransition(
-                            market_id=market.id,
-                            condition_id=market.condition_id,
-                            market_slug=market.slug,
-                            from_tier=market.tier,
-                            to_tier=-1,
-                            transitioned_at=now,
-                            hours_to_close=hours_to_close,
-                            reason="low_volume",
-                        )
-                        session.add(transition)
-                        # Deactivate low-volume market instead of promoting to T2+
-                        # This saves WebSocket bandwidth (only T2+ gets WS)
-                        market.active = False
-                        deactivated += 1
-                        logger.debug(
-                            "Market deactivated (low volume at T1→T2)",
-                            market=market.slug,
-                            volume_24h=volume_24h,
-                            threshold=settings.ml_volume_threshold,
-                        )
-                        continue
-
-                tier_counts[new_tier] += 1
-
-                if market.tier != new_tier:
-                    # Record tier transition
-                    transition = TierTransition(
-                        market_id=market.id,
-                        condition_id=market.condition_id,
-                        market_slug=market.slug,
-                        from_tier=market.tier,
-                        to_tier=new_tier,
-                        transitioned_at=now,
-                        hours_to_close=hours_to_close,
-                        reason="time",
-                    )
-                    session.add(transition)
+            new_tier = tier_case(now)
+            hours_to_close = func.extract("epoch", Market.end_date - now) / 3600
+            tracked = (Market.active == True, Market.resolved == False)
+
+            # Volume filter at T1→T2 transition (before WebSocket)
+            # Markets have until 12h before close to build volume
+            promoting = session.execute(
+                select(Market.id, Market.condition_id, Market.slug).where(
+                    *tracked, Market.tier <= 1, new_tier >= 2,
+                )
+            ).all()
+            gamma_markets = (
+                redis_client.get_gamma_markets([m.condition_id for m in promoting]) or {}
+            ) if promoting else {}
+
+            low_volume_ids = []
+            for market in promoting:
+                volume_24h = float((gamma_markets.get(market.condition_id) or {}).get("volume24hr") or 0)
+                if volume_24h < settings.ml_volume_threshold:
+                    low_volume_ids.append(market.id)
                     logger.debug(
-                        "Tier change",
+                        "Market deactivated (low volume at T1→T2)",
                         market=market.slug,
-                        old_tier=market.tier,
-                        new_tier=new_tier,
+                        volume_24h=volume_24h,
+                        threshold=settings.ml_volume_threshold,
                     )
-                    market.tier = new_tier
-                    updated += 1
+
+            deactivated = 0
+            if low_volume_ids:
+                # Record deactivations as tier transitions, then deactivate instead
+                # of promoting to T2+ (saves WebSocket bandwidth - only T2+ gets WS)
+                session.execute(
+                    _transition_insert(
+                        select(
+                            Market.id, Market.condition_id, Market.slug, Market.tier,
+                            literal(-1), literal(now), hours_to_close, literal("low_volume"),
+                        ).where(Market.id.in_(low_volume_ids))
+                    )
+                )
+                deactivated = session.execute(
+                    update(Market)
+                    .where(Market.id.in_(low_volume_ids))
+                    .values(active=False)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+
+            # Record tier transitions, then apply the new tiers
+            changed = (*tracked, Market.tier != new_tier)
+            session.execute(
+                _transition_insert(
+                    select(
+                        Market.id, Market.condition_id, Market.slug, Market.tier,
+                        new_tier, literal(now), hours_to_close, literal("time"),
+                    ).where(*changed)
+                )
+            )
+            updated = session.execute(
+                update(Market)
+                .where(*changed)
+                .values(tier=new_tier)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            tier_counts = {i: 0 for i in range(5)}
+            for tier, count in session.execute(
+                select(Market.tier, func.count()).where(*tracked).group_by(Market.tier)
+            ):
+                tier_counts[tier] = count
 
             session.commit()
 
@@ -442,6 +329,17 @@ def update_market_tiers() -> dict:
         redis_client.close()
 
 
+def _transition_insert(rows):
+    """INSERT INTO tier_transitions ... SELECT (columns in the order selected)."""
+    return insert(TierTransition).from_select(
+        [
+            "market_id", "condition_id", "market_slug", "from_tier",
+            "to_tier", "transitioned_at", "hours_to_close", "reason",
+        ],
+        rows,
+    )
+
+
 @shared_task(name="src.tasks.discovery.capture_all_resolutions")
 def capture_all_resolutions() -> dict:
     """
@@ -833,8 +731,7 @@ def cleanup_stale_markets() -> dict:
 
     # Get gamma cache to check if markets still exist in API
     redis_client = SyncRedisClient()
-    gamma_cache = redis_client.get_gamma_markets_cache() or []
-    gamma_condition_ids = {m.get("conditionId") for m in gamma_cache}
+    gamma_condition_ids = redis_client.get_gamma_condition_ids() or set()
     redis_client.close()
 
     with get_session() as session:
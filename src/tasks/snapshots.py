@@ -14,8 +14,11 @@ Production features:
 - Data validation before DB writes
 - Graceful degradation when one data source fails
 - Structured logging with task context
+- Worker-lifetime CLOB/Gamma/Redis clients (keep-alive connections reused across runs)
 
-Uses SYNCHRONOUS HTTP calls to avoid asyncio event loop issues in Celery.
+Uses SYNCHRONOUS HTTP calls to avoid asyncio event loop issues in Celery,
+except with snapshot_async_engine, where orderbook/metrics fetching runs as
+one coroutine on a persistent per-worker event loop (src/snapshots/engine.py).
 """
 import time
 import traceback
@@ -26,19 +29,30 @@ from typing import Optional
 
 from celery import shared_task
 from celery.exceptions import SoftTimeLimitExceeded
-from sqlalchemy import select, update
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError, OperationalError
 import structlog
 import httpx
 
 from src.config.settings import settings
 from src.db.database import get_session, validate_price, validate_volume
-from src.db.models import Market, Snapshot, TaskRun, OrderbookSnapshot
-from src.db.redis import SyncRedisClient
-from src.fetchers.gamma import GammaClient, SyncGammaClient
-from src.fetchers.clob import CLOBClient, SyncCLOBClient
+from src.db.models import Market, Snapshot, TaskRun
+from src.db.redis import GammaMarketView, SyncRedisClient
+from src.fetchers.clob import SyncCLOBClient
+from src.fetchers.orderbook_features import OrderbookBatch
 from src.fetchers.base import CircuitOpenError
-from src.collectors.metrics import compute_all_metrics_sync
+from src.collectors.metrics import compute_all_metrics_sync, get_published_metrics_many_sync
+from src.snapshots.clients import worker_clients
+from src.snapshots.engine import fetch_market_inputs
+from src.snapshots.scheduling import adaptive_tier, batch_count, select_adaptive, store_adaptive_states
+from src.snapshots.dedup import store_written_entries, suppress_unchanged
+from src.snapshots.storage import (
+    load_tier_markets,
+    orderbook_row,
+    snapshot_row,
+    tier_filter,
+    write_snapshots,
+)
 
 logger = structlog.get_logger()
 
@@ -57,6 +71,10 @@ RETRYABLE_ERRORS = (
     SoftTimeLimitExceeded,  # Celery soft limit hit
 )
 
+# Decoded Gamma markets kept across tasks in this worker process, refreshed
+# from the cache change stream (only changed markets are re-fetched)
+_gamma_view = GammaMarketView()
+
 
 @shared_task(
     name="src.tasks.snapshots.warm_gamma_cache",
@@ -74,14 +92,15 @@ def warm_gamma_cache(self) -> dict:
     Auto-retries on transient failures with exponential backoff.
     """
     task_id = str(uuid.uuid4())[:8]
-    gamma = SyncGammaClient()
-    redis_client = SyncRedisClient()
+    gamma = worker_clients.gamma()
+    redis_client = worker_clients.redis()
     try:
         all_markets = gamma.get_all_active_markets()
         # Cache with longer TTL (30s) - warming runs every 8s so plenty of buffer
-        redis_client.set_gamma_markets_cache(all_markets, ttl=30)
-        logger.info("Gamma cache warmed", market_count=len(all_markets), task_id=task_id)
-        return {"cached": len(all_markets)}
+        # Only markets whose content changed are rewritten (and published to the change stream)
+        result = redis_client.update_gamma_markets_cache(all_markets, ttl=30)
+        logger.info("Gamma cache warmed", market_count=len(all_markets), task_id=task_id, **result)
+        return {"cached": len(all_markets), **result}
     except RETRYABLE_ERRORS as e:
         logger.warning(
             "Gamma cache warming failed (will retry)",
@@ -93,9 +112,6 @@ def warm_gamma_cache(self) -> dict:
     except Exception as e:
         logger.error("Gamma cache warming failed", error=str(e), task_id=task_id)
         raise
-    finally:
-        gamma.close()
-        redis_client.close()
 
 
 @shared_task(
@@ -119,298 +135,120 @@ def snapshot_tier(self, tier: int) -> dict:
     task_run_id = _start_task_run("snapshot_tier", tier=tier)
 
     try:
-        # Get markets in this tier
+        # Get markets in this tier (only the columns snapshots need)
         with get_session() as session:
-            markets = session.execute(
-                select(Market).where(
-                    Market.tier == tier,
-                    Market.active == True,
-                    Market.resolved == False,
-                )
-            ).scalars().all()
-
-            if not markets:
-                logger.debug("No markets in tier", tier=tier)
-                _complete_task_run(task_run_id, "success", 0, 0)
-                return {"tier": tier, "markets": 0, "snapshots": 0}
-
-            # Build lookup maps
-            market_ids = {m.condition_id: m.id for m in markets}
-            yes_tokens = {m.condition_id: m.yes_token_id for m in markets}
-            market_end_dates = {m.condition_id: m.end_date for m in markets}
-
-        # Initialize sync clients
-        clob = SyncCLOBClient()
-        redis_client = SyncRedisClient()
+            markets = load_tier_markets(session, tier)
+
+        if not markets:
+            logger.debug("No markets in tier", tier=tier)
+            _complete_task_run(task_run_id, "success", 0, 0)
+            return {"tier": tier, "markets": 0, "snapshots": 0}
+
+        # Build lookup maps
+        market_ids = {m.condition_id: m.id for m in markets}
+        yes_tokens = {m.condition_id: m.yes_token_id for m in markets}
+        market_end_dates = {m.condition_id: m.end_date for m in markets}
+
+        # Worker-lifetime clients (shared across runs, never closed here)
+        clob = worker_clients.clob()
+        redis_client = worker_clients.redis()
+
+        # Try cached Gamma data first (shared across all tier tasks)
+        # IMPORTANT: Tasks should ONLY use cached data to avoid rate limiting
+        # The warm_gamma_cache task keeps the cache populated
+        # Only this tier's changed/unseen markets are fetched (HMGET), not the whole cache
+        condition_ids = list(market_ids.keys())
+        gamma_by_id = _gamma_view.get_markets(redis_client, condition_ids)
+        if gamma_by_id is None:
+            # Cache miss - wait briefly and retry once (cache warming might be in progress)
+            time.sleep(2)
+            gamma_by_id = _gamma_view.get_markets(redis_client, condition_ids)
+
+        if gamma_by_id is None:
+            # Still no cache - skip this cycle (cache warming will populate soon)
+            logger.warning("Gamma cache empty - skipping snapshot cycle", tier=tier)
+            _complete_task_run(task_run_id, "skipped", len(market_ids), 0)
+            return {"tier": tier, "markets": len(market_ids), "snapshots": 0, "skipped": True}
+
+        logger.debug("Gamma cache hit", count=len(gamma_by_id))
+
+        tier_markets = list(gamma_by_id.values())
+
+        # Log if markets are missing from gamma cache (indicates stale DB data)
+        missing_from_cache = set(market_ids.keys()) - gamma_by_id.keys()
+        if missing_from_cache:
+            logger.warning(
+                "Markets in DB but not in gamma cache",
+                tier=tier,
+                missing_count=len(missing_from_cache),
+                sample_missing=list(missing_from_cache)[:3],
+            )
 
-        try:
-            # Try cached Gamma data first (shared across all tier tasks)
-            # IMPORTANT: Tasks should ONLY use cached data to avoid rate limiting
-            # The warm_gamma_cache task keeps the cache populated
-            all_markets = redis_client.get_gamma_markets_cache()
-            if all_markets is None:
-                # Cache miss - wait briefly and retry once (cache warming might be in progress)
-                time.sleep(2)
-                all_markets = redis_client.get_gamma_markets_cache()
-
-            if all_markets is None:
-                # Still no cache - skip this cycle (cache warming will populate soon)
-                logger.warning("Gamma cache empty - skipping snapshot cycle", tier=tier)
-                _complete_task_run(task_run_id, "skipped", len(market_ids), 0)
-                return {"tier": tier, "markets": len(market_ids), "snapshots": 0, "skipped": True}
-
-            logger.debug("Gamma cache hit", count=len(all_markets))
-
-            # Filter to our tier's markets
-            tier_markets = [
-                m for m in all_markets
-                if m.get("conditionId") in market_ids
-            ]
-
-            # Log if markets are missing from gamma cache (indicates stale DB data)
-            cache_condition_ids = {m.get("conditionId") for m in all_markets}
-            missing_from_cache = set(market_ids.keys()) - cache_condition_ids
-            if missing_from_cache:
-                logger.warning(
-                    "Markets in DB but not in gamma cache",
-                    tier=tier,
-                    missing_count=len(missing_from_cache),
-                    sample_missing=list(missing_from_cache)[:3],
-                )
-
-            now = datetime.now(timezone.utc)
-
-            # === PARALLEL ORDERBOOK FETCHING (with Redis cache priority) ===
-            orderbook_features: dict[str, dict] = {}
-            orderbook_raw: dict[str, dict] = {}  # Store raw orderbooks for OrderbookSnapshot
-            if tier in settings.orderbook_enabled_tiers:
-                cache_hits = 0
-                api_calls = 0
-
-                def fetch_orderbook(args):
-                    """Fetch orderbook from Redis cache first, fall back to CLOB API."""
-                    condition_id, token_id = args
-                    nonlocal cache_hits, api_calls
-
-                    # Try Redis cache first (from WebSocket updates)
-                    cached = redis_client.get_orderbook(condition_id)
-                    if cached and cached.get("bids") and cached.get("asks"):
-                        return condition_id, cached, CLOBClient.extract_orderbook_features(cached), "cache"
-
-                    # Fall back to CLOB API
-                    try:
-                        orderbook = clob.get_orderbook(token_id)
-                        return condition_id, orderbook, CLOBClient.extract_orderbook_features(orderbook), "api"
-                    except Exception as e:
-                        logger.debug("Orderbook fetch failed", market=condition_id[:16], error=str(e))
-                        return condition_id, None, {}, "error"
-
-                # Build list of orderbook fetch arguments
-                orderbook_args = [
-                    (m.get("conditionId"), yes_tokens.get(m.get("conditionId")))
-                    for m in tier_markets
-                    if yes_tokens.get(m.get("conditionId"))
-                ]
-
-                # Execute all orderbook fetches in parallel using ThreadPoolExecutor
-                if orderbook_args:
-                    with ThreadPoolExecutor(max_workers=min(ORDERBOOK_CONCURRENCY, len(orderbook_args))) as executor:
-                        futures = {executor.submit(fetch_orderbook, args): args for args in orderbook_args}
-                        for future in as_completed(futures):
-                            try:
-                                cid, raw, features, source = future.result()
-                                if features:
-                                    orderbook_features[cid] = features
-                                if raw:
-                                    orderbook_raw[cid] = raw
-                                if source == "cache":
-                                    cache_hits += 1
-                                elif source == "api":
-                                    api_calls += 1
-                            except Exception as e:
-                                logger.debug("Orderbook future failed", error=str(e))
-
-                logger.debug("Orderbooks fetched", tier=tier, total=len(orderbook_features),
-                           cache_hits=cache_hits, api_calls=api_calls)
-
-            # === PARALLEL METRICS FETCHING ===
-            trade_metrics: dict[str, dict] = {}
-            if tier in settings.websocket_enabled_tiers:
-                def fetch_metrics(condition_id: str):
-                    try:
-                        return condition_id, compute_all_metrics_sync(condition_id)
-                    except Exception as e:
-                        logger.debug("Metrics fetch failed", market=condition_id[:16], error=str(e))
-                        return condition_id, {}
-
-                # Execute all metrics fetches in parallel
-                condition_ids = [m.get("conditionId") for m in tier_markets]
-                if condition_ids:
-                    with ThreadPoolExecutor(max_workers=min(METRICS_CONCURRENCY, len(condition_ids))) as executor:
-                        futures = {executor.submit(fetch_metrics, cid): cid for cid in condition_ids}
-                        for future in as_completed(futures):
-                            try:
-                                cid, metrics = future.result()
-                                if metrics:
-                                    trade_metrics[cid] = metrics
-                            except Exception as e:
-                                logger.debug("Metrics future failed", error=str(e))
-
-                logger.debug("Metrics fetched", tier=tier, count=len(trade_metrics))
-
-            # === BUILD SNAPSHOTS ===
-            snapshots = []
-            for market_data in tier_markets:
-                condition_id = market_data.get("conditionId")
-                market_id = market_ids[condition_id]
-                yes_price, _ = GammaClient.parse_outcome_prices(market_data)
-
-                # Calculate hours to close
-                end_date = market_end_dates.get(condition_id)
-                hours_to_close = None
-                if end_date:
-                    hours_to_close = (end_date - now).total_seconds() / 3600
-
-                # Create base snapshot with Gamma data
-                snapshot = Snapshot(
-                    market_id=market_id,
-                    timestamp=now,
-                    tier=tier,
-                    # === PRICE FIELDS ===
-                    price=yes_price,
-                    best_bid=_safe_float(market_data.get("bestBid")),
-                    best_ask=_safe_float(market_data.get("bestAsk")),
-                    spread=_safe_float(market_data.get("spread")),
-                    last_trade_price=_safe_float(market_data.get("lastTradePrice")),
-                    # === MOMENTUM (FREE from Gamma!) ===
-                    price_change_1d=_safe_float(market_data.get("oneDayPriceChange")),
-                    price_change_1w=_safe_float(market_data.get("oneWeekPriceChange")),
-                    price_change_1m=_safe_float(market_data.get("oneMonthPriceChange")),
-                    # === VOLUME ===
-                    volume_total=_safe_float(market_data.get("volumeNum")),
-                    volume_24h=_safe_float(market_data.get("volume24hr")),
-                    volume_1w=_safe_float(market_data.get("volume1wk")),
-                    liquidity=_safe_float(market_data.get("liquidityNum")),
-                    # === CONTEXT ===
-                    hours_to_close=hours_to_close,
-                    day_of_week=now.weekday(),
-                    hour_of_day=now.hour,
-                )
-
-                # Apply orderbook features (fetched in parallel above)
-                features = orderbook_features.get(condition_id, {})
-                if features:
-                    snapshot.bid_depth_5 = features.get("bid_depth_5")
-                    snapshot.bid_depth_10 = features.get("bid_depth_10")
-                    snapshot.bid_depth_20 = features.get("bid_depth_20")
-                    snapshot.bid_depth_50 = features.get("bid_depth_50")
-                    snapshot.ask_depth_5 = features.get("ask_depth_5")
-                    snapshot.ask_depth_10 = features.get("ask_depth_10")
-                    snapshot.ask_depth_20 = features.get("ask_depth_20")
-                    snapshot.ask_depth_50 = features.get("ask_depth_50")
-                    snapshot.bid_levels = features.get("bid_levels")
-                    snapshot.ask_levels = features.get("ask_levels")
-                    snapshot.book_imbalance = features.get("book_imbalance")
-                    snapshot.bid_wall_price = features.get("bid_wall_price")
-                    snapshot.bid_wall_size = features.get("bid_wall_size")
-                    snapshot.ask_wall_price = features.get("ask_wall_price")
-                    snapshot.ask_wall_size = features.get("ask_wall_size")
-
-                    # Use CLOB prices only if BOTH sides exist and spread is reasonable
-                    clob_bid = features.get("best_bid")
-                    clob_ask = features.get("best_ask")
-                    clob_spread = features.get("spread")
-                    if clob_bid and clob_ask and clob_spread and clob_spread < 0.5:
-                        snapshot.best_bid = clob_bid
-                        snapshot.best_ask = clob_ask
-                        snapshot.spread = clob_spread
-
-                # Apply trade metrics (fetched in parallel above)
-                metrics = trade_metrics.get(condition_id, {})
-                if metrics:
-                    snapshot.trade_count_1h = metrics.get("trade_count_1h")
-                    snapshot.buy_count_1h = metrics.get("buy_count_1h")
-                    snapshot.sell_count_1h = metrics.get("sell_count_1h")
-                    snapshot.volume_1h = metrics.get("volume_1h")
-                    snapshot.buy_volume_1h = metrics.get("buy_volume_1h")
-                    snapshot.sell_volume_1h = metrics.get("sell_volume_1h")
-                    snapshot.avg_trade_size_1h = metrics.get("avg_trade_size_1h")
-                    snapshot.max_trade_size_1h = metrics.get("max_trade_size_1h")
-                    snapshot.vwap_1h = metrics.get("vwap_1h")
-                    snapshot.whale_count_1h = metrics.get("whale_count_1h")
-                    snapshot.whale_volume_1h = metrics.get("whale_volume_1h")
-                    snapshot.whale_buy_volume_1h = metrics.get("whale_buy_volume_1h")
-                    snapshot.whale_sell_volume_1h = metrics.get("whale_sell_volume_1h")
-                    snapshot.whale_net_flow_1h = metrics.get("whale_net_flow_1h")
-                    snapshot.whale_buy_ratio_1h = metrics.get("whale_buy_ratio_1h")
-                    snapshot.time_since_whale = metrics.get("time_since_whale")
-                    snapshot.pct_volume_from_whales = metrics.get("pct_volume_from_whales")
-
-                snapshots.append(snapshot)
-
-            # Build OrderbookSnapshot objects from raw orderbook data
-            orderbook_snapshots = []
-            for condition_id, raw in orderbook_raw.items():
-                market_id = market_ids.get(condition_id)
-                if not market_id:
-                    continue
-                bids = raw.get("bids", [])
-                asks = raw.get("asks", [])
-                # Find largest bid/ask
-                largest_bid = max(bids, key=lambda x: float(x.get("size", 0)), default=None) if bids else None
-                largest_ask = max(asks, key=lambda x: float(x.get("size", 0)), default=None) if asks else None
-                orderbook_snapshots.append(OrderbookSnapshot(
-                    market_id=market_id,
-                    timestamp=now,
-                    bids=bids,
-                    asks=asks,
-                    total_bid_depth=sum(float(b.get("size", 0)) for b in bids),
-                    total_ask_depth=sum(float(a.get("size", 0)) for a in asks),
-                    num_bid_levels=len(bids),
-                    num_ask_levels=len(asks),
-                    largest_bid_price=float(largest_bid.get("price", 0)) if largest_bid else None,
-                    largest_bid_size=float(largest_bid.get("size", 0)) if largest_bid else None,
-                    largest_ask_price=float(largest_ask.get("price", 0)) if largest_ask else None,
-                    largest_ask_size=float(largest_ask.get("size", 0)) if largest_ask else None,
-                ))
-
-            # Bulk insert snapshots and orderbook snapshots
-            if snapshots or orderbook_snapshots:
-                with get_session() as session:
-                    if snapshots:
-                        session.add_all(snapshots)
-                    if orderbook_snapshots:
-                        session.add_all(orderbook_snapshots)
-
-                    # Update market last_snapshot_at and snapshot_count
-                    for snapshot in snapshots:
-                        session.execute(
-                            update(Market)
-                            .where(Market.id == snapshot.market_id)
-                            .values(
-                                last_snapshot_at=now,
-                                snapshot_count=Market.snapshot_count + 1,
-                            )
-                        )
-
-                    session.commit()
-
-            _complete_task_run(task_run_id, "success", len(market_ids), len(snapshots))
-            logger.info(
-                "Snapshots collected",
+        # Activity-driven scheduling: keep only markets that are due this run
+        snapshot_states: dict[str, list] = {}
+        deferred = 0
+        if adaptive_tier(tier):
+            tier_markets, snapshot_states = select_adaptive(redis_client, tier, tier_markets)
+            deferred = len(gamma_by_id) - len(tier_markets)
+
+        now = datetime.now(timezone.utc)
+
+        # === PARALLEL ORDERBOOK + METRICS FETCHING (Redis cache first, CLOB fallback) ===
+        orderbook_raw, orderbook_features, trade_metrics = _fetch_market_inputs(
+            tier, tier_markets, yes_tokens, clob, redis_client
+        )
+        # Totals/largest levels for OrderbookSnapshot (adds features for API-fetched books)
+        orderbook_summaries = _extract_orderbooks(orderbook_raw, orderbook_features)
+
+        # === BUILD SNAPSHOT ROWS (plain dicts - no ORM unit of work) ===
+        snapshots = []
+        for market_data in tier_markets:
+            condition_id = market_data.get("conditionId")
+            snapshots.append(snapshot_row(
+                market_data,
+                market_id=market_ids[condition_id],
                 tier=tier,
-                markets=len(market_ids),
-                snapshots=len(snapshots),
+                now=now,
+                end_date=market_end_dates.get(condition_id),
+                features=orderbook_features.get(condition_id),
+                metrics=trade_metrics.get(condition_id),
+            ))
+
+        # Change suppression: drop rows (and their orderbooks) that barely moved
+        suppressed: set[int] = set()
+        written_entries: dict[str, dict] = {}
+        if settings.snapshot_dedup_enabled:
+            snapshots, suppressed, written_entries = suppress_unchanged(
+                redis_client, tier, snapshots, [m.get("conditionId") for m in tier_markets]
             )
-            return {
-                "tier": tier,
-                "markets": len(market_ids),
-                "snapshots": len(snapshots),
-            }
 
-        finally:
-            clob.close()
-            redis_client.close()
+        orderbook_snapshots = [
+            orderbook_row(market_ids[condition_id], now, raw, orderbook_summaries[condition_id])
+            for condition_id, raw in orderbook_raw.items()
+            if condition_id in market_ids and market_ids[condition_id] not in suppressed
+        ]
+
+        # Bulk insert snapshots/orderbooks and bump market bookkeeping
+        write_snapshots(now, tier, snapshots, orderbook_snapshots, suppressed)
+        store_adaptive_states(redis_client, snapshot_states)
+        store_written_entries(redis_client, written_entries)
+
+        _complete_task_run(task_run_id, "success", len(market_ids), len(snapshots))
+        logger.info(
+            "Snapshots collected",
+            tier=tier,
+            markets=len(market_ids),
+            snapshots=len(snapshots),
+            suppressed=len(suppressed),
+            deferred=deferred,
+        )
+        return {
+            "tier": tier,
+            "markets": len(market_ids),
+            "snapshots": len(snapshots),
+            "suppressed": len(suppressed),
+            "deferred": deferred,
+        }
 
     except Exception as e:
         _fail_task_run(task_run_id, e)
@@ -430,7 +268,8 @@ def snapshot_tier_batch(self, tier: int, batch: int, total_batches: int = 2) ->
     """
     Collect snapshots for a batch of markets in a specific tier.
 
-    Splits the tier's markets into batches for parallel processing by multiple workers.
+    Splits the tier's markets into batches for parallel processing by multiple workers;
+    batch b gets the markets with id % total_batches == b.
 
     Args:
         tier: Tier number (0-4)
@@ -443,267 +282,118 @@ def snapshot_tier_batch(self, tier: int, batch: int, total_batches: int = 2) ->
     task_run_id = _start_task_run(f"snapshot_tier_batch_{batch}", tier=tier)
 
     try:
-        # Get markets in this tier
+        # Get this batch's markets - partitioned in SQL (id % total_batches)
         with get_session() as session:
-            all_tier_markets = session.execute(
-                select(Market).where(
-                    Market.tier == tier,
-                    Market.active == True,
-                    Market.resolved == False,
-                ).order_by(Market.id)  # Consistent ordering for batching
-            ).scalars().all()
-
-            if not all_tier_markets:
-                logger.debug("No markets in tier", tier=tier)
-                _complete_task_run(task_run_id, "success", 0, 0)
-                return {"tier": tier, "batch": batch, "markets": 0, "snapshots": 0}
-
-            # Split into batches - this batch gets every Nth market
-            markets = [m for i, m in enumerate(all_tier_markets) if i % total_batches == batch]
-
-            if not markets:
-                _complete_task_run(task_run_id, "success", 0, 0)
-                return {"tier": tier, "batch": batch, "markets": 0, "snapshots": 0}
-
-            # Build lookup maps
-            market_ids = {m.condition_id: m.id for m in markets}
-            yes_tokens = {m.condition_id: m.yes_token_id for m in markets}
-            market_end_dates = {m.condition_id: m.end_date for m in markets}
-
-        # Initialize sync clients
-        clob = SyncCLOBClient()
-        redis_client = SyncRedisClient()
-
-        try:
-            # Use cached Gamma data ONLY - avoid rate limiting
-            all_gamma_markets = redis_client.get_gamma_markets_cache()
-            if all_gamma_markets is None:
-                time.sleep(2)
-                all_gamma_markets = redis_client.get_gamma_markets_cache()
-
-            if all_gamma_markets is None:
-                logger.warning("Gamma cache empty - skipping batch", tier=tier, batch=batch)
-                _complete_task_run(task_run_id, "skipped", len(market_ids), 0)
-                return {"tier": tier, "batch": batch, "markets": len(market_ids), "snapshots": 0, "skipped": True}
-
-            # Filter to our batch's markets
-            tier_markets = [
-                m for m in all_gamma_markets
-                if m.get("conditionId") in market_ids
-            ]
-
-            # Log if markets are missing from gamma cache
-            cache_condition_ids = {m.get("conditionId") for m in all_gamma_markets}
-            missing_from_cache = set(market_ids.keys()) - cache_condition_ids
-            if missing_from_cache:
-                logger.warning(
-                    "Markets in DB but not in gamma cache (batch)",
-                    tier=tier,
-                    batch=batch,
-                    missing_count=len(missing_from_cache),
-                )
-
-            now = datetime.now(timezone.utc)
-
-            # === PARALLEL ORDERBOOK FETCHING ===
-            orderbook_features: dict[str, dict] = {}
-            orderbook_raw: dict[str, dict] = {}  # Store raw orderbooks for OrderbookSnapshot
-            if tier in settings.orderbook_enabled_tiers:
-                def fetch_orderbook(args):
-                    condition_id, token_id = args
-                    cached = redis_client.get_orderbook(condition_id)
-                    if cached and cached.get("bids") and cached.get("asks"):
-                        return condition_id, cached, CLOBClient.extract_orderbook_features(cached), "cache"
-                    try:
-                        orderbook = clob.get_orderbook(token_id)
-                        return condition_id, orderbook, CLOBClient.extract_orderbook_features(orderbook), "api"
-                    except Exception:
-                        return condition_id, None, {}, "error"
-
-                orderbook_args = [
-                    (m.get("conditionId"), yes_tokens.get(m.get("conditionId")))
-                    for m in tier_markets
-                    if yes_tokens.get(m.get("conditionId"))
-                ]
-
-                if orderbook_args:
-                    with ThreadPoolExecutor(max_workers=min(ORDERBOOK_CONCURRENCY, len(orderbook_args))) as executor:
-                        futures = {executor.submit(fetch_orderbook, args): args for args in orderbook_args}
-                        for future in as_completed(futures):
-                            try:
-                                cid, raw, features, _ = future.result()
-                                if features:
-                                    orderbook_features[cid] = features
-                                if raw:
-                                    orderbook_raw[cid] = raw
-                            except Exception:
-                                pass
-
-            # === PARALLEL METRICS FETCHING ===
-            trade_metrics: dict[str, dict] = {}
-            if tier in settings.websocket_enabled_tiers:
-                def fetch_metrics(condition_id: str):
-                    try:
-                        return condition_id, compute_all_metrics_sync(condition_id)
-                    except Exception:
-                        return condition_id, {}
-
-                condition_ids = [m.get("conditionId") for m in tier_markets]
-                if condition_ids:
-                    with ThreadPoolExecutor(max_workers=min(METRICS_CONCURRENCY, len(condition_ids))) as executor:
-                        futures = {executor.submit(fetch_metrics, cid): cid for cid in condition_ids}
-                        for future in as_completed(futures):
-                            try:
-                                cid, metrics = future.result()
-                                if metrics:
-                                    trade_metrics[cid] = metrics
-                            except Exception:
-                                pass
-
-            # === BUILD SNAPSHOTS ===
-            snapshots = []
-            for market_data in tier_markets:
-                condition_id = market_data.get("conditionId")
-                market_id = market_ids[condition_id]
-                yes_price, _ = GammaClient.parse_outcome_prices(market_data)
-
-                end_date = market_end_dates.get(condition_id)
-                hours_to_close = (end_date - now).total_seconds() / 3600 if end_date else None
-
-                snapshot = Snapshot(
-                    market_id=market_id,
-                    timestamp=now,
-                    tier=tier,
-                    price=yes_price,
-                    best_bid=_safe_float(market_data.get("bestBid")),
-                    best_ask=_safe_float(market_data.get("bestAsk")),
-                    spread=_safe_float(market_data.get("spread")),
-                    last_trade_price=_safe_float(market_data.get("lastTradePrice")),
-                    price_change_1d=_safe_float(market_data.get("oneDayPriceChange")),
-                    price_change_1w=_safe_float(market_data.get("oneWeekPriceChange")),
-                    price_change_1m=_safe_float(market_data.get("oneMonthPriceChange")),
-                    volume_total=_safe_float(market_data.get("volumeNum")),
-                    volume_24h=_safe_float(market_data.get("volume24hr")),
-                    volume_1w=_safe_float(market_data.get("volume1wk")),
-                    liquidity=_safe_float(market_data.get("liquidityNum")),
-                    hours_to_close=hours_to_close,
-                    day_of_week=now.weekday(),
-                    hour_of_day=now.hour,
-                )
-
-                # Apply orderbook features
-                features = orderbook_features.get(condition_id, {})
-                if features:
-                    snapshot.bid_depth_5 = features.get("bid_depth_5")
-                    snapshot.bid_depth_10 = features.get("bid_depth_10")
-                    snapshot.bid_depth_20 = features.get("bid_depth_20")
-                    snapshot.bid_depth_50 = features.get("bid_depth_50")
-                    snapshot.ask_depth_5 = features.get("ask_depth_5")
-                    snapshot.ask_depth_10 = features.get("ask_depth_10")
-                    snapshot.ask_depth_20 = features.get("ask_depth_20")
-                    snapshot.ask_depth_50 = features.get("ask_depth_50")
-                    snapshot.bid_levels = features.get("bid_levels")
-                    snapshot.ask_levels = features.get("ask_levels")
-                    snapshot.book_imbalance = features.get("book_imbalance")
-                    snapshot.bid_wall_price = features.get("bid_wall_price")
-                    snapshot.bid_wall_size = features.get("bid_wall_size")
-                    snapshot.ask_wall_price = features.get("ask_wall_price")
-                    snapshot.ask_wall_size = features.get("ask_wall_size")
-
-                    clob_bid = features.get("best_bid")
-                    clob_ask = features.get("best_ask")
-                    clob_spread = features.get("spread")
-                    if clob_bid and clob_ask and clob_spread and clob_spread < 0.5:
-                        snapshot.best_bid = clob_bid
-                        snapshot.best_ask = clob_ask
-                        snapshot.spread = clob_spread
-
-                # Apply trade metrics
-                metrics = trade_metrics.get(condition_id, {})
-                if metrics:
-                    snapshot.trade_count_1h = metrics.get("trade_count_1h")
-                    snapshot.buy_count_1h = metrics.get("buy_count_1h")
-                    snapshot.sell_count_1h = metrics.get("sell_count_1h")
-                    snapshot.volume_1h = metrics.get("volume_1h")
-                    snapshot.buy_volume_1h = metrics.get("buy_volume_1h")
-                    snapshot.sell_volume_1h = metrics.get("sell_volume_1h")
-                    snapshot.avg_trade_size_1h = metrics.get("avg_trade_size_1h")
-                    snapshot.max_trade_size_1h = metrics.get("max_trade_size_1h")
-                    snapshot.vwap_1h = metrics.get("vwap_1h")
-                    snapshot.whale_count_1h = metrics.get("whale_count_1h")
-                    snapshot.whale_volume_1h = metrics.get("whale_volume_1h")
-                    snapshot.whale_buy_volume_1h = metrics.get("whale_buy_volume_1h")
-                    snapshot.whale_sell_volume_1h = metrics.get("whale_sell_volume_1h")
-                    snapshot.whale_net_flow_1h = metrics.get("whale_net_flow_1h")
-                    snapshot.whale_buy_ratio_1h = metrics.get("whale_buy_ratio_1h")
-                    snapshot.time_since_whale = metrics.get("time_since_whale")
-                    snapshot.pct_volume_from_whales = metrics.get("pct_volume_from_whales")
-
-                snapshots.append(snapshot)
-
-            # Build OrderbookSnapshot objects from raw orderbook data
-            orderbook_snapshots = []
-            for condition_id, raw in orderbook_raw.items():
-                market_id = market_ids.get(condition_id)
-                if not market_id:
-                    continue
-                bids = raw.get("bids", [])
-                asks = raw.get("asks", [])
-                largest_bid = max(bids, key=lambda x: float(x.get("size", 0)), default=None) if bids else None
-                largest_ask = max(asks, key=lambda x: float(x.get("size", 0)), default=None) if asks else None
-                orderbook_snapshots.append(OrderbookSnapshot(
-                    market_id=market_id,
-                    timestamp=now,
-                    bids=bids,
-                    asks=asks,
-                    total_bid_depth=sum(float(b.get("size", 0)) for b in bids),
-                    total_ask_depth=sum(float(a.get("size", 0)) for a in asks),
-                    num_bid_levels=len(bids),
-                    num_ask_levels=len(asks),
-                    largest_bid_price=float(largest_bid.get("price", 0)) if largest_bid else None,
-                    largest_bid_size=float(largest_bid.get("size", 0)) if largest_bid else None,
-                    largest_ask_price=float(largest_ask.get("price", 0)) if largest_ask else None,
-                    largest_ask_size=float(largest_ask.get("size", 0)) if largest_ask else None,
-                ))
-
-            # Bulk insert snapshots and orderbook snapshots
-            if snapshots or orderbook_snapshots:
-                with get_session() as session:
-                    if snapshots:
-                        session.add_all(snapshots)
-                    if orderbook_snapshots:
-                        session.add_all(orderbook_snapshots)
-                    for snapshot in snapshots:
-                        session.execute(
-                            update(Market)
-                            .where(Market.id == snapshot.market_id)
-                            .values(
-                                last_snapshot_at=now,
-                                snapshot_count=Market.snapshot_count + 1,
-                            )
-                        )
-                    session.commit()
-
-            _complete_task_run(task_run_id, "success", len(market_ids), len(snapshots))
-            logger.info(
-                "Batch snapshots collected",
+            markets = load_tier_markets(session, tier, batch, total_batches)
+
+        if not markets:
+            logger.debug("No markets in tier batch", tier=tier, batch=batch)
+            _complete_task_run(task_run_id, "success", 0, 0)
+            return {"tier": tier, "batch": batch, "markets": 0, "snapshots": 0}
+
+        # Build lookup maps
+        market_ids = {m.condition_id: m.id for m in markets}
+        yes_tokens = {m.condition_id: m.yes_token_id for m in markets}
+        market_end_dates = {m.condition_id: m.end_date for m in markets}
+
+        # Worker-lifetime clients (shared across runs, never closed here)
+        clob = worker_clients.clob()
+        redis_client = worker_clients.redis()
+
+        # Use cached Gamma data ONLY - avoid rate limiting
+        # Only this batch's changed/unseen markets are fetched (HMGET), not the whole cache
+        condition_ids = list(market_ids.keys())
+        gamma_by_id = _gamma_view.get_markets(redis_client, condition_ids)
+        if gamma_by_id is None:
+            time.sleep(2)
+            gamma_by_id = _gamma_view.get_markets(redis_client, condition_ids)
+
+        if gamma_by_id is None:
+            logger.warning("Gamma cache empty - skipping batch", tier=tier, batch=batch)
+            _complete_task_run(task_run_id, "skipped", len(market_ids), 0)
+            return {"tier": tier, "batch": batch, "markets": len(market_ids), "snapshots": 0, "skipped": True}
+
+        tier_markets = list(gamma_by_id.values())
+
+        # Log if markets are missing from gamma cache
+        missing_from_cache = set(market_ids.keys()) - gamma_by_id.keys()
+        if missing_from_cache:
+            logger.warning(
+                "Markets in DB but not in gamma cache (batch)",
                 tier=tier,
                 batch=batch,
-                markets=len(market_ids),
-                snapshots=len(snapshots),
-                orderbook_snapshots=len(orderbook_snapshots),
+                missing_count=len(missing_from_cache),
             )
-            return {
-                "tier": tier,
-                "batch": batch,
-                "markets": len(market_ids),
-                "snapshots": len(snapshots),
-                "orderbook_snapshots": len(orderbook_snapshots),
-            }
-
-        finally:
-            clob.close()
-            redis_client.close()
+
+        # Activity-driven scheduling: keep only markets that are due this run
+        snapshot_states: dict[str, list] = {}
+        deferred = 0
+        if adaptive_tier(tier):
+            tier_markets, snapshot_states = select_adaptive(redis_client, tier, tier_markets)
+            deferred = len(gamma_by_id) - len(tier_markets)
+
+        now = datetime.now(timezone.utc)
+
+        # === PARALLEL ORDERBOOK + METRICS FETCHING (Redis cache first, CLOB fallback) ===
+        orderbook_raw, orderbook_features, trade_metrics = _fetch_market_inputs(
+            tier, tier_markets, yes_tokens, clob, redis_client
+        )
+        # Totals/largest levels for OrderbookSnapshot (adds features for API-fetched books)
+        orderbook_summaries = _extract_orderbooks(orderbook_raw, orderbook_features)
+
+        # === BUILD SNAPSHOT ROWS (plain dicts - no ORM unit of work) ===
+        snapshots = []
+        for market_data in tier_markets:
+            condition_id = market_data.get("conditionId")
+            snapshots.append(snapshot_row(
+                market_data,
+                market_id=market_ids[condition_id],
+                tier=tier,
+                now=now,
+                end_date=market_end_dates.get(condition_id),
+                features=orderbook_features.get(condition_id),
+                metrics=trade_metrics.get(condition_id),
+            ))
+
+        # Change suppression: drop rows (and their orderbooks) that barely moved
+        suppressed: set[int] = set()
+        written_entries: dict[str, dict] = {}
+        if settings.snapshot_dedup_enabled:
+            snapshots, suppressed, written_entries = suppress_unchanged(
+                redis_client, tier, snapshots, [m.get("conditionId") for m in tier_markets]
+            )
+
+        orderbook_snapshots = [
+            orderbook_row(market_ids[condition_id], now, raw, orderbook_summaries[condition_id])
+            for condition_id, raw in orderbook_raw.items()
+            if condition_id in market_ids and market_ids[condition_id] not in suppressed
+        ]
+
+        # Bulk insert snapshots/orderbooks and bump market bookkeeping
+        write_snapshots(now, tier, snapshots, orderbook_snapshots, suppressed)
+        store_adaptive_states(redis_client, snapshot_states)
+        store_written_entries(redis_client, written_entries)
+
+        _complete_task_run(task_run_id, "success", len(market_ids), len(snapshots))
+        logger.info(
+            "Batch snapshots collected",
+            tier=tier,
+            batch=batch,
+            markets=len(market_ids),
+            snapshots=len(snapshots),
+            orderbook_snapshots=len(orderbook_snapshots),
+            suppressed=len(suppressed),
+            deferred=deferred,
+        )
+        return {
+            "tier": tier,
+            "batch": batch,
+            "markets": len(market_ids),
+            "snapshots": len(snapshots),
+            "orderbook_snapshots": len(orderbook_snapshots),
+            "suppressed": len(suppressed),
+            "deferred": deferred,
+        }
 
     except Exception as e:
         _fail_task_run(task_run_id, e)
@@ -711,6 +401,36 @@ def snapshot_tier_batch(self, tier: int, batch: int, total_batches: int = 2) ->
         raise
 
 
+@shared_task(name="src.tasks.snapshots.dispatch_tier_batches")
+def dispatch_tier_batches(tier: int) -> dict:
+    """
+    Fan out one tier run as snapshot_tier_batch tasks sized to the tier.
+
+    Used by beat when snapshot_dynamic_batches is enabled: the batch count
+    grows with the tier's market count up to snapshot_batch_workers.
+
+    Args:
+        tier: Tier number (0-4)
+
+    Returns:
+        Dictionary with tier, markets, and batches counts
+    """
+    with get_session() as session:
+        market_count = session.execute(
+            select(func.count(Market.id)).where(*tier_filter(tier))
+        ).scalar() or 0
+
+    if not market_count:
+        return {"tier": tier, "markets": 0, "batches": 0}
+
+    total_batches = batch_count(market_count)
+    for batch in range(total_batches):
+        snapshot_tier_batch.delay(tier, batch, total_batches)
+
+    logger.debug("Tier batches dispatched", tier=tier, markets=market_count, batches=total_batches)
+    return {"tier": tier, "markets": market_count, "batches": total_batches}
+
+
 @shared_task(name="src.tasks.snapshots.snapshot_market")
 def snapshot_market(market_id: int) -> dict:
     """
@@ -735,131 +455,48 @@ def snapshot_market(market_id: int) -> dict:
         tier = market.tier
         end_date = market.end_date
 
-    gamma = SyncGammaClient()
-    clob = SyncCLOBClient()
+    gamma = worker_clients.gamma()
+    clob = worker_clients.clob()
 
-    try:
-        # Fetch market data
-        market_data = gamma.get_market(condition_id)
-        if not market_data:
-            return {"market_id": market_id, "success": False, "error": "API fetch failed"}
+    # Fetch market data
+    market_data = gamma.get_market(condition_id)
+    if not market_data:
+        return {"market_id": market_id, "success": False, "error": "API fetch failed"}
 
-        now = datetime.now(timezone.utc)
-        yes_price, _ = GammaClient.parse_outcome_prices(market_data)
-        hours_to_close = (end_date - now).total_seconds() / 3600 if end_date else None
+    now = datetime.now(timezone.utc)
 
-        # Create snapshot
-        snapshot = Snapshot(
-            market_id=market_id,
-            timestamp=now,
-            tier=tier,
-            price=yes_price,
-            best_bid=_safe_float(market_data.get("bestBid")),
-            best_ask=_safe_float(market_data.get("bestAsk")),
-            spread=_safe_float(market_data.get("spread")),
-            last_trade_price=_safe_float(market_data.get("lastTradePrice")),
-            price_change_1d=_safe_float(market_data.get("oneDayPriceChange")),
-            price_change_1w=_safe_float(market_data.get("oneWeekPriceChange")),
-            price_change_1m=_safe_float(market_data.get("oneMonthPriceChange")),
-            volume_total=_safe_float(market_data.get("volumeNum")),
-            volume_24h=_safe_float(market_data.get("volume24hr")),
-            volume_1w=_safe_float(market_data.get("volume1wk")),
-            liquidity=_safe_float(market_data.get("liquidityNum")),
-            hours_to_close=hours_to_close,
-            day_of_week=now.weekday(),
-            hour_of_day=now.hour,
-        )
-
-        # Fetch orderbook if token available
-        orderbook_snapshot = None
-        if yes_token_id:
-            try:
-                orderbook = clob.get_orderbook(yes_token_id)
-                features = CLOBClient.extract_orderbook_features(orderbook)
-
-                snapshot.bid_depth_5 = features["bid_depth_5"]
-                snapshot.bid_depth_10 = features["bid_depth_10"]
-                snapshot.bid_depth_20 = features["bid_depth_20"]
-                snapshot.bid_depth_50 = features["bid_depth_50"]
-                snapshot.ask_depth_5 = features["ask_depth_5"]
-                snapshot.ask_depth_10 = features["ask_depth_10"]
-                snapshot.ask_depth_20 = features["ask_depth_20"]
-                snapshot.ask_depth_50 = features["ask_depth_50"]
-                snapshot.bid_levels = features["bid_levels"]
-                snapshot.ask_levels = features["ask_levels"]
-                snapshot.book_imbalance = features["book_imbalance"]
-                snapshot.bid_wall_price = features["bid_wall_price"]
-                snapshot.bid_wall_size = features["bid_wall_size"]
-                snapshot.ask_wall_price = features["ask_wall_price"]
-                snapshot.ask_wall_size = features["ask_wall_size"]
-
-                # Create OrderbookSnapshot from raw data
-                bids = orderbook.get("bids", [])
-                asks = orderbook.get("asks", [])
-                largest_bid = max(bids, key=lambda x: float(x.get("size", 0)), default=None) if bids else None
-                largest_ask = max(asks, key=lambda x: float(x.get("size", 0)), default=None) if asks else None
-                orderbook_snapshot = OrderbookSnapshot(
-                    market_id=market_id,
-                    timestamp=now,
-                    bids=bids,
-                    asks=asks,
-                    total_bid_depth=sum(float(b.get("size", 0)) for b in bids),
-                    total_ask_depth=sum(float(a.get("size", 0)) for a in asks),
-                    num_bid_levels=len(bids),
-                    num_ask_levels=len(asks),
-                    largest_bid_price=float(largest_bid.get("price", 0)) if largest_bid else None,
-                    largest_bid_size=float(largest_bid.get("size", 0)) if largest_bid else None,
-                    largest_ask_price=float(largest_ask.get("price", 0)) if largest_ask else None,
-                    largest_ask_size=float(largest_ask.get("size", 0)) if largest_ask else None,
-                )
-
-            except Exception as e:
-                logger.warning("Orderbook fetch failed", error=str(e))
-
-        # Save snapshot and orderbook snapshot
-        with get_session() as session:
-            session.add(snapshot)
-            if orderbook_snapshot:
-                session.add(orderbook_snapshot)
-            session.execute(
-                update(Market)
-                .where(Market.id == market_id)
-                .values(
-                    last_snapshot_at=now,
-                    snapshot_count=Market.snapshot_count + 1,
-                )
-            )
-            session.commit()
-
-        return {"market_id": market_id, "success": True}
-
-    finally:
-        gamma.close()
-        clob.close()
+    # Fetch orderbook if token available
+    orderbook_raw: dict[str, dict] = {}
+    if yes_token_id:
+        try:
+            orderbook_raw[condition_id] = clob.get_orderbook(yes_token_id)
+        except Exception as e:
+            logger.warning("Orderbook fetch failed", error=str(e))
+    orderbook_features: dict[str, dict] = {}
+    orderbook_summaries = _extract_orderbooks(orderbook_raw, orderbook_features)
+
+    # Same rows and bulk writer as the tier tasks (honours orderbook_storage_mode)
+    snapshot = snapshot_row(
+        market_data,
+        market_id=market_id,
+        tier=tier,
+        now=now,
+        end_date=end_date,
+        features=orderbook_features.get(condition_id),
+        metrics=None,
+    )
+    orderbook_snapshots = [
+        orderbook_row(market_id, now, raw, orderbook_summaries[condition_id])
+        for condition_id, raw in orderbook_raw.items()
+    ]
+    write_snapshots(now, tier, [snapshot], orderbook_snapshots)
+
+    return {"market_id": market_id, "success": True}
 
 
 # === Helper Functions ===
 
 
-def _safe_float(value, field_name: str = "field") -> Optional[float]:
-    """
-    Safely convert value to float, returning None on failure.
-
-    Logs warning for suspicious but valid values.
-    """
-    if value is None:
-        return None
-    try:
-        result = float(value)
-        # Log suspicious values but don't reject them
-        if result < 0:
-            logger.debug(f"Negative value for {field_name}", value=result)
-        return result
-    except (ValueError, TypeError) as e:
-        logger.debug(f"Invalid value for {field_name}", value=value, error=str(e))
-        return None
-
-
 def _safe_price(value) -> Optional[float]:
     """
     Safely convert price value, validating range [0, 1].
@@ -946,3 +583,160 @@ def _fail_task_run(run_id: int, error: Exception) -> None:
             run.error_message = str(error)
             run.error_traceback = traceback.format_exc()
             session.commit()
+
+
+def _fetch_market_inputs(
+    tier: int,
+    tier_markets: list[dict],
+    yes_tokens: dict[str, str],
+    clob: SyncCLOBClient,
+    redis_client: SyncRedisClient,
+) -> tuple[dict[str, dict], dict[str, dict], dict[str, dict]]:
+    """
+    Fetch orderbooks and trade metrics for the markets of one run.
+
+    With snapshot_async_engine this is one coroutine on the worker's event
+    loop (src/snapshots/engine.py); otherwise per-market fetches fan
+    out over thread pools.
+
+    Returns:
+        (orderbook_raw, orderbook_features, trade_metrics) keyed by condition_id;
+        orderbook_features holds collector-published features only
+    """
+    if settings.snapshot_async_engine:
+        return worker_clients.run(fetch_market_inputs(
+            worker_clients.async_redis(),
+            worker_clients.async_clob(),
+            tier,
+            [m.get("conditionId") for m in tier_markets],
+            yes_tokens,
+            ORDERBOOK_CONCURRENCY,
+        ))
+
+    # Orderbooks: Redis cache first, CLOB API fallback
+    orderbook_features: dict[str, dict] = {}
+    orderbook_raw: dict[str, dict] = {}  # Store raw orderbooks for OrderbookSnapshot
+    if tier in settings.orderbook_enabled_tiers:
+        cache_hits = 0
+        api_calls = 0
+
+        def fetch_orderbook(args):
+            """Fetch orderbook from Redis cache first, fall back to CLOB API."""
+            condition_id, token_id = args
+            nonlocal cache_hits, api_calls
+
+            # Try Redis cache first (live replica published by the collector,
+            # which includes precomputed features)
+            cached = redis_client.get_orderbook(condition_id)
+            if cached and cached.get("bids") and cached.get("asks"):
+                return condition_id, cached, cached.get("features"), "cache"
+
+            # Fall back to CLOB API (features extracted in one batch by _extract_orderbooks)
+            try:
+                orderbook = clob.get_orderbook(token_id)
+                return condition_id, orderbook, None, "api"
+            except Exception as e:
+                logger.debug("Orderbook fetch failed", market=condition_id[:16], error=str(e))
+                return condition_id, None, {}, "error"
+
+        # Build list of orderbook fetch arguments
+        orderbook_args = [
+            (m.get("conditionId"), yes_tokens.get(m.get("conditionId")))
+            for m in tier_markets
+            if yes_tokens.get(m.get("conditionId"))
+        ]
+
+        # Execute all orderbook fetches in parallel using ThreadPoolExecutor
+        if orderbook_args:
+            with ThreadPoolExecutor(max_workers=min(ORDERBOOK_CONCURRENCY, len(orderbook_args))) as executor:
+                futures = {executor.submit(fetch_orderbook, args): args for args in orderbook_args}
+                for future in as_completed(futures):
+                    try:
+                        cid, raw, features, source = future.result()
+                        if features:
+                            orderbook_features[cid] = features
+                        if raw:
+                            orderbook_raw[cid] = raw
+                        if source == "cache":
+                            cache_hits += 1
+                        elif source == "api":
+                            api_calls += 1
+                    except Exception as e:
+                        logger.debug("Orderbook future failed", error=str(e))
+
+        logger.debug("Orderbooks fetched", tier=tier, total=len(orderbook_features),
+                   cache_hits=cache_hits, api_calls=api_calls)
+
+    # Trade metrics
+    trade_metrics: dict[str, dict] = {}
+    if tier in settings.websocket_enabled_tiers:
+        def fetch_metrics(condition_id: str):
+            try:
+                return condition_id, compute_all_metrics_sync(condition_id)
+            except Exception as e:
+                logger.debug("Metrics fetch failed", market=condition_id[:16], error=str(e))
+                return condition_id, {}
+
+        # Collector-published metrics first (one pipeline), then recompute
+        # from the trade buffer in parallel for markets it doesn't cover
+        condition_ids = [m.get("conditionId") for m in tier_markets]
+        try:
+            trade_metrics.update(get_published_metrics_many_sync(condition_ids))
+        except Exception as e:
+            # Every market falls back to recomputing from its trade buffer
+            logger.warning(
+                "Published metrics read failed, recomputing from trade buffers",
+                tier=tier, markets=len(condition_ids), error=str(e),
+            )
+        published_count = len(trade_metrics)
+        condition_ids = [cid for cid in condition_ids if cid not in trade_metrics]
+        if condition_ids:
+            with ThreadPoolExecutor(max_workers=min(METRICS_CONCURRENCY, len(condition_ids))) as executor:
+                futures = {executor.submit(fetch_metrics, cid): cid for cid in condition_ids}
+                for future in as_completed(futures):
+                    try:
+                        cid, metrics = future.result()
+                        if metrics:
+                            trade_metrics[cid] = metrics
+                    except Exception as e:
+                        logger.debug("Metrics future failed", error=str(e))
+
+        logger.debug("Metrics fetched", tier=tier, count=len(trade_metrics),
+                   published=published_count)
+
+    return orderbook_raw, orderbook_features, trade_metrics
+
+
+def _extract_orderbooks(orderbook_raw: dict[str, dict], orderbook_features: dict[str, dict]) -> dict[str, dict]:
+    """
+    Compute features and summaries for all fetched orderbooks in one batch.
+
+    Books without published (collector) features get extracted features
+    added to orderbook_features in place; collector-published summaries
+    (computed on the full book) take precedence over ones extracted here.
+    If a malformed level fails the batch, books are retried one at a time
+    and bad ones are dropped.
+
+    Returns:
+        condition_id -> totals/largest levels for OrderbookSnapshot rows
+    """
+    try:
+        groups = [list(orderbook_raw)]
+        batches = [OrderbookBatch([orderbook_raw[cid] for cid in groups[0]])]
+    except (TypeError, ValueError) as e:
+        logger.warning("Orderbook batch extraction failed", error=str(e))
+        groups, batches = [], []
+        for condition_id in list(orderbook_raw):
+            try:
+                batches.append(OrderbookBatch([orderbook_raw[condition_id]]))
+                groups.append([condition_id])
+            except (TypeError, ValueError):
+                del orderbook_raw[condition_id]
+
+    summaries: dict[str, dict] = {}
+    for condition_ids, batch in zip(groups, batches):
+        for condition_id, features in zip(condition_ids, batch.features()):
+            orderbook_features.setdefault(condition_id, features)
+        for condition_id, summary in zip(condition_ids, batch.summaries()):
+            summaries[condition_id] = orderbook_raw[condition_id].get("summary") or summary
+    return summaries
@@ -0,0 +1,125 @@
+"""
+Tests for load-aware WebSocket connection assignment.
+
+Tests:
+- Message rates are smoothed across rolls; unseen markets use the tier prior
+- Existing placements are kept when the market set changes
+- New markets go to the least-loaded connection, heaviest first
+- Hot connections shed markets to cold ones, bounded per cycle
+- Connections are added as the market count passes the fill target
+"""
+
+from src.collectors.sharding import ConnectionScheduler, MarketLoadTracker
+from src.config.settings import settings
+
+
+def make_scheduler(**kwargs) -> ConnectionScheduler:
+    defaults = dict(
+        max_markets_per_connection=4,
+        min_connections=2,
+        max_connections=4,
+        fill_target=0.5,
+        tolerance=0.2,
+        max_moves=10,
+    )
+    defaults.update(kwargs)
+    return ConnectionScheduler(**defaults)
+
+
+def connection_loads(assignment, weights, num_connections):
+    loads = [0.0] * num_connections
+    for cid, conn in assignment.items():
+        loads[conn] += weights[cid]
+    return loads
+
+
+class TestMarketLoadTracker:
+    """Tests for MarketLoadTracker."""
+
+    def test_roll_smooths_rates(self):
+        """The first roll takes the observed rate; later rolls move toward it."""
+        tracker = MarketLoadTracker(half_life=10.0)
+        tracker._rolled_at = 0.0
+        for _ in range(20):
+            tracker.record("hot")
+
+        tracker.roll(["hot", "quiet"], now=10.0)
+        assert tracker.rates == {"hot": 2.0, "quiet": 0.0}
+
+        # No messages for one half-life: halfway to zero
+        tracker.roll(["hot", "quiet"], now=20.0)
+        assert tracker.rates["hot"] == 1.0
+
+    def test_weights_fall_back_to_tier_prior(self, monkeypatch):
+        monkeypatch.setattr(settings, "websocket_tier_load_weights", {3: 0.1, 4: 0.5})
+        tracker = MarketLoadTracker()
+        tracker.rates["seen"] = 3.0
+
+        assert tracker.weights({"seen": 2, "new_t4": 4, "new_t2": 2}) == {
+            "seen": 3.0,
+            "new_t4": 0.5,
+            "new_t2": 0.0,
+        }
+
+
+class TestConnectionScheduler:
+    """Tests for ConnectionScheduler.plan() and connections_needed()."""
+
+    def test_keeps_existing_placements(self):
+        """A new market does not reshuffle markets that are already placed."""
+        scheduler = make_scheduler()
+        weights = {"a": 1.0, "b": 1.0, "c": 1.0, "d": 1.0, "e": 1.0}
+        current = {"a": 1, "b": 0, "c": 1, "d": 0}
+
+        assignment = scheduler.plan(list(weights), weights, current, 2)
+
+        assert {cid: assignment[cid] for cid in current} == current
+        assert assignment["e"] in (0, 1)
+
+    def test_new_markets_balance_load(self):
+        """Heavy markets are spread before light ones fill the gaps."""
+        scheduler = make_scheduler()
+        weights = {"hot1": 5.0, "hot2": 5.0, "warm": 2.0, "cold1": 0.5, "cold2": 0.5}
+
+        assignment = scheduler.plan(list(weights), weights, {}, 2)
+
+        assert assignment["hot1"] != assignment["hot2"]
+        assert sorted(connection_loads(assignment, weights, 2)) == [6.0, 7.0]
+
+    def test_rebalances_hot_connection(self):
+        """Markets move off a connection that carries most of the traffic."""
+        scheduler = make_scheduler()
+        weights = {"a": 4.0, "b": 4.0, "c": 1.0, "d": 1.0}
+        current = {"a": 0, "b": 0, "c": 1, "d": 1}
+
+        assignment = scheduler.plan(list(weights), weights, current, 2)
+
+        assert sorted(connection_loads(assignment, weights, 2)) == [4.0, 6.0]
+
+    def test_moves_are_bounded(self):
+        scheduler = make_scheduler(max_moves=1, max_markets_per_connection=10)
+        weights = {f"m{i}": 1.0 for i in range(8)}
+        current = {cid: 0 for cid in weights}
+
+        assignment = scheduler.plan(list(weights), weights, current, 2)
+
+        assert sum(1 for conn in assignment.values() if conn == 1) == 1
+
+    def test_respects_connection_cap(self):
+        """No connection exceeds its cap; markets beyond capacity are dropped."""
+        scheduler = make_scheduler(max_markets_per_connection=2)
+        weights = {f"m{i}": float(i) for i in range(6)}
+
+        assignment = scheduler.plan(list(weights), weights, {}, 2)
+
+        assert set(assignment) == {"m0", "m1", "m2", "m3"}
+        assert sorted(assignment.values()) == [0, 0, 1, 1]
+
+    def test_connections_needed_spills_and_caps(self):
+        scheduler = make_scheduler()  # 2 markets per connection at 50% fill
+
+        assert scheduler.connections_needed(1) == 2
+        assert scheduler.connections_needed(5) == 3
+        assert scheduler.connections_needed(100) == 4
+        # Open connections are never closed
+        assert scheduler.connections_needed(1, current=3) == 3
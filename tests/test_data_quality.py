@@ -0,0 +1,30 @@
+"""
+Tests for data quality expectations.
+
+Tests:
+- Fixed tiers expect their tier interval
+- Adaptive tiers expect their max interval, so quiet markets are not gaps
+"""
+
+from src.api.routes.data_quality import expected_interval, expected_snapshots_per_hour
+from src.config.settings import settings
+
+
+class TestExpectedInterval:
+    """Tests for expected_interval() and expected_snapshots_per_hour()."""
+
+    def test_fixed_tiers(self, monkeypatch):
+        monkeypatch.setattr(settings, "adaptive_snapshots_enabled", False)
+
+        assert expected_interval(4) == settings.tier_4_interval
+        assert expected_snapshots_per_hour(4) == 240
+
+    def test_adaptive_tiers_use_max_interval(self, monkeypatch):
+        monkeypatch.setattr(settings, "adaptive_snapshots_enabled", True)
+        monkeypatch.setattr(settings, "adaptive_snapshot_min_interval", {4: 5.0})
+        monkeypatch.setattr(settings, "adaptive_snapshot_max_interval", {4: 60.0})
+
+        assert expected_interval(4) == 60.0
+        assert expected_snapshots_per_hour(4) == 60.0
+        # Tiers without adaptive settings keep the fixed cadence
+        assert expected_interval(2) == settings.tier_2_interval
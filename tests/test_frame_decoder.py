@@ -0,0 +1,62 @@
+"""
+Tests for WebSocket frame decoding and event dispatch.
+
+Tests:
+- Every backend decodes frames to the same event lists
+- Keepalives, single events and arrays are normalized to lists
+- Malformed frames raise ValueError
+- The collector routes events through its event_type table
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import msgpack
+import pytest
+
+from src.collectors.decoding import FrameDecoder, available_backends, get_loads
+from src.collectors.websocket import WebSocketCollector
+
+TRADE = {"event_type": "last_trade_price", "asset_id": "123", "price": "0.52", "size": "10", "side": "BUY"}
+
+
+class TestFrameDecoder:
+    """Tests for FrameDecoder.decode()."""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_backends_agree(self, backend):
+        decoder = FrameDecoder(backend)
+
+        assert decoder.decode(json.dumps(TRADE)) == [TRADE]
+        assert decoder.decode(json.dumps([TRADE, TRADE])) == [TRADE, TRADE]
+        assert decoder.decode("PONG") == []
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_malformed_frame_raises_value_error(self, backend):
+        with pytest.raises(ValueError):
+            FrameDecoder(backend).decode('{"event_type": ')
+
+    def test_binary_frames_are_msgpack(self):
+        assert FrameDecoder("json").decode(msgpack.packb(TRADE)) == [TRADE]
+
+    def test_auto_prefers_fastest_backend(self):
+        assert get_loads("auto")[0] == available_backends()[0]
+        with pytest.raises(ValueError):
+            get_loads("yaml")
+
+
+class TestEventDispatch:
+    """Tests for WebSocketCollector event routing."""
+
+    @pytest.mark.asyncio
+    async def test_routes_by_event_type(self):
+        collector = WebSocketCollector(managed=True)
+        trade, book = AsyncMock(), AsyncMock()
+        collector._event_handlers.update(last_trade_price=trade, book=book)
+
+        await collector._handle_message(json.dumps([TRADE, {"event_type": "tick_size_change"}]))
+        await collector._handle_message(json.dumps({"event_type": "book", "asset_id": "123"}))
+        await collector._handle_message("not json")
+
+        trade.assert_awaited_once_with(TRADE)
+        assert book.await_count == 1
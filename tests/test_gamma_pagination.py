@@ -0,0 +1,92 @@
+"""
+Tests for concurrent Gamma market pagination.
+
+Tests:
+- Pages are merged in offset order and stop at the first short page
+- Duplicates across pages are dropped
+- Sync and async clients fan out pages and return the same listing
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.fetchers.gamma import (
+    PAGE_SIZE,
+    GammaClient,
+    SyncGammaClient,
+    merge_market_pages,
+)
+
+
+def make_listing(total: int) -> list[dict]:
+    return [{"conditionId": f"c{i}"} for i in range(total)]
+
+
+def fake_pages(listing: list[dict], calls: list[int]):
+    def get_markets(active=True, closed=False, limit=PAGE_SIZE, offset=0):
+        calls.append(offset)
+        return listing[offset:offset + limit]
+    return get_markets
+
+
+class TestMergeMarketPages:
+    """Tests for merge_market_pages()."""
+
+    def test_stops_at_first_short_page(self):
+        """Pages after the end of the listing are ignored."""
+        pages = [[{"conditionId": "a"}, {"conditionId": "b"}], [{"conditionId": "c"}], []]
+        markets, used, complete = merge_market_pages(pages, limit=2)
+
+        assert [m["conditionId"] for m in markets] == ["a", "b", "c"]
+        assert used == 2
+        assert complete is True
+
+    def test_dedupes_shifted_markets(self):
+        """A market shifted onto the next page is kept once, in first position."""
+        pages = [[{"conditionId": "a"}, {"conditionId": "b"}], [{"conditionId": "b"}, {"conditionId": "c"}], []]
+        markets, _, _ = merge_market_pages(pages, limit=2)
+
+        assert [m["conditionId"] for m in markets] == ["a", "b", "c"]
+
+    def test_incomplete_when_all_pages_full(self):
+        """Hitting the page cap without a short page is reported."""
+        _, _, complete = merge_market_pages([[{"id": 1}], [{"id": 2}]], limit=1)
+        assert complete is False
+
+
+class TestConcurrentListing:
+    """Tests for get_all_active_markets() on both clients."""
+
+    def test_sync_fetches_all_pages(self):
+        """Sync client returns every market in order."""
+        listing = make_listing(PAGE_SIZE * 10 + 37)
+        calls: list[int] = []
+        client = SyncGammaClient()
+        try:
+            with patch.object(client, "get_markets", side_effect=fake_pages(listing, calls)):
+                markets = client.get_all_active_markets()
+        finally:
+            client.close()
+
+        assert markets == listing
+        assert 0 in calls and PAGE_SIZE * 10 in calls
+
+    @pytest.mark.asyncio
+    async def test_async_fetches_all_pages(self):
+        """Async client returns every market in order."""
+        listing = make_listing(PAGE_SIZE * 3)
+        calls: list[int] = []
+        sync_get = fake_pages(listing, calls)
+
+        async def get_markets(**kwargs):
+            return sync_get(**kwargs)
+
+        client = GammaClient()
+        try:
+            with patch.object(client, "get_markets", side_effect=get_markets):
+                markets = await client.get_all_active_markets()
+        finally:
+            await client.close()
+
+        assert markets == listing
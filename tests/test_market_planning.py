@@ -0,0 +1,327 @@
+"""
+Tests for the bulk discovery planning helpers.
+
+Each planned INSERT/UPDATE row is compared against what the previous
+per-row ORM path (one SELECT and attribute assignments per market)
+produced for the same Gamma data.
+
+Tests:
+- Discovery filters: condition_id, orderbook, lookahead window, duplicates
+- New market insert rows
+- Unchanged, changed and resolved/deactivated market update rows
+- tier_case() matches calculate_tier() at every boundary and for NULL end dates
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from src.config.settings import settings
+from src.db import markets as markets_module
+from src.db.markets import (
+    DISCOVERY_EXISTING_COLUMNS,
+    calculate_tier,
+    filter_discovery_candidates,
+    new_market_row,
+    plan_market_update,
+    tier_case,
+)
+from src.db.models import Market
+from src.fetchers.gamma import GammaClient
+
+NOW = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def gamma_market(**overrides) -> dict:
+    """Gamma listing entry for an open market resolving in 6h."""
+    market = {
+        "id": "512",
+        "conditionId": "0xabc",
+        "slug": "will-it-rain",
+        "question": "Will it rain?",
+        "description": "Resolves YES if it rains.",
+        "events": [{"id": 77, "slug": "weather", "title": "Weather"}],
+        "clobTokenIds": '["yes-token", "no-token"]',
+        "outcomePrices": '["0.4", "0.6"]',
+        "startDate": "2026-09-01T00:00:00Z",
+        "endDate": (NOW + timedelta(hours=6)).isoformat(),
+        "createdAt": "2026-08-31T00:00:00Z",
+        "spread": 0.02,
+        "volume24hr": 1500.5,
+        "liquidityNum": 900.0,
+        "closed": False,
+        "acceptingOrders": True,
+        "acceptingOrdersTimestamp": "2026-09-01T00:00:00Z",
+        "umaResolutionStatus": None,
+        "active": True,
+        "category": "Weather",
+        "negRisk": False,
+        "competitive": 0.8,
+        "enableOrderBook": True,
+    }
+    market.update(overrides)
+    return market
+
+
+def existing_market(**overrides) -> SimpleNamespace:
+    """Row with DISCOVERY_EXISTING_COLUMNS matching gamma_market()."""
+    row = {
+        "id": 1,
+        "condition_id": "0xabc",
+        "slug": "will-it-rain",
+        "active": True,
+        "resolved": False,
+        "closed": False,
+        "closed_at": None,
+        "accepting_orders": True,
+        "accepting_orders_updated_at": datetime(2026, 9, 1, tzinfo=timezone.utc),
+        "uma_resolution_status": None,
+        "uma_status_updated_at": None,
+        "yes_token_id": "yes-token",
+        "no_token_id": "no-token",
+        "event_id": "77",
+        "event_slug": "weather",
+        "event_title": "Weather",
+        "gamma_id": 512,
+        "tier": 2,
+        "updated_at": None,
+    }
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def orm_update(existing: SimpleNamespace, market_data: dict, tier: int, now: datetime) -> SimpleNamespace:
+    """Apply the attribute updates of the previous per-row ORM path to a copy."""
+    market = SimpleNamespace(**vars(existing))
+    yes_token, no_token = GammaClient.parse_token_ids(market_data)
+    events = market_data.get("events", [])
+    event_data = events[0] if events else {}
+    event_id = event_data.get("id")
+
+    market.tier = tier
+    market.active = market_data.get("active", True)
+    market.updated_at = now
+    new_closed = market_data.get("closed", False)
+    new_accepting_orders = market_data.get("acceptingOrders", True)
+    new_uma_status = market_data.get("umaResolutionStatus")
+    if new_closed and not market.closed:
+        market.closed_at = GammaClient.parse_datetime(market_data.get("closedTime")) or now
+    market.closed = new_closed
+    if new_accepting_orders != market.accepting_orders:
+        market.accepting_orders_updated_at = GammaClient.parse_datetime(
+            market_data.get("acceptingOrdersTimestamp")
+        ) or now
+    market.accepting_orders = new_accepting_orders
+    if new_uma_status != market.uma_resolution_status:
+        market.uma_status_updated_at = now
+    market.uma_resolution_status = new_uma_status
+    if yes_token and not market.yes_token_id:
+        market.yes_token_id = yes_token
+    if no_token and not market.no_token_id:
+        market.no_token_id = no_token
+    if event_id and not market.event_id:
+        market.event_id = str(event_id)
+    if event_data.get("slug") and not market.event_slug:
+        market.event_slug = event_data.get("slug")
+    if event_data.get("title") and not market.event_title:
+        market.event_title = event_data.get("title")
+    if market.gamma_id is None and market_data.get("id"):
+        market.gamma_id = int(market_data.get("id"))
+    return market
+
+
+def assert_matches_orm(existing: SimpleNamespace, market_data: dict, tier: int = 2) -> dict:
+    values = plan_market_update(existing, market_data, tier, NOW)
+    expected = orm_update(existing, market_data, tier, NOW)
+
+    assert values["id"] == existing.id
+    for column, value in values.items():
+        assert value == getattr(expected, column), column
+    return values
+
+
+class TestFilterDiscoveryCandidates:
+    """Tests for filter_discovery_candidates()."""
+
+    def test_filters_and_tiers(self, monkeypatch):
+        monkeypatch.setattr(settings, "ml_lookahead_hours", 24 * 7)
+        now = datetime.now(timezone.utc)
+        markets = [
+            gamma_market(conditionId="keep", endDate=(now + timedelta(hours=6)).isoformat()),
+            gamma_market(conditionId="keep", endDate=(now + timedelta(hours=1000)).isoformat()),
+            gamma_market(conditionId=None),
+            gamma_market(conditionId="no-book", enableOrderBook=False),
+            gamma_market(conditionId="too-far", endDate=(now + timedelta(days=30)).isoformat()),
+            gamma_market(conditionId="long-gone", endDate=(now - timedelta(hours=48)).isoformat()),
+            gamma_market(conditionId="no-end", endDate=None),
+        ]
+
+        candidates = filter_discovery_candidates(markets, now)
+
+        # Duplicates keep the first occurrence
+        assert list(candidates) == ["keep", "no-end"]
+        market_data, end_date, tier = candidates["keep"]
+        assert market_data is markets[0]
+        assert tier == calculate_tier(end_date) == 2
+        assert candidates["no-end"][1:] == (None, 0)
+
+
+class TestNewMarketRow:
+    """Tests for new_market_row()."""
+
+    def test_matches_orm_insert(self):
+        market_data = gamma_market(umaResolutionStatus="proposed", closedTime="2026-10-01T11:00:00Z")
+        end_date = NOW + timedelta(hours=6)
+
+        row = new_market_row(market_data, end_date, 2, NOW)
+
+        assert row == {
+            "condition_id": "0xabc",
+            "gamma_id": 512,
+            "slug": "will-it-rain",
+            "question": "Will it rain?",
+            "description": "Resolves YES if it rains.",
+            "event_id": "77",
+            "event_slug": "weather",
+            "event_title": "Weather",
+            "yes_token_id": "yes-token",
+            "no_token_id": "no-token",
+            "start_date": datetime(2026, 9, 1, tzinfo=timezone.utc),
+            "end_date": end_date,
+            "created_at": datetime(2026, 8, 31, tzinfo=timezone.utc),
+            "initial_price": 0.4,
+            "initial_spread": 0.02,
+            "initial_volume": 1500.5,
+            "initial_liquidity": 900.0,
+            "closed": False,
+            "closed_at": datetime(2026, 10, 1, 11, tzinfo=timezone.utc),
+            "accepting_orders": True,
+            "accepting_orders_updated_at": datetime(2026, 9, 1, tzinfo=timezone.utc),
+            "uma_resolution_status": "proposed",
+            "uma_status_updated_at": NOW,
+            "tier": 2,
+            "active": True,
+            "tracking_started_at": NOW,
+            "category": "Weather",
+            "neg_risk": False,
+            "competitive": 0.8,
+            "enable_order_book": True,
+        }
+
+    def test_defaults_for_sparse_payload(self):
+        row = new_market_row({"conditionId": "0xdef"}, None, 0, NOW)
+
+        assert row["gamma_id"] is None
+        assert row["event_id"] is None
+        assert row["initial_volume"] == 0.0
+        assert row["accepting_orders"] is True
+        assert row["uma_status_updated_at"] is None
+        # Same keys as a full row, so rows batch into one executemany
+        assert set(row) == set(new_market_row(gamma_market(), None, 0, NOW))
+
+
+class TestPlanMarketUpdate:
+    """Tests for plan_market_update() against the per-row ORM updates."""
+
+    def test_columns_are_loaded(self):
+        loaded = {column.key for column in DISCOVERY_EXISTING_COLUMNS}
+        # Every existing value the plan reads comes from the bulk SELECT
+        assert loaded >= set(vars(existing_market())) - {"tier", "updated_at"}
+
+    def test_unchanged_market(self):
+        existing = existing_market()
+
+        values = assert_matches_orm(existing, gamma_market())
+
+        # Only the tier and updated_at differ from what is stored
+        changed = {k for k, v in values.items() if getattr(existing, k) != v}
+        assert changed == {"updated_at"}
+
+    def test_changed_market(self):
+        existing = existing_market(yes_token_id=None, event_slug=None, gamma_id=None)
+        market_data = gamma_market(
+            acceptingOrders=False,
+            acceptingOrdersTimestamp="2026-10-01T11:30:00Z",
+            umaResolutionStatus="proposed",
+        )
+
+        values = assert_matches_orm(existing, market_data, tier=3)
+
+        assert values["tier"] == 3
+        assert values["accepting_orders_updated_at"] == datetime(2026, 10, 1, 11, 30, tzinfo=timezone.utc)
+        assert values["uma_status_updated_at"] == NOW
+        # Missing identifiers are filled, present ones never overwritten
+        assert values["yes_token_id"] == "yes-token"
+        assert values["event_slug"] == "weather"
+        assert values["gamma_id"] == 512
+
+    @pytest.mark.parametrize("overrides", [
+        {"closed": True, "closedTime": "2026-10-01T10:00:00Z", "umaResolutionStatus": "resolved"},
+        {"closed": True, "umaResolutionStatus": "resolved"},  # No closedTime: falls back to now
+        {"active": False, "acceptingOrders": False, "acceptingOrdersTimestamp": None},
+    ])
+    def test_resolved_or_deactivated_market(self, overrides):
+        values = assert_matches_orm(existing_market(), gamma_market(**overrides))
+
+        assert values["active"] == overrides.get("active", True)
+        assert values["closed"] == overrides.get("closed", False)
+
+    def test_already_closed_keeps_closed_at(self):
+        closed_at = datetime(2026, 9, 30, tzinfo=timezone.utc)
+        existing = existing_market(closed=True, closed_at=closed_at, resolved=True)
+
+        values = assert_matches_orm(existing, gamma_market(closed=True, closedTime="2026-10-01T10:00:00Z"))
+
+        assert values["closed_at"] == closed_at
+
+
+class FrozenDatetime(datetime):
+    """datetime whose now() is NOW (for calculate_tier)."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+def market_values(market_id: int) -> dict:
+    """Required columns, including those with Postgres-only server defaults."""
+    return {
+        "id": market_id, "condition_id": f"0x{market_id}", "slug": "m", "question": "q",
+        "subscription_version": market_id,
+        "tracking_started_at": NOW, "first_seen": NOW, "updated_at": NOW,
+    }
+
+
+@pytest.fixture
+def sqlite_markets():
+    """In-memory markets table."""
+    engine = create_engine("sqlite://")
+    Market.__table__.create(engine)
+    with engine.connect() as connection:
+        yield connection
+
+
+class TestTierCase:
+    """tier_case() evaluated in SQL agrees with calculate_tier()."""
+
+    @pytest.mark.parametrize("hours", [
+        None,
+        -30.0, -0.001, 0.0, 0.5,
+        1.0 - 1e-3, 1.0, 1.0 + 1e-3,
+        4.0 - 1e-3, 4.0, 4.0 + 1e-3,
+        12.0 - 1e-3, 12.0, 12.0 + 1e-3,
+        48.0 - 1e-3, 48.0, 48.0 + 1e-3,
+        200.0,
+    ])
+    def test_matches_calculate_tier(self, hours, sqlite_markets, monkeypatch):
+        monkeypatch.setattr(markets_module, "datetime", FrozenDatetime)
+        end_date = NOW + timedelta(hours=hours) if hours is not None else None
+        sqlite_markets.execute(
+            insert(Market).values(**market_values(1), end_date=end_date)
+        )
+
+        sql_tier = sqlite_markets.execute(select(tier_case(NOW))).scalar_one()
+
+        assert sql_tier == calculate_tier(end_date)
@@ -0,0 +1,99 @@
+"""
+Tests for vectorized orderbook feature extraction.
+
+Tests:
+- Batch features match the per-level CLOBClient helpers
+- Empty books and empty batches
+- Summaries used for orderbook_snapshots rows
+- REST books sorted best first give the same features as the live replica
+"""
+
+import random
+
+from src.collectors.orderbook import OrderBook
+from src.fetchers.clob import CLOBClient
+from src.fetchers.orderbook_features import OrderbookBatch, extract_orderbook_features, sort_orderbook
+
+
+def random_book(rng: random.Random) -> dict:
+    def side(n):
+        return [
+            {"price": str(round(rng.random(), 3)), "size": str(rng.randint(1, 500))}
+            for _ in range(n)
+        ]
+    return {"bids": side(rng.randint(0, 70)), "asks": side(rng.randint(0, 70))}
+
+
+class TestOrderbookBatch:
+    """Tests for OrderbookBatch."""
+
+    def test_matches_per_level_helpers(self):
+        """Every feature equals the loop-based helper result for the same book."""
+        rng = random.Random(7)
+        books = [random_book(rng) for _ in range(200)]
+        batch = OrderbookBatch(books)
+        features = batch.features()
+        midpoints = batch.weighted_midpoint()
+        bid_near = batch.depth_at_price("bid", 0.05)
+        ask_near = batch.depth_at_price("ask", 0.05)
+
+        for book, f, mid, bid_d, ask_d in zip(books, features, midpoints, bid_near, ask_near):
+            for n in (5, 10, 20, 50):
+                assert abs(f[f"bid_depth_{n}"] - CLOBClient.calculate_depth(book, "bid", n)) < 1e-9
+                assert abs(f[f"ask_depth_{n}"] - CLOBClient.calculate_depth(book, "ask", n)) < 1e-9
+            assert abs(f["book_imbalance"] - CLOBClient.calculate_imbalance(book)) < 1e-9
+            assert (f["bid_wall_price"], f["bid_wall_size"]) == CLOBClient.find_wall(book, "bid")
+            assert (f["ask_wall_price"], f["ask_wall_size"]) == CLOBClient.find_wall(book, "ask")
+            expected_mid = CLOBClient.calculate_weighted_midpoint(book)
+            assert (mid is None) == (expected_mid is None)
+            if mid is not None:
+                assert abs(mid - expected_mid) < 1e-12
+            assert abs(bid_d - CLOBClient.calculate_depth_at_price(book, "bid", 0.05)) < 1e-9
+            assert abs(ask_d - CLOBClient.calculate_depth_at_price(book, "ask", 0.05)) < 1e-9
+
+    def test_empty_books(self):
+        """Empty sides give zero depths/walls and no best prices."""
+        features = extract_orderbook_features({"bids": [], "asks": []})
+        assert features["bid_depth_50"] == 0.0
+        assert features["book_imbalance"] == 0.0
+        assert features["bid_wall_price"] == 0.0
+        assert features["best_bid"] is None
+        assert features["spread"] is None
+        assert OrderbookBatch([]).features() == []
+
+    def test_summaries(self):
+        """Summaries give totals, level counts and largest levels."""
+        book = {
+            "bids": [{"price": "0.45", "size": "10"}, {"price": "0.44", "size": "30"}],
+            "asks": [],
+        }
+        summary = OrderbookBatch([book]).summaries()[0]
+        assert summary["total_bid_depth"] == 40.0
+        assert summary["num_bid_levels"] == 2
+        assert summary["largest_bid_price"] == 0.44
+        assert summary["largest_bid_size"] == 30.0
+        assert summary["total_ask_depth"] == 0.0
+        assert summary["largest_ask_price"] is None
+
+    def test_sorted_rest_book_matches_replica(self):
+        """A REST book in exchange order, once sorted, has the replica's features and summary."""
+        rng = random.Random(11)
+        bids = sorted(
+            ({"price": f"{p / 100:.2f}", "size": str(rng.randint(1, 500))} for p in rng.sample(range(1, 50), 30)),
+            key=lambda level: float(level["price"]),
+        )  # Worst first, as the REST endpoint lists them
+        asks = sorted(
+            ({"price": f"{p / 100:.2f}", "size": str(rng.randint(1, 500))} for p in rng.sample(range(51, 99), 30)),
+            key=lambda level: float(level["price"]),
+            reverse=True,
+        )
+        replica = OrderBook()
+        replica.apply_snapshot(bids, asks)
+
+        book = sort_orderbook({"bids": list(bids), "asks": list(asks)})
+
+        assert book["bids"][0]["price"] == str(replica.best_bid)
+        features = extract_orderbook_features(book)
+        for key, value in replica.features().items():
+            assert abs(features[key] - value) < 1e-9 if value is not None else features[key] is None, key
+        assert OrderbookBatch([book]).summaries()[0] == replica.summary()
@@ -0,0 +1,145 @@
+"""
+Tests for the live L2 orderbook replica.
+
+Tests:
+- Snapshot plus deltas keep sorted best-first levels
+- Features and summaries match the REST extractors on the full book
+- Stale, unanchored and inconsistent deltas are rejected
+- Replica publishes only changed, in-sync books
+"""
+
+from unittest.mock import MagicMock
+
+from src.collectors.orderbook import OrderBook, OrderBookReplica
+from src.fetchers.clob import CLOBClient
+from src.fetchers.orderbook_features import OrderbookBatch
+
+
+def make_book_event(bids, asks, timestamp="1000", key_style="bids"):
+    side_keys = ("bids", "asks") if key_style == "bids" else ("buys", "sells")
+    return {
+        "event_type": "book",
+        side_keys[0]: [{"price": p, "size": s} for p, s in bids],
+        side_keys[1]: [{"price": p, "size": s} for p, s in asks],
+        "timestamp": timestamp,
+        "hash": "h0",
+    }
+
+
+class TestOrderBook:
+    """Tests for OrderBook snapshot/delta application."""
+
+    def test_levels_best_first_after_deltas(self):
+        """Deltas insert, update and remove levels in sorted order."""
+        book = OrderBook()
+        book.apply_snapshot(
+            [{"price": "0.40", "size": "100"}, {"price": "0.45", "size": "50"}],
+            [{"price": "0.55", "size": "70"}, {"price": "0.50", "size": "20"}],
+        )
+        book.apply_change("BUY", 0.47, 10.0)
+        book.apply_change("BUY", 0.40, 0.0)
+        book.apply_change("SELL", 0.50, 35.0)
+
+        assert book.levels("bid") == [(0.47, 10.0), (0.45, 50.0)]
+        assert book.levels("ask") == [(0.50, 35.0), (0.55, 70.0)]
+        assert book.levels("bid", 1) == [(0.47, 10.0)]
+        assert book.best_bid == 0.47
+        assert book.best_ask == 0.50
+
+    def test_features_match_rest_extraction(self):
+        """Replica features equal the REST feature extractor on the same book."""
+        book = OrderBook()
+        bids = [{"price": str(0.01 * i), "size": str(10 * i)} for i in range(1, 40)]
+        asks = [{"price": str(0.5 + 0.01 * i), "size": str(5 * i)} for i in range(1, 30)]
+        book.apply_snapshot(bids, asks)
+
+        features = book.features()
+        expected = CLOBClient.extract_orderbook_features(book.to_orderbook(n=1000))
+        assert features.keys() == expected.keys()
+        for key, value in expected.items():
+            assert abs(features[key] - value) < 1e-9, key
+
+    def test_summary_matches_batch_summaries(self):
+        """Totals and largest levels equal OrderbookBatch.summaries on the same book."""
+        book = OrderBook()
+        bids = [{"price": str(0.01 * i), "size": str(7 * i % 50 + 1)} for i in range(1, 80)]
+        asks = [{"price": str(0.2 + 0.01 * i), "size": str(3 * i % 40 + 1)} for i in range(1, 70)]
+        book.apply_snapshot(bids, asks)
+
+        assert book.summary() == OrderbookBatch([book.to_orderbook()]).summaries()[0]
+        assert OrderBook().summary()["largest_bid_price"] is None
+
+
+class TestOrderBookReplica:
+    """Tests for OrderBookReplica event handling and publishing."""
+
+    def test_accepts_legacy_buys_sells_keys(self):
+        """Older book payloads use buys/sells instead of bids/asks."""
+        replica = OrderBookReplica(MagicMock())
+        replica.apply_book("c1", make_book_event([("0.4", "1")], [("0.6", "2")], key_style="buys"))
+
+        assert replica.books["c1"].best_bid == 0.4
+        assert replica.books["c1"].best_ask == 0.6
+
+    def test_drops_stale_and_unanchored_changes(self):
+        """Deltas before any snapshot or older than the book are ignored."""
+        replica = OrderBookReplica(MagicMock())
+        assert not replica.apply_change("c1", {"price": "0.5", "size": "1", "side": "BUY"}, 900)
+
+        replica.apply_book("c1", make_book_event([("0.4", "1")], [("0.6", "2")], timestamp="1000"))
+        assert not replica.apply_change("c1", {"price": "0.45", "size": "1", "side": "BUY"}, 900)
+        assert replica.apply_change("c1", {"price": "0.45", "size": "1", "side": "BUY"}, 1001)
+        assert replica.books["c1"].best_bid == 0.45
+        assert replica.changes_dropped == 2
+
+    def test_mismatched_best_price_marks_out_of_sync(self):
+        """A disagreement with exchange-reported best bid/ask stops publishing."""
+        writer = MagicMock()
+        replica = OrderBookReplica(writer, refresh_seconds=60.0)
+        replica.apply_book("c1", make_book_event([("0.4", "1")], [("0.6", "2")]))
+        replica.apply_change(
+            "c1",
+            {"price": "0.41", "size": "5", "side": "BUY", "best_bid": "0.42", "best_ask": "0.6"},
+            1001,
+        )
+
+        assert replica.books["c1"].in_sync is False
+        assert replica.desyncs == 1
+        assert replica.publish(now=100.0) == 0
+
+        # A fresh snapshot resynchronizes the book
+        replica.apply_book("c1", make_book_event([("0.42", "5")], [("0.6", "2")], timestamp="1002"))
+        assert replica.publish(now=101.0) == 1
+
+    def test_publishes_changed_books_with_features(self):
+        """Published payload is top-N best-first levels plus features."""
+        writer = MagicMock()
+        replica = OrderBookReplica(writer, refresh_seconds=60.0, publish_levels=1)
+        replica.apply_book("c1", make_book_event([("0.4", "1"), ("0.45", "3")], [("0.6", "2")]))
+
+        assert replica.publish(now=100.0) == 1
+        cid, payload = writer.set_orderbook.call_args.args
+        assert cid == "c1"
+        assert payload["bids"] == [{"price": "0.45", "size": "3.0"}]
+        assert payload["features"]["bid_levels"] == 2
+        assert payload["features"]["bid_depth_5"] == 4.0
+        # Summaries cover the full book even when the levels are capped
+        assert payload["summary"]["num_bid_levels"] == 2
+        assert payload["summary"]["total_bid_depth"] == 4.0
+
+        # Unchanged and not due for refresh
+        assert replica.publish(now=101.0) == 0
+        assert replica.publish(now=160.0) == 1
+
+    def test_publishes_full_book_by_default(self):
+        """The default payload keeps every level, so orderbook_snapshots rows are not truncated."""
+        writer = MagicMock()
+        replica = OrderBookReplica(writer, refresh_seconds=60.0, publish_levels=0)
+        bids = [(f"{0.01 * i:.2f}", "1") for i in range(1, 71)]
+        replica.apply_book("c1", make_book_event(bids, [("0.9", "2")]))
+
+        replica.publish(now=100.0)
+        _, payload = writer.set_orderbook.call_args.args
+        assert len(payload["bids"]) == 70
+        assert payload["summary"]["num_bid_levels"] == 70
+        assert payload["summary"]["total_bid_depth"] == 70.0
@@ -0,0 +1,100 @@
+"""
+Tests for packed orderbook depth storage.
+
+Tests:
+- Pack/unpack round trip with fixed-point ticks, best price first
+- Delta encoding against a keyframe rebuilds the same book
+- Row encoding picks delta or full depth
+- JSONB and packed rows decode to the same arrays
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.db.models import OrderbookSnapshot
+from src.db.orderbook_storage import (
+    PRICE_SCALE,
+    apply_delta,
+    decode_orderbook,
+    delta_levels,
+    depth_matrix,
+    encode_orderbook_rows,
+    levels_to_ticks,
+    pack_levels,
+    unpack_levels,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+BIDS = [{"price": "0.44", "size": "100"}, {"price": "0.45", "size": "25.5"}, {"price": "0.40", "size": "0"}]
+ASKS = [{"price": "0.52", "size": "70"}, {"price": "0.50", "size": "12"}]
+
+
+class TestPacking:
+    """Tests for tick/size packing."""
+
+    def test_round_trip_best_first(self):
+        """Levels come back sorted best first with zero-size levels dropped."""
+        ticks, sizes = levels_to_ticks(BIDS, "bid")
+        data = pack_levels(ticks, sizes)
+        assert len(data) == 2 * 6
+
+        ticks, sizes = unpack_levels(data)
+        assert ticks.tolist() == [4500, 4400]
+        assert sizes.tolist() == [25.5, 100.0]
+
+        ask_ticks, _ = levels_to_ticks(ASKS, "ask")
+        assert (ask_ticks / PRICE_SCALE).tolist() == [0.5, 0.52]
+
+    def test_delta_rebuilds_book(self):
+        """Keyframe + delta equals the new book, including removed levels."""
+        base = levels_to_ticks(BIDS, "bid")
+        new = levels_to_ticks(
+            [{"price": "0.45", "size": "30"}, {"price": "0.46", "size": "5"}], "bid"
+        )
+        delta = delta_levels(*base, *new)
+        assert sorted(delta[0].tolist()) == [4400, 4500, 4600]
+
+        ticks, sizes = apply_delta(*base, *delta, "bid")
+        assert ticks.tolist() == new[0].tolist()
+        assert sizes.tolist() == new[1].tolist()
+
+
+class TestRowEncoding:
+    """Tests for encode_orderbook_rows() and decode_orderbook()."""
+
+    def test_encode_uses_delta_when_smaller(self):
+        """Rows for markets with a keyframe store only changed levels."""
+        keyframe_row = {"market_id": 1, "bids": BIDS, "asks": ASKS}
+        encode_orderbook_rows([keyframe_row])
+        assert keyframe_row["bids"] is None
+        assert keyframe_row["keyframe_id"] is None
+
+        row = {"market_id": 1, "bids": BIDS, "asks": ASKS[:1] + [{"price": "0.50", "size": "13"}]}
+        encode_orderbook_rows([row], {1: (42, keyframe_row["bid_depth"], keyframe_row["ask_depth"])})
+        assert row["keyframe_id"] == 42
+        assert row["bid_depth"] == b""
+        assert len(row["ask_depth"]) == 6
+
+        keyframe = OrderbookSnapshot(id=42, market_id=1, timestamp=NOW,
+                                     bid_depth=keyframe_row["bid_depth"], ask_depth=keyframe_row["ask_depth"])
+        packed = OrderbookSnapshot(id=43, market_id=1, timestamp=NOW, keyframe_id=42,
+                                   bid_depth=row["bid_depth"], ask_depth=row["ask_depth"])
+        book = decode_orderbook(packed, keyframe)
+        assert book.bid_prices.tolist() == [0.45, 0.44]
+        assert book.ask_sizes.tolist() == [13.0, 70.0]
+
+    def test_jsonb_and_packed_rows_decode_alike(self):
+        """Readers return the same arrays regardless of storage mode."""
+        row = {"market_id": 1, "bids": BIDS, "asks": ASKS}
+        encode_orderbook_rows([row])
+        jsonb = decode_orderbook(OrderbookSnapshot(id=1, market_id=1, timestamp=NOW, bids=BIDS, asks=ASKS))
+        packed = decode_orderbook(OrderbookSnapshot(id=2, market_id=1, timestamp=NOW,
+                                                    bid_depth=row["bid_depth"], ask_depth=row["ask_depth"]))
+        for field in ("bid_prices", "bid_sizes", "ask_prices", "ask_sizes"):
+            np.testing.assert_array_equal(getattr(jsonb, field), getattr(packed, field))
+
+        matrix = depth_matrix([jsonb, packed], "ask", levels=3)
+        assert matrix.shape == (2, 3)
+        assert matrix[0].tolist() == [12.0, 70.0, 0.0]
@@ -0,0 +1,181 @@
+"""
+Tests for the token-bucket rate limiters.
+
+Tests:
+- Local limiter reserves tokens and waits outside its lock
+- Distributed limiter hands out prefetched tokens without Redis round trips
+- Endpoint buckets are checked together with the API bucket
+- Nothing granted means waiting for the bucket to refill
+- Redis failures degrade to the local bucket
+- Clients close the Redis pool their limiter opened, never a shared one
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.fetchers import base, rate_limit
+from src.config.settings import settings
+from src.fetchers.base import BaseClient, SyncBaseClient, SyncRateLimiter
+from src.fetchers.rate_limit import DistributedRateLimiter, SyncDistributedRateLimiter
+
+
+class FakeScript:
+    """Stands in for the Lua script: grants from a fixed token supply."""
+
+    def __init__(self, supply: int):
+        self.supply = supply
+        self.calls = []
+
+    def __call__(self, keys, args):
+        self.calls.append((list(keys), list(args)))
+        granted = min(args[0], self.supply)
+        self.supply -= granted
+        return [granted, 0 if granted else 50]
+
+
+def make_limiter(script, **kwargs) -> SyncDistributedRateLimiter:
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = script
+    return SyncDistributedRateLimiter(
+        "clob.polymarket.com",
+        kwargs.pop("rate", 20.0),
+        fallback=kwargs.pop("fallback", MagicMock()),
+        redis_client=redis_client,
+        **kwargs,
+    )
+
+
+class TestSyncRateLimiter:
+    """Tests for the process-local SyncRateLimiter."""
+
+    def test_waits_are_reserved_in_order(self, monkeypatch):
+        """Each caller beyond the bucket waits one more token interval."""
+        waits = []
+        monkeypatch.setattr(base.time, "sleep", waits.append)
+        limiter = SyncRateLimiter(rate=10.0)
+        limiter.tokens = 0.0
+
+        for _ in range(3):
+            limiter.acquire()
+
+        assert [round(w, 2) for w in waits] == [0.1, 0.2, 0.3]
+        assert not limiter.lock.locked()
+
+
+class TestSyncDistributedRateLimiter:
+    """Tests for SyncDistributedRateLimiter.acquire()."""
+
+    def test_prefetched_tokens_skip_redis(self):
+        """One round trip takes a batch; the rest is handed out locally."""
+        script = FakeScript(supply=100)
+        limiter = make_limiter(script, rate=20.0, prefetch_seconds=0.25)
+
+        for _ in range(5):
+            limiter.acquire("/book")
+
+        assert len(script.calls) == 1
+        keys, args = script.calls[0]
+        assert keys == ["ratelimit:clob.polymarket.com"]
+        assert args == [5, 20.0, 20.0]
+
+    def test_endpoint_bucket_checked_with_api_bucket(self):
+        """An endpoint with its own limit takes tokens from both buckets."""
+        script = FakeScript(supply=100)
+        limiter = make_limiter(script, rate=20.0, endpoint_rates={"/book": 8.0}, prefetch_seconds=0.25)
+
+        limiter.acquire("/book")
+        limiter.acquire("/price")
+
+        (book_keys, book_args), (price_keys, _) = script.calls
+        assert book_keys == ["ratelimit:clob.polymarket.com", "ratelimit:clob.polymarket.com:/book"]
+        # Batch sized by the slower bucket
+        assert book_args == [2, 20.0, 20.0, 8.0, 8.0]
+        assert price_keys == ["ratelimit:clob.polymarket.com"]
+
+    def test_waits_when_bucket_empty(self, monkeypatch):
+        """With nothing granted the limiter sleeps for the reported refill time."""
+        waits = []
+        monkeypatch.setattr(rate_limit.time, "sleep", waits.append)
+        calls = iter([[0, 50], [1, 0]])
+        limiter = make_limiter(lambda keys, args: next(calls), prefetch_seconds=0.0)
+
+        limiter.acquire()
+
+        assert waits == [0.05]
+
+    def test_redis_error_falls_back_to_local_bucket(self):
+        """An unreachable Redis uses the local limiter until the retry delay passes."""
+        fallback = MagicMock()
+
+        def failing(keys, args):
+            raise RedisConnectionError("down")
+
+        limiter = make_limiter(failing, fallback=fallback)
+        limiter.acquire("/book")
+        limiter.acquire("/book")
+
+        assert fallback.acquire.call_count == 2
+
+
+class TestDistributedRateLimiter:
+    """Tests for the async DistributedRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_prefetched_tokens_skip_redis(self):
+        """The async limiter shares the prefetch behaviour."""
+        calls = []
+
+        async def script(keys, args):
+            calls.append(keys)
+            return [args[0], 0]
+
+        redis_client = MagicMock()
+        redis_client.register_script.return_value = script
+        limiter = DistributedRateLimiter(
+            "gamma-api.polymarket.com", 10.0, fallback=MagicMock(),
+            prefetch_seconds=0.5, redis_client=redis_client,
+        )
+
+        for _ in range(5):
+            await limiter.acquire("/markets")
+
+        assert calls == [["ratelimit:gamma-api.polymarket.com"]]
+
+
+class TestLimiterClose:
+    """Tests for closing the distributed limiter's Redis pool with its client."""
+
+    def test_sync_client_closes_owned_pool(self, monkeypatch):
+        """Per-run clients must not leave a Redis pool behind."""
+        pool = MagicMock()
+        monkeypatch.setattr(settings, "rate_limit_distributed", True)
+        monkeypatch.setattr(rate_limit.redis_sync, "from_url", MagicMock(return_value=pool))
+
+        client = SyncBaseClient("https://clob.polymarket.com", rate_limit=10.0)
+        client.close()
+        client.close()
+
+        pool.close.assert_called_once()
+
+    def test_injected_redis_left_open(self):
+        """A caller-provided connection is the caller's to close."""
+        limiter = make_limiter(FakeScript(supply=0))
+
+        limiter.close()
+
+        limiter.redis.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_client_closes_owned_pool(self, monkeypatch):
+        """The async pool is closed on the loop that used it."""
+        pool = MagicMock()
+        pool.aclose = AsyncMock()
+        monkeypatch.setattr(settings, "rate_limit_distributed", True)
+        monkeypatch.setattr(rate_limit.redis_async, "from_url", MagicMock(return_value=pool))
+
+        client = BaseClient("https://gamma-api.polymarket.com", rate_limit=10.0)
+        await client.close()
+
+        pool.aclose.assert_awaited_once()
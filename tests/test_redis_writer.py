@@ -0,0 +1,358 @@
+"""
+Tests for the coalescing Redis writer used by the WebSocket collector.
+
+Tests:
+- Many writes in one tick become one pipeline
+- Last-write-wins keys collapse repeated updates
+- Trade entries are packed and scored by epoch-ms
+- Packed and legacy JSON trade entries decode to the same shape
+- Gamma cache is written per market and read with HMGET
+- Delta warming and the change-stream driven market view
+- Only consumed Gamma fields mark a market changed; stream entries carry
+  counts and the IDs live in a per-version key
+- Snapshot state and written vectors are per-market keys with their own TTL
+"""
+
+import json
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.db.redis import (
+    GAMMA_CHANGES_IDS_TTL,
+    GAMMA_CHANGES_STREAM,
+    GAMMA_DIGEST_KEY,
+    GAMMA_MARKETS_KEY,
+    GAMMA_VERSION_KEY,
+    TRADE_STRUCT,
+    CoalescingRedisWriter,
+    GammaMarketView,
+    SNAPSHOT_STATE_TTL,
+    SyncRedisClient,
+    _merge_trade_buffers,
+    decode_trade,
+    diff_gamma_markets,
+    encode_trade,
+    gamma_changes_ids_key,
+    snapshot_state_key,
+    snapshot_written_key,
+)
+
+
+def make_trade(size: float = 1.0, ts: float = 1_700_000_000.0) -> dict:
+    return {"ts": ts, "price": 0.5, "size": size, "side": "BUY", "whale_tier": 0}
+
+
+def make_writer():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    redis_client = MagicMock()
+    redis_client.client.pipeline.return_value = pipe
+    return CoalescingRedisWriter(redis_client, tick_seconds=1.0), redis_client, pipe
+
+
+class TestCoalescingRedisWriter:
+    """Tests for CoalescingRedisWriter.flush()."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_one_pipeline(self):
+        """A burst of trades for one market is sent as a single pipeline."""
+        writer, redis_client, pipe = make_writer()
+
+        for i in range(3):
+            writer.push_trade("cid", make_trade(size=i + 1))
+            writer.set_ws_last_event("cid")
+            writer.set_price("cid", 0.5 + i / 100)
+            writer.set_ws_last_activity()
+
+        commands = await writer.flush()
+
+        redis_client.client.pipeline.assert_called_once_with(transaction=False)
+        pipe.execute.assert_awaited_once()
+        # ZADD + ZREMRANGEBYSCORE + ZREMRANGEBYRANK + EXPIRE
+        # + HSET last_event + HSET prices + SET activity
+        assert commands == 7
+        assert writer.writes_buffered == 12
+
+    @pytest.mark.asyncio
+    async def test_last_write_wins(self):
+        """Repeated price updates collapse to the latest value."""
+        writer, _, pipe = make_writer()
+
+        writer.set_price("cid", 0.40)
+        writer.set_price("cid", 0.45)
+        writer.set_price("cid", 0.47)
+        await writer.flush()
+
+        pipe.hset.assert_called_once_with("prices", mapping={"cid": "0.47"})
+
+    @pytest.mark.asyncio
+    async def test_trades_added_with_epoch_ms_scores(self):
+        """Trades for a market go out as one ZADD of packed members."""
+        writer, _, pipe = make_writer()
+
+        writer.push_trade("cid", make_trade(size=1, ts=100.0))
+        writer.push_trade("cid", make_trade(size=2, ts=100.5))
+        await writer.flush()
+
+        key, mapping = pipe.zadd.call_args.args
+        assert key == "tradebuf:cid"
+        assert sorted(mapping.values()) == [100_000, 100_500]
+        assert sorted(decode_trade(m)["size"] for m in mapping) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_empty_flush_sends_nothing(self):
+        """No buffered writes means no pipeline."""
+        writer, redis_client, _ = make_writer()
+
+        assert await writer.flush() == 0
+        redis_client.client.pipeline.assert_not_called()
+
+
+class TestTradeCodec:
+    """Tests for the packed trade buffer encoding."""
+
+    def test_round_trip(self):
+        """Encoding then decoding preserves the trade fields."""
+        trade = {"ts": 1_700_000_000.123, "price": 0.42, "size": 2500.0, "side": "SELL", "whale_tier": 2}
+        member, score = encode_trade(trade)
+
+        assert len(member) == TRADE_STRUCT.size
+        assert score == 1_700_000_000_123
+        assert decode_trade(member) == trade
+
+    def test_identical_trades_stay_distinct(self):
+        """Two identical trades in the same millisecond are separate members."""
+        a, _ = encode_trade(make_trade())
+        b, _ = encode_trade(make_trade())
+        assert a != b
+
+    def test_legacy_entries_merged_newest_first(self):
+        """Legacy JSON list entries are filtered by age and merged with packed ones."""
+        now = time.time()
+        packed = [encode_trade(make_trade(size=1, ts=now - 10))[0]]
+        legacy = [
+            json.dumps({"timestamp": "2020-01-01T00:00:00+00:00", "price": 0.5, "size": 9, "side": "BUY"}),
+            json.dumps({
+                "timestamp": datetime.fromtimestamp(now - 5).astimezone().isoformat(),
+                "price": 0.5, "size": 2, "side": "SELL", "whale_tier": 1,
+            }),
+            "not json",
+        ]
+
+        trades = _merge_trade_buffers(packed, legacy, cutoff=now - 3600)
+
+        assert [t["size"] for t in trades] == [2, 1]
+        assert trades[0]["side"] == "SELL"
+
+
+class TestGammaCache:
+    """Tests for the per-market Gamma cache encoding."""
+
+    def test_replace_is_one_transaction_and_bumps_version(self):
+        """A warm writes every market as a hash field and increments the version."""
+        pipe = MagicMock()
+        pipe.execute.return_value = [1, 2, True, 7]
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value = pipe
+
+        version = client.set_gamma_markets_cache(
+            [{"conditionId": "a", "volume24hr": 1}, {"conditionId": "b"}, {"id": "no-cid"}],
+            ttl=30,
+        )
+
+        client._client.pipeline.assert_called_once_with(transaction=True)
+        pipe.delete.assert_called_once_with(GAMMA_MARKETS_KEY, GAMMA_DIGEST_KEY)
+        mapping = pipe.hset.call_args.kwargs["mapping"]
+        assert set(mapping) == {"a", "b"}
+        pipe.incr.assert_called_once_with(GAMMA_VERSION_KEY)
+        assert version == 7
+
+    def test_hmget_skips_missing_and_corrupt(self):
+        """Only requested, present and valid markets are returned."""
+        pipe = MagicMock()
+        pipe.execute.return_value = [1, [json.dumps({"conditionId": "a"}), None, "{bad"]]
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value = pipe
+
+        markets = client.get_gamma_markets(["a", "b", "c"])
+
+        pipe.hmget.assert_called_once_with(GAMMA_MARKETS_KEY, ["a", "b", "c"])
+        assert markets == {"a": {"conditionId": "a"}}
+
+    def test_cold_cache_is_none(self):
+        """A missing hash means the cache is cold, not that markets are absent."""
+        pipe = MagicMock()
+        pipe.execute.return_value = [0, [None]]
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value = pipe
+
+        assert client.get_gamma_markets(["a"]) is None
+
+
+class TestSnapshotState:
+    """Tests for the per-market snapshot state and written-vector keys."""
+
+    def test_each_market_gets_its_own_ttl(self):
+        """Writing one market must not extend the lifetime of another."""
+        pipe = MagicMock()
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value = pipe
+
+        client.set_snapshot_state({"a": [1.0, 0.5]})
+        client.set_snapshot_written({"b": {"ts": 1.0, "features": {}}})
+
+        keys = [c.args[0] for c in pipe.set.call_args_list]
+        assert keys == [snapshot_state_key("a"), snapshot_written_key("b")]
+        assert all(c.kwargs["ex"] == SNAPSHOT_STATE_TTL for c in pipe.set.call_args_list)
+        pipe.expire.assert_not_called()
+
+    def test_activity_reads_count_and_last_trade(self):
+        """State and (trade_count_1h, last_trade_at) come from one pipeline."""
+        pipe = MagicMock()
+        pipe.execute.return_value = [
+            [json.dumps([1.0, 0.5]), None, None],
+            [json.dumps(4), json.dumps(990.5)],
+            [json.dumps(0), None],
+            [None, None],
+        ]
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value = pipe
+
+        states, activity = client.get_snapshot_activity(["a", "b", "c"])
+
+        pipe.hmget.assert_any_call("metrics:a", "trade_count_1h", "last_trade_at")
+        assert states == {"a": [1.0, 0.5]}
+        assert activity == {"a": (4, 990.5), "b": (0, None)}
+
+    def test_written_read_skips_missing_and_corrupt(self):
+        """Expired or unreadable entries are treated as never written."""
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.mget.return_value = [json.dumps({"ts": 1.0}), None, "{bad"]
+
+        written = client.get_snapshot_written(["a", "b", "c"])
+
+        client._client.mget.assert_called_once_with([snapshot_written_key(c) for c in "abc"])
+        assert written == {"a": {"ts": 1.0}}
+
+
+class TestGammaDelta:
+    """Tests for delta-aware Gamma cache warming and the process-local view."""
+
+    def test_diff_only_reports_changed_and_removed(self):
+        """Unchanged markets produce no writes; vanished markets are removed."""
+        markets = [{"conditionId": "a", "volume24hr": 1}, {"conditionId": "b", "volume24hr": 2}]
+        values, digests, removed = diff_gamma_markets(markets, {})
+        assert set(values) == {"a", "b"}
+        assert removed == []
+
+        markets = [{"conditionId": "a", "volume24hr": 1}, {"conditionId": "c"}]
+        values, new_digests, removed = diff_gamma_markets(markets, digests)
+        assert set(values) == {"c"}
+        assert removed == ["b"]
+
+    def test_diff_ignores_fields_nobody_reads(self):
+        """Volatile unread fields do not count as a change; consumed ones do."""
+        market = {"conditionId": "a", "volume24hr": 1, "bestBid": "0.4", "updatedAt": "t1"}
+        _, digests, _ = diff_gamma_markets([market], {})
+
+        values, _, _ = diff_gamma_markets([{**market, "updatedAt": "t2", "competitive": 0.9}], digests)
+        assert values == {}
+
+        values, _, _ = diff_gamma_markets([{**market, "updatedAt": "t2", "bestBid": "0.41"}], digests)
+        # The full payload is stored, not just the hashed fields
+        assert json.loads(values["a"])["updatedAt"] == "t2"
+
+    def test_delta_warm_writes_counts_to_stream_and_ids_to_key(self):
+        """Stream entries stay small; the ID lists expire with their own TTL."""
+        _, digests, _ = diff_gamma_markets([{"conditionId": "a"}, {"conditionId": "b"}], {})
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        pipe = client._client.pipeline.return_value.__enter__.return_value
+        pipe.exists.return_value = True
+        pipe.hgetall.return_value = digests
+        pipe.get.return_value = "4"
+
+        result = client.update_gamma_markets_cache(
+            [{"conditionId": "a", "bestBid": "0.5"}, {"conditionId": "c"}]
+        )
+
+        assert result == {"version": 5, "changed": 2, "removed": 1, "full": False}
+        pipe.xadd.assert_called_once()
+        assert pipe.xadd.call_args.args[:2] == (GAMMA_CHANGES_STREAM, {"version": 5, "changed": 2, "removed": 1})
+        pipe.set.assert_called_once_with(
+            gamma_changes_ids_key(5),
+            json.dumps({"changed": ["a", "c"], "removed": ["b"]}),
+            ex=GAMMA_CHANGES_IDS_TTL,
+        )
+
+    def test_read_changes_resolves_ids(self):
+        """Delta entries get their ID lists; expired IDs turn into a full rewrite."""
+        client = SyncRedisClient()
+        client._client = MagicMock()
+        client._client.pipeline.return_value.execute.return_value = [1, "6", [
+            ("5-0", {"version": "5", "changed": "1", "removed": "0"}),
+            ("6-0", {"version": "6", "changed": "1", "removed": "0"}),
+        ]]
+        client._client.mget.return_value = [None, json.dumps({"changed": ["a"], "removed": []})]
+
+        version, entries = client.read_gamma_changes("4-0")
+
+        client._client.mget.assert_called_once_with([gamma_changes_ids_key(5), gamma_changes_ids_key(6)])
+        assert version == 6
+        assert entries[0][1]["full"] == "1"
+        assert entries[1][1]["changed"] == ["a"]
+
+        view = GammaMarketView()
+        view.version, view.markets = 4, {"a": {}, "b": {}}
+        view.apply_changes(version, entries)
+        # Expired IDs of version 5 force a reset
+        assert view.markets == {}
+        assert view.resets == 1
+
+    def test_view_evicts_only_changed_markets(self):
+        """Consecutive versions evict listed markets; everything else stays cached."""
+        view = GammaMarketView()
+        view.apply_changes(1, [("1-0", {"full": "1"})])
+        view.markets = {"a": {"v": 1}, "b": {"v": 1}}
+
+        view.apply_changes(2, [("2-0", {"version": "2", "changed": ["a"], "removed": []})])
+
+        assert set(view.markets) == {"b"}
+        assert view.last_id == "2-0"
+        assert view.version == 2
+
+    def test_view_resets_on_version_gap(self):
+        """A skipped version (trimmed stream) drops the whole view."""
+        view = GammaMarketView()
+        view.apply_changes(1, [("1-0", {"full": "1"})])
+        view.markets = {"a": {}, "b": {}}
+
+        view.apply_changes(5, [("5-0", {"version": "5", "changed": ["a"], "removed": []})])
+
+        assert view.markets == {}
+        assert view.version == 5
+
+    def test_view_fetches_only_missing(self):
+        """Cached markets are served locally; only unseen ones hit HMGET."""
+        view = GammaMarketView()
+        redis = MagicMock()
+        redis.read_gamma_changes.return_value = (3, [])
+        redis.get_gamma_markets.return_value = {"b": {"conditionId": "b"}}
+        view.version = 3
+        view.last_id = "3-0"
+        view.markets = {"a": {"conditionId": "a"}}
+
+        markets = view.get_markets(redis, ["a", "b"])
+
+        redis.get_gamma_markets.assert_called_once_with(["b"])
+        assert set(markets) == {"a", "b"}
+        assert view.hits == 1
@@ -0,0 +1,96 @@
+"""
+Tests for WebSocket frame recording and local replay.
+
+Tests:
+- Recordings round-trip text and binary frames with offsets and markets
+- Files with bare frames (no timestamps) still load
+- The replay server sends each connection only its subscribed tokens' frames
+- Replay is paced by the recorded offsets times the speed
+"""
+
+import asyncio
+import gzip
+import json
+import time
+
+import pytest
+import websockets
+
+from src.collectors.replay import FrameRecorder, Recording, ReplayServer, frame_assets, read_recording
+
+MARKETS = {"c1": {"yes_token_id": "y1", "no_token_id": "n1", "market_id": 1, "tier": 4}}
+
+
+def trade(asset_id):
+    return json.dumps({"event_type": "last_trade_price", "asset_id": asset_id, "price": "0.5"})
+
+
+class TestRecording:
+    """Tests for FrameRecorder and read_recording()."""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "frames.rec.gz")
+        with FrameRecorder(path, MARKETS, source="wss://example") as recorder:
+            recorder.write(trade("y1"), at=recorder._start + 0.25)
+            recorder.write(b"\x81\xa1a\x01", at=recorder._start + 0.5)
+
+        recording = read_recording(path)
+
+        assert recording.markets == MARKETS
+        assert recording.source == "wss://example"
+        assert recording.frames == [(0.25, trade("y1")), (0.5, b"\x81\xa1a\x01")]
+        assert recording.duration == 0.25
+
+    def test_bare_frames(self, tmp_path):
+        path = str(tmp_path / "frames.txt.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(trade("y1") + "\n\nPONG\n")
+
+        assert read_recording(path).frames == [(0.0, trade("y1")), (0.0, "PONG")]
+
+    def test_frame_assets(self):
+        batch = json.dumps([
+            {"event_type": "price_change", "price_changes": [{"asset_id": "a"}, {"asset_id": "b"}]},
+            {"event_type": "book", "asset_id": "c"},
+        ])
+
+        assert frame_assets(batch) == {"a", "b", "c"}
+        assert frame_assets("PONG") is None
+
+
+class TestReplayServer:
+    """Tests for ReplayServer over a local socket."""
+
+    async def _receive(self, url, tokens, count):
+        async with websockets.connect(url) as ws:
+            await ws.send(json.dumps({"type": "market", "assets_ids": tokens}))
+            return [await asyncio.wait_for(ws.recv(), timeout=5) for _ in range(count)]
+
+    @pytest.mark.asyncio
+    async def test_sends_subscribed_tokens_only(self):
+        recording = Recording(MARKETS, [(0.0, trade("y1")), (0.1, trade("other")), (0.2, trade("n1"))])
+        server = ReplayServer(recording, speed=0, loops=2)
+        url = await server.start()
+        try:
+            frames = await self._receive(url, ["y1", "n1"], 4)
+            await server.wait_done(1)
+        finally:
+            await server.stop()
+
+        assert frames == [trade("y1"), trade("n1")] * 2
+        assert server.frames_sent == 4
+
+    @pytest.mark.asyncio
+    async def test_paced_by_speed(self):
+        recording = Recording(MARKETS, [(1.0, trade("y1")), (1.4, trade("y1"))])
+        server = ReplayServer(recording, speed=2)
+        url = await server.start()
+        try:
+            start = time.monotonic()
+            await self._receive(url, ["y1"], 2)
+            elapsed = time.monotonic() - start
+        finally:
+            await server.stop()
+
+        # 0.4s recorded gap at 2x
+        assert 0.18 <= elapsed < 1.0
@@ -0,0 +1,144 @@
+"""
+Tests for GET coalescing and the short-TTL response cache in the API clients.
+
+Tests:
+- Fresh responses are served from cache and expire after their TTL
+- The least recently used response is evicted when the cache is full
+- Concurrent identical GETs share one request (threads and coroutines)
+- Callers get copies, never the cached object
+- Paths without a TTL bypass the cache
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.fetchers.base import BaseClient, ResponseCache, SyncBaseClient
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_hit_until_ttl_expires(self, monkeypatch):
+        """A response is served until its path's TTL has passed."""
+        clock = [100.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        cache = ResponseCache({"/book": 2.0})
+        key = ResponseCache.key("/book", {"token_id": "a"})
+
+        cache.put(key, {"bids": []})
+        assert cache.get(key) == (True, {"bids": []})
+
+        clock[0] += 2.5
+        assert cache.get(key) == (False, None)
+        assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 0, "entries": 0}
+
+    def test_evicts_least_recently_used(self):
+        """The oldest untouched entry goes first when the cache is full."""
+        cache = ResponseCache({"/book": 60.0}, max_entries=2)
+        a, b, c = (ResponseCache.key("/book", {"token_id": t}) for t in "abc")
+
+        cache.put(a, 1)
+        cache.put(b, 2)
+        cache.get(a)
+        cache.put(c, 3)
+
+        assert cache.get(a)[0] and cache.get(c)[0]
+        assert not cache.get(b)[0]
+
+    def test_key_ignores_param_order(self):
+        assert ResponseCache.key("/prices", {"a": 1, "b": 2}) == ResponseCache.key("/prices", {"b": 2, "a": 1})
+
+
+class TestSyncCoalescing:
+    """Tests for SyncBaseClient.get() coalescing and caching."""
+
+    def test_concurrent_gets_share_one_request(self):
+        """Threads asking for the same book wait on a single request."""
+        client = SyncBaseClient("https://api.invalid", 100, response_cache_ttls={"/book": 5.0})
+        calls = []
+
+        def fetch(path, params=None, request_id=None):
+            calls.append(path)
+            time.sleep(0.05)
+            return {"bids": [["0.5", "10"]]}
+
+        client._get = fetch
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.get("/book", {"token_id": "a"})))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(results) == 6
+        # Later call is a cache hit
+        client.get("/book", {"token_id": "a"})
+        assert len(calls) == 1
+        client.close()
+
+    def test_callers_get_copies(self):
+        """Mutating a returned response does not change what others receive."""
+        client = SyncBaseClient("https://api.invalid", 100, response_cache_ttls={"/book": 5.0})
+        client._get = lambda path, params=None, request_id=None: {"bids": []}
+
+        first = client.get("/book")
+        first["bids"].append("mutated")
+
+        assert client.get("/book") == {"bids": []}
+        client.close()
+
+    def test_uncached_path_always_fetches(self):
+        client = SyncBaseClient("https://api.invalid", 100, response_cache_ttls={"/book": 5.0})
+        calls = []
+        client._get = lambda path, params=None, request_id=None: calls.append(path) or {}
+
+        client.get("/markets")
+        client.get("/markets")
+
+        assert calls == ["/markets", "/markets"]
+        client.close()
+
+    def test_error_reaches_every_waiter(self):
+        """A failed request raises in the caller; nothing is cached."""
+        client = SyncBaseClient("https://api.invalid", 100, response_cache_ttls={"/book": 5.0})
+
+        def fail(path, params=None, request_id=None):
+            raise ValueError("boom")
+
+        client._get = fail
+        with pytest.raises(ValueError):
+            client.get("/book")
+        assert client.response_cache.stats()["entries"] == 0
+        client.close()
+
+
+class TestAsyncCoalescing:
+    """Tests for BaseClient.get() coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_share_one_request(self):
+        """Coroutines share one in-flight request even with a zero TTL."""
+        client = BaseClient("https://api.invalid", 100, response_cache_ttls={"/book": 0})
+        calls = []
+
+        async def fetch(path, params=None, request_id=None):
+            calls.append(path)
+            await asyncio.sleep(0.02)
+            return {"asks": []}
+
+        client._get = fetch
+        results = await asyncio.gather(*(client.get("/book", {"token_id": "a"}) for _ in range(5)))
+        await client.get("/book", {"token_id": "a"})
+
+        assert results == [{"asks": []}] * 5
+        # Zero TTL: coalesced while in flight, refetched afterwards
+        assert len(calls) == 2
+        assert client.response_cache.stats()["coalesced"] == 4
+        await client.close()
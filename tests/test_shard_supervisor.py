@@ -0,0 +1,128 @@
+"""
+Tests for the process-sharded collector supervisor.
+
+Tests:
+- Eligible markets are split across all shards and published with a version
+- A dead shard's markets move to the live shards
+- A restarted shard gets markets back on the next rebalance
+"""
+
+from itertools import count
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.collectors.shards import ShardSupervisor
+from src.config.settings import settings
+
+
+class FakeProcess:
+    """Stands in for a shard process."""
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.pid = 1000 + shard_id
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+    def kill(self):
+        self.alive = False
+
+
+def row(market_id, tier=4):
+    return SimpleNamespace(
+        condition_id=f"c{market_id}",
+        id=market_id,
+        yes_token_id=f"y{market_id}",
+        no_token_id=f"n{market_id}",
+        tier=tier,
+        active=True,
+        resolved=False,
+        subscription_version=market_id,
+    )
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    monkeypatch.setattr(settings, "websocket_shard_restart_delay", 5.0)
+    monkeypatch.setattr(settings, "websocket_shard_rebalance_max_moves", 500)
+    redis = MagicMock()
+    versions = count(1)
+    redis.set_shard_assignments.side_effect = lambda assignments: next(versions)
+    supervisor = ShardSupervisor(3, redis=redis, process_factory=lambda shard_id, n: FakeProcess(shard_id))
+    supervisor.subscriptions.apply_full([row(i) for i in range(30)], high_water=30)
+    supervisor.subscriptions.refresh = MagicMock()
+    for shard_id in range(3):
+        supervisor._start_shard(shard_id)
+    return supervisor
+
+
+def per_shard(supervisor):
+    counts = {}
+    for shard_id in supervisor.assignment.values():
+        counts[shard_id] = counts.get(shard_id, 0) + 1
+    return counts
+
+
+class TestShardSupervisor:
+    """Tests for ShardSupervisor assignment and restarts."""
+
+    def test_initial_split(self, supervisor):
+        supervisor.rebalance()
+
+        assert per_shard(supervisor) == {0: 10, 1: 10, 2: 10}
+        published = supervisor.redis.set_shard_assignments.call_args.args[0]
+        assert sorted(published) == [0, 1, 2]
+        assert supervisor.version == 1
+
+        # Nothing changed: no new version
+        supervisor.rebalance()
+        assert supervisor.redis.set_shard_assignments.call_count == 1
+
+    def test_dead_shard_markets_redistributed(self, supervisor):
+        supervisor.rebalance()
+        before = dict(supervisor.assignment)
+        supervisor.processes[1].alive = False
+
+        assert supervisor.check_shards({0: {}, 2: {}}, now=0.0)
+        supervisor.rebalance()
+
+        assert set(per_shard(supervisor)) == {0, 2}
+        assert len(supervisor.assignment) == 30
+        # Markets on live shards stay put
+        assert all(supervisor.assignment[cid] == shard for cid, shard in before.items() if shard != 1)
+        published = supervisor.redis.set_shard_assignments.call_args.args[0]
+        assert published[1] == []
+        # Moved markets are still connected somewhere
+        supervisor.redis.remove_ws_connected.assert_called_with(set())
+
+    def test_restart_after_delay_rebalances_back(self, supervisor):
+        supervisor.rebalance()
+        supervisor.processes[2].alive = False
+        supervisor.check_shards({0: {}, 1: {}}, now=0.0)
+        supervisor.rebalance()
+
+        # Not restarted before the delay
+        assert not supervisor.check_shards({0: {}, 1: {}}, now=2.0)
+        assert 2 not in supervisor.processes
+
+        assert supervisor.check_shards({0: {}, 1: {}}, now=6.0)
+        supervisor.rebalance()
+
+        assert supervisor.restarts == 1
+        assert supervisor.processes[2].is_alive()
+        assert per_shard(supervisor)[2] > 0
+        assert len(supervisor.assignment) == 30
@@ -0,0 +1,160 @@
+"""
+Tests for change-suppressed snapshot writes.
+
+Tests:
+- Price-like columns use the absolute tolerance, others the relative one
+- Clock-derived and identity columns are ignored
+- A value appearing or disappearing is a change
+- Unchanged rows are suppressed until the max-age heartbeat
+- suppress_unchanged() reads the last written vectors from Redis and
+  reports suppressed market IDs
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.config.settings import settings
+from src.snapshots import dedup
+
+NOW = 1_000_000.0
+ABS = 0.001
+REL = 0.01
+
+
+def changed(previous, current):
+    return dedup.features_changed(previous, current, ABS, REL)
+
+
+def row(**overrides):
+    """Snapshot row with stable features and clock columns."""
+    values = {
+        "market_id": 1, "timestamp": NOW, "tier": 4,
+        "price": 0.5, "spread": 0.02, "volume_24h": 1000.0, "trade_count_1h": 0,
+        "hours_to_close": 48.0, "time_since_whale": 120.0,
+    }
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture(autouse=True)
+def dedup_settings(monkeypatch):
+    monkeypatch.setattr(settings, "snapshot_dedup_abs_tolerance", ABS)
+    monkeypatch.setattr(settings, "snapshot_dedup_rel_tolerance", REL)
+    monkeypatch.setattr(settings, "snapshot_dedup_max_age", 300.0)
+
+
+class TestFeaturesChanged:
+    """Tests for features_changed()."""
+
+    def test_absolute_tolerance_for_prices(self):
+        assert not changed({"price": 0.5}, {"price": 0.5009})
+        assert changed({"price": 0.5}, {"price": 0.502})
+
+    def test_relative_tolerance_for_volumes(self):
+        # 1% of 1000 = 10
+        assert not changed({"volume_24h": 1000.0}, {"volume_24h": 1009.0})
+        assert changed({"volume_24h": 1000.0}, {"volume_24h": 1011.0})
+
+    def test_relative_tolerance_floor_of_one_unit(self):
+        # Tiny old values still need a move of at least 1% of 1.0
+        assert not changed({"trade_count_1h": 0}, {"trade_count_1h": 0.005})
+        assert changed({"trade_count_1h": 0}, {"trade_count_1h": 1})
+
+    def test_value_appearing_or_disappearing(self):
+        assert changed({"price": None}, {"price": 0.5})
+        assert changed({"price": 0.5}, {"price": None})
+        assert changed({}, {"spread": 0.02})
+        assert not changed({"price": None}, {"price": None})
+
+    def test_clock_columns_ignored(self):
+        previous = dedup.feature_vector(row())
+        current = dedup.feature_vector(row(timestamp=NOW + 60, hours_to_close=47.9, time_since_whale=180.0))
+
+        assert "hours_to_close" not in current
+        assert not changed(previous, current)
+
+
+class TestSelectChangedRows:
+    """Tests for select_changed_rows()."""
+
+    def written(self, age, **overrides):
+        return {"c1": {"ts": NOW - age, "features": dedup.feature_vector(row(**overrides))}}
+
+    def test_first_row_written(self):
+        keep, written = dedup.select_changed_rows([row()], ["c1"], {}, NOW)
+
+        assert keep == [0]
+        assert written["c1"] == {"ts": NOW, "features": dedup.feature_vector(row())}
+
+    def test_unchanged_row_suppressed(self):
+        keep, written = dedup.select_changed_rows([row(hours_to_close=47.0)], ["c1"], self.written(60), NOW)
+
+        assert keep == []
+        assert written == {}
+
+    def test_changed_row_written(self):
+        keep, _ = dedup.select_changed_rows([row(price=0.6)], ["c1"], self.written(60), NOW)
+
+        assert keep == [0]
+
+    def test_max_age_heartbeat(self):
+        keep, written = dedup.select_changed_rows([row()], ["c1"], self.written(300), NOW)
+
+        assert keep == [0]
+        assert written["c1"]["ts"] == NOW
+        # An explicit max_age overrides the setting
+        keep, _ = dedup.select_changed_rows([row()], ["c1"], self.written(60), NOW, max_age=30)
+        assert keep == [0]
+
+    def test_rows_decided_independently(self):
+        previous = {**self.written(60), **{"c2": self.written(60)["c1"]}}
+
+        keep, written = dedup.select_changed_rows(
+            [row(), row(price=0.6)], ["c1", "c2"], previous, NOW
+        )
+
+        assert keep == [1]
+        assert set(written) == {"c2"}
+
+
+class TestSuppressUnchanged:
+    """Tests for suppress_unchanged() and store_written_entries() against Redis."""
+
+    @pytest.fixture(autouse=True)
+    def frozen_clock(self, monkeypatch):
+        monkeypatch.setattr(dedup.time, "time", lambda: NOW)
+
+    def test_suppressed_rows_reported_by_market_id(self):
+        redis_client = MagicMock()
+        redis_client.get_snapshot_written.return_value = {
+            "c1": {"ts": NOW - 60, "features": dedup.feature_vector(row(market_id=1))},
+        }
+        rows = [row(market_id=1), row(market_id=2)]
+
+        kept, suppressed, written = dedup.suppress_unchanged(redis_client, 4, rows, ["c1", "c2"])
+
+        redis_client.get_snapshot_written.assert_called_once_with(["c1", "c2"])
+        assert kept == [rows[1]]
+        assert suppressed == {1}
+        assert set(written) == {"c2"}
+
+    def test_read_failure_writes_every_row(self):
+        redis_client = MagicMock()
+        redis_client.get_snapshot_written.side_effect = ConnectionError("down")
+        rows = [row(market_id=1), row(market_id=2)]
+
+        kept, suppressed, written = dedup.suppress_unchanged(redis_client, 4, rows, ["c1", "c2"])
+
+        assert kept == rows
+        assert suppressed == set()
+        assert set(written) == {"c1", "c2"}
+
+    def test_store_failure_is_not_fatal(self):
+        redis_client = MagicMock()
+        redis_client.set_snapshot_written.side_effect = ConnectionError("down")
+
+        dedup.store_written_entries(redis_client, {"c1": {"ts": NOW, "features": {}}})
+        dedup.store_written_entries(redis_client, {})
+
+        redis_client.set_snapshot_written.assert_called_once()
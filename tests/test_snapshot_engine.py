@@ -0,0 +1,208 @@
+"""
+Tests for the asyncio snapshot fetch stage.
+
+Tests:
+- Cached books are served from one MGET without touching the CLOB
+- Cache misses fall back to the CLOB, bounded by the concurrency limit
+- A failing CLOB call drops only that market
+- A failed cache read falls back to the CLOB for every market
+- A failed published-metrics read is logged as a warning and recomputed
+- Published metrics are used first, the trade buffer only for the rest
+- fetch_market_inputs() only fetches the sources the tier has enabled
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.collectors.metrics import PUBLISHED_AT_KEY
+from src.config.settings import settings
+from src.snapshots import engine
+
+BOOK = {"bids": [{"price": "0.49", "size": "10"}], "asks": [{"price": "0.51", "size": "10"}]}
+
+
+class FakeRedis:
+    """Async Redis stand-in serving cached books, published metrics and trade buffers."""
+
+    def __init__(self, books=None, metrics=None, trades=None, fail=()):
+        self.books = books or {}
+        self.metrics = metrics or {}
+        self.trades = trades or {}
+        self.fail = set(fail)
+        self.calls: list[tuple[str, list]] = []
+
+    async def get_orderbooks_many(self, condition_ids):
+        self.calls.append(("get_orderbooks_many", list(condition_ids)))
+        if "books" in self.fail:
+            raise ConnectionError("down")
+        return {cid: self.books[cid] for cid in condition_ids if cid in self.books}
+
+    async def get_metrics_many(self, condition_ids):
+        self.calls.append(("get_metrics_many", list(condition_ids)))
+        if "metrics" in self.fail:
+            raise ConnectionError("down")
+        return {cid: self.metrics[cid] for cid in condition_ids if cid in self.metrics}
+
+    async def get_trades_1h_many(self, condition_ids):
+        self.calls.append(("get_trades_1h_many", list(condition_ids)))
+        return {cid: self.trades.get(cid, []) for cid in condition_ids}
+
+
+class FakeCLOB:
+    """Async CLOB stand-in that records peak concurrency."""
+
+    def __init__(self, fail=(), delay=0.01):
+        self.fail = set(fail)
+        self.delay = delay
+        self.requested: list[str] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_orderbook(self, token_id):
+        self.requested.append(token_id)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if token_id in self.fail:
+                raise RuntimeError("502")
+            return {**BOOK, "token": token_id}
+        finally:
+            self.in_flight -= 1
+
+
+class TestFetchOrderbooks:
+    """Tests for fetch_orderbooks()."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_clob(self):
+        redis = FakeRedis(books={"c1": {**BOOK, "features": {"bid_levels": 1}}})
+        clob = FakeCLOB()
+
+        raw, features = await engine.fetch_orderbooks(redis, clob, {"c1": "t1"}, concurrency=4)
+
+        assert redis.calls == [("get_orderbooks_many", ["c1"])]
+        assert clob.requested == []
+        assert raw["c1"]["bids"] == BOOK["bids"]
+        assert features == {"c1": {"bid_levels": 1}}
+
+    @pytest.mark.asyncio
+    async def test_miss_falls_back_to_clob(self):
+        # c2 is cached without asks, which counts as a miss
+        redis = FakeRedis(books={"c1": BOOK, "c2": {"bids": BOOK["bids"], "asks": []}})
+        clob = FakeCLOB()
+
+        raw, features = await engine.fetch_orderbooks(
+            redis, clob, {"c1": "t1", "c2": "t2", "c3": "t3"}, concurrency=4
+        )
+
+        assert sorted(clob.requested) == ["t2", "t3"]
+        assert raw["c1"] is BOOK
+        assert raw["c2"]["token"] == "t2"
+        assert raw["c3"]["token"] == "t3"
+        # API books have no published features (extracted later in one batch)
+        assert features == {}
+
+    @pytest.mark.asyncio
+    async def test_clob_error_drops_only_that_market(self):
+        clob = FakeCLOB(fail={"t2"})
+
+        raw, _ = await engine.fetch_orderbooks(FakeRedis(), clob, {"c1": "t1", "c2": "t2"}, concurrency=4)
+
+        assert set(raw) == {"c1"}
+
+    @pytest.mark.asyncio
+    async def test_cache_read_failure_uses_clob(self):
+        clob = FakeCLOB()
+
+        raw, _ = await engine.fetch_orderbooks(
+            FakeRedis(books={"c1": BOOK}, fail={"books"}), clob, {"c1": "t1"}, concurrency=4
+        )
+
+        assert clob.requested == ["t1"]
+        assert set(raw) == {"c1"}
+
+    @pytest.mark.asyncio
+    async def test_clob_requests_bounded_by_concurrency(self):
+        clob = FakeCLOB()
+        tokens = {f"c{i}": f"t{i}" for i in range(20)}
+
+        raw, _ = await engine.fetch_orderbooks(FakeRedis(), clob, tokens, concurrency=3)
+
+        assert len(raw) == 20
+        assert clob.peak == 3
+
+
+class TestFetchMetrics:
+    """Tests for fetch_metrics()."""
+
+    @pytest.mark.asyncio
+    async def test_published_first_then_trade_buffer(self):
+        trade = {"ts": 1_000.0, "price": 0.5, "size": 10.0, "side": "BUY", "whale_tier": 0}
+        redis = FakeRedis(
+            metrics={
+                "c1": {"trade_count_1h": 7, PUBLISHED_AT_KEY: 1.0},
+                # Not published by the collector (no marker): recomputed
+                "c2": {"trade_count_1h": 99},
+            },
+            trades={"c2": [trade]},
+        )
+
+        metrics = await engine.fetch_metrics(redis, ["c1", "c2", "c3"])
+
+        assert redis.calls == [
+            ("get_metrics_many", ["c1", "c2", "c3"]),
+            ("get_trades_1h_many", ["c2", "c3"]),
+        ]
+        assert metrics["c1"] == {"trade_count_1h": 7}
+        assert metrics["c2"]["trade_count_1h"] == 1
+        assert metrics["c3"]["trade_count_1h"] == 0
+
+    @pytest.mark.asyncio
+    async def test_published_read_failure_recomputes_all(self, monkeypatch):
+        logger = MagicMock()
+        monkeypatch.setattr(engine, "logger", logger)
+        redis = FakeRedis(fail={"metrics"})
+
+        metrics = await engine.fetch_metrics(redis, ["c1"])
+
+        assert redis.calls[-1] == ("get_trades_1h_many", ["c1"])
+        assert metrics["c1"]["trade_count_1h"] == 0
+        # The fallback is visible, not silent
+        logger.warning.assert_called_once()
+        assert logger.warning.call_args.kwargs["markets"] == 1
+
+
+class TestFetchMarketInputs:
+    """Tests for fetch_market_inputs()."""
+
+    @pytest.mark.asyncio
+    async def test_sources_follow_tier_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "orderbook_enabled_tiers", [4])
+        monkeypatch.setattr(settings, "websocket_enabled_tiers", [3, 4])
+        redis = FakeRedis(books={"c1": BOOK})
+        clob = FakeCLOB()
+
+        raw, _, metrics = await engine.fetch_market_inputs(
+            redis, clob, 3, ["c1", "c2"], {"c1": "t1", "c2": "t2"}, 4
+        )
+
+        assert raw == {}
+        assert set(metrics) == {"c1", "c2"}
+        assert clob.requested == []
+
+    @pytest.mark.asyncio
+    async def test_markets_without_token_get_no_orderbook(self, monkeypatch):
+        monkeypatch.setattr(settings, "orderbook_enabled_tiers", [4])
+        monkeypatch.setattr(settings, "websocket_enabled_tiers", [])
+        clob = FakeCLOB()
+
+        raw, _, metrics = await engine.fetch_market_inputs(
+            FakeRedis(), clob, 4, ["c1", "c2"], {"c1": "t1", "c2": None}, 4
+        )
+
+        assert clob.requested == ["t1"]
+        assert set(raw) == {"c1"}
+        assert metrics == {}
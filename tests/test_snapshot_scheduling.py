@@ -0,0 +1,161 @@
+"""
+Tests for activity-driven snapshot scheduling.
+
+Tests:
+- Never-snapshotted markets are due
+- Markets younger than the min interval are skipped, changed or not
+- Unchanged markets wait for the max interval (with beat slack)
+- Changed markets are due at the activity interval, hot ones at the min
+- A 1h trade count falling from expiry alone is not a change
+- state_changed() epsilon, newer-trade and None handling
+- select_adaptive() reads stored state and treats a failed read as all due
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.config.settings import settings
+from src.snapshots import scheduling
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture(autouse=True)
+def adaptive_settings(monkeypatch):
+    monkeypatch.setattr(settings, "adaptive_snapshot_min_interval", {4: 5.0})
+    monkeypatch.setattr(settings, "adaptive_snapshot_max_interval", {4: 60.0})
+    monkeypatch.setattr(settings, "adaptive_snapshot_hot_trades_per_min", 5.0)
+    monkeypatch.setattr(settings, "adaptive_snapshot_price_epsilon", 0.0005)
+    monkeypatch.setattr(settings, "tier_4_interval", 15)
+
+
+def state(age, price=0.5, last_trade_at=None):
+    """State list in STATE_FIELDS order, stored `age` seconds before NOW."""
+    return [NOW - age, price, price - 0.01, price + 0.01, 0.02, price, last_trade_at]
+
+
+def due(previous, current, trade_count=None):
+    return scheduling.select_due_markets(
+        4, {"c1": current}, {"c1": previous} if previous else {}, NOW, {"c1": trade_count},
+    )
+
+
+class TestSelectDueMarkets:
+    """Tests for select_due_markets()."""
+
+    def test_never_snapshotted_is_due(self):
+        assert due(None, state(0)) == ["c1"]
+
+    def test_under_min_interval_skipped(self):
+        # Changed, but only 3s old (+0.5s slack < 5s min)
+        assert due(state(3), state(0, price=0.6)) == []
+
+    def test_unchanged_waits_for_max_interval(self):
+        assert due(state(30), state(0)) == []
+        # 59.6s + 0.5s slack reaches the 60s heartbeat
+        assert due(state(59.6), state(0)) == ["c1"]
+
+    def test_changed_due_at_activity_interval(self):
+        # No trades: activity interval is the regular 15s tier interval
+        assert due(state(10), state(0, price=0.51)) == []
+        assert due(state(15), state(0, price=0.51)) == ["c1"]
+
+    def test_hot_market_due_at_min_interval(self):
+        # 300 trades/h = 5/min = hot: interval drops to the 5s min
+        assert due(state(5, last_trade_at=NOW - 6), state(0, last_trade_at=NOW - 1), 300) == ["c1"]
+
+    def test_trades_expiring_is_not_a_change(self):
+        # Busy an hour ago, quiet since: the 1h count falls every run as old
+        # trades expire, but no new trade arrived and prices are flat
+        last_trade = NOW - 1800
+        previous = state(0, last_trade_at=last_trade)
+        for age, trade_count in ((15, 290), (30, 200), (45, 120), (59, 40)):
+            assert due(state(age, last_trade_at=last_trade), previous, trade_count) == [], age
+        assert due(state(59.6, last_trade_at=last_trade), previous, 30) == ["c1"]
+
+
+class TestActivityInterval:
+    """Tests for activity_interval()."""
+
+    def test_interpolates_between_base_and_min(self):
+        assert scheduling.activity_interval(4, None) == 15.0
+        assert scheduling.activity_interval(4, 150) == 10.0  # Half as hot
+        assert scheduling.activity_interval(4, 10_000) == 5.0
+
+
+class TestStateChanged:
+    """Tests for state_changed()."""
+
+    def test_epsilon_and_new_trades(self):
+        previous = state(10, last_trade_at=NOW - 100)
+
+        assert not scheduling.state_changed(previous, state(0, price=0.5004, last_trade_at=NOW - 100), 0.0005)
+        assert scheduling.state_changed(previous, state(0, price=0.501, last_trade_at=NOW - 100), 0.0005)
+        # Only a newer trade is activity
+        assert scheduling.state_changed(previous, state(0, last_trade_at=NOW - 1), 0.0005)
+        assert scheduling.state_changed(state(10), state(0, last_trade_at=NOW - 1), 0.0005)
+        # Metrics no longer published (or an older restart value) is not activity
+        assert not scheduling.state_changed(previous, state(0), 0.0005)
+        assert not scheduling.state_changed(previous, state(0, last_trade_at=NOW - 200), 0.0005)
+
+    def test_value_appearing_or_disappearing(self):
+        previous = state(10)
+        current = state(0)
+        current[2] = None  # best_bid gone
+
+        assert scheduling.state_changed(previous, current, 0.0005)
+        assert scheduling.state_changed(current, previous, 0.0005)
+        assert not scheduling.state_changed(current, list(current), 0.0005)
+
+
+class TestSelectAdaptive:
+    """Tests for select_adaptive() against the Redis state store."""
+
+    def market(self, condition_id, price="0.5"):
+        return {
+            "conditionId": condition_id, "outcomePrices": f'["{price}", "0.5"]',
+            "bestBid": "0.49", "bestAsk": "0.51", "spread": "0.02", "lastTradePrice": price,
+        }
+
+    def test_keeps_due_markets_and_their_states(self, monkeypatch):
+        monkeypatch.setattr(scheduling.time, "time", lambda: NOW)
+        redis_client = MagicMock()
+        fresh = [NOW - 1, 0.5, 0.49, 0.51, 0.02, 0.5, None]
+        redis_client.get_snapshot_activity.return_value = ({"c1": fresh}, {"c2": (3, NOW - 30)})
+
+        due, states = scheduling.select_adaptive(redis_client, 4, [self.market("c1"), self.market("c2")])
+
+        # c1 was snapshotted 1s ago, c2 never
+        assert [m["conditionId"] for m in due] == ["c2"]
+        assert states == {"c2": [NOW, 0.5, 0.49, 0.51, 0.02, 0.5, NOW - 30]}
+
+    def test_expiring_trade_count_not_due(self, monkeypatch):
+        monkeypatch.setattr(scheduling.time, "time", lambda: NOW)
+        redis_client = MagicMock()
+        stored = [NOW - 30, 0.5, 0.49, 0.51, 0.02, 0.5, NOW - 1800]
+        # Count was higher at the last snapshot; last trade unchanged
+        redis_client.get_snapshot_activity.return_value = ({"c1": stored}, {"c1": (12, NOW - 1800)})
+
+        due, states = scheduling.select_adaptive(redis_client, 4, [self.market("c1")])
+
+        assert due == [] and states == {}
+
+    def test_read_failure_makes_every_market_due(self, monkeypatch):
+        monkeypatch.setattr(scheduling.time, "time", lambda: NOW)
+        redis_client = MagicMock()
+        redis_client.get_snapshot_activity.side_effect = ConnectionError("down")
+
+        due, states = scheduling.select_adaptive(redis_client, 4, [self.market("c1"), self.market("c2")])
+
+        assert len(due) == 2
+        assert set(states) == {"c1", "c2"}
+
+    def test_store_failure_is_not_fatal(self):
+        redis_client = MagicMock()
+        redis_client.set_snapshot_state.side_effect = ConnectionError("down")
+
+        scheduling.store_adaptive_states(redis_client, {"c1": [NOW]})
+        scheduling.store_adaptive_states(redis_client, {})
+
+        redis_client.set_snapshot_state.assert_called_once_with({"c1": [NOW]})
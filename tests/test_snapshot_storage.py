@@ -0,0 +1,286 @@
+"""
+Tests for snapshot row building and the bulk write path.
+
+Tests:
+- Rows carry every column, with or without orderbook features and metrics
+- CLOB best bid/ask replace Gamma's only for a sane two-sided book
+- write_snapshots() inserts rows and bumps snapshot_count/last_snapshot_at
+  in one UPDATE (written markets only for the count)
+- Suppressed markets are counted per tier and minute in snapshot_suppressions
+- Packed storage mode stores orderbook depth as bytea
+- Batches partition a tier (every market in exactly one batch) and
+  batch_count() sizes them to the tier
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import BigInteger, create_engine, insert, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.db.models import Market, OrderbookSnapshot, Snapshot, SnapshotSuppression
+from src.snapshots import storage
+from src.snapshots.scheduling import batch_count
+from src.snapshots.storage import (
+    ORDERBOOK_FEATURE_COLUMNS,
+    TRADE_METRIC_COLUMNS,
+    load_tier_markets,
+    orderbook_row,
+    snapshot_row,
+    write_snapshots,
+)
+
+NOW = datetime(2026, 10, 1, 12, 0, 30, tzinfo=timezone.utc)
+EARLIER = NOW - timedelta(minutes=5)
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+def gamma_market(**overrides) -> dict:
+    market = {
+        "conditionId": "0xabc",
+        "outcomePrices": '["0.4", "0.6"]',
+        "bestBid": "0.39",
+        "bestAsk": "0.41",
+        "spread": "0.02",
+        "lastTradePrice": "0.4",
+        "oneDayPriceChange": "-0.01",
+        "volumeNum": "25000",
+        "volume24hr": "1500",
+        "liquidityNum": "900",
+    }
+    market.update(overrides)
+    return market
+
+
+def summary() -> dict:
+    return {
+        "total_bid_depth": 10.0, "total_ask_depth": 5.0,
+        "num_bid_levels": 1, "num_ask_levels": 1,
+        "largest_bid_price": 0.39, "largest_bid_size": 10.0,
+        "largest_ask_price": 0.41, "largest_ask_size": 5.0,
+    }
+
+
+def book_row(market_id: int) -> dict:
+    raw = {"bids": [{"price": "0.39", "size": "10"}], "asks": [{"price": "0.41", "size": "5"}]}
+    return orderbook_row(market_id, NOW, raw, summary())
+
+
+class TestSnapshotRow:
+    """Tests for snapshot_row()."""
+
+    def test_full_row(self):
+        features = {column: 1.0 for column in ORDERBOOK_FEATURE_COLUMNS}
+        features.update(best_bid=0.395, best_ask=0.405, spread=0.01)
+        metrics = {column: 2.0 for column in TRADE_METRIC_COLUMNS}
+
+        row = snapshot_row(gamma_market(), 7, 4, NOW, NOW + timedelta(hours=3), features, metrics)
+
+        assert row["market_id"] == 7
+        assert row["timestamp"] == NOW
+        assert row["tier"] == 4
+        assert row["price"] == 0.4
+        assert row["volume_24h"] == 1500.0
+        assert row["price_change_1d"] == -0.01
+        assert row["price_change_1w"] is None
+        assert row["hours_to_close"] == 3.0
+        assert (row["day_of_week"], row["hour_of_day"]) == (NOW.weekday(), 12)
+        assert all(row[column] == 1.0 for column in ORDERBOOK_FEATURE_COLUMNS)
+        assert all(row[column] == 2.0 for column in TRADE_METRIC_COLUMNS)
+        # Two-sided CLOB book with a sane spread wins over Gamma
+        assert (row["best_bid"], row["best_ask"], row["spread"]) == (0.395, 0.405, 0.01)
+
+    def test_missing_orderbook_and_metrics(self):
+        full = snapshot_row(gamma_market(), 7, 4, NOW, None, {"bid_levels": 3}, {"trade_count_1h": 1})
+
+        row = snapshot_row(gamma_market(), 7, 4, NOW, None, None, None)
+
+        # Same keys either way, so rows batch into one executemany
+        assert set(row) == set(full)
+        assert all(row[column] is None for column in ORDERBOOK_FEATURE_COLUMNS + TRADE_METRIC_COLUMNS)
+        assert (row["best_bid"], row["best_ask"], row["spread"]) == (0.39, 0.41, 0.02)
+        assert row["hours_to_close"] is None
+
+    def test_one_sided_or_wide_book_keeps_gamma_prices(self):
+        one_sided = snapshot_row(gamma_market(), 7, 4, NOW, None, {"best_bid": 0.3, "spread": 0.01}, None)
+        wide = snapshot_row(gamma_market(), 7, 4, NOW, None, {"best_bid": 0.1, "best_ask": 0.9, "spread": 0.8}, None)
+
+        assert one_sided["best_bid"] == 0.39
+        assert wide["spread"] == 0.02
+
+    def test_unparseable_gamma_values_are_none(self):
+        row = snapshot_row(gamma_market(bestBid="n/a", volume24hr=None), 7, 4, NOW, None, None, None)
+
+        assert row["best_bid"] is None
+        assert row["volume_24h"] is None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """In-memory database with three tier-4 markets, wired into write_snapshots()."""
+    engine = create_engine("sqlite://")
+    for model in (Market, Snapshot, OrderbookSnapshot, SnapshotSuppression):
+        model.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Market), [
+            {
+                "id": market_id, "condition_id": f"0x{market_id}", "slug": "m", "question": "q",
+                "tier": 4, "snapshot_count": 5, "last_snapshot_at": EARLIER,
+                "subscription_version": market_id,
+                "tracking_started_at": EARLIER, "first_seen": EARLIER, "updated_at": EARLIER,
+            }
+            for market_id in (1, 2, 3)
+        ])
+
+    @contextmanager
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    monkeypatch.setattr(storage, "get_session", get_session)
+    return engine
+
+
+def market_bookkeeping(engine) -> dict[int, tuple[int, datetime]]:
+    with engine.connect() as connection:
+        rows = connection.execute(select(Market.id, Market.snapshot_count, Market.last_snapshot_at))
+        return {row.id: (row.snapshot_count, row.last_snapshot_at) for row in rows}
+
+
+def count(engine, model) -> int:
+    with engine.connect() as connection:
+        return len(connection.execute(select(model.__table__)).all())
+
+
+class TestWriteSnapshots:
+    """Tests for write_snapshots() against an in-memory database."""
+
+    @pytest.fixture(autouse=True)
+    def jsonb_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "orderbook_storage_mode", "jsonb")
+
+    def rows(self, *market_ids):
+        return [snapshot_row(gamma_market(), market_id, 4, NOW, None, None, None) for market_id in market_ids]
+
+    def test_inserts_and_bumps_written_markets(self, db):
+        write_snapshots(NOW, 4, self.rows(1, 2), [book_row(1)])
+
+        assert count(db, Snapshot) == 2
+        assert count(db, OrderbookSnapshot) == 1
+        bookkeeping = market_bookkeeping(db)
+        assert bookkeeping[1] == bookkeeping[2] == (6, NOW.replace(tzinfo=None))
+        assert bookkeeping[3] == (5, EARLIER.replace(tzinfo=None))
+        assert count(db, SnapshotSuppression) == 0
+
+    def test_suppressed_markets_bump_last_snapshot_only(self, db):
+        write_snapshots(NOW, 4, self.rows(1), [book_row(1)], suppressed_ids={2, 3})
+
+        bookkeeping = market_bookkeeping(db)
+        assert bookkeeping[1] == (6, NOW.replace(tzinfo=None))
+        assert bookkeeping[2] == bookkeeping[3] == (5, NOW.replace(tzinfo=None))
+        assert count(db, Snapshot) == 1
+
+    def test_suppressions_accumulate_per_minute(self, db):
+        write_snapshots(NOW, 4, [], [], suppressed_ids={1, 2})
+        write_snapshots(NOW + timedelta(seconds=10), 4, [], [], suppressed_ids={3})
+        write_snapshots(NOW + timedelta(minutes=1), 4, [], [], suppressed_ids={1})
+
+        with db.connect() as connection:
+            rows = connection.execute(
+                select(SnapshotSuppression.bucket, SnapshotSuppression.suppressed)
+                .order_by(SnapshotSuppression.bucket)
+            ).all()
+        assert [(bucket.minute, suppressed) for bucket, suppressed in rows] == [(0, 3), (1, 1)]
+
+    def test_nothing_to_write_opens_no_session(self, monkeypatch):
+        def fail():
+            raise AssertionError("session opened")
+
+        monkeypatch.setattr(storage, "get_session", fail)
+        write_snapshots(NOW, 4, [], [])
+
+    def test_packed_mode_stores_depth_bytes(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "orderbook_storage_mode", "packed")
+        monkeypatch.setattr(settings, "orderbook_delta_encoding", False)
+
+        write_snapshots(NOW, 4, self.rows(1), [book_row(1)])
+
+        with db.connect() as connection:
+            row = connection.execute(select(OrderbookSnapshot.__table__)).one()
+        assert row.bids is None and row.asks is None
+        assert isinstance(row.bid_depth, bytes) and isinstance(row.ask_depth, bytes)
+        assert row.total_bid_depth == 10.0
+
+
+class TestTierBatches:
+    """Tests for load_tier_markets() partitioning and batch_count()."""
+
+    @pytest.fixture
+    def tier_db(self):
+        engine = create_engine("sqlite://")
+        Market.__table__.create(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Market), [
+                {
+                    "id": market_id, "condition_id": f"0x{market_id}", "slug": "m", "question": "q",
+                    # Every 7th market is in another tier, every 11th resolved
+                    "tier": 3 if market_id % 7 == 0 else 4,
+                    "resolved": market_id % 11 == 0,
+                    "subscription_version": market_id,
+                    "tracking_started_at": EARLIER, "first_seen": EARLIER, "updated_at": EARLIER,
+                }
+                for market_id in range(1, 104)
+            ])
+        with Session(engine) as session:
+            yield session
+
+    @pytest.mark.parametrize("total_batches", [1, 2, 3, 4, 7])
+    def test_every_market_in_exactly_one_batch(self, tier_db, total_batches):
+        whole_tier = {row.id for row in load_tier_markets(tier_db, 4)}
+
+        batches = [
+            [row.id for row in load_tier_markets(tier_db, 4, batch, total_batches)]
+            for batch in range(total_batches)
+        ]
+
+        assigned = [market_id for batch in batches for market_id in batch]
+        assert len(assigned) == len(set(assigned))
+        assert set(assigned) == whole_tier
+        assert all(market_id % total_batches == batch
+                   for batch, ids in enumerate(batches) for market_id in ids)
+        # Other tiers and resolved markets are never loaded
+        assert not any(market_id % 7 == 0 or market_id % 11 == 0 for market_id in whole_tier)
+
+    def test_rows_have_snapshot_columns(self, tier_db):
+        row = load_tier_markets(tier_db, 4)[0]
+
+        assert set(row._fields) == {"id", "condition_id", "yes_token_id", "end_date"}
+
+    @pytest.mark.parametrize("markets, expected", [
+        (0, 1),      # Empty tier still gets one batch (the dispatcher skips it)
+        (1, 1),
+        (250, 1),
+        (251, 2),    # Non-multiple rounds up
+        (600, 3),
+        (10_000, 4), # Capped by the workers available
+    ])
+    def test_batch_count(self, monkeypatch, markets, expected):
+        monkeypatch.setattr(settings, "snapshot_batch_target_size", 250)
+        monkeypatch.setattr(settings, "snapshot_batch_workers", 4)
+
+        assert batch_count(markets) == expected
+
+    def test_batch_count_explicit_workers_and_bad_target(self, monkeypatch):
+        monkeypatch.setattr(settings, "snapshot_batch_target_size", 0)
+
+        # A zero target size is treated as one market per batch
+        assert batch_count(5, workers=8) == 5
+        assert batch_count(50, workers=8) == 8
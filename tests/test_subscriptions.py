@@ -0,0 +1,116 @@
+"""
+Tests for incremental WebSocket subscription management.
+
+Tests:
+- Diffs contain only added/removed markets; token changes resubscribe
+- Changed rows upsert or remove markets and advance the high-water mark
+- Eligible markets are ranked by tier
+- Collectors patch their token lookup in place
+"""
+
+from types import SimpleNamespace
+
+from src.collectors.subscriptions import MarketSubscriptions, diff_subscriptions, token_ids
+from src.collectors.websocket import WebSocketCollector
+
+
+def info(market_id, tier=4, yes=None, no=None):
+    return {
+        "yes_token_id": yes or f"y{market_id}",
+        "no_token_id": no or f"n{market_id}",
+        "market_id": market_id,
+        "tier": tier,
+    }
+
+
+def row(market_id, version, tier=4, active=True, resolved=False, yes=None):
+    return SimpleNamespace(
+        condition_id=f"c{market_id}",
+        id=market_id,
+        yes_token_id=yes if yes is not None else f"y{market_id}",
+        no_token_id=f"n{market_id}",
+        tier=tier,
+        active=active,
+        resolved=resolved,
+        subscription_version=version,
+    )
+
+
+class TestDiffSubscriptions:
+    """Tests for diff_subscriptions()."""
+
+    def test_only_changes_in_diff(self):
+        current = {"c1": info(1), "c2": info(2)}
+        desired = {"c2": info(2, tier=3), "c3": info(3)}
+
+        diff = diff_subscriptions(current, desired)
+
+        # A tier change alone needs no frames
+        assert list(diff.added) == ["c3"]
+        assert list(diff.removed) == ["c1"]
+        assert token_ids(diff.added.values()) == ["y3", "n3"]
+
+    def test_token_change_resubscribes(self):
+        """New token IDs subscribe the new tokens; only tokens no longer used are unsubscribed."""
+        current = {"c1": info(1)}
+        desired = {"c1": info(1, yes="y1b")}
+
+        diff = diff_subscriptions(current, desired)
+
+        assert diff.subscribe_tokens() == ["y1b", "n1"]
+        # n1 is still wanted and stays subscribed
+        assert diff.unsubscribe_tokens() == ["y1"]
+
+    def test_filled_in_token_keeps_existing_token(self):
+        """Discovery filling in a NO token must not unsubscribe the YES token."""
+        current = {"c1": {**info(1), "no_token_id": None}}
+        desired = {"c1": info(1)}
+
+        diff = diff_subscriptions(current, desired)
+
+        assert diff.subscribe_tokens() == ["y1", "n1"]
+        assert diff.unsubscribe_tokens() == []
+
+    def test_no_changes_is_falsy(self):
+        assert not diff_subscriptions({"c1": info(1)}, {"c1": info(1)})
+
+
+class TestMarketSubscriptions:
+    """Tests for MarketSubscriptions row application."""
+
+    def test_changes_upsert_and_remove(self):
+        """Changed rows update the view; ineligible ones drop out."""
+        view = MarketSubscriptions(resync_seconds=60)
+        view.apply_full([row(1, 5), row(2, 6), row(3, 7, tier=1)], high_water=9)
+        assert set(view.markets) == {"c1", "c2"}
+
+        view.apply_changes([row(1, 10, resolved=True), row(3, 12, tier=3), row(2, 11, tier=2)])
+
+        assert set(view.markets) == {"c2", "c3"}
+        assert view.markets["c2"]["tier"] == 2
+        assert view.high_water == 12
+
+    def test_ranked_by_tier(self):
+        view = MarketSubscriptions(resync_seconds=60)
+        view.apply_full([row(1, 1, tier=2), row(2, 2, tier=4), row(3, 3, tier=3), row(4, 4, tier=4)], 4)
+
+        assert list(view.ranked()) == ["c2", "c4", "c3", "c1"]
+        assert list(view.ranked(limit=2)) == ["c2", "c4"]
+
+
+class TestCollectorLookupPatch:
+    """Tests for WebSocketCollector.apply_subscription_diff()."""
+
+    def test_patches_lookup_in_place(self):
+        collector = WebSocketCollector(managed=True)
+        collector.apply_subscription_diff(diff_subscriptions({}, {"c1": info(1), "c2": info(2)}))
+        lookup = collector.token_to_market
+
+        collector.apply_subscription_diff(
+            diff_subscriptions(collector.subscribed_markets, {"c2": info(2), "c3": info(3)})
+        )
+
+        assert collector.token_to_market is lookup
+        assert set(lookup) == {"y2", "n2", "y3", "n3"}
+        assert lookup["n3"] == {"condition_id": "c3", "market_id": 3, "token_type": "NO"}
+        assert set(collector.subscribed_markets) == {"c2", "c3"}
@@ -0,0 +1,89 @@
+"""
+Tests for the write-behind trade writer.
+
+Tests:
+- Trades are flushed in size-bounded batches
+- Partial batches are flushed after the flush interval
+- Full queue spills trades instead of blocking the producer
+- Stop drains everything still queued
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from src.collectors.ingest import PendingTrade, TradeWriter
+
+
+def make_trade(size: float = 10.0, whale_tier: int = 0) -> PendingTrade:
+    return PendingTrade(
+        market_id=1,
+        timestamp=datetime.now(timezone.utc),
+        price=0.5,
+        size=size,
+        side="BUY",
+        token_type="YES",
+        whale_tier=whale_tier,
+    )
+
+
+class TestTradeWriter:
+    """Tests for TradeWriter batching and backpressure."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_size_bounded_batches(self):
+        """25 trades with batch_size=10 are written as 10 + 10 + 5."""
+        batches = []
+        writer = TradeWriter(batch_size=10, flush_interval=0.05, max_queue=100)
+
+        with patch.object(TradeWriter, "_write_batch", side_effect=lambda b: batches.append(len(b)) or 0):
+            for _ in range(25):
+                await writer.submit(make_trade())
+            await writer.start()
+            await writer.stop()
+
+        assert batches == [10, 10, 5]
+        assert writer.written == 25
+        assert writer.stats()["queue_size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushed_after_interval(self):
+        """A single trade is written without waiting for a full batch."""
+        batches = []
+        writer = TradeWriter(batch_size=100, flush_interval=0.05, max_queue=100)
+
+        with patch.object(TradeWriter, "_write_batch", side_effect=lambda b: batches.append(len(b)) or 0):
+            await writer.start()
+            await writer.submit(make_trade())
+            await asyncio.sleep(0.2)
+            assert batches == [1]
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_spills(self):
+        """When the queue is full and nothing drains it, trades are spilled."""
+        writer = TradeWriter(batch_size=10, flush_interval=0.05, max_queue=2, put_timeout=0.01)
+
+        assert await writer.submit(make_trade()) is True
+        assert await writer.submit(make_trade()) is True
+        assert await writer.submit(make_trade()) is False
+
+        stats = writer.stats()
+        assert stats["spilled"] == 1
+        assert stats["backpressure_waits"] == 1
+        assert stats["enqueued"] == 2
+
+    @pytest.mark.asyncio
+    async def test_write_failure_counted_not_raised(self):
+        """DB errors are counted as failed rows and do not stop the writer."""
+        writer = TradeWriter(batch_size=10, flush_interval=0.05, max_queue=100)
+
+        with patch.object(TradeWriter, "_write_batch", side_effect=RuntimeError("db down")):
+            await writer.submit(make_trade())
+            await writer.start()
+            await writer.stop()
+
+        assert writer.failed == 1
+        assert writer.written == 0
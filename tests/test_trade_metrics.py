@@ -0,0 +1,209 @@
+"""
+Tests for incremental sliding-window trade metrics.
+
+Tests:
+- Running aggregates match a full recompute
+- Max trade size stays correct as large trades expire
+- Whale stats and time_since_whale
+- last_trade_at only moves on new trades and is dropped by readers
+- Aggregator only publishes seeded, changed markets
+- Seeding merges older buffered trades without double-counting flushed live ones
+- Recompute from buffered trades matches the rolling window
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.collectors.metrics import (
+    RollingTradeWindow,
+    TradeMetricsAggregator,
+    finalize_published_metrics,
+    metrics_from_trades,
+)
+from src.db.redis import decode_trade, encode_trade
+
+
+class TestRollingTradeWindow:
+    """Tests for RollingTradeWindow add/expire/metrics."""
+
+    def test_metrics_match_recompute(self):
+        """Running sums produce the same values as recomputing from trades."""
+        window = RollingTradeWindow(window_seconds=3600)
+        trades = [
+            (1000.0, 0.40, 100.0, "BUY", 0),
+            (1001.0, 0.42, 300.0, "SELL", 1),
+            (1002.0, 0.41, 50.0, "BUY", 0),
+        ]
+        for t in trades:
+            window.add(*t)
+
+        m = window.metrics(now=1010.0)
+        assert m["trade_count_1h"] == 3
+        assert m["buy_count_1h"] == 2
+        assert m["sell_count_1h"] == 1
+        assert m["volume_1h"] == 450.0
+        assert m["buy_volume_1h"] == 150.0
+        assert m["max_trade_size_1h"] == 300.0
+        assert m["avg_trade_size_1h"] == 150.0
+        expected_vwap = sum(p * s for _, p, s, _, _ in trades) / 450.0
+        assert abs(m["vwap_1h"] - expected_vwap) < 1e-12
+        assert m["whale_count_1h"] == 0
+        assert m["time_since_whale"] is None
+
+    def test_max_updates_when_largest_trade_expires(self):
+        """The monotonic deque falls back to the next largest trade."""
+        window = RollingTradeWindow(window_seconds=60)
+        window.add(0.0, 0.5, 500.0, "BUY", 0)
+        window.add(10.0, 0.5, 200.0, "BUY", 0)
+        window.add(20.0, 0.5, 100.0, "SELL", 0)
+
+        assert window.metrics(now=30.0)["max_trade_size_1h"] == 500.0
+
+        assert window.expire(now=65.0) is True
+        m = window.metrics(now=65.0)
+        assert m["trade_count_1h"] == 2
+        assert m["max_trade_size_1h"] == 200.0
+        assert m["volume_1h"] == 300.0
+
+    def test_empty_after_expiry_resets(self):
+        """A fully expired window reports the empty metric shape."""
+        window = RollingTradeWindow(window_seconds=60)
+        window.add(0.0, 0.5, 10.0, "BUY", 2)
+        window.expire(now=100.0)
+
+        m = window.metrics(now=100.0)
+        assert m["trade_count_1h"] == 0
+        assert m["vwap_1h"] is None
+        assert m["whale_count_1h"] == 0
+        assert m["last_whale_at"] is None
+        # The newest trade time survives expiry; only a new trade moves it
+        assert m["last_trade_at"] == 0.0
+
+    def test_last_trade_at_dropped_by_readers(self):
+        """last_trade_at is published for scheduling but is not a snapshot column."""
+        window = RollingTradeWindow(window_seconds=3600)
+        window.add(100.0, 0.5, 10.0, "BUY", 0)
+        window.add(200.0, 0.5, 10.0, "SELL", 0)
+
+        m = window.metrics(now=300.0)
+        assert m["last_trade_at"] == 200.0
+        assert "last_trade_at" not in finalize_published_metrics(m, now=300.0)
+
+    def test_whale_metrics(self):
+        """Whale trades feed whale volume, flow and last whale time."""
+        window = RollingTradeWindow(window_seconds=3600)
+        window.add(100.0, 0.5, 3000.0, "BUY", 2)
+        window.add(200.0, 0.5, 1000.0, "SELL", 0)
+        window.add(300.0, 0.5, 2500.0, "SELL", 2)
+
+        m = window.metrics(now=400.0)
+        assert m["whale_count_1h"] == 2
+        assert m["whale_volume_1h"] == 5500.0
+        assert m["whale_net_flow_1h"] == 500.0
+        assert m["time_since_whale"] == 100
+        assert m["pct_volume_from_whales"] == 5500.0 / 6500.0
+
+        # Published value is recomputed at read time
+        assert finalize_published_metrics(m, now=460.0)["time_since_whale"] == 160
+
+
+class TestTradeMetricsAggregator:
+    """Tests for TradeMetricsAggregator.publish()."""
+
+    def test_publishes_only_seeded_dirty_markets(self):
+        """Unseeded markets are never published; unchanged ones wait for refresh."""
+        writer = MagicMock()
+        agg = TradeMetricsAggregator(writer, publish_interval=1.0, refresh_seconds=60.0)
+        agg.record_trade("a", 1000.0, 0.5, 10.0, "BUY", 0)
+        agg.record_trade("b", 1000.0, 0.5, 10.0, "BUY", 0)
+        agg._seeded.add("a")
+
+        assert agg.publish(now=1001.0) == 1
+        cid, metrics = writer.set_metrics.call_args.args
+        assert cid == "a"
+        assert metrics["trade_count_1h"] == 1
+        assert metrics["published_at"] == 1001.0
+
+        # Nothing changed and refresh not due
+        assert agg.publish(now=1002.0) == 0
+        # Refresh keeps the TTL alive
+        assert agg.publish(now=1062.0) == 1
+
+
+class TestSeed:
+    """Tests for TradeMetricsAggregator.seed()."""
+
+    @staticmethod
+    def buffered(*trades: dict) -> list[dict]:
+        """Trades as read back from the packed buffer (newest first)."""
+        return [decode_trade(encode_trade(t)[0]) for t in sorted(trades, key=lambda t: -t["ts"])]
+
+    @pytest.mark.asyncio
+    async def test_flushed_live_trade_counted_once(self):
+        """A live trade already in the buffer (ms-truncated ts) is not added twice."""
+        live = {"ts": 1000.0007, "price": 0.5, "size": 10.0, "side": "BUY", "whale_tier": 0}
+        older = {"ts": 900.25, "price": 0.4, "size": 5.0, "side": "SELL", "whale_tier": 0}
+        agg = TradeMetricsAggregator(MagicMock())
+        agg.record_trade("a", live["ts"], live["price"], live["size"], live["side"], live["whale_tier"])
+        redis = MagicMock()
+        redis.get_trades_1h = AsyncMock(return_value=self.buffered(live, older))
+        # The round trip truncates the timestamp below the in-memory one
+        assert redis.get_trades_1h.return_value[0]["ts"] < live["ts"]
+
+        assert await agg.seed(redis, ["a"]) == 1
+
+        metrics = agg.windows["a"].metrics(now=1001.0)
+        assert metrics["trade_count_1h"] == 2
+        assert metrics["volume_1h"] == 15.0
+
+    @pytest.mark.asyncio
+    async def test_seed_without_live_trades_loads_buffer(self):
+        """With no live window every buffered trade is loaded, oldest first."""
+        trades = [
+            {"ts": 900.0 + i, "price": 0.5, "size": 1.0, "side": "BUY", "whale_tier": 0}
+            for i in range(3)
+        ]
+        agg = TradeMetricsAggregator(MagicMock())
+        redis = MagicMock()
+        redis.get_trades_1h = AsyncMock(return_value=self.buffered(*trades))
+
+        await agg.seed(redis, ["a"])
+
+        assert agg.windows["a"].metrics(now=1000.0)["trade_count_1h"] == 3
+        assert agg.windows["a"].oldest_ts == 900.0
+
+
+class TestMetricsFromTrades:
+    """Tests for metrics_from_trades() (buffer recompute path)."""
+
+    def test_matches_rolling_window(self):
+        """Recomputing from trade dicts gives the collector's published values."""
+        trades = [
+            (100.0, 0.40, 3000.0, "BUY", 2),
+            (200.0, 0.42, 300.0, "SELL", 0),
+            (300.0, 0.41, 2500.0, "SELL", 2),
+            (350.0, 0.45, 50.0, "BUY", 1),
+        ]
+        window = RollingTradeWindow(window_seconds=3600)
+        for t in trades:
+            window.add(*t)
+        expected = window.metrics(now=400.0)
+
+        m = metrics_from_trades(
+            [
+                {"ts": ts, "price": price, "size": size, "side": side, "whale_tier": tier}
+                for ts, price, size, side, tier in reversed(trades)
+            ],
+            now=400.0,
+        )
+        for key, value in m.items():
+            assert value == expected[key] or abs(value - expected[key]) < 1e-9, key
+
+    def test_empty(self):
+        """No trades gives zero counts and no whale timing."""
+        m = metrics_from_trades([], now=400.0)
+        assert m["trade_count_1h"] == 0
+        assert m["vwap_1h"] is None
+        assert m["whale_count_1h"] == 0
+        assert m["time_since_whale"] is None
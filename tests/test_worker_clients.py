@@ -0,0 +1,134 @@
+"""
+Tests for the worker-lifetime client pool.
+
+Tests:
+- A healthy cached client is reused
+- A cached HTTP client that is_closed (or a Redis client failing ping) is closed and rebuilt
+- Health checks run at most every health_interval seconds
+- worker_process_init discards the inherited engine pool without closing
+  the parent's connections, then resets and warms the clients
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.snapshots import clients
+from src.snapshots.clients import WorkerClients
+
+
+class FakeHTTPClient:
+    """Stand-in for an httpx-backed API client."""
+
+    created = 0
+
+    def __init__(self):
+        FakeHTTPClient.created += 1
+        self.is_closed = False
+        self.close_calls = 0
+
+    def close(self):
+        self.close_calls += 1
+        self.is_closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_created():
+    FakeHTTPClient.created = 0
+
+
+class TestGet:
+    """Tests for WorkerClients._get()."""
+
+    def test_healthy_client_reused(self):
+        pool = WorkerClients(health_interval=0)
+
+        first = pool._get("clob", FakeHTTPClient, pool._http_healthy)
+        second = pool._get("clob", FakeHTTPClient, pool._http_healthy)
+
+        assert second is first
+        assert FakeHTTPClient.created == 1
+
+    def test_closed_client_rebuilt(self):
+        pool = WorkerClients(health_interval=0)
+        first = pool._get("clob", FakeHTTPClient, pool._http_healthy)
+        first.is_closed = True
+
+        second = pool._get("clob", FakeHTTPClient, pool._http_healthy)
+
+        assert second is not first
+        assert not second.is_closed
+        assert first.close_calls == 1
+        assert pool._get("clob", FakeHTTPClient, pool._http_healthy) is second
+
+    def test_failed_redis_ping_rebuilt(self):
+        pool = WorkerClients(health_interval=0)
+        first = pool._get("redis", MagicMock, pool._redis_healthy)
+        first.ping.return_value = False
+
+        second = pool._get("redis", MagicMock, pool._redis_healthy)
+
+        assert second is not first
+        first.close.assert_called_once()
+
+    def test_health_checked_at_most_every_interval(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(clients.time, "monotonic", lambda: clock[0])
+        pool = WorkerClients(health_interval=30)
+        healthy = MagicMock(return_value=True)
+
+        pool._get("gamma", FakeHTTPClient, healthy)
+        clock[0] += 10
+        pool._get("gamma", FakeHTTPClient, healthy)
+        assert healthy.call_count == 0
+
+        clock[0] += 25
+        pool._get("gamma", FakeHTTPClient, healthy)
+        assert healthy.call_count == 1
+
+    def test_close_drops_clients(self):
+        pool = WorkerClients(health_interval=0)
+        first = pool._get("clob", FakeHTTPClient, pool._http_healthy)
+
+        pool.close()
+
+        assert first.close_calls == 1
+        assert pool._get("clob", FakeHTTPClient, pool._http_healthy) is not first
+
+
+class TestWorkerSignals:
+    """Tests for the worker_process_init/shutdown handlers."""
+
+    def test_init_disposes_inherited_pool_without_closing(self, monkeypatch):
+        engine = MagicMock()
+        pool = MagicMock()
+        monkeypatch.setattr(clients, "engine", engine)
+        monkeypatch.setattr(clients, "worker_clients", pool)
+
+        clients._init_worker_clients()
+
+        # close=False: the parent's connections stay open for the parent
+        engine.dispose.assert_called_once_with(close=False)
+        pool.close.assert_called_once()
+        pool.warm.assert_called_once()
+
+    def test_init_survives_warm_failure(self, monkeypatch):
+        pool = MagicMock()
+        pool.warm.side_effect = ConnectionError("down")
+        monkeypatch.setattr(clients, "engine", MagicMock())
+        monkeypatch.setattr(clients, "worker_clients", pool)
+
+        clients._init_worker_clients()
+
+        pool.warm.assert_called_once()
+
+    def test_shutdown_closes_clients_and_pool(self, monkeypatch):
+        engine = MagicMock()
+        pool = MagicMock()
+        monkeypatch.setattr(clients, "engine", engine)
+        monkeypatch.setattr(clients, "worker_clients", pool)
+
+        clients._close_worker_clients()
+
+        pool.close.assert_called_once()
+        engine.dispose.assert_called_once_with()